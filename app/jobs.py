@@ -9,6 +9,7 @@
 защитный ордер выхода с риском своего входа.
 """
 import asyncio
+import functools
 import time
 import logging
 import re
@@ -20,14 +21,38 @@ from telegram.ext import ContextTypes
 
 from core.config import (
     ALLOWED_ID,
+    BYBIT_API_KEY,
+    BYBIT_API_SECRET,
+    HEAT_QUEUE_DRAIN_INTERVAL_SEC,
+    IS_DEMO,
     ORDER_TIMEOUT_DAYS,
+    PRIVATE_STREAM_ENABLED,
+    PRIVATE_STREAM_STALE_SEC,
+    PRIVATE_STREAM_URL,
     WATCHDOG_COOLDOWN_SEC,
     WATCHDOG_ENABLED,
     WATCHDOG_INTERVAL_SEC,
 )
+from core.executors import run_disk
 from core.database import is_trading_enabled, get_risk_for_symbol, get_source_at_time
 from core.trading_core import session
 from core.bybit_call import bybit_call
+from core.exchange_snapshot import (
+    get_open_orders_snapshot,
+    get_positions_snapshot,
+    get_wallet_snapshot,
+    invalidate_exchange_snapshots,
+)
+from core.instrument_cache import (
+    INSTRUMENT_CACHE_TTL_SEC,
+    get_instrument_info,
+    refresh_instruments,
+)
+from core.private_stream import (
+    PRIVATE_STREAM_MAINNET_URL,
+    PRIVATE_STREAM_TESTNET_URL,
+    PrivateStream,
+)
 from core.notifier import (
     send_alert,
     alert_bybit_error,
@@ -37,7 +62,7 @@ from core.notifier import (
     TIMEOUT,
 )
 from core.journal import (
-    append_event, RECONCILED, POSITION_CONFIRMED,
+    append_event, submit_event, RECONCILED, POSITION_CONFIRMED,
     POSITION_NOT_FOUND_ON_EXCHANGE,
     PENDING, CONFIRMED,
     PROTECTION_CHANGE,
@@ -50,6 +75,7 @@ from core.journal import (
     MARK_2R_SOURCE_CLOSED_KLINE,
     MARK_2R_SOURCE_CURRENT_POSITION,
     get_position_lifecycles,
+    get_position_open_times,
     normalize_symbol,
     check_and_quarantine_sources,
     get_disabled_sources,
@@ -65,6 +91,8 @@ from core.journal import (
     is_current_pending_lifecycle,
     CONFIRM_APPEND_WRITTEN,
     CONFIRM_APPEND_NOT_CURRENT,
+    JOURNAL_SNAPSHOT_INTERVAL_SEC,
+    save_lifecycle_snapshot,
 )
 # Строгий разбор positionIdx и канонический write_outcome берутся из общего
 # контракта доказательств (HIGH-6): идентичность позиции в журнале обязана
@@ -116,7 +144,14 @@ from core.utils import safe_float
 # пагинации: токен продолжения читается из result["nextPageCursor"] и уходит
 # следующим запросом параметром cursor. Реализация общая с /report намеренно —
 # два authoritative-отчёта не имеют права разойтись в проверке полноты страниц.
-from handlers.reporting import fetch_closed_pnl_rows
+# Завершённая часть недели читается из локальной истории closed-PnL.
+from handlers.cancel_orders import (
+    CANCELLED,
+    REJECTED,
+    UNVERIFIED,
+    cancel_orders_batched,
+)
+from handlers.reporting import load_closed_pnl_rows
 from handlers.ui import (
     format_action,
     format_header,
@@ -388,7 +423,7 @@ async def _journal_protection_change(
         event["position_idx"] = position_idx
 
     try:
-        written = await asyncio.to_thread(append_event, event)
+        written = await run_disk(append_event, event)
     except Exception as exc:
         logging.error("Auto-BE: audit PROTECTION_CHANGE не записан: %s", exc)
         return False
@@ -401,25 +436,58 @@ async def _journal_protection_change(
     return True
 
 
+def _exclusive(job):
+    """Не даёт двум прогонам одной задачи идти одновременно.
+
+    Периодический прогон и внеочередной (по сигналу приватного потока) ждут
+    друг друга, а не читают и пишут одну позицию параллельно.
+    """
+    lock = None
+
+    @functools.wraps(job)
+    async def run(context):
+        nonlocal lock
+        if lock is None:
+            lock = asyncio.Lock()
+        async with lock:
+            return await job(context)
+
+    return run
+
+
 # --- 1. Heartbeat (Проверка пульса) ---
 async def heartbeat_job(context: ContextTypes.DEFAULT_TYPE):
-    """Пишет аптайм и текущий PnL по всем позам."""
+    """Пишет аптайм и текущий PnL по всем позам.
+
+    Пульс ничего не решает, поэтому позиции берёт из зеркала приватного
+    потока, пока оно свежее; иначе — из общего REST-снимка.
+    """
     uptime = str(timedelta(seconds=int(time.time() - START_TIME)))
 
     # Пытаемся получить PnL (тихо, без лишнего шума)
     try:
-        _pos_resp = await bybit_call(session.get_positions, category="linear", settleCoin="USDT")
-        positions = _pos_resp['result']['list']
+        positions = None
+        if _private_stream is not None:
+            positions = _private_stream.mirror.positions(PRIVATE_STREAM_STALE_SEC)
+        if positions is None:
+            _pos_resp = (await get_positions_snapshot(bybit_call, session)).resp
+            positions = _pos_resp['result']['list']
         total_pnl = sum(safe_float(p.get('unrealisedPnl')) for p in positions if safe_float(p.get('size')) > 0)
         active_count = len([p for p in positions if safe_float(p.get('size')) > 0])
         pnl_str = f" | 💰 Open PnL: {total_pnl:+.2f}$ ({active_count} deals)"
     except Exception:
         pnl_str = ""
 
-    logging.info(f"💓 System active. Uptime: {uptime}{pnl_str}")
+    stream_str = ""
+    if _private_stream is not None:
+        live = _private_stream.mirror.is_fresh(PRIVATE_STREAM_STALE_SEC)
+        stream_str = f" | 📡 Stream: {'live' if live else 'stale'}"
+
+    logging.info(f"💓 System active. Uptime: {uptime}{pnl_str}{stream_str}")
 
 
 # --- 2. Auto-Breakeven (Перевод в Безубыток) ---
+@_exclusive
 async def auto_breakeven_job(context: ContextTypes.DEFAULT_TYPE):
     """
     Авто-трейлинг стопа: ступенчатое подтягивание по R.
@@ -430,14 +498,16 @@ async def auto_breakeven_job(context: ContextTypes.DEFAULT_TYPE):
     if not is_trading_enabled(): return
 
     try:
-        _pos_resp = await bybit_call(session.get_positions, category="linear", settleCoin="USDT")
+        # По этим чтениям переносится SL: общий снимок другой задачи не
+        # подходит, нужен собственный свежий ответ биржи.
+        _pos_resp = (await get_positions_snapshot(bybit_call, session, fresh=True)).resp
         positions = _require_result_rows(_pos_resp, "get_positions")
-        protection_evidence = await asyncio.to_thread(get_auto_protection_evidence)
+        protection_evidence = await run_disk(get_auto_protection_evidence)
         if not protection_evidence:
             return
-        _orders_resp = await bybit_call(
-            session.get_open_orders, category="linear", settleCoin="USDT"
-        )
+        _orders_resp = (
+            await get_open_orders_snapshot(bybit_call, session, fresh=True)
+        ).resp
         order_rows = _require_result_rows(_orders_resp, "get_open_orders")
         active = [p for p in positions if safe_float(p.get('size'), field='size') > 0]
 
@@ -534,7 +604,7 @@ async def auto_breakeven_job(context: ContextTypes.DEFAULT_TYPE):
             current_r = price_move / dist_1r_price
 
             # 3. Получаем шаг цены (tickSize) для округления
-            _info_resp = await bybit_call(session.get_instruments_info, category="linear", symbol=sym)
+            _info_resp = await get_instrument_info(bybit_call, session, sym)
             info = _info_resp['result']['list'][0]
             tick = float(info['priceFilter']['tickSize'])
 
@@ -620,13 +690,17 @@ async def auto_cleanup_orders_job(context: ContextTypes.DEFAULT_TYPE):
     if not is_trading_enabled(): return
 
     try:
-        _orders_resp = await bybit_call(session.get_open_orders, category="linear", settleCoin="USDT")
+        # Отмена — запись: решение принимается по свежему списку ордеров.
+        _orders_resp = (
+            await get_open_orders_snapshot(bybit_call, session, fresh=True)
+        ).resp
         orders = _orders_resp['result']['list']
         if not orders: return
 
         now_ms = time.time() * 1000
         timeout_ms = ORDER_TIMEOUT_DAYS * 24 * 60 * 60 * 1000
 
+        stale = []
         for o in orders:
             # Не трогаем TP/SL (они ReduceOnly) и рыночные
             if safe_float(o.get('price')) == 0: continue
@@ -636,21 +710,39 @@ async def auto_cleanup_orders_job(context: ContextTypes.DEFAULT_TYPE):
 
             # Если просрочен
             if (now_ms - created_time) > timeout_ms:
-                try:
-                    await bybit_call(session.cancel_order, category="linear", symbol=o['symbol'], orderId=o['orderId'])
-                    logging.info(f"🗑 Cleanup: {o['symbol']}")
-                    await context.bot.send_message(
-                        chat_id=ALLOWED_ID,
-                        text=(
-                            f"{format_header('ℹ️', 'ORDER CANCELLED')}\n"
-                            f"{h(o['symbol'])} · Limit\n\n"
-                            f"Ордер отменён по существующему таймауту.\n\n"
-                            f"{format_action('проверьте открытые ордера через /orders')}"
-                        ),
-                        parse_mode='HTML'
-                    )
-                except Exception as e:
-                    logging.debug(f"Cleanup cancel {o['symbol']}/{o['orderId']}: {e}")
+                stale.append((o['symbol'], o['orderId']))
+        if not stale: return
+
+        # Пакетная отмена: один cancel_batch_order на 10 ордеров и одна сводка
+        # за прогон вместо запроса и сообщения на каждый ордер.
+        outcomes = await cancel_orders_batched(bybit_call, session, stale)
+        by_outcome = {CANCELLED: [], REJECTED: [], UNVERIFIED: []}
+        for pair in stale:
+            by_outcome[outcomes[pair]].append(pair)
+        for sym, oid in by_outcome[CANCELLED]:
+            logging.info(f"🗑 Cleanup: {sym}")
+        for sym, oid in by_outcome[REJECTED] + by_outcome[UNVERIFIED]:
+            logging.debug(f"Cleanup cancel {sym}/{oid}: {outcomes[(sym, oid)]}")
+
+        cancelled_symbols = sorted({sym for sym, _ in by_outcome[CANCELLED]})
+        rows = [('Отменено', len(by_outcome[CANCELLED]))]
+        if by_outcome[REJECTED]:
+            rows.append(('Отклонено биржей', len(by_outcome[REJECTED])))
+        if by_outcome[UNVERIFIED]:
+            rows.append(('Исход не подтверждён', len(by_outcome[UNVERIFIED])))
+        lines = [
+            format_header('ℹ️', 'ORDER CLEANUP'),
+            f"Отмена лимитных ордеров старше {ORDER_TIMEOUT_DAYS} дн. по существующему таймауту.",
+            format_value_block(rows),
+        ]
+        if cancelled_symbols:
+            lines.append(", ".join(h(sym) for sym in cancelled_symbols))
+        lines.append(format_action('проверьте открытые ордера через /orders'))
+        await context.bot.send_message(
+            chat_id=ALLOWED_ID,
+            text="\n\n".join(lines),
+            parse_mode='HTML'
+        )
     except Exception as e:
         logging.error(f"Cleanup Job Error: {e}")
         try:
@@ -668,7 +760,7 @@ async def auto_cleanup_orders_job(context: ContextTypes.DEFAULT_TYPE):
 async def daily_balance_job(context: ContextTypes.DEFAULT_TYPE):
     """Каждое утро (в 9:00 UTC) присылает баланс."""
     try:
-        wallet = await bybit_call(session.get_wallet_balance, accountType="UNIFIED", coin="USDT")
+        wallet = (await get_wallet_snapshot(bybit_call, session)).resp
         acct = wallet['result']['list'][0]
         equity = safe_float(acct.get('totalEquity'), field='totalEquity')
         pnl = safe_float(acct.get('totalPerpUPL'), field='totalPerpUPL')
@@ -694,24 +786,109 @@ async def daily_balance_job(context: ContextTypes.DEFAULT_TYPE):
             pass
 
 # --- 5. TIME MANAGEMENT ---
+# Время открытия позиции не меняется за её жизнь: оно кешируется по
+# идентичности позиции и запрашивается у биржи один раз, а не каждые 4 часа.
+# createdTime после закрытия и нового входа может остаться прежним, поэтому
+# к ключу добавлен входной ордер из журнала (ENTRY_EXECUTION_ANCHOR_PROVEN /
+# POSITION_CONFIRMED), а позиции, пропавшие с биржи, из кеша уходят.
+# (symbol, side, positionIdx, createdTime, entry order_id) → миллисекунды эпохи.
+_POSITION_OPEN_MS: dict = {}
+_OPEN_TIME_LOOKUP_CONCURRENCY = 4
+
+
+def _position_lifecycle_key(p) -> tuple:
+    return (p.get('symbol'), p.get('side'), p.get('positionIdx'), p.get('createdTime'))
+
+
+def _open_time_cache_key(p, seed) -> tuple:
+    """Ключ кеша: lifecycle на бирже плюс входной ордер бота из журнала."""
+    return _position_lifecycle_key(p) + ((seed or {}).get('order_id') or '',)
+
+
+async def _lookup_position_open_ms(p):
+    """Время позиции по бирже: последнее исполнение символа либо createdTime."""
+    exec_info = await bybit_call(session.get_executions, category="linear", symbol=p['symbol'], limit=1)
+    trades = exec_info.get('result', {}).get('list', [])
+    if trades:
+        return int(trades[0]['execTime'])
+    # Если истории нет, берем createdTime
+    return int(p['createdTime'])
+
+
+async def _position_open_times(active_positions) -> dict:
+    """Время открытия каждой позиции (ключ — :func:`_position_lifecycle_key`).
+
+    Порядок источников: кеш этого lifecycle → журнал бота
+    (ENTRY_EXECUTION_ANCHOR_PROVEN / POSITION_CONFIRMED того же символа и
+    стороны) → ``get_executions`` по оставшимся символам, параллельно (не
+    более ``_OPEN_TIME_LOOKUP_CONCURRENCY``; частоту держит планировщик
+    bybit_call). Журнал читается каждый прогон: новый вход бота меняет ключ
+    кеша (:func:`_open_time_cache_key`), даже если createdTime на бирже тот же.
+    Символ, для которого время получить не удалось, в результат не попадает
+    и запрашивается снова в следующий прогон.
+    """
+    try:
+        seeds = await run_disk(get_position_open_times)
+    except Exception as exc:
+        logging.warning(f"⚠️ Время входа из журнала недоступно: {exc}")
+        seeds = {}
+    entries = {}
+    for p in active_positions:
+        seed = seeds.get(normalize_symbol(p['symbol']))
+        if not (seed and entry_side_to_position_side(seed['side']) == p['side']):
+            seed = None
+        entries[_open_time_cache_key(p, seed)] = (p, seed)
+    for key in list(_POSITION_OPEN_MS):
+        if key not in entries:
+            del _POSITION_OPEN_MS[key]
+
+    lookups = []
+    for key, (p, seed) in entries.items():
+        if key in _POSITION_OPEN_MS:
+            continue
+        if seed is not None:
+            _POSITION_OPEN_MS[key] = seed['open_ms']
+        else:
+            lookups.append((key, p))
+
+    semaphore = asyncio.Semaphore(_OPEN_TIME_LOOKUP_CONCURRENCY)
+
+    async def _one(key, p):
+        async with semaphore:
+            try:
+                _POSITION_OPEN_MS[key] = await _lookup_position_open_ms(p)
+            except Exception as exec_err:
+                logging.warning(f"⚠️ Не удалось получить время сделки для {p['symbol']}: {exec_err}")
+
+    await asyncio.gather(*(_one(key, p) for key, p in lookups))
+
+    return {
+        _position_lifecycle_key(p): _POSITION_OPEN_MS[key]
+        for key, (p, _seed) in entries.items() if key in _POSITION_OPEN_MS
+    }
+
+
 async def time_management_job(context: ContextTypes.DEFAULT_TYPE):
     """
     Управление позициями по времени.
 
-    Проверяет возраст каждой позиции по времени последнего исполнения.
+    Проверяет возраст каждой позиции от времени её открытия
+    (:func:`_position_open_times`).
     Предупреждение на 5-й день, принудительный сигнал на 7-й.
     """
     try:
         # 1. Получаем все позиции
-        _pos_resp = await bybit_call(session.get_positions, category="linear", settleCoin="USDT")
+        _pos_resp = (await get_positions_snapshot(bybit_call, session)).resp
         positions = _pos_resp['result']['list']
         active_positions = [p for p in positions if safe_float(p.get('size')) > 0]
 
         if not active_positions:
+            _POSITION_OPEN_MS.clear()
             return
 
         now = datetime.now()
         alerts = []
+        open_times = await _position_open_times(active_positions)
 
         for p in active_positions:
             sym = p['symbol']
@@ -720,22 +897,11 @@ async def time_management_job(context: ContextTypes.DEFAULT_TYPE):
             stop_loss = safe_float(p.get('stopLoss'), field='stopLoss')
             pnl = safe_float(p.get('unrealisedPnl'), field='unrealisedPnl')
 
-            # --- Получаем реальное время сделки ---
-            start_dt = None
-            try:
-                # Запрашиваем последнее исполнение (trade) по этому символу
-                exec_info = await bybit_call(session.get_executions, category="linear", symbol=sym, limit=1)
-                trades = exec_info.get('result', {}).get('list', [])
-
-                if trades:
-                    last_trade_ms = int(trades[0]['execTime'])
-                    start_dt = datetime.fromtimestamp(last_trade_ms / 1000)
-                else:
-                    # Если истории нет, берем createdTime
-                    start_dt = datetime.fromtimestamp(int(p['createdTime']) / 1000)
-            except Exception as exec_err:
-                logging.warning(f"⚠️ Не удалось получить время сделки для {sym}: {exec_err}")
+            # --- Время открытия сделки ---
+            open_ms = open_times.get(_position_lifecycle_key(p))
+            if open_ms is None:
                 continue  # Пропускаем
+            start_dt = datetime.fromtimestamp(open_ms / 1000)
 
             # Возраст сделки
             duration = now - start_dt
@@ -823,9 +989,11 @@ async def reconcile_journal_job(context: ContextTypes.DEFAULT_TYPE):
     """
     try:
         try:
-            _pos_resp = await bybit_call(
-                session.get_positions, category="linear", settleCoin="USDT"
-            )
+            # fresh: по этому снимку пишется терминальный RECONCILED, а
+            # подтверждение позиции могло случиться уже после общего снимка.
+            _pos_resp = (
+                await get_positions_snapshot(bybit_call, session, fresh=True)
+            ).resp
             open_syms = parse_positions_snapshot(_pos_resp)
         except _SnapshotUnknown as unknown:
             # UNKNOWN != closed: состояние не сверяем и ничего не очищаем.
@@ -835,7 +1003,7 @@ async def reconcile_journal_job(context: ContextTypes.DEFAULT_TYPE):
             )
             return
 
-        lifecycles = await asyncio.to_thread(get_position_lifecycles)
+        lifecycles = await run_disk(get_position_lifecycles)
 
         for sym in sorted(lifecycles):
             info = lifecycles[sym]
@@ -859,7 +1027,7 @@ async def reconcile_journal_job(context: ContextTypes.DEFAULT_TYPE):
 
         # Проверка условий автокарантина
         try:
-            quarantined = await asyncio.to_thread(check_and_quarantine_sources)
+            quarantined = await run_disk(check_and_quarantine_sources)
             for tag, reason in quarantined:
                 await send_alert(
                     context.bot, ALLOWED_ID, "WARNING", FAIL_CLOSED,
@@ -1166,7 +1334,7 @@ async def _confirm_position(
         event["position_idx"] = position_idx
     event.update(initial_anchor)
 
-    append_result = await asyncio.to_thread(
+    append_result = await run_disk(
         append_position_confirmation, event, info
     )
     if append_result == CONFIRM_APPEND_NOT_CURRENT:
@@ -1213,7 +1381,7 @@ async def fresh_entry_confirmation_job(context: ContextTypes.DEFAULT_TYPE):
         if attempt > 1:
             await asyncio.sleep(FRESH_CONFIRM_RETRY_DELAY_SEC)
 
-        if not await asyncio.to_thread(is_current_pending_lifecycle, sym, info):
+        if not await run_disk(is_current_pending_lifecycle, sym, info):
             logging.info(
                 "Fresh confirmation stopped: symbol=%s attempt=%s "
                 "reason=lifecycle_not_current",
@@ -1288,7 +1456,7 @@ async def _reconcile_missing_position(
     if position_idx is not None:
         event["position_idx"] = position_idx
 
-    written = await asyncio.to_thread(append_event, event)
+    written = await run_disk(append_event, event)
     if not written:
         # Без durable-записи уведомление не отправляем: lifecycle остаётся
         # CONFIRMED, следующий цикл повторит попытку записи.
@@ -1351,7 +1519,7 @@ async def weekly_source_report_job(context: ContextTypes.DEFAULT_TYPE):
         start_ts = int((now - timedelta(days=7)).timestamp() * 1000)
 
         # Закрытые сделки за неделю: один 7-дневный интервал, все его страницы.
-        all_trades = await fetch_closed_pnl_rows(start_ts, end_ts)
+        all_trades = await load_closed_pnl_rows(start_ts, end_ts, end_ts)
 
         if not all_trades:
             await context.bot.send_message(
@@ -1681,9 +1849,7 @@ async def protection_watchdog_job(context: ContextTypes.DEFAULT_TYPE):
     """
     try:
         try:
-            _pos_resp = await bybit_call(
-                session.get_positions, category="linear", settleCoin="USDT"
-            )
+            _pos_resp = (await get_positions_snapshot(bybit_call, session)).resp
             positions, unproven = classify_protection_snapshot(_pos_resp)
         except _SnapshotUnknown as unknown:
             # UNKNOWN != protected: снимок целиком недостоверен.
@@ -1837,6 +2003,35 @@ async def _fetch_entry_fill(sym: str, order_id: str):
     return proven_entry_fill(rows, symbol=sym, order_id=order_id)
 
 
+async def _journal_append(event: dict) -> bool:
+    """Durable-запись события через group-commit очередь журнала.
+
+    В отличие от ``run_disk(append_event, ...)`` ожидание не занимает поток
+    дискового пула. Результат — как у :func:`core.journal.append_event`.
+    """
+    return await asyncio.wrap_future(submit_event(event))
+
+
+async def _journal_append_batch(pending: dict, build, report) -> None:
+    """Пишет journal-only события нескольких символов одной пачкой.
+
+    ``build(sym, plan)`` строит событие (или None), ``report(sym, plan,
+    written)`` логирует итог. Сначала все события ставятся в очередь журнала,
+    затем ожидается их общий fsync; порядок символов сохраняется, а ошибка
+    построения события останавливает обход, как и прежний цикл, — уже
+    поставленные события дожидаются своего итога.
+    """
+    submitted = []
+    try:
+        for sym, plan in pending.items():
+            event = build(sym, plan)
+            if event:
+                submitted.append((sym, plan, submit_event(event)))
+    finally:
+        for sym, plan, future in submitted:
+            report(sym, plan, await asyncio.wrap_future(future))
+
+
 async def _bind_symbol_exits(
     sym: str, plan: dict, position_rows: list, order_rows: list, known: set
 ) -> None:
@@ -1893,7 +2088,7 @@ async def _bind_symbol_exits(
     key = binding_key(event)
     if not event or key is None or key in known:
         return
-    written = await asyncio.to_thread(append_event, event)
+    written = await _journal_append(event)
     if not written:
         logging.error("Exit binding: continuation %s → %s не записана", sym, exit_order_id)
         return
@@ -1943,7 +2138,7 @@ async def _bind_symbol_take_profit(
     key = binding_key(event)
     if not event or key is None or key in known:
         return
-    if await asyncio.to_thread(append_event, event):
+    if await _journal_append(event):
         known.add(key)
 
 
@@ -2017,7 +2212,7 @@ async def _observe_tp1_fill(sym: str, plan: dict, known: set) -> None:
     key = tp1_fill_key(event)
     if not event or key is None or key in known:
         return
-    if await asyncio.to_thread(append_event, event):
+    if await _journal_append(event):
         known.add(key)
         logging.info(
             "TP1 fill evidence written: symbol=%s tpOrderId=%s cumExecQty=%s",
@@ -2027,8 +2222,8 @@ async def _observe_tp1_fill(sym: str, plan: dict, known: set) -> None:
         logging.error("TP1 fill evidence не записано для %s", sym)
 
 
-async def _materialize_r1_milestone(sym: str, plan: dict) -> None:
-    """Материализует durable 1R-милестоун из уже durable-факта исполнения TP1.
+def _r1_milestone_event(sym: str, plan: dict) -> dict | None:
+    """Событие durable 1R-милестоуна из уже durable-факта исполнения TP1.
 
     Journal-only: дополнительного чтения Bybit НЕ требуется, потому что
     authoritative-факт ненулевого исполнения точной ноги TP1 уже durable
@@ -2043,11 +2238,13 @@ async def _materialize_r1_milestone(sym: str, plan: dict) -> None:
     милестоуну лишь при наличии нижележащего durable-факта исполнения TP1, а
     вызывающий отбирает символы по ``exec_qty`` и ``r1_proven``, поэтому уже
     доказанный милестоун повторно не пишется (идемпотентно, без лог-спама).
+    Записывает событие :func:`_journal_append_batch` — одной пачкой для всех
+    символов цикла.
     """
     tp1 = plan.get("tp1")
     if not isinstance(tp1, dict):
-        return
-    event = build_milestone_event(
+        return None
+    return build_milestone_event(
         symbol=sym,
         side=plan.get("side"),
         position_idx=plan.get("position_idx"),
@@ -2057,9 +2254,11 @@ async def _materialize_r1_milestone(sym: str, plan: dict) -> None:
         tp_order_link_id=tp1.get("order_link_id"),
         milestone=MILESTONE_1R,
     )
-    if not event:
-        return
-    if await asyncio.to_thread(append_event, event):
+
+
+def _report_r1_milestone(sym: str, plan: dict, written: bool) -> None:
+    if written:
+        tp1 = plan["tp1"]
         logging.info(
             "1R milestone durable: symbol=%s entryOrderId=%s tpOrderId=%s",
             sym, plan.get("order_id") or "-",
@@ -2236,7 +2435,7 @@ async def _prove_entry_anchor(sym: str, plan: dict):
     )
     if not event:
         return None
-    if not await asyncio.to_thread(append_event, event):
+    if not await _journal_append(event):
         logging.error("2R entry anchor не записан для %s", sym)
         return None
     logging.info(
@@ -2251,7 +2450,7 @@ async def _append_mark_2r_event(sym: str, event: dict) -> bool:
     """Durable-запись факта markPrice на уровне 2R (без exchange-записи)."""
     if not event:
         return False
-    if not await asyncio.to_thread(append_event, event):
+    if not await _journal_append(event):
         logging.error("2R market evidence не записано для %s", sym)
         return False
     logging.info(
@@ -2404,8 +2603,8 @@ async def _observe_r2_evidence(sym: str, plan: dict, position_rows: list) -> Non
     await _observe_kline_2r(sym, plan, anchor_ms, target_2r)
 
 
-async def _materialize_r2_milestone(sym: str, plan: dict) -> None:
-    """Материализует durable 2R-милестоун из уже durable факта рынка.
+def _r2_milestone_event(sym: str, plan: dict) -> dict | None:
+    """Событие durable 2R-милестоуна из уже durable факта рынка.
 
     Journal-only: дополнительного чтения Bybit НЕ требуется, потому что и
     временной якорь входа, и факт markPrice на уровне 2R уже durable. Это же —
@@ -2417,18 +2616,20 @@ async def _materialize_r2_milestone(sym: str, plan: dict) -> None:
     Милестоун только фиксирует факт достижения уровня 2R. Отсюда НЕ вызываются
     ``set_trading_stop`` / ``place_order`` / ``cancel_order`` / ``amend_order`` и
     НЕ пишутся ``PROTECTION_CHANGE`` / ``EXIT_ORDER_BOUND``: политика Auto-BE и
-    Risk Cut на sticky-милестоуны в этом срезе не мигрируется.
+    Risk Cut на sticky-милестоуны в этом срезе не мигрируется. Записывает
+    событие :func:`_journal_append_batch` — одной пачкой для всех символов.
     """
-    event = build_r2_milestone_event(
+    return build_r2_milestone_event(
         symbol=sym,
         side=plan.get("side"),
         position_idx=plan.get("position_idx"),
         entry_order_id=plan.get("order_id"),
         entry_order_link_id=plan.get("order_link_id"),
     )
-    if not event:
-        return
-    if await asyncio.to_thread(append_event, event):
+
+
+def _report_r2_milestone(sym: str, plan: dict, written: bool) -> None:
+    if written:
         logging.info(
             "2R milestone durable: symbol=%s entryOrderId=%s",
             sym, plan.get("order_id") or "-",
@@ -2437,6 +2638,7 @@ async def _materialize_r2_milestone(sym: str, plan: dict) -> None:
         logging.error("2R milestone не записан для %s", sym)
 
 
+@_exclusive
 async def exit_binding_job(context: ContextTypes.DEFAULT_TYPE):
     """Поддерживает causal SL continuation, historical TP audit и факт TP1.
 
@@ -2461,7 +2663,7 @@ async def exit_binding_job(context: ContextTypes.DEFAULT_TYPE):
     Новый poller для этого не добавляется, и защита от такого evidence не
     включается.
 
-    Ещё одним journal-only шагом (см. :func:`_materialize_r1_milestone`)
+    Ещё одним journal-only шагом (см. :func:`_r1_milestone_event`)
     материализуется durable милестоун 1R для lifecycle, у которого факт
     исполнения TP1 уже durable, а милестоун ещё не доказан. Этот шаг не читает
     Bybit и является ограниченным путём восстановления после краха между фактом
@@ -2486,13 +2688,13 @@ async def exit_binding_job(context: ContextTypes.DEFAULT_TYPE):
     ни одной записи на биржу.
     """
     try:
-        anchored = await asyncio.to_thread(get_auto_protection_evidence)
+        anchored = await run_disk(get_auto_protection_evidence)
         continuations = {
             sym: plan for sym, plan in anchored.items()
             if plan.get("anchored") is True
             and isinstance(plan.get("pending_change"), dict)
         }
-        tp_candidates = await asyncio.to_thread(get_exit_binding_candidates)
+        tp_candidates = await run_disk(get_exit_binding_candidates)
         # Факт исполнения TP1 наблюдается только там, где точная durable
         # идентичность ноги уже есть, а её исполнение ещё не доказано.
         tp1_pending = {
@@ -2511,8 +2713,9 @@ async def exit_binding_job(context: ContextTypes.DEFAULT_TYPE):
             and plan["tp1"].get("exec_qty") is not None
             and not plan.get("milestones", {}).get("r1_proven", False)
         }
-        for milestone_sym, milestone_plan in milestone_pending.items():
-            await _materialize_r1_milestone(milestone_sym, milestone_plan)
+        await _journal_append_batch(
+            milestone_pending, _r1_milestone_event, _report_r1_milestone,
+        )
 
         # C2 шаг A: милестоун 2R достраивается journal-only из уже durable факта
         # рынка. Ни одного C2-чтения биржи здесь не требуется, поэтому крах между
@@ -2522,8 +2725,9 @@ async def exit_binding_job(context: ContextTypes.DEFAULT_TYPE):
             if plan.get("mark_2r_fact") is True
             and not plan.get("milestones", {}).get("r2_proven", False)
         }
-        for r2_sym, r2_plan in r2_milestone_pending.items():
-            await _materialize_r2_milestone(r2_sym, r2_plan)
+        await _journal_append_batch(
+            r2_milestone_pending, _r2_milestone_event, _report_r2_milestone,
+        )
 
         # C2 шаги B/C: наблюдение выполняется только для exact lifecycle, где 1R
         # доказан, 2R ещё нет и durable факта рынка ещё нет. Уже доказанный 2R и
@@ -2543,10 +2747,11 @@ async def exit_binding_job(context: ContextTypes.DEFAULT_TYPE):
         ):
             return
 
+        # По этим чтениям пишутся durable-доказательства: снимок берётся свежим.
         try:
-            _pos_resp = await bybit_call(
-                session.get_positions, category="linear", settleCoin="USDT"
-            )
+            _pos_resp = (
+                await get_positions_snapshot(bybit_call, session, fresh=True)
+            ).resp
             position_rows = _require_result_rows(_pos_resp, "get_positions")
         except _SnapshotUnknown as unknown:
             logging.warning("Exit binding: снимок позиций недостоверен: %s", unknown)
@@ -2580,9 +2785,9 @@ async def exit_binding_job(context: ContextTypes.DEFAULT_TYPE):
 
         if pending:
             try:
-                _orders_resp = await bybit_call(
-                    session.get_open_orders, category="linear", settleCoin="USDT"
-                )
+                _orders_resp = (
+                    await get_open_orders_snapshot(bybit_call, session, fresh=True)
+                ).resp
                 order_rows = _require_result_rows(_orders_resp, "get_open_orders")
             except _SnapshotUnknown as unknown:
                 logging.warning(
@@ -2594,7 +2799,7 @@ async def exit_binding_job(context: ContextTypes.DEFAULT_TYPE):
             pending = [sym for sym in pending if sym in protected]
 
         if pending:
-            recorded = await asyncio.to_thread(get_exit_binding_events)
+            recorded = await run_disk(get_exit_binding_events)
             if recorded is None:
                 # Недоказанный журнал не означает «связей ещё нет»: писать поверх
                 # него значило бы плодить дубликаты и портить аудит.
@@ -2622,7 +2827,7 @@ async def exit_binding_job(context: ContextTypes.DEFAULT_TYPE):
                     )
 
         if tp1_symbols:
-            observed = await asyncio.to_thread(get_tp_ladder_fill_events)
+            observed = await run_disk(get_tp_ladder_fill_events)
             if observed is None:
                 # Недоказанный журнал фактом «наблюдений нет» не является.
                 return
@@ -2663,3 +2868,223 @@ def register_exit_binding(job_queue) -> None:
         "Exit binding observer включён: интервал %s с, первый прогон через %s с",
         EXIT_BINDING_INTERVAL_SEC, EXIT_BINDING_FIRST_RUN_SEC,
     )
+
+
+# ---------------------------------------------------------------------------
+# Приватный WebSocket-поток: внеочередной прогон наблюдателей (опционально)
+# ---------------------------------------------------------------------------
+
+PRIVATE_STREAM_FIRST_RUN_SEC = 5
+# Исполнение обычно приходит пачкой order + execution + position: короткая
+# пауза собирает её в один внеочередной прогон вместо трёх.
+PRIVATE_STREAM_WAKE_DELAY_SEC = 0.5
+
+_private_stream: PrivateStream | None = None
+_stream_wake_pending = False
+
+
+def _on_private_stream_change(job_queue, topics: set) -> None:
+    """Изменение на бирже: старый снимок больше не переиспользуется.
+
+    Вызывается в цикле событий (через call_soon_threadsafe). Внеочередной
+    прогон ставится не чаще одного на пачку событий.
+    """
+    global _stream_wake_pending
+    invalidate_exchange_snapshots()
+    if _stream_wake_pending:
+        return
+    _stream_wake_pending = True
+    job_queue.run_once(private_stream_wake_job, PRIVATE_STREAM_WAKE_DELAY_SEC)
+
+
+async def _seed_private_stream_mirror(stream: PrivateStream) -> None:
+    """Засевает зеркало позиций из REST; при сбое зеркало остаётся непригодным."""
+    epoch = stream.mirror.begin_seed()
+    try:
+        _pos_resp = (await get_positions_snapshot(bybit_call, session, fresh=True)).resp
+        positions = _require_result_rows(_pos_resp, "get_positions")
+    except Exception as e:
+        logging.warning("Private stream: засев зеркала не выполнен: %s", e)
+        return
+    if stream.mirror.seed(epoch, positions):
+        logging.info("Private stream: зеркало засеяно (%d позиций)", len(positions))
+
+
+async def private_stream_wake_job(context: ContextTypes.DEFAULT_TYPE):
+    """Внеочередной прогон exit binding и auto-BE по сигналу потока.
+
+    Сигнал потока — не доказательство: задачи, как и в периодическом прогоне,
+    сами перечитывают позиции и ордера по REST и решают только по ним.
+    Exit binding идёт первым: он записывает факт TP1 и милестоун 1R, которые
+    auto-BE читает из журнала. Последней переоценивается очередь heat:
+    закрытие или перенос SL могли освободить бюджет.
+    """
+    global _stream_wake_pending
+    _stream_wake_pending = False
+    stream = _private_stream
+    if stream is not None and stream.mirror.needs_seed:
+        await _seed_private_stream_mirror(stream)
+    await exit_binding_job(context)
+    await auto_breakeven_job(context)
+    await heat_queue_job(context)
+
+
+async def _start_private_stream_job(context: ContextTypes.DEFAULT_TYPE):
+    global _private_stream
+    if _private_stream is not None:
+        return
+    loop = asyncio.get_running_loop()
+    job_queue = context.job_queue
+
+    def on_change(topics):
+        loop.call_soon_threadsafe(_on_private_stream_change, job_queue, topics)
+
+    url = PRIVATE_STREAM_URL or (
+        PRIVATE_STREAM_TESTNET_URL if IS_DEMO else PRIVATE_STREAM_MAINNET_URL
+    )
+    _private_stream = PrivateStream(
+        url, BYBIT_API_KEY, BYBIT_API_SECRET, on_change=on_change,
+    )
+    _private_stream.start()
+
+
+def register_private_stream(job_queue) -> bool:
+    """Запускает приватный поток только при включённом PRIVATE_STREAM_ENABLED.
+
+    Поток стартует из цикла событий (run_once), чтобы уведомления было куда
+    передавать. Периодические задачи остаются как есть: поток лишь ускоряет
+    реакцию и при разрыве или устаревании ничего не отключает.
+    Возвращает True, если запуск поставлен.
+    """
+    if not PRIVATE_STREAM_ENABLED:
+        logging.info("Private stream отключён (PRIVATE_STREAM_ENABLED=0)")
+        return False
+
+    job_queue.run_once(_start_private_stream_job, PRIVATE_STREAM_FIRST_RUN_SEC)
+    logging.info(
+        "Private stream включён: устаревание через %s с", PRIVATE_STREAM_STALE_SEC,
+    )
+    return True
+
+
+# ---------------------------------------------------------------------------
+# Фоновое обновление кеша метаданных инструментов
+# ---------------------------------------------------------------------------
+
+# Первая загрузка сразу после старта, чтобы первый сигнал уже читал фильтры из
+# памяти. Период — половина TTL: строки обновляются раньше, чем устареют.
+INSTRUMENT_REFRESH_FIRST_RUN_SEC = 3
+
+
+async def instrument_refresh_job(context: ContextTypes.DEFAULT_TYPE):
+    """Загружает все linear-инструменты в кеш (core.instrument_cache).
+
+    Сбой только логируется: прежние строки доживают свой TTL, а после него
+    читатели возвращаются к запросу по одному символу.
+    """
+    try:
+        count = await refresh_instruments(bybit_call, session)
+    except Exception as e:
+        logging.warning("Instrument cache: обновление не выполнено: %s", e)
+        return
+    logging.debug("Instrument cache: загружено %d инструментов", count)
+
+
+def register_instrument_refresh(job_queue) -> bool:
+    """Регистрирует фоновое обновление кеша инструментов, если кеш включён.
+
+    При INSTRUMENT_CACHE_TTL_SEC=0 кеш выключен и задача не создаётся.
+    Возвращает True, если задача поставлена.
+    """
+    if INSTRUMENT_CACHE_TTL_SEC <= 0:
+        logging.info("Instrument cache отключён (INSTRUMENT_CACHE_TTL_SEC=0)")
+        return False
+
+    job_queue.run_repeating(
+        instrument_refresh_job,
+        interval=max(60.0, INSTRUMENT_CACHE_TTL_SEC / 2),
+        first=INSTRUMENT_REFRESH_FIRST_RUN_SEC,
+    )
+    return True
+
+
+# ---------------------------------------------------------------------------
+# Очередь heat: повторная проверка сделок, когда heat снизился
+# ---------------------------------------------------------------------------
+
+HEAT_QUEUE_DRAIN_FIRST_RUN_SEC = 30
+
+
+async def heat_queue_job(context: ContextTypes.DEFAULT_TYPE):
+    """Разбор очереди heat (handlers.signal_parser.drain_heat_queue).
+
+    Периодически и по событию приватного потока. Без HEAT_ACTION=queue и
+    при пустой очереди биржа не запрашивается.
+    """
+    from handlers.signal_parser import drain_heat_queue
+
+    try:
+        admitted = await drain_heat_queue(context.bot)
+    except Exception as e:
+        logging.error("Heat queue job error: %s", e)
+        return
+    if admitted:
+        logging.info("Heat queue: %d сделок отправлено на повторную проверку", admitted)
+
+
+def register_heat_queue_drain(job_queue) -> bool:
+    """Регистрирует разбор очереди heat, если превышение heat ставит в очередь.
+
+    Возвращает True, если задача поставлена.
+    """
+    from core.heat import heat_queue_enabled
+
+    if not heat_queue_enabled():
+        logging.info("Heat queue отключена (HEAT_ACTION != queue или MAX_TOTAL_HEAT_USDT=0)")
+        return False
+
+    job_queue.run_repeating(
+        heat_queue_job,
+        interval=max(5, HEAT_QUEUE_DRAIN_INTERVAL_SEC),
+        first=HEAT_QUEUE_DRAIN_FIRST_RUN_SEC,
+    )
+    logging.info(
+        "Heat queue: разбор каждые %s с", max(5, HEAT_QUEUE_DRAIN_INTERVAL_SEC),
+    )
+    return True
+
+
+# ---------------------------------------------------------------------------
+# Снимок materialised-состояния журнала
+# ---------------------------------------------------------------------------
+
+# Первый снимок — вскоре после старта: стартовые задачи уже прочитали журнал.
+JOURNAL_SNAPSHOT_FIRST_RUN_SEC = 180
+
+
+async def journal_snapshot_job(context: ContextTypes.DEFAULT_TYPE):
+    """Записывает снимок lifecycle журнала (core.journal.save_lifecycle_snapshot).
+
+    Сбой только логируется внутри: журнал остаётся authoritative, а без
+    свежего снимка следующий старт просто разберёт больший хвост.
+    """
+    if await run_disk(save_lifecycle_snapshot):
+        logging.debug("Journal snapshot: записан")
+
+
+def register_journal_snapshot(job_queue) -> bool:
+    """Регистрирует периодическую запись снимка журнала, если она включена.
+
+    При JOURNAL_SNAPSHOT_INTERVAL_SEC=0 снимок не пишется и задача не
+    создаётся. Возвращает True, если задача поставлена.
+    """
+    if JOURNAL_SNAPSHOT_INTERVAL_SEC <= 0:
+        logging.info("Journal snapshot отключён (JOURNAL_SNAPSHOT_INTERVAL_SEC=0)")
+        return False
+
+    job_queue.run_repeating(
+        journal_snapshot_job,
+        interval=max(60.0, JOURNAL_SNAPSHOT_INTERVAL_SEC),
+        first=JOURNAL_SNAPSHOT_FIRST_RUN_SEC,
+    )
+    return True
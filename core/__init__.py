@@ -4,5 +4,12 @@
 Содержит: config.py (env-переменные), database.py (JSON-хранилище),
 trading_core.py (сессия Bybit, TP-лестница), bybit_call.py (async-обёртка),
 notifier.py (алерты), heat.py (контроль риска), conflict.py (разрешение
-конфликтов сигналов), journal.py (торговый журнал + карантин).
+конфликтов сигналов), journal.py (торговый журнал + карантин),
+exchange_snapshot.py (общий снимок позиций и открытых ордеров),
+private_stream.py (приватный WebSocket-поток и зеркало позиций),
+instrument_cache.py (кеш метаданных инструментов), rate_limit.py (token bucket),
+request_scheduler.py (очереди и лимиты запросов Bybit),
+executors.py (пулы потоков для сети и диска),
+bybit_async.py (нативный async-транспорт V5 на httpx),
+closed_pnl_store.py (локальная история closed-PnL для отчётов).
 """
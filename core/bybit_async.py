@@ -0,0 +1,290 @@
+"""
+Нативный async-транспорт Bybit V5 на httpx для эндпоинтов, которые реально
+вызывает бот.
+
+Синхронная сессия pybit работает через поток пула: каждый вызов — переход в
+поток, собственная ``requests``-сессия потока и подпись HMAC с нуля. Этот
+модуль выполняет те же запросы прямо в event loop через общий keep-alive пул
+соединений httpx (HTTP/2, если установлен пакет ``h2``; иначе HTTP/1.1
+keep-alive). Ключ HMAC подготавливается один раз, на запрос копируется
+готовое состояние.
+
+Транспорт выбирается при старте (BYBIT_TRANSPORT=httpx, по умолчанию pybit):
+:func:`configure_async_transport` привязывает его к уже созданной сессии
+pybit — URL, ключи и recv_window берутся из неё. После этого
+:func:`core.bybit_call.bybit_call` получает для ``session.<метод>`` из
+:data:`ENDPOINTS` нативную корутину через :func:`native_call`; остальные
+методы и любые прямые синхронные вызовы сессии идут через pybit как раньше.
+
+Контракт ответа совпадает с pybit, поэтому write_verify.envelope_ok и
+существующие разборщики не меняются:
+
+  * retCode == 0 — возвращается разобранный JSON-конверт целиком;
+  * ненулевой retCode — :class:`InvalidRequestError` с ``status_code`` =
+    retCode и ``resp_headers``; 10002 (recv_window) и 10006 (rate limit)
+    повторяются, как в pybit (10006 — после сброса лимита по заголовку
+    ``X-Bapi-Limit-Reset-Timestamp``);
+  * HTTP-статус не 200 — :class:`FailedRequestError` с HTTP-кодом;
+  * сетевые исключения httpx пробрасываются без изменений (pybit так же
+    пробрасывает исключения requests).
+"""
+import asyncio
+import hashlib
+import hmac
+import json
+import logging
+import time
+import weakref
+from datetime import datetime, timezone
+
+import httpx
+
+try:
+    import h2  # noqa: F401
+    _HTTP2 = True
+except ImportError:
+    _HTTP2 = False
+
+# Метод сессии pybit → (HTTP-метод, путь, нужна ли подпись).
+ENDPOINTS = {
+    "get_positions": ("GET", "/v5/position/list", True),
+    "get_open_orders": ("GET", "/v5/order/realtime", True),
+    "get_order_history": ("GET", "/v5/order/history", True),
+    "get_executions": ("GET", "/v5/execution/list", True),
+    "get_closed_pnl": ("GET", "/v5/position/closed-pnl", True),
+    "get_wallet_balance": ("GET", "/v5/account/wallet-balance", True),
+    "get_mark_price_kline": ("GET", "/v5/market/mark-price-kline", False),
+    "get_tickers": ("GET", "/v5/market/tickers", False),
+    "get_instruments_info": ("GET", "/v5/market/instruments-info", False),
+    "place_order": ("POST", "/v5/order/create", True),
+    "place_batch_order": ("POST", "/v5/order/create-batch", True),
+    "amend_order": ("POST", "/v5/order/amend", True),
+    "cancel_order": ("POST", "/v5/order/cancel", True),
+    "cancel_batch_order": ("POST", "/v5/order/cancel-batch", True),
+    "set_trading_stop": ("POST", "/v5/position/trading-stop", True),
+}
+
+# Приведение типов тела POST — то же, что делает pybit перед подписью.
+_STRING_PARAMS = ("qty", "price", "triggerPrice", "takeProfit", "stopLoss")
+_INTEGER_PARAMS = ("positionIdx",)
+
+_RETRY_CODES = frozenset({10002, 10006, 30034, 30035, 130035, 130150})
+_MAX_ATTEMPTS = 3
+_RETRY_DELAY_SEC = 3.0
+_TIMEOUT_SEC = 10.0
+_POOL_LIMITS = httpx.Limits(
+    max_connections=16, max_keepalive_connections=8, keepalive_expiry=30.0,
+)
+
+
+class _RequestError(Exception):
+    """Общая форма ошибок pybit: request, message, status_code, time, resp_headers."""
+
+    def __init__(self, request, message, status_code, time, resp_headers):
+        self.request = request
+        self.message = message
+        self.status_code = status_code
+        self.time = time
+        self.resp_headers = resp_headers
+        super().__init__(
+            f"{message} (ErrCode: {status_code}) (ErrTime: {time})"
+            f".\nRequest → {request}."
+        )
+
+
+class InvalidRequestError(_RequestError):
+    """Bybit вернул ненулевой retCode."""
+
+
+class FailedRequestError(_RequestError):
+    """HTTP-статус ответа не 200."""
+
+
+def _now_str() -> str:
+    return datetime.now(timezone.utc).strftime("%H:%M:%S")
+
+
+def _clean_query(params: dict) -> dict:
+    """Убирает None и целые float — как pybit до подписи."""
+    cleaned = {}
+    for key, value in params.items():
+        if value is None:
+            continue
+        if isinstance(value, float) and value == int(value):
+            value = int(value)
+        cleaned[key] = value
+    return cleaned
+
+
+def _post_body(params: dict) -> str:
+    body = dict(params)
+    for key, value in body.items():
+        if key in _STRING_PARAMS and type(value) is not str:
+            body[key] = str(value)
+        elif key in _INTEGER_PARAMS and type(value) is not int:
+            body[key] = int(value)
+    return json.dumps(body)
+
+
+class AsyncBybitClient:
+    """V5-клиент поверх общего пула соединений httpx (по одному на event loop)."""
+
+    def __init__(self, endpoint: str, api_key, api_secret, recv_window: int = 5000,
+                 *, transport=None):
+        self.endpoint = endpoint.rstrip("/")
+        self._transport = transport
+        self.api_key = api_key
+        self.recv_window = int(recv_window)
+        self._mac = (
+            hmac.new(api_secret.encode("utf-8"), digestmod=hashlib.sha256)
+            if api_secret else None
+        )
+        self._clients: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+
+    def _client(self) -> httpx.AsyncClient:
+        loop = asyncio.get_running_loop()
+        client = self._clients.get(loop)
+        if client is None:
+            client = self._clients[loop] = httpx.AsyncClient(
+                base_url=self.endpoint,
+                http2=_HTTP2,
+                limits=_POOL_LIMITS,
+                timeout=_TIMEOUT_SEC,
+                transport=self._transport,
+            )
+        return client
+
+    def sign(self, payload: str, timestamp: int, recv_window: int) -> str:
+        if self.api_key is None or self._mac is None:
+            raise PermissionError("Authenticated endpoints require keys.")
+        mac = self._mac.copy()
+        mac.update(f"{timestamp}{self.api_key}{recv_window}{payload}".encode("utf-8"))
+        return mac.hexdigest()
+
+    def _headers(self, payload: str, recv_window: int) -> dict:
+        timestamp = int(time.time() * 1000)
+        return {
+            "Content-Type": "application/json",
+            "X-BAPI-API-KEY": self.api_key,
+            "X-BAPI-SIGN": self.sign(payload, timestamp, recv_window),
+            "X-BAPI-SIGN-TYPE": "2",
+            "X-BAPI-TIMESTAMP": str(timestamp),
+            "X-BAPI-RECV-WINDOW": str(recv_window),
+        }
+
+    async def request(self, name: str, **params):
+        """Выполняет метод ``name`` из :data:`ENDPOINTS`; ответ — как у pybit."""
+        method, path, auth = ENDPOINTS[name]
+        params = _clean_query(params)
+        recv_window = self.recv_window
+        client = self._client()
+
+        for attempt in range(1, _MAX_ATTEMPTS + 1):
+            if method == "GET":
+                payload = "&".join(f"{k}={v}" for k, v in sorted(params.items()))
+                headers = self._headers(payload, recv_window) if auth else {}
+                url = f"{path}?{payload}" if payload else path
+                response = await client.get(url, headers=headers)
+            else:
+                payload = _post_body(params)
+                headers = self._headers(payload, recv_window) if auth else {}
+                response = await client.post(path, content=payload, headers=headers)
+
+            request_info = f"{method} {path}: {payload}"
+            if response.status_code != 200:
+                raise FailedRequestError(
+                    request=request_info,
+                    message=(
+                        "You have breached the IP rate limit or your IP is from the USA."
+                        if response.status_code == 403
+                        else "HTTP status code is not 200."
+                    ),
+                    status_code=response.status_code,
+                    time=_now_str(),
+                    resp_headers=response.headers,
+                )
+            envelope = response.json()
+            code_key = "retCode" if "retCode" in envelope else "ret_code"
+            msg_key = "retMsg" if "retMsg" in envelope else "ret_msg"
+            code = envelope.get(code_key)
+            if not code:
+                return envelope
+
+            if code in _RETRY_CODES and attempt < _MAX_ATTEMPTS:
+                delay = _RETRY_DELAY_SEC
+                if code == 10002:
+                    recv_window += 2500
+                elif code == 10006:
+                    try:
+                        reset_ms = int(response.headers.get("X-Bapi-Limit-Reset-Timestamp"))
+                        delay = max(0.0, reset_ms / 1000 - time.time())
+                    except (TypeError, ValueError):
+                        delay = 2.0
+                logging.warning(
+                    "Bybit %s: retCode=%s, повтор через %.2f с", name, code, delay,
+                )
+                await asyncio.sleep(delay)
+                continue
+
+            raise InvalidRequestError(
+                request=request_info,
+                message=envelope.get(msg_key),
+                status_code=code,
+                time=_now_str(),
+                resp_headers=response.headers,
+            )
+
+        raise FailedRequestError(
+            request=f"{method} {path}",
+            message="Bad Request. Retries exceeded maximum.",
+            status_code=400,
+            time=_now_str(),
+            resp_headers=None,
+        )
+
+
+# Сессия pybit, к которой привязан транспорт, и сам клиент.
+_SESSION = None
+_CLIENT: AsyncBybitClient | None = None
+
+
+def configure_async_transport(session) -> AsyncBybitClient | None:
+    """Привязывает нативный транспорт к сессии pybit (None — отключает)."""
+    global _SESSION, _CLIENT
+    if session is None:
+        _SESSION = _CLIENT = None
+        return None
+    _CLIENT = AsyncBybitClient(
+        session.endpoint,
+        session.api_key,
+        session.api_secret,
+        recv_window=getattr(session, "recv_window", 5000),
+    )
+    _SESSION = session
+    logging.info(
+        "Bybit transport: httpx (%s), %d эндпоинтов",
+        "HTTP/2" if _HTTP2 else "HTTP/1.1 keep-alive", len(ENDPOINTS),
+    )
+    return _CLIENT
+
+
+def native_call(fn, args: tuple):
+    """Нативная корутина для ``session.<метод>`` привязанной сессии либо None.
+
+    None — вызов выполняется через pybit: транспорт не включён, метод не из
+    :data:`ENDPOINTS`, функция не метод привязанной сессии или переданы
+    позиционные аргументы (методы V5 pybit принимают только именованные).
+    """
+    if _CLIENT is None or args:
+        return None
+    if getattr(fn, "__self__", None) is not _SESSION:
+        return None
+    name = getattr(fn, "__name__", None)
+    if name not in ENDPOINTS:
+        return None
+    client = _CLIENT
+
+    async def _call(**kwargs):
+        return await client.request(name, **kwargs)
+
+    return _call
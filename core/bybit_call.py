@@ -11,19 +11,38 @@
 
 Исключения из обёрнутой функции пробрасываются вызывающему без изменений.
 """
-import asyncio
 import logging
 import os
 import time
 
+from core.bybit_async import native_call
+from core.exchange_snapshot import note_exchange_call
+from core.executors import run_network
+from core.instrument_cache import note_instrument_rejection
+from core.leverage_cache import note_positions_response
+from core.request_scheduler import note_request_error, request_endpoint, request_slot
+
 _SLOW_CALL_THRESHOLD = 0.5  # секунды
 # Предупреждения о медленных вызовах включаются опционально: BYBIT_SLOW_CALL_WARN=1.
 # По умолчанию логируем на уровне DEBUG, чтобы не засорять продакшн-логи.
 _SLOW_CALL_WARN = os.getenv("BYBIT_SLOW_CALL_WARN", "").lower() in ("1", "true")
 
 
-async def bybit_call(fn, *args, _alert_errors=True, **kwargs):
-    """Запускает синхронный вызов Bybit SDK в пуле потоков, не блокируя event loop.
+def _call_symbol(args, kwargs):
+    """Символ вызова: ``symbol=`` либо первый позиционный аргумент-строка.
+
+    Обёртки модуля handlers.orders (``place_limit_order``,
+    ``set_leverage_safe``) принимают символ первым позиционным аргументом.
+    """
+    symbol = kwargs.get("symbol")
+    if symbol is None and args and isinstance(args[0], str):
+        symbol = args[0]
+    return symbol
+
+
+async def bybit_call(fn, *args, _alert_errors=True, _endpoint=None, **kwargs):
+    """Запускает синхронный вызов Bybit SDK в сетевом пуле потоков
+    (core.executors), не блокируя event loop.
 
     Вызовы медленнее _SLOW_CALL_THRESHOLD секунд логируются на уровне DEBUG.
     Установите BYBIT_SLOW_CALL_WARN=1, чтобы повысить их до WARNING.
@@ -31,12 +50,39 @@ async def bybit_call(fn, *args, _alert_errors=True, **kwargs):
     При исключении: классифицирует ошибку и отправляет дедуплицированный
     алерт владельцу (если configure_alerts() был вызван при старте), затем
     пробрасывает исключение без изменений.
+
+    Любой вызов записи (имя не ``get_*``/``check_*``/``fetch_*``) после
+    завершения — успешного или нет — сбрасывает общие снимки биржи
+    (core.exchange_snapshot): неоднозначная запись тоже могла примениться.
+    Отказ записи по фильтрам цены/объёма сбрасывает строку символа в кеше
+    метаданных инструментов (core.instrument_cache). Успешный
+    ``get_positions`` засевает кеш плеча (core.leverage_cache).
+
+    Перед отправкой вызов проходит очередь core.request_scheduler: ведро
+    лимита своего эндпоинта и слот выполнения по классу приоритета. Время
+    ожидания в очереди в порог медленного вызова не входит. Обёртки из
+    :data:`core.request_scheduler.WRAPPER_ENDPOINTS` (``place_limit_order``,
+    ``set_leverage_safe`` и др.) идут через ведро того эндпоинта, который
+    вызывают внутри; явный ``_endpoint=`` задаёт его для прочих функций.
+
+    При BYBIT_TRANSPORT=httpx методы сессии из core.bybit_async.ENDPOINTS
+    выполняются нативным async-клиентом прямо в event loop, с тем же
+    конвертом ответа и той же формой исключений.
     """
     name = getattr(fn, "__name__", None) or getattr(fn, "__qualname__", str(fn))
-    t0 = time.monotonic()
+    endpoint = _endpoint or request_endpoint(name)
     try:
-        result = await asyncio.to_thread(fn, *args, **kwargs)
+        async with request_slot(endpoint):
+            t0 = time.monotonic()
+            native = native_call(fn, args)
+            if native is not None:
+                result = await native(**kwargs)
+            else:
+                result = await run_network(fn, *args, **kwargs)
     except Exception as exc:
+        note_request_error(endpoint, exc)
+        note_exchange_call(endpoint)
+        note_instrument_rejection(_call_symbol(args, kwargs), exc)
         if _alert_errors:
             try:
                 from core.notifier import alert_bybit_error
@@ -44,6 +90,9 @@ async def bybit_call(fn, *args, _alert_errors=True, **kwargs):
             except Exception:
                 pass  # ошибка алертинга не должна подавлять реальное исключение
         raise
+    note_exchange_call(endpoint)
+    if name == "get_positions":
+        note_positions_response(result, t0)
 
     elapsed = time.monotonic() - t0
     if elapsed > _SLOW_CALL_THRESHOLD:
@@ -0,0 +1,220 @@
+"""
+Локальная история closed-PnL (append-only JSONL) для /report и недельного
+отчёта по источникам.
+
+Закрытые сделки прошлых интервалов больше не меняются, а отчёт за месяц
+раньше каждый раз заново скачивал все его 7-дневные чанки. Хранилище
+запоминает строки и интервалы, выборка которых ДОКАЗАННО полна, и следующий
+отчёт читает их с диска, запрашивая у биржи только непокрытые промежутки.
+
+Строки файла (один JSON-объект на строку):
+  {"t": "row", "row": {...}}                 — строка get_closed_pnl; ключ
+                                               (symbol, orderId, updatedTime)
+  {"t": "covered", "start": ms, "end": ms}   — интервал [start, end]
+                                               включительно выбран полностью
+
+Контракт полноты — тот же, что у handlers.reporting.fetch_closed_pnl_rows:
+интервал записывается только из её возвращённого (полного) результата и только
+если он уже завершён (вызывающий проверяет границу :data:`CLOSED_PNL_SETTLE_MS`).
+Строки интервала дописываются одной записью вместе с его маркером ``covered``
+(flush + fsync), поэтому маркер на диске всегда идёт после своих строк.
+
+Fail-closed:
+  * интервал не записывается, если хоть одна строка не несёт полного ключа,
+    ключ повторяется или ``updatedTime`` лежит вне интервала — покрытие такой
+    выборки не доказано, и её запросят у биржи снова;
+  * повреждённая строка файла делает недоказанными все маркеры ПОСЛЕ неё
+    (их строки могли быть в ней); более ранние маркеры остаются в силе.
+
+Хранилище выключено, пока не вызван :func:`configure_closed_pnl_store`
+(main.py при старте): без него отчёты работают как раньше, только с биржей.
+"""
+import copy
+import json
+import logging
+import os
+import threading
+
+# Интервал считается завершённым, если его конец старше «сейчас» на столько
+# миллисекунд: строка closed-PnL появляется у биржи не мгновенно после закрытия.
+CLOSED_PNL_SETTLE_MS = 10 * 60 * 1000
+
+
+def closed_pnl_key(row):
+    """Ключ строки ``(symbol, orderId, updatedTime)`` либо None."""
+    if not isinstance(row, dict):
+        return None
+    symbol = row.get("symbol")
+    order_id = row.get("orderId")
+    if not isinstance(symbol, str) or not symbol:
+        return None
+    if not isinstance(order_id, str) or not order_id:
+        return None
+    try:
+        updated = int(row.get("updatedTime"))
+    except (TypeError, ValueError):
+        return None
+    return symbol, order_id, updated
+
+
+def _merge(intervals: list) -> list:
+    """Сливает пересекающиеся и смежные (через 1 мс) интервалы."""
+    merged: list = []
+    for start, end in sorted(intervals):
+        if merged and start <= merged[-1][1] + 1:
+            merged[-1][1] = max(merged[-1][1], end)
+        else:
+            merged.append([start, end])
+    return [(start, end) for start, end in merged]
+
+
+class ClosedPnlStore:
+    """Durable-история closed-PnL одного файла; потокобезопасна."""
+
+    def __init__(self, path):
+        self.path = str(path)
+        self._lock = threading.Lock()
+        self._loaded = False
+        self._rows: dict = {}
+        self._covered: list = []
+        self._tail_offset = None
+
+    def _load_unlocked(self) -> None:
+        if self._loaded:
+            return
+        rows: dict = {}
+        covered: list = []
+        corrupt_at = None
+        tail_offset = None
+        try:
+            with open(self.path, "rb") as f:
+                raw = f.read()
+        except FileNotFoundError:
+            raw = b""
+        if raw and not raw.endswith(b"\n"):
+            # Оборванная последняя запись (сбой посреди write): её маркер не
+            # дописан, значит она ничего не доказывает. Следующая запись
+            # усечёт файл до конца последней полной строки.
+            tail_offset = raw.rfind(b"\n") + 1
+            raw = raw[:tail_offset]
+        for lineno, line in enumerate(raw.split(b"\n"), 1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+                kind = record["t"]
+                if kind == "row":
+                    key = closed_pnl_key(record["row"])
+                    if key is None:
+                        raise ValueError("строка без ключа")
+                    rows[key] = record["row"]
+                elif kind == "covered":
+                    start, end = record["start"], record["end"]
+                    if type(start) is not int or type(end) is not int or start > end:
+                        raise ValueError("некорректный интервал")
+                    if corrupt_at is None:
+                        covered.append((start, end))
+                else:
+                    raise ValueError(f"неизвестный тип {kind!r}")
+            except (ValueError, KeyError, TypeError) as exc:
+                if corrupt_at is None:
+                    corrupt_at = lineno
+                    logging.warning(
+                        "closed_pnl_store: повреждена строка %s файла %s (%s) — "
+                        "последующие интервалы будут перечитаны у биржи",
+                        lineno, self.path, exc,
+                    )
+        self._rows = rows
+        self._covered = _merge(covered)
+        self._tail_offset = tail_offset
+        self._loaded = True
+
+    def _covers(self, ts: int) -> bool:
+        return any(start <= ts <= end for start, end in self._covered)
+
+    def plan(self, start_ms: int, end_ms: int):
+        """Сохранённые строки ``[start_ms, end_ms]`` и непокрытые промежутки.
+
+        Возвращает ``(rows, gaps)``: копии строк доказанно покрытых частей
+        интервала и список ``(start, end)`` частей, которые нужно выбрать у
+        биржи. Строки вне доказанных интервалов (например, записанные после
+        повреждённой строки) не отдаются: их промежуток будет выбран заново.
+        """
+        with self._lock:
+            self._load_unlocked()
+            gaps: list = []
+            cursor = start_ms
+            for c_start, c_end in self._covered:
+                if c_end < cursor:
+                    continue
+                if c_start > end_ms:
+                    break
+                if c_start > cursor:
+                    gaps.append((cursor, c_start - 1))
+                cursor = c_end + 1
+                if cursor > end_ms:
+                    break
+            if cursor <= end_ms:
+                gaps.append((cursor, end_ms))
+            rows = [
+                copy.deepcopy(row) for key, row in self._rows.items()
+                if start_ms <= key[2] <= end_ms and self._covers(key[2])
+            ]
+        rows.sort(key=lambda r: closed_pnl_key(r)[2])
+        return rows, gaps
+
+    def record(self, start_ms: int, end_ms: int, rows: list) -> bool:
+        """Записывает полную выборку завершённого интервала.
+
+        ``rows`` — результат fetch_closed_pnl_rows ровно этого интервала.
+        Возвращает True, только если строки и маркер записаны на диск.
+        """
+        keys = [closed_pnl_key(row) for row in rows]
+        if any(k is None or not start_ms <= k[2] <= end_ms for k in keys):
+            return False
+        if len(set(keys)) != len(keys):
+            return False
+        with self._lock:
+            self._load_unlocked()
+            fresh = [
+                (key, row) for key, row in zip(keys, rows)
+                if key not in self._rows
+            ]
+            lines = [
+                json.dumps({"t": "row", "row": row}, ensure_ascii=False)
+                for _, row in fresh
+            ]
+            lines.append(json.dumps({"t": "covered", "start": start_ms, "end": end_ms}))
+            payload = "\n".join(lines) + "\n"
+            try:
+                os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+                with open(self.path, "ab") as f:
+                    if self._tail_offset is not None:
+                        f.truncate(self._tail_offset)
+                    f.write(payload.encode("utf-8"))
+                    f.flush()
+                    os.fsync(f.fileno())
+            except OSError as exc:
+                logging.warning("closed_pnl_store: запись %s не удалась: %s", self.path, exc)
+                # Состояние файла неизвестно: перечитать его при следующем обращении.
+                self._loaded = False
+                return False
+            self._tail_offset = None
+            for key, row in fresh:
+                self._rows[key] = copy.deepcopy(row)
+            self._covered = _merge(self._covered + [(start_ms, end_ms)])
+        return True
+
+
+_STORE: ClosedPnlStore | None = None
+
+
+def configure_closed_pnl_store(path) -> None:
+    """Включает хранилище на файле ``path`` (None — выключает)."""
+    global _STORE
+    _STORE = ClosedPnlStore(path) if path is not None else None
+
+
+def get_closed_pnl_store() -> ClosedPnlStore | None:
+    """Текущее хранилище либо None, если оно не включено."""
+    return _STORE
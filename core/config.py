@@ -33,6 +33,10 @@ if not TELEGRAM_TOKEN or not BYBIT_API_KEY or not BYBIT_API_SECRET or not ALLOWE
 
 # --- SETTINGS ---
 IS_DEMO = os.getenv('IS_DEMO') == 'True'
+
+# Транспорт REST-вызовов Bybit через bybit_call: pybit (по умолчанию) или
+# httpx — нативный async-клиент core.bybit_async для основных эндпоинтов V5.
+BYBIT_TRANSPORT = os.getenv('BYBIT_TRANSPORT', 'pybit').strip().lower()
 USER_RISK_USD = float(os.getenv('USER_RISK_USD', 50))
 
 # Буферы маржи (защита от 110007)
@@ -69,10 +73,14 @@ SOURCE_ALLOW_ADD = os.getenv('SOURCE_ALLOW_ADD', '0') == '1'
 MAX_TOTAL_HEAT_USDT = float(os.getenv('MAX_TOTAL_HEAT_USDT', 0))
 # HEAT_ACTION: действие при превышении лимита heat.
 #   "reject" — fail-closed, заблокировать сделку (по умолчанию)
-#   "queue"  — сохранить сигнал в очередь (без автоисполнения); требует внешнего воркера
+#   "queue"  — сохранить сигнал в очередь; воркер очереди проверяет его заново,
+#              когда heat снизится (handlers.signal_parser.drain_heat_queue)
 HEAT_ACTION = os.getenv('HEAT_ACTION', 'reject').lower()
 # HEAT_QUEUE_TTL_MIN: время действия поставленных в очередь сделок (минуты).
 HEAT_QUEUE_TTL_MIN = int(os.getenv('HEAT_QUEUE_TTL_MIN', 30))
+# HEAT_QUEUE_DRAIN_INTERVAL_SEC: период переоценки очереди heat (секунды).
+#   Событие приватного потока переоценивает её сразу, не дожидаясь периода.
+HEAT_QUEUE_DRAIN_INTERVAL_SEC = int(os.getenv('HEAT_QUEUE_DRAIN_INTERVAL_SEC', 60))
 
 # --- FILE PATHS ---
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -84,6 +92,7 @@ COMMENTS_FILE = DATA_DIR / "journal_comments.json"
 SOURCES_FILE = DATA_DIR / "sources_log.json"
 HEAT_QUEUE_FILE = DATA_DIR / "heat_queue.json"
 JOURNAL_FILE = DATA_DIR / "trade_journal.jsonl"
+CLOSED_PNL_HISTORY_FILE = DATA_DIR / "closed_pnl_history.jsonl"
 DISABLED_SOURCES_FILE = DATA_DIR / "disabled_sources.json"
 
 # --- ПРЕВЬЮ МАРКЕТ-СДЕЛКИ / ПОДТВЕРЖДЕНИЕ ---
@@ -104,4 +113,16 @@ WATCHDOG_ENABLED = os.getenv('WATCHDOG_ENABLED', '1').strip().lower() not in (
 WATCHDOG_INTERVAL_SEC = max(1, int(os.getenv('WATCHDOG_INTERVAL_SEC', 300)))
 # WATCHDOG_COOLDOWN_SEC: кулдаун повторного алерта по одной и той же позиции
 #   (symbol, side, positionIdx). 0 = алерт на каждом цикле.
-WATCHDOG_COOLDOWN_SEC = max(0, int(os.getenv('WATCHDOG_COOLDOWN_SEC', 1800)))
\ No newline at end of file
+WATCHDOG_COOLDOWN_SEC = max(0, int(os.getenv('WATCHDOG_COOLDOWN_SEC', 1800)))
+# --- ПРИВАТНЫЙ WEBSOCKET-ПОТОК BYBIT (position / order / execution) ---
+# PRIVATE_STREAM_ENABLED: push-сигнал об изменениях позиций и ордеров, по
+#   которому auto-BE и exit binding перечитывают REST сразу, а не на следующем
+#   тике. Выключен по умолчанию; REST-опрос работает в любом случае.
+PRIVATE_STREAM_ENABLED = os.getenv('PRIVATE_STREAM_ENABLED', '0').strip().lower() in (
+    '1', 'true', 'yes', 'on',
+)
+# PRIVATE_STREAM_URL: пусто = по сети сессии (testnet при IS_DEMO, иначе mainnet).
+PRIVATE_STREAM_URL = os.getenv('PRIVATE_STREAM_URL', '').strip()
+# PRIVATE_STREAM_STALE_SEC: зеркало потока пригодно, пока последнее сообщение
+#   (включая pong) не старше этого числа секунд; пинг уходит каждые 20 с.
+PRIVATE_STREAM_STALE_SEC = max(1, int(os.getenv('PRIVATE_STREAM_STALE_SEC', 45)))
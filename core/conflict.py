@@ -14,6 +14,7 @@
   SOURCE_ALLOW_ADD          — "0" (по умолчанию)      | "1"
 """
 
+import asyncio
 import logging
 
 from core.config import CONFLICT_POLICY_SAME_DIR, SOURCE_ALLOW_ADD
@@ -23,32 +24,61 @@ from core.config import CONFLICT_POLICY_SAME_DIR, SOURCE_ALLOW_ADD
 # Внутренние вспомогательные функции
 # ---------------------------------------------------------------------------
 
+def _position_side(pos_resp) -> str | None:
+    for pos in pos_resp["result"]["list"]:
+        if float(pos.get("size", 0)) > 0:
+            return "LONG" if pos["side"] == "Buy" else "SHORT"
+    return None
+
+
+def _entry_order_side(orders_resp) -> str | None:
+    for order in orders_resp["result"]["list"]:
+        if not order.get("reduceOnly", False):
+            return "LONG" if order["side"] == "Buy" else "SHORT"
+    return None
+
+
 async def _get_existing_side(symbol: str) -> str | None:
     """
     Возвращает 'LONG' или 'SHORT', если по символу есть открытая позиция или
     ордер на вход (non-reduceOnly). Возвращает None, если ничего нет.
     При ошибке API — бросает исключение (вызывающий обрабатывает fail-closed).
+
+    Позиция и открытые ордера читаются одновременно, но решение принимается в
+    прежнем порядке: найденная позиция решает сама (исход чтения ордеров тогда
+    не важен), иначе ошибка чтения позиции, затем ошибка чтения ордеров
+    пробрасывается — как при последовательных запросах.
     """
     from core.bybit_call import bybit_call
     from core.trading_core import session
 
-    # 1. Открытая позиция
-    pos_resp = await bybit_call(
-        session.get_positions, category="linear", symbol=symbol
+    pos_resp, orders_resp = await asyncio.gather(
+        # 1. Открытая позиция
+        bybit_call(session.get_positions, category="linear", symbol=symbol),
+        # 2. Ожидающий ордер на вход (non-reduceOnly = открывающий)
+        bybit_call(
+            session.get_open_orders, category="linear", symbol=symbol, limit=10
+        ),
+        return_exceptions=True,
     )
-    for pos in pos_resp["result"]["list"]:
-        if float(pos.get("size", 0)) > 0:
-            return "LONG" if pos["side"] == "Buy" else "SHORT"
+    if isinstance(pos_resp, BaseException):
+        raise pos_resp
+    side = _position_side(pos_resp)
+    if side is not None:
+        return side
 
-    # 2. Ожидающий ордер на вход (non-reduceOnly = открывающий)
-    orders_resp = await bybit_call(
-        session.get_open_orders, category="linear", symbol=symbol, limit=10
-    )
-    for order in orders_resp["result"]["list"]:
-        if not order.get("reduceOnly", False):
-            return "LONG" if order["side"] == "Buy" else "SHORT"
+    if isinstance(orders_resp, BaseException):
+        raise orders_resp
+    return _entry_order_side(orders_resp)
 
-    return None
+
+async def read_existing_side(symbol: str) -> str | None:
+    """Чтение текущего направления по *symbol* для раннего запуска.
+
+    Обработчик сигнала запускает его вместе с прочими чтениями и передаёт в
+    :func:`resolve_signal_conflict` как ``existing_side_read``.
+    """
+    return await _get_existing_side(symbol)
 
 
 # ---------------------------------------------------------------------------
@@ -58,6 +88,8 @@ async def _get_existing_side(symbol: str) -> str | None:
 async def resolve_signal_conflict(
     symbol: str,
     new_side: str,
+    *,
+    existing_side_read=None,
 ) -> tuple[str, str]:
     """
     Проверяет, конфликтует ли новый сигнал по *symbol* / *new_side* с
@@ -68,9 +100,15 @@ async def resolve_signal_conflict(
       "ignore" — то же направление, CONFLICT_POLICY_SAME_DIR=ignore → сигнал отброшен
       "add"    — то же направление, SOURCE_ALLOW_ADD=1 → разрешить добор
       "block"  — противоположное направление (всегда) или ошибка API (fail-closed)
+
+    ``existing_side_read`` — уже запущенное :func:`read_existing_side` по тому
+    же символу; его ошибка так же даёт "block". Без него чтение выполняется
+    здесь.
     """
+    if existing_side_read is None:
+        existing_side_read = _get_existing_side(symbol)
     try:
-        existing_side = await _get_existing_side(symbol)
+        existing_side = await existing_side_read
     except Exception as exc:
         logging.error(
             "conflict check API error for %s — fail-closed: %s", symbol, exc
@@ -6,6 +6,7 @@
 """
 import json
 import os
+import threading
 import time
 import logging
 from datetime import datetime
@@ -21,6 +22,9 @@ _MARKET_PENDING: dict = {}
 # Очередь тепла (в памяти + на диске): список сделок, ожидающих снижения heat.
 # Каждый элемент: {sym, side, entry_val, stop_val, risk_usd, source_tag, queued_at, ttl_min}
 HEAT_QUEUE: list = []
+# Очередь меняют и цикл событий (постановка из enforce_heat), и дисковый пул
+# (разбор очереди через run_disk): изменение и запись на диск — под замком.
+_HEAT_QUEUE_LOCK = threading.Lock()
 
 # --- 1. Глобальные переменные (Кэш в памяти) ---
 # Они заполнятся данными при вызове init_db()
@@ -230,8 +234,9 @@ def add_to_heat_queue(item: dict) -> None:
     item должен содержать: sym, side, entry_val, stop_val, risk_usd, source_tag,
                            queued_at (секунды эпохи), ttl_min.
     """
-    HEAT_QUEUE.append(item)
-    save_json(HEAT_QUEUE_FILE, HEAT_QUEUE)
+    with _HEAT_QUEUE_LOCK:
+        HEAT_QUEUE.append(item)
+        save_json(HEAT_QUEUE_FILE, HEAT_QUEUE)
 
 
 def get_heat_queue() -> list:
@@ -249,24 +254,36 @@ def prune_heat_queue() -> list:
     now = time.time()
     active = []
     expired = []
-    for item in HEAT_QUEUE:
-        ttl_sec = item.get("ttl_min", 30) * 60
-        if now - item.get("queued_at", 0) < ttl_sec:
-            active.append(item)
-        else:
-            expired.append(item)
-    if expired:
-        HEAT_QUEUE = active
-        save_json(HEAT_QUEUE_FILE, HEAT_QUEUE)
+    with _HEAT_QUEUE_LOCK:
+        for item in HEAT_QUEUE:
+            ttl_sec = item.get("ttl_min", 30) * 60
+            if now - item.get("queued_at", 0) < ttl_sec:
+                active.append(item)
+            else:
+                expired.append(item)
+        if expired:
+            HEAT_QUEUE = active
+            save_json(HEAT_QUEUE_FILE, HEAT_QUEUE)
     return expired
 
 
+def remove_heat_queue_item(item: dict) -> bool:
+    """Удаляет именно этот элемент очереди (по идентичности). Возвращает True при успехе."""
+    with _HEAT_QUEUE_LOCK:
+        for i, queued in enumerate(HEAT_QUEUE):
+            if queued is item:
+                HEAT_QUEUE.pop(i)
+                save_json(HEAT_QUEUE_FILE, HEAT_QUEUE)
+                return True
+    return False
+
+
 def remove_from_heat_queue(sym: str) -> bool:
     """Удаляет первый элемент очереди с совпадающим sym. Возвращает True при успехе."""
-    global HEAT_QUEUE
-    for i, item in enumerate(HEAT_QUEUE):
-        if item.get("sym") == sym:
-            HEAT_QUEUE.pop(i)
-            save_json(HEAT_QUEUE_FILE, HEAT_QUEUE)
-            return True
+    with _HEAT_QUEUE_LOCK:
+        for i, item in enumerate(HEAT_QUEUE):
+            if item.get("sym") == sym:
+                HEAT_QUEUE.pop(i)
+                save_json(HEAT_QUEUE_FILE, HEAT_QUEUE)
+                return True
     return False
\ No newline at end of file
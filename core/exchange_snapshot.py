@@ -0,0 +1,336 @@
+"""
+Общий снимок позиций и открытых ордеров Bybit (category=linear, settleCoin=USDT)
+и баланса счёта (accountType=UNIFIED, coin=USDT).
+
+Heartbeat, auto-BE, time management, сверка журнала, watchdog защиты, exit
+binding, расчёт heat и /status читают один и тот же аккаунт-широкий снимок с
+интервалом в секунды. Модуль раздаёт им один ответ биржи вместо отдельного
+REST-запроса на каждого читателя:
+
+  * ответ моложе ``max_age`` секунд отдаётся из памяти
+    (по умолчанию EXCHANGE_SNAPSHOT_MAX_AGE_SEC, 0 = без повторного
+    использования);
+  * одновременные читатели одного снимка ждут ОДИН запрос (coalescing);
+  * ``fresh=True`` — путь записи или проверки после записи — всегда выполняет
+    собственный запрос и к уже летящему не присоединяется;
+  * любая запись через :func:`core.bybit_call.bybit_call` (всё, что не
+    ``get_*``/``check_*``/``fetch_*``) сбрасывает снимки: после собственной
+    записи бота старое состояние биржи не переиспользуется. Событие
+    приватного потока (исполнение, ордер, позиция) сбрасывает их так же
+    (app.jobs._on_private_stream_change).
+
+Баланс (:func:`get_wallet_snapshot`) читают preflight сигнала, подтверждение
+Market и утренний отчёт; по умолчанию он живёт WALLET_SNAPSHOT_MAX_AGE_SEC.
+``check_daily_limit`` выполняется в потоке пула и ждать запрос цикла событий
+не может: :func:`peek_wallet_snapshot` отдаёт ему сохранённый снимок той же
+сессии, а без него он читает баланс сам, как раньше.
+
+Кешируется только доказанно успешный конверт (``retCode`` int 0, ``result``
+dict, ``result.list`` список). Иначе ответ отдаётся вызывающему как есть и не
+запоминается: решение о достоверности по-прежнему принимает строгий разбор
+вызывающего (``_require_result_rows``, ``parse_positions_snapshot``), модуль его
+не ослабляет и не подменяет. Ошибка запроса пробрасывается всем ждущим и тоже
+не кешируется.
+
+Сетевой вызов выполняет переданный ``call`` (``bybit_call`` вызывающего модуля)
+над переданной ``session``: снимок переиспользуется только для той же пары,
+поэтому подменённая в тесте сессия или обёртка не получает чужой ответ.
+Каждый читатель получает собственную глубокую копию ответа.
+
+Открытые ордера читаются ВСЕМИ страницами (``limit=50``, ``cursor`` из
+``result.nextPageCursor``): без пагинации Bybit отдаёт только первые 20, и
+ордера сверх них были невидимы для очистки, heat и проверки защиты. Страницы
+склеиваются в один конверт (``nextPageCursor`` пуст), так что разбор
+вызывающих не меняется; ``by_symbol`` снимка — те же строки по символу.
+Аномальная страница отдаётся вызывающему как есть (строгий разбор её
+отвергнет). Пустая страница с продолжением, повторный токен, повтор
+``orderId`` между страницами и незавершённая за ``_MAX_OPEN_ORDER_PAGES``
+пагинация — :class:`IncompleteSnapshotError`: неполный список неотличим от
+правдивого, поэтому частичный снимок не отдаётся.
+
+Переменные окружения:
+  EXCHANGE_SNAPSHOT_MAX_AGE_SEC — 3 (секунды); 0 = только coalescing
+  WALLET_SNAPSHOT_MAX_AGE_SEC   — 5 (секунды) для баланса; 0 = только coalescing
+"""
+import asyncio
+import copy
+import logging
+import os
+import time
+from collections import namedtuple
+
+SNAPSHOT_POSITIONS = "get_positions"
+SNAPSHOT_OPEN_ORDERS = "get_open_orders"
+SNAPSHOT_WALLET = "get_wallet_balance"
+_SNAPSHOT_KINDS = (SNAPSHOT_POSITIONS, SNAPSHOT_OPEN_ORDERS, SNAPSHOT_WALLET)
+
+# Читается напрямую из окружения (как BYBIT_SLOW_CALL_WARN в core.bybit_call):
+# модуль нужен и там, где core.config заменён заглушкой.
+try:
+    EXCHANGE_SNAPSHOT_MAX_AGE_SEC = max(
+        0.0, float(os.getenv("EXCHANGE_SNAPSHOT_MAX_AGE_SEC", 3))
+    )
+except ValueError:
+    EXCHANGE_SNAPSHOT_MAX_AGE_SEC = 3.0
+try:
+    WALLET_SNAPSHOT_MAX_AGE_SEC = max(
+        0.0, float(os.getenv("WALLET_SNAPSHOT_MAX_AGE_SEC", 5))
+    )
+except ValueError:
+    WALLET_SNAPSHOT_MAX_AGE_SEC = 5.0
+
+# Префиксы имён read-only вызовов: всё остальное считается записью.
+_READ_PREFIXES = ("get_", "check_", "fetch_")
+
+OPEN_ORDERS_PAGE_LIMIT = 50
+_MAX_OPEN_ORDER_PAGES = 40
+
+ExchangeSnapshot = namedtuple(
+    "ExchangeSnapshot", ("kind", "resp", "fetched_at", "fetched_ts", "by_symbol"),
+    defaults=(None,),
+)
+ExchangeSnapshot.__doc__ = """Снимок одного read-запроса Bybit.
+
+``resp`` — ответ биржи целиком (копия); ``fetched_at`` — ``time.monotonic()``
+МОМЕНТА ОТПРАВКИ запроса (возраст считается консервативно), ``fetched_ts`` —
+то же время в Unix-секундах для логов и UI. ``by_symbol`` — для доказанного
+снимка открытых ордеров словарь ``symbol → [строки resp]``, иначе None.
+"""
+
+
+class IncompleteSnapshotError(RuntimeError):
+    """Пагинация открытых ордеров не доказала полноту списка."""
+
+# kind → (session, call, generation, ExchangeSnapshot)
+_CACHE: dict = {}
+# kind → (session, call, generation, asyncio.Task)
+_INFLIGHT: dict = {}
+# Растёт при каждой записи: ответ, запрошенный до записи, не кешируется.
+_generation = 0
+
+
+def snapshot_age(snapshot: ExchangeSnapshot) -> float:
+    """Возраст снимка в секундах."""
+    return time.monotonic() - snapshot.fetched_at
+
+
+def invalidate_exchange_snapshots() -> None:
+    """Сбрасывает все снимки: следующий читатель выполнит новый запрос."""
+    global _generation
+    _generation += 1
+    _CACHE.clear()
+    _INFLIGHT.clear()
+
+
+def note_exchange_call(name: str) -> None:
+    """Сбрасывает снимки после записи (вызывается из bybit_call)."""
+    if not (isinstance(name, str) and name.startswith(_READ_PREFIXES)):
+        invalidate_exchange_snapshots()
+
+
+def _envelope_proven(resp) -> bool:
+    if not isinstance(resp, dict):
+        return False
+    code = resp.get("retCode")
+    if type(code) is not int or code != 0:
+        return False
+    result = resp.get("result")
+    return isinstance(result, dict) and isinstance(result.get("list"), list)
+
+
+def _index_by_symbol(resp) -> dict:
+    index: dict = {}
+    for row in resp["result"]["list"]:
+        if isinstance(row, dict):
+            index.setdefault(row.get("symbol"), []).append(row)
+    return index
+
+
+def _handout(snapshot: ExchangeSnapshot) -> ExchangeSnapshot:
+    resp = copy.deepcopy(snapshot.resp)
+    by_symbol = None
+    if snapshot.kind == SNAPSHOT_OPEN_ORDERS and _envelope_proven(resp):
+        by_symbol = _index_by_symbol(resp)
+    return snapshot._replace(resp=resp, by_symbol=by_symbol)
+
+
+def _page_cursor(resp) -> str:
+    raw = resp["result"].get("nextPageCursor")
+    if raw is None:
+        return ""
+    if not isinstance(raw, str):
+        raise IncompleteSnapshotError(
+            f"get_open_orders: nextPageCursor неизвестного типа {type(raw).__name__}"
+        )
+    return raw
+
+
+async def _fetch_open_orders(call, session):
+    """Все страницы открытых ордеров одним конвертом (или аномальная страница)."""
+    rows: list = []
+    first = None
+    cursor = ""
+    seen_cursors: set = set()
+    seen_ids: set = set()
+
+    for page in range(1, _MAX_OPEN_ORDER_PAGES + 1):
+        kw = dict(category="linear", settleCoin="USDT", limit=OPEN_ORDERS_PAGE_LIMIT)
+        if cursor:
+            kw["cursor"] = cursor
+        resp = await call(session.get_open_orders, **kw)
+        if not _envelope_proven(resp):
+            return resp
+        if first is None:
+            first = resp
+        page_rows = resp["result"]["list"]
+        for row in page_rows:
+            order_id = row.get("orderId") if isinstance(row, dict) else None
+            if order_id:
+                if order_id in seen_ids:
+                    raise IncompleteSnapshotError(
+                        f"get_open_orders: orderId {order_id} повторился на "
+                        f"странице {page}: список сдвинулся во время чтения"
+                    )
+                seen_ids.add(order_id)
+        rows.extend(page_rows)
+
+        next_cursor = _page_cursor(resp)
+        if not next_cursor:
+            merged = dict(first)
+            merged["result"] = dict(first["result"], list=rows, nextPageCursor="")
+            return merged
+        if not page_rows:
+            raise IncompleteSnapshotError(
+                "get_open_orders: пустая страница с непустым nextPageCursor"
+            )
+        if next_cursor in seen_cursors:
+            raise IncompleteSnapshotError(
+                "get_open_orders: Bybit повторил уже использованный nextPageCursor"
+            )
+        seen_cursors.add(next_cursor)
+        cursor = next_cursor
+
+    raise IncompleteSnapshotError(
+        f"get_open_orders: пагинация не завершилась за {_MAX_OPEN_ORDER_PAGES} стр."
+    )
+
+
+async def _fetch(kind: str, call, session, generation: int) -> ExchangeSnapshot:
+    fetched_at = time.monotonic()
+    fetched_ts = time.time()
+    if kind == SNAPSHOT_OPEN_ORDERS:
+        resp = await _fetch_open_orders(call, session)
+    elif kind == SNAPSHOT_WALLET:
+        resp = await call(session.get_wallet_balance, accountType="UNIFIED", coin="USDT")
+    else:
+        resp = await call(getattr(session, kind), category="linear", settleCoin="USDT")
+    snapshot = ExchangeSnapshot(kind, resp, fetched_at, fetched_ts)
+    if generation == _generation and _envelope_proven(resp):
+        cached = _CACHE.get(kind)
+        if cached is None or cached[3].fetched_at <= fetched_at:
+            _CACHE[kind] = (session, call, generation, snapshot)
+    return snapshot
+
+
+def _retrieve_exception(task: asyncio.Task) -> None:
+    # Ошибку получают ждущие; здесь она только помечается полученной, чтобы
+    # отменённый читатель не оставил "Task exception was never retrieved".
+    if not task.cancelled():
+        task.exception()
+
+
+async def get_exchange_snapshot(
+    kind: str,
+    call,
+    session,
+    *,
+    max_age: float | None = None,
+    fresh: bool = False,
+) -> ExchangeSnapshot:
+    """Снимок ``kind`` (:data:`SNAPSHOT_POSITIONS` / :data:`SNAPSHOT_OPEN_ORDERS`
+    / :data:`SNAPSHOT_WALLET`).
+
+    Без ``fresh`` отдаёт сохранённый снимок той же пары (session, call) не
+    старше ``max_age`` либо присоединяется к уже летящему запросу этой пары.
+    Исключение запроса пробрасывается без изменений.
+    """
+    if kind not in _SNAPSHOT_KINDS:
+        raise ValueError(f"неизвестный снимок биржи: {kind!r}")
+    if max_age is None:
+        max_age = (
+            WALLET_SNAPSHOT_MAX_AGE_SEC if kind == SNAPSHOT_WALLET
+            else EXCHANGE_SNAPSHOT_MAX_AGE_SEC
+        )
+    loop = asyncio.get_running_loop()
+
+    if not fresh:
+        cached = _CACHE.get(kind)
+        if (
+            cached is not None
+            and cached[0] is session
+            and cached[1] is call
+            and snapshot_age(cached[3]) <= max_age
+        ):
+            return _handout(cached[3])
+        inflight = _INFLIGHT.get(kind)
+        if (
+            inflight is not None
+            and inflight[0] is session
+            and inflight[1] is call
+            and inflight[2] == _generation
+            and not inflight[3].done()
+            and inflight[3].get_loop() is loop
+        ):
+            return _handout(await asyncio.shield(inflight[3]))
+
+    generation = _generation
+    task = loop.create_task(_fetch(kind, call, session, generation))
+    task.add_done_callback(_retrieve_exception)
+    entry = (session, call, generation, task)
+    _INFLIGHT[kind] = entry
+
+    def _forget(_task, kind=kind, entry=entry):
+        if _INFLIGHT.get(kind) is entry:
+            del _INFLIGHT[kind]
+
+    task.add_done_callback(_forget)
+    snapshot = await asyncio.shield(task)
+    logging.debug(
+        "exchange snapshot %s: новый запрос (fresh=%s)", kind, fresh,
+    )
+    return _handout(snapshot)
+
+
+async def get_positions_snapshot(call, session, *, max_age=None, fresh=False):
+    """Общий снимок ``get_positions(category="linear", settleCoin="USDT")``."""
+    return await get_exchange_snapshot(
+        SNAPSHOT_POSITIONS, call, session, max_age=max_age, fresh=fresh,
+    )
+
+
+async def get_open_orders_snapshot(call, session, *, max_age=None, fresh=False):
+    """Полный (все страницы) снимок открытых ордеров linear/USDT с ``by_symbol``."""
+    return await get_exchange_snapshot(
+        SNAPSHOT_OPEN_ORDERS, call, session, max_age=max_age, fresh=fresh,
+    )
+
+
+async def get_wallet_snapshot(call, session, *, max_age=None, fresh=False):
+    """Общий снимок ``get_wallet_balance(accountType="UNIFIED", coin="USDT")``."""
+    return await get_exchange_snapshot(
+        SNAPSHOT_WALLET, call, session, max_age=max_age, fresh=fresh,
+    )
+
+
+def peek_wallet_snapshot(session, max_age: float | None = None):
+    """Копия сохранённого ответа баланса *session* не старше ``max_age`` или None.
+
+    Синхронная и без сети — для читателей в потоке пула. Обёртка вызова не
+    сравнивается: у синхронного читателя её нет, ответ той же сессии тот же.
+    """
+    if max_age is None:
+        max_age = WALLET_SNAPSHOT_MAX_AGE_SEC
+    cached = _CACHE.get(SNAPSHOT_WALLET)
+    if cached is None or cached[0] is not session or snapshot_age(cached[3]) > max_age:
+        return None
+    return copy.deepcopy(cached[3].resp)
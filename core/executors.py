@@ -0,0 +1,123 @@
+"""
+Отдельные пулы потоков для сетевых вызовов SDK и для локального дискового I/O.
+
+Раньше и :func:`core.bybit_call.bybit_call`, и ``asyncio.to_thread(append_event,
+...)`` делили пул по умолчанию event loop: долгая пагинация ``get_closed_pnl``
+или fsync журнала могли занять все потоки и задержать срочную проверку
+``set_trading_stop``. Теперь у каждого класса работы свой ограниченный пул:
+
+  * :func:`run_network` — вызовы Bybit SDK (bybit_call);
+  * :func:`run_disk` — журнал, JSON-хранилища, локальные файлы.
+
+Как и ``asyncio.to_thread``, функция выполняется в потоке с копией
+contextvars, исключение пробрасывается без изменений, а отмена ожидающего
+вызова не прерывает уже начатую в потоке работу. Загрузка пулов (занятые
+потоки, очередь сейчас и её пик) видна в /health через
+:func:`get_executor_stats`.
+
+Переменные окружения:
+  NETWORK_EXECUTOR_WORKERS — 8 (не меньше BYBIT_MAX_IN_FLIGHT)
+  DISK_EXECUTOR_WORKERS    — 2
+"""
+import asyncio
+import contextvars
+import functools
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+
+def _env_workers(name: str, default: int) -> int:
+    try:
+        return max(1, int(os.getenv(name, default)))
+    except ValueError:
+        return default
+
+
+# Читаются напрямую из окружения (как BYBIT_MAX_IN_FLIGHT): модуль нужен там,
+# где core.config заменён заглушкой.
+NETWORK_EXECUTOR_WORKERS = _env_workers("NETWORK_EXECUTOR_WORKERS", 8)
+DISK_EXECUTOR_WORKERS = _env_workers("DISK_EXECUTOR_WORKERS", 2)
+
+
+class _Pool:
+    """Ленивый ThreadPoolExecutor с учётом очереди и занятых потоков."""
+
+    def __init__(self, name: str, workers: int):
+        self.name = name
+        self.workers = workers
+        self._executor = None
+        self._lock = threading.Lock()
+        self.active = 0
+        self.queued = 0
+        self.peak_queued = 0
+        self.completed = 0
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.workers, thread_name_prefix=f"{self.name}-io",
+                )
+            return self._executor
+
+    def _run(self, fn, args, kwargs):
+        with self._lock:
+            self.queued -= 1
+            self.active += 1
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            with self._lock:
+                self.active -= 1
+                self.completed += 1
+
+    def _dequeue_cancelled(self, cfut) -> None:
+        if cfut.cancelled():
+            with self._lock:
+                self.queued -= 1
+
+    async def run(self, fn, *args, **kwargs):
+        ctx = contextvars.copy_context()
+        call = functools.partial(ctx.run, self._run, fn, args, kwargs)
+        executor = self._get_executor()
+        with self._lock:
+            self.queued += 1
+            self.peak_queued = max(self.peak_queued, self.queued)
+        try:
+            cfut = executor.submit(call)
+        except BaseException:
+            with self._lock:
+                self.queued -= 1
+            raise
+        cfut.add_done_callback(self._dequeue_cancelled)
+        return await asyncio.wrap_future(cfut)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "active": self.active,
+                "queued": self.queued,
+                "peak_queued": self.peak_queued,
+                "completed": self.completed,
+            }
+
+
+_NETWORK = _Pool("network", NETWORK_EXECUTOR_WORKERS)
+_DISK = _Pool("disk", DISK_EXECUTOR_WORKERS)
+
+
+async def run_network(fn, *args, **kwargs):
+    """Выполняет синхронный сетевой вызов (Bybit SDK) в сетевом пуле."""
+    return await _NETWORK.run(fn, *args, **kwargs)
+
+
+async def run_disk(fn, *args, **kwargs):
+    """Выполняет синхронную работу с локальными файлами в дисковом пуле."""
+    return await _DISK.run(fn, *args, **kwargs)
+
+
+def get_executor_stats() -> dict:
+    """Снимок загрузки пулов: ``{"network": {...}, "disk": {...}}``."""
+    return {"network": _NETWORK.stats(), "disk": _DISK.stats()}
@@ -14,6 +14,9 @@ heat = сумма риска-под-стопом в USDT по всем отсл
     HEAT_ACTION          — "reject" (по умолчанию) | "queue"
     HEAT_QUEUE_TTL_MIN   — 30 (минут)
 
+Очередь (HEAT_ACTION=queue) разбирает handlers.signal_parser.drain_heat_queue:
+порядок допуска и бюджет считает :func:`select_heat_admissions`.
+
 Все значения конфигурации читаются из core.config при импорте.
 """
 
@@ -78,14 +81,38 @@ def compute_heat_from_data(positions: list, market_pending: dict, risk_mapping:
     return total
 
 
+def heat_queue_enabled() -> bool:
+    """True, если превышение heat ставит сделку в очередь (есть что разбирать)."""
+    return MAX_TOTAL_HEAT_USDT > 0 and HEAT_ACTION == "queue"
+
+
 # ---------------------------------------------------------------------------
 # Асинхронный расчёт тепла (требует живой сессии Bybit)
 # ---------------------------------------------------------------------------
 
-async def compute_current_heat() -> tuple[float, str]:
+async def read_heat_positions():
+    """
+    Ответ get_positions (общий снимок позиций linear/USDT) для расчёта heat.
+
+    Возвращает None без запроса, если heat отключён. Обработчик сигнала
+    запускает чтение заранее и передаёт его в :func:`enforce_heat`.
+    """
+    if MAX_TOTAL_HEAT_USDT <= 0:
+        return None
+    from core.trading_core import session
+    from core.bybit_call import bybit_call
+    from core.exchange_snapshot import get_positions_snapshot
+
+    return (await get_positions_snapshot(bybit_call, session)).resp
+
+
+async def compute_current_heat(positions_read=None) -> tuple[float, str]:
     """
     Получает открытые позиции с Bybit и рассчитывает суммарный heat.
 
+    ``positions_read`` — уже запущенное :func:`read_heat_positions`; без него
+    позиции читаются здесь.
+
     Возвращает (heat_usd: float, source: str).
     При ошибке API: возвращает (0.0, "api_error") — fail-open для heat
     (чтобы временная недоступность API не блокировала все сделки).
@@ -93,14 +120,12 @@ async def compute_current_heat() -> tuple[float, str]:
     if MAX_TOTAL_HEAT_USDT <= 0:
         return 0.0, "disabled"
 
+    if positions_read is None:
+        positions_read = read_heat_positions()
     try:
-        from core.trading_core import session
-        from core.bybit_call import bybit_call
         from core.database import _MARKET_PENDING, RISK_MAPPING
 
-        pos_resp = await bybit_call(
-            session.get_positions, category="linear", settleCoin="USDT"
-        )
+        pos_resp = await positions_read
         positions = [
             p for p in pos_resp["result"]["list"] if float(p.get("size", 0)) > 0
         ]
@@ -129,16 +154,53 @@ def check_heat_sync(new_risk_usd: float, current_heat: float) -> tuple[bool, flo
     return allowed, current_heat, heat_after
 
 
+def select_heat_admissions(queue: list, current_heat: float) -> list:
+    """
+    Чистая функция: элементы очереди, которые влезают в бюджет heat.
+
+    Порядок — ``priority`` (больше — раньше, по умолчанию 0), затем
+    ``queued_at`` (FIFO). Риск допущенного элемента добавляется к heat
+    следующего. Первый не влезающий элемент останавливает допуск: следующие
+    за ним не обходят его, даже если меньше.
+    """
+    def _order(item):
+        try:
+            priority = float(item.get("priority", 0) or 0)
+        except (TypeError, ValueError):
+            priority = 0.0
+        return -priority, float(item.get("queued_at", 0) or 0)
+
+    admitted = []
+    heat = current_heat
+    for item in sorted(queue, key=_order):
+        try:
+            risk = float(item.get("risk_usd", 0))
+        except (TypeError, ValueError):
+            break
+        allowed, _cur, heat_after = check_heat_sync(risk, heat)
+        if not allowed:
+            break
+        admitted.append(item)
+        heat = heat_after
+    return admitted
+
+
 async def enforce_heat(
     new_risk_usd: float,
     trade_info: dict,
     bot,
     owner_id: str,
+    *,
+    positions_read=None,
 ) -> tuple[bool, str]:
     """
     Полная асинхронная проверка heat (получает живой heat, проверяет лимит, при необходимости ставит в очередь).
 
-    Ключи trade_info: sym, side, entry_val, stop_val, risk_usd, source_tag.
+    Ключи trade_info: sym, side, entry_val, stop_val, risk_usd, source_tag,
+    signal_text (текст сигнала для повторной проверки из очереди). Сделка,
+    повторно проверяемая из очереди, передаёт свой ``queued_at``: вернувшись
+    в очередь, она сохраняет место и срок жизни.
+    ``positions_read`` — заранее запущенное :func:`read_heat_positions`.
 
     Возвращает (allowed: bool, reason: str).
     allowed=True  → продолжить сделку
@@ -147,7 +209,9 @@ async def enforce_heat(
     if MAX_TOTAL_HEAT_USDT <= 0:
         return True, "heat_disabled"
 
-    current_heat, heat_source = await compute_current_heat()
+    current_heat, heat_source = await compute_current_heat(
+        positions_read=positions_read
+    )
     allowed, cur, heat_after = check_heat_sync(new_risk_usd, current_heat)
 
     if allowed:
@@ -174,7 +238,8 @@ async def enforce_heat(
 
     if HEAT_ACTION == "queue":
         item = dict(trade_info)
-        item.update({"queued_at": time.time(), "ttl_min": HEAT_QUEUE_TTL_MIN})
+        item.setdefault("queued_at", time.time())
+        item["ttl_min"] = HEAT_QUEUE_TTL_MIN
         try:
             add_to_heat_queue(item)
             logging.info("Heat queue: %s добавлен (TTL %dмин)", sym, HEAT_QUEUE_TTL_MIN)
@@ -0,0 +1,208 @@
+"""
+Кеш метаданных инструментов Bybit (category=linear): tickSize, qtyStep,
+min/max qty, ценовые фильтры.
+
+Фильтры инструмента меняются крайне редко, а читаются на каждом сигнале,
+каждую минуту auto-BE по каждой позиции, при выставлении TP-лестницы, в
+превью ручной защиты и в ветках кнопок. Модуль отдаёт их из памяти:
+
+  * :func:`refresh_instruments` одним проходом загружает ВСЕ linear-инструменты
+    (пагинация ``nextPageCursor``) — фоновая задача повторяет его на TTL;
+  * :func:`get_instrument_info` отдаёт строку из памяти не старше
+    INSTRUMENT_CACHE_TTL_SEC, иначе выполняет прежний запрос по одному символу;
+  * отказ биржи по цене или объёму (:data:`INSTRUMENT_REJECT_CODES`) на записи
+    через :func:`core.bybit_call.bybit_call` (символ берётся из ``symbol=``
+    или первого позиционного аргумента) и в маркет-входе
+    ``handlers.orders.place_market_with_retry``, который гасит исключение сам,
+    сбрасывает строку символа: следующий читатель получит свежие фильтры, а
+    не повторит отказ.
+
+Ответ отдаётся в форме конверта ``get_instruments_info`` с одной строкой в
+``result.list``, поэтому строгий разбор вызывающих не меняется. Запоминается
+только доказанно успешный конверт, строка которого несёт ровно запрошенный
+``symbol``; всё прочее отдаётся вызывающему как есть и не кешируется.
+
+Как и в core.exchange_snapshot, сетевой вызов выполняет переданный ``call``
+над переданной ``session``, и строка переиспользуется только для той же пары.
+
+Переменные окружения:
+  INSTRUMENT_CACHE_TTL_SEC — 3600 (секунды); 0 = без кеша, как раньше
+"""
+import copy
+import logging
+import os
+import time
+from collections import namedtuple
+
+from core.write_verify import read_status_code
+
+# Читается напрямую из окружения (как EXCHANGE_SNAPSHOT_MAX_AGE_SEC): модуль
+# нужен и там, где core.config заменён заглушкой.
+try:
+    INSTRUMENT_CACHE_TTL_SEC = max(
+        0.0, float(os.getenv("INSTRUMENT_CACHE_TTL_SEC", 3600))
+    )
+except ValueError:
+    INSTRUMENT_CACHE_TTL_SEC = 3600.0
+
+# Размер страницы Get Instruments Info (официальный диапазон 1..1000).
+INSTRUMENTS_PAGE_LIMIT = 1000
+# Safety bound пагинации: linear-инструментов порядка сотен, а некорректный
+# cursor не должен крутить цикл бесконечно.
+_MAX_PAGES = 20
+
+# Отказы записи, которые означают устаревшие фильтры инструмента:
+#   10001  — ошибка параметров (в т.ч. шаг цены/объёма),
+#   110003 — цена вне допустимого диапазона priceFilter,
+#   110017 — недопустимый объём/цена,
+#   110094 — объём ниже минимальной стоимости ордера.
+INSTRUMENT_REJECT_CODES = frozenset({10001, 110003, 110017, 110094})
+
+_Entry = namedtuple("_Entry", ("session", "call", "fetched_at", "row"))
+
+# symbol → _Entry
+_ROWS: dict = {}
+# symbol → time.monotonic() последнего сброса: строка, запрошенная раньше
+# сброса, обратно в кеш не попадает.
+_INVALIDATED: dict = {}
+
+
+class InstrumentCacheError(Exception):
+    """Полная выборка инструментов не доказана."""
+
+
+def _row_symbol(row):
+    symbol = row.get("symbol") if isinstance(row, dict) else None
+    return symbol if isinstance(symbol, str) and symbol else None
+
+
+def _envelope_rows(resp):
+    """``result.list`` доказанно успешного конверта либо None."""
+    if not isinstance(resp, dict):
+        return None
+    code = resp.get("retCode")
+    if type(code) is not int or code != 0:
+        return None
+    result = resp.get("result")
+    if not isinstance(result, dict) or not isinstance(result.get("list"), list):
+        return None
+    return result["list"]
+
+
+def _envelope(row: dict) -> dict:
+    return {
+        "retCode": 0,
+        "retMsg": "OK",
+        "result": {"category": "linear", "list": [copy.deepcopy(row)]},
+    }
+
+
+def _remember(symbol: str, row: dict, session, call, fetched_at: float) -> None:
+    if _INVALIDATED.get(symbol, float("-inf")) >= fetched_at:
+        return
+    cached = _ROWS.get(symbol)
+    if cached is None or cached.fetched_at <= fetched_at:
+        _ROWS[symbol] = _Entry(session, call, fetched_at, copy.deepcopy(row))
+
+
+def invalidate_instrument(symbol: str | None = None) -> None:
+    """Сбрасывает строку символа (или весь кеш при ``symbol=None``)."""
+    now = time.monotonic()
+    if symbol is None:
+        for known in list(_ROWS):
+            _INVALIDATED[known] = now
+        _ROWS.clear()
+        return
+    _INVALIDATED[symbol] = now
+    _ROWS.pop(symbol, None)
+
+
+def note_instrument_rejection(symbol, exc: Exception) -> bool:
+    """Сбрасывает строку символа после отказа по фильтрам (из bybit_call).
+
+    Возвращает True, если строка сброшена.
+    """
+    if not isinstance(symbol, str) or not symbol:
+        return False
+    if read_status_code(exc) not in INSTRUMENT_REJECT_CODES:
+        return False
+    invalidate_instrument(symbol)
+    logging.info(
+        "Instrument cache: %s сброшен после отказа биржи по фильтрам", symbol,
+    )
+    return True
+
+
+async def get_instrument_info(call, session, symbol: str, *, fresh: bool = False):
+    """Конверт ``get_instruments_info`` для одного ``symbol``.
+
+    Из памяти — строка той же пары (session, call) не старше TTL; иначе
+    прежний запрос ``get_instruments_info(category="linear", symbol=...)``.
+    Исключение запроса пробрасывается без изменений.
+    """
+    if not fresh and INSTRUMENT_CACHE_TTL_SEC > 0:
+        cached = _ROWS.get(symbol)
+        if (
+            cached is not None
+            and cached.session is session
+            and cached.call is call
+            and time.monotonic() - cached.fetched_at <= INSTRUMENT_CACHE_TTL_SEC
+        ):
+            return _envelope(cached.row)
+
+    fetched_at = time.monotonic()
+    resp = await call(session.get_instruments_info, category="linear", symbol=symbol)
+    rows = _envelope_rows(resp)
+    if (
+        INSTRUMENT_CACHE_TTL_SEC > 0
+        and rows is not None
+        and len(rows) == 1
+        and _row_symbol(rows[0]) == symbol
+    ):
+        _remember(symbol, rows[0], session, call, fetched_at)
+    return resp
+
+
+async def refresh_instruments(call, session) -> int:
+    """Загружает все linear-инструменты и заменяет ими кеш пары.
+
+    Fail-closed: аномальная страница, повтор токена или незавершённая за
+    ``_MAX_PAGES`` пагинация поднимают InstrumentCacheError, и кеш остаётся
+    прежним — частичная выборка не выдаётся за полную. Возвращает число строк.
+    """
+    fetched_at = time.monotonic()
+    rows: dict = {}
+    cursor = ""
+    seen_cursors: set = set()
+
+    for _ in range(_MAX_PAGES):
+        kwargs = dict(category="linear", limit=INSTRUMENTS_PAGE_LIMIT)
+        if cursor:
+            kwargs["cursor"] = cursor
+        resp = await call(session.get_instruments_info, **kwargs)
+        page = _envelope_rows(resp)
+        if page is None:
+            raise InstrumentCacheError("недоказанный ответ get_instruments_info")
+        for row in page:
+            symbol = _row_symbol(row)
+            if symbol is not None:
+                rows[symbol] = row
+        next_cursor = resp["result"].get("nextPageCursor") or ""
+        if not isinstance(next_cursor, str):
+            raise InstrumentCacheError("недоказанный тип nextPageCursor")
+        if not next_cursor:
+            break
+        if next_cursor in seen_cursors:
+            raise InstrumentCacheError("Bybit повторил nextPageCursor")
+        seen_cursors.add(next_cursor)
+        cursor = next_cursor
+    else:
+        raise InstrumentCacheError(
+            f"пагинация не завершилась за {_MAX_PAGES} стр."
+        )
+
+    for symbol in [s for s, e in _ROWS.items() if s not in rows and e.fetched_at <= fetched_at]:
+        del _ROWS[symbol]
+    for symbol, row in rows.items():
+        _remember(symbol, row, session, call, fetched_at)
+    return len(rows)
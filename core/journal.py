@@ -78,7 +78,35 @@
                       задают. Lifecycle не меняет и терминальным не является.
 
 Чтение хронологии по инструменту — get_trade_timeline(): read-only, порядок
-физических строк JSONL, недоказанное evidence отображается как UNKNOWN.
+физических строк JSONL, недоказанное evidence отображается как UNKNOWN. Строки
+символа находятся по индексу смещений (trade_journal.jsonl.timeline для
+активного сегмента, .idx для запечатанных), который дописывается вслед за
+append_event и пересобирается, если не сходится с журналом.
+
+Запись — append_event() / submit_event() через group-commit писателя: события,
+пришедшие, пока идёт предыдущий fsync, уходят одной записью с одним fsync, а
+каждое получает свой результат только после fsync своей пачки.
+
+Все чтения (tolerant read_events() и строгий _iter_strict_events()) обслуживает
+process-wide инкрементальный индекс _journal_index(): файл разбирается один
+раз, дальше — только строки, дописанные после запомненного смещения. Тот же
+индекс ведёт materialised-свёртки get_position_lifecycles(),
+get_bot_entry_identities() и get_auto_protection_evidence(), а фоновая задача
+периодически пишет их снимок (save_lifecycle_snapshot(): смещение, identity и
+сигнатуры префикса, sha256). После перезапуска эти читатели поднимают снимок и
+разбирают только хвост; несовпадение снимка с файлом — разбор с нуля. Журнал
+остаётся authoritative, снимок — лишь кеш.
+
+Сегменты: дописывается только активный файл trade_journal.jsonl; доросший до
+JOURNAL_SEGMENT_MAX_BYTES файл запечатывается в trade_journal.jsonl.NNNNNN с
+индексом .idx рядом (строки по символу, счётчики типов, min/max ts).
+read_events() с фильтром по типу, символу или since_ts пропускает заведомо
+неподходящие запечатанные сегменты; строгие свёртки разбирают каждый сегмент
+один раз и его событий не держат.
+С JOURNAL_COMPACT_SEGMENTS=1 рядом с сегментом пишется его компактная копия
+.tjc (core.journal_codec: интернированные типы/символы/ключи, CRC-32 каждой
+записи); запечатанный сегмент разбирается из неё, если её META сходится с
+размером и mtime сегмента, а цепочка CRC цела.
 
 Lifecycle по символу (порядок строк в JSONL, не timestamp):
   ENTRY_PLACED → PENDING; POSITION_CONFIRMED → CONFIRMED;
@@ -102,35 +130,80 @@ Bybit (Buy/Sell) — entry_side_to_position_side(). Доказанный рис
 get_exit_order_risk_evidence(): ``{(symbol, exit_order_id): risk_usdt}`` только
 из EXIT_ORDER_BOUND, с fail-closed исключением противоречивых ключей.
 
-Статистика источников рассчитывается из событий CLOSED по запросу.
+Статистика источников рассчитывается из событий CLOSED по запросу: события
+ведутся столбцами (ts, тег, pnl, R в array; numpy — если установлен), и все
+окна автокарантина считаются за один проход без перечитывания журнала.
 Автокарантин отключает источник для новых сигналов при превышении порогов.
 
 Переменные окружения (по умолчанию отключены / 0):
   QUARANTINE_LOSS_STREAK       — 0 = выкл; N = карантин после N убытков подряд
   QUARANTINE_DAILY_PNL_USDT    — 0 = выкл; отрицательное = допустимый дневной убыток
   QUARANTINE_WEEKLY_PNL_USDT   — 0 = выкл
+  JOURNAL_SNAPSHOT_INTERVAL_SEC — 900; период записи снимка lifecycle, 0 = выкл
+  JOURNAL_SEGMENT_MAX_BYTES    — 0 (выкл); размер запечатывания сегмента, опционально
+  JOURNAL_GROUP_COMMIT_WINDOW_MS — 0; доп. ожидание попутных событий пачки, мс
+  JOURNAL_GROUP_COMMIT_MAX_EVENTS — 256; максимум событий на один fsync
+  JOURNAL_COMPACT_SEGMENTS     — 0; 1 = компактная копия (.tjc) запечатанных сегментов
 """
 
+import copy
+import hashlib
 import json
 import logging
 import math
 import os
+import re
 import threading
 import time
+from array import array
 from collections import namedtuple
+from concurrent.futures import Future
 from decimal import Decimal, InvalidOperation
 
+try:
+    import numpy as _np
+except ImportError:
+    _np = None
+
 from core.config import (
     DATA_DIR, JOURNAL_FILE, DISABLED_SOURCES_FILE,
     QUARANTINE_LOSS_STREAK, QUARANTINE_DAILY_PNL_USDT, QUARANTINE_WEEKLY_PNL_USDT,
 )
+from core import journal_codec
 # Строгий разбор positionIdx берётся из общего контракта доказательств (HIGH-6):
 # второй, ослабленный вариант той же проверки создал бы расхождение в том, что
 # считается доказанной идентичностью позиции. Модуль чистый (stdlib + Decimal).
 from core.write_verify import read_position_idx
 
 
-_JOURNAL_LOCK = threading.RLock()
+class _JournalLock:
+    """Реентерабельная блокировка журнала с явным признаком владения.
+
+    Глубина захвата ведётся в thread-local: :func:`append_event` по
+    :meth:`held` узнаёт, что текущий поток уже держит блокировку и ждать
+    group-commit писателя (которому нужна та же блокировка) нельзя.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._local = threading.local()
+
+    def __enter__(self):
+        self._lock.acquire()
+        self._local.depth = getattr(self._local, "depth", 0) + 1
+        return self
+
+    def __exit__(self, *exc_info):
+        self._local.depth -= 1
+        self._lock.release()
+        return False
+
+    def held(self) -> bool:
+        """True, если блокировку держит текущий поток."""
+        return getattr(self._local, "depth", 0) > 0
+
+
+_JOURNAL_LOCK = _JournalLock()
 
 # ---------------------------------------------------------------------------
 # Константы типов событий журнала
@@ -435,23 +508,38 @@ def get_disabled_sources() -> dict:
 # Ввод-вывод журнала
 # ---------------------------------------------------------------------------
 
-def _append_event_unlocked(event: dict) -> bool:
-    """
-    Дописывает одно JSON-событие в файл журнала (формат JSONL).
+def _encode_event(event: dict) -> bytes:
+    """JSONL-строка события; добавляет 'ts' (Unix-секунды), если не задан."""
+    event.setdefault("ts", time.time())
+    return (json.dumps(event, ensure_ascii=False) + "\n").encode("utf-8")
 
-    Безопасно вызывать из async-хендлеров через asyncio.to_thread.
-    Добавляет 'ts' (Unix-секунды), если не задан.
 
-    Возвращает True только если вся строка целиком записана на диск и
-    синхронизирована (flush + fsync). Частичная запись (short write) успехом
+def _append_payloads_unlocked(payloads: list) -> bool:
+    """
+    Дописывает готовые JSONL-строки одной записью и одним fsync.
+
+    Возвращает True только если все строки целиком записаны на диск и
+    синхронизированы (flush + fsync). Частичная запись (short write) успехом
     не считается: файл best-effort усекается до исходной длины, чтобы битая
-    строка не осталась durable, и возвращается False. Исключения не
-    пробрасываются (поведение сохранено); вызывающий код, которому нужна
-    durable-гарантия перед уведомлением, обязан проверить возвращённое значение.
+    строка не осталась durable, и возвращается False — для всех строк сразу.
+    Исключения ввода-вывода не пробрасываются.
+
+    Дорос активный сегмент до JOURNAL_SEGMENT_MAX_BYTES — после записи он
+    запечатывается (:func:`_after_append_unlocked`).
     """
-    DATA_DIR.mkdir(exist_ok=True)
-    event.setdefault("ts", time.time())
-    payload = (json.dumps(event, ensure_ascii=False) + "\n").encode("utf-8")
+    end_pos = _write_payloads_unlocked(payloads)
+    if end_pos is None:
+        return False
+    _after_append_unlocked(end_pos)
+    return True
+
+
+def _write_payloads_unlocked(payloads: list) -> int | None:
+    """Запись и fsync строк (см. :func:`_append_payloads_unlocked`).
+
+    Возвращает смещение конца записи либо None, если запись не доказана.
+    """
+    payload = b"".join(payloads)
     try:
         # Binary append: число записанных байт проверяемо, в отличие от
         # текстового режима с перекодировкой.
@@ -472,19 +560,1248 @@ def _append_event_unlocked(event: dict) -> bool:
                         "journal append_event: откат частичной записи не удался: %s",
                         rollback_exc,
                     )
-                return False
+                return None
             f.flush()
             os.fsync(f.fileno())
+            return start_pos + written
     except Exception as exc:
         logging.error("journal append_event failed: %s", exc)
-        return False
-    return True
+        return None
 
 
-def append_event(event: dict) -> bool:
-    """Durably append one event while serialising journal writers."""
+def _after_append_unlocked(end_pos: int) -> None:
+    """Обслуживание после durable-записи: индекс /timeline и ротация сегмента.
+
+    Group-commit писатель вызывает его один раз на пачку, до уведомления
+    ожидающих: вернувшийся append_event видит индекс и сегменты уже с
+    собственной строкой.
+    """
+    if _TIMELINE is not None or os.path.exists(timeline_index_path()):
+        # Индекс /timeline — только кеш: его сбой запись не отменяет, а
+        # несходящийся индекс пересоберётся при следующем чтении.
+        try:
+            _timeline_index()
+        except Exception as exc:
+            logging.warning("journal timeline index update failed: %s", exc)
+    if JOURNAL_SEGMENT_MAX_BYTES and end_pos >= JOURNAL_SEGMENT_MAX_BYTES:
+        # События уже durable: сбой ротации на результат записи не влияет,
+        # активный сегмент просто растёт до следующей попытки.
+        try:
+            _rotate_segment_unlocked()
+        except Exception as exc:
+            logging.error("journal segment rotation failed: %s", exc)
+
+
+def _append_event_unlocked(event: dict) -> bool:
+    """
+    Дописывает одно JSON-событие в файл журнала (формат JSONL) в обход
+    group-commit писателя. Вызывается под :data:`_JOURNAL_LOCK` — там, где
+    проверка состояния и запись должны быть атомарны.
+
+    Результат — как у :func:`append_event`: True только для целиком
+    записанной и синхронизированной строки.
+    """
+    DATA_DIR.mkdir(exist_ok=True)
+    return _append_payloads_unlocked([_encode_event(event)])
+
+
+# ---------------------------------------------------------------------------
+# Group commit: один fsync на пачку событий
+# ---------------------------------------------------------------------------
+
+# Сколько писатель дополнительно ждёт попутные события после первого в пачке
+# (мс) и сколько событий максимум уходит одним fsync. Пачку естественно
+# набирают события, пришедшие, пока идёт предыдущий fsync; 0 — без
+# дополнительного ожидания. Читаются напрямую из окружения, как
+# JOURNAL_SEGMENT_MAX_BYTES.
+try:
+    JOURNAL_GROUP_COMMIT_WINDOW_MS = max(
+        0.0, float(os.getenv("JOURNAL_GROUP_COMMIT_WINDOW_MS", 0))
+    )
+except ValueError:
+    JOURNAL_GROUP_COMMIT_WINDOW_MS = 0.0
+try:
+    JOURNAL_GROUP_COMMIT_MAX_EVENTS = max(
+        1, int(os.getenv("JOURNAL_GROUP_COMMIT_MAX_EVENTS", 256))
+    )
+except ValueError:
+    JOURNAL_GROUP_COMMIT_MAX_EVENTS = 256
+
+# Простаивающий писатель завершает поток; следующий submit поднимет новый.
+_WRITER_IDLE_SEC = 5.0
+
+
+def _commit_batch(batch: list) -> None:
+    """Пишет пачку ``(event, future)`` одной записью и одним fsync.
+
+    Каждое future получает свой результат: событие, которое не кодируется в
+    JSON, получает своё исключение и в запись не попадает; остальные — общий
+    итог записи (short write откатывает всю пачку, и False получают все).
+    """
+    payloads, accepted = [], []
+    for event, future in batch:
+        if not future.set_running_or_notify_cancel():
+            continue
+        try:
+            payloads.append(_encode_event(event))
+        except Exception as exc:
+            future.set_exception(exc)
+            continue
+        accepted.append(future)
+    if not accepted:
+        return
     with _JOURNAL_LOCK:
+        try:
+            DATA_DIR.mkdir(exist_ok=True)
+            end_pos = _write_payloads_unlocked(payloads)
+        except Exception as exc:
+            for future in accepted:
+                future.set_exception(exc)
+            return
+        if end_pos is not None:
+            _after_append_unlocked(end_pos)
+        for future in accepted:
+            future.set_result(end_pos is not None)
+
+
+class _GroupCommitWriter:
+    """Фоновый писатель журнала с group commit.
+
+    :meth:`submit` ставит событие в очередь и сразу возвращает
+    ``concurrent.futures.Future``; поток писателя забирает всё накопленное
+    (не больше JOURNAL_GROUP_COMMIT_MAX_EVENTS) и пишет одной записью под
+    :data:`_JOURNAL_LOCK` с одним fsync. Future разрешается только после
+    fsync, поэтому durable-before-notify сохраняется для каждого события.
+    """
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._queue: list = []
+        self._thread: threading.Thread | None = None
+
+    def submit(self, event: dict) -> Future:
+        future: Future = Future()
+        with self._cond:
+            self._queue.append((event, future))
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name="journal-writer", daemon=True,
+                )
+                self._thread.start()
+            self._cond.notify()
+        return future
+
+    def _take(self) -> list | None:
+        with self._cond:
+            if not self._queue:
+                self._cond.wait(_WRITER_IDLE_SEC)
+            if not self._queue:
+                self._thread = None
+                return None
+            if JOURNAL_GROUP_COMMIT_WINDOW_MS:
+                self._cond.wait_for(
+                    lambda: len(self._queue) >= JOURNAL_GROUP_COMMIT_MAX_EVENTS,
+                    JOURNAL_GROUP_COMMIT_WINDOW_MS / 1000,
+                )
+            batch = self._queue[:JOURNAL_GROUP_COMMIT_MAX_EVENTS]
+            del self._queue[:JOURNAL_GROUP_COMMIT_MAX_EVENTS]
+            return batch
+
+    def _run(self) -> None:
+        while True:
+            batch = self._take()
+            if batch is None:
+                return
+            try:
+                _commit_batch(batch)
+            except BaseException as exc:
+                logging.error("journal writer: пачка не записана: %s", exc)
+                for _event, future in batch:
+                    if not future.done():
+                        future.set_exception(exc)
+
+
+_WRITER = _GroupCommitWriter()
+
+
+def submit_event(event: dict) -> Future:
+    """Ставит событие в group-commit очередь журнала.
+
+    Возвращает ``concurrent.futures.Future``, которое разрешается в True
+    только после того, как строка события целиком записана и fsync пройден,
+    и в False при неудачной записи (см. :func:`append_event`). Несколько
+    событий, отправленных подряд до ожидания, уходят одним fsync; из async-кода
+    future ожидается через ``asyncio.wrap_future``.
+    """
+    return _WRITER.submit(event)
+
+
+def append_event(event: dict) -> bool:
+    """Durably append one event while serialising journal writers.
+
+    Событие проходит через group-commit писателя: вызов ждёт fsync своей
+    пачки и возвращает результат записи именно этого события; ошибка
+    кодирования события пробрасывается, как и раньше. Под уже
+    взятым :data:`_JOURNAL_LOCK` писатель ждать нельзя — тогда запись идёт
+    напрямую.
+    """
+    if _JOURNAL_LOCK.held():
         return _append_event_unlocked(event)
+    return submit_event(event).result()
+
+
+# ---------------------------------------------------------------------------
+# Инкрементальный индекс журнала (process-wide)
+# ---------------------------------------------------------------------------
+
+# Сколько байт начала файла и конца разобранного префикса запоминается, чтобы
+# заметить подмену уже проиндексированного содержимого (перезапись, усечение).
+_INDEX_SIGNATURE_BYTES = 256
+
+
+class _SegmentIndex:
+    """Разобранный в памяти префикс одного файла журнала.
+
+    Журнал append-only, поэтому однажды разобранную полную строку повторно
+    читать незачем: индекс помнит устройство/inode файла и байтовое смещение
+    конца последней ПОЛНОЙ строки (``\\n``) и при следующем обращении разбирает
+    только дописанный хвост. Недописанная последняя строка в смещение не
+    входит: она перечитывается, пока писатель её не завершит.
+
+    Два представления одного и того же префикса:
+
+      * tolerant (``events`` / ``by_type`` / ``by_symbol``) — ровно то, что
+        возвращал построчный :func:`read_events`: повреждённые строки
+        пропускаются, порядок — физический порядок строк;
+      * strict (``strict`` / ``strict_by_type``) — то, что выдавал построчный
+        :func:`_iter_strict_events`. Первая аномалия запоминается в
+        ``strict_error`` и делает строгий результат недоказанным навсегда
+        (до пересборки индекса): префикс append-only журнала уже не
+        исправится. Оборванная последняя строка аномалией остаётся, пока
+        она не дописана.
+
+    События общие для обоих представлений и для всех вызывающих: наружу
+    публичные функции отдают копии, внутренние сканеры только читают.
+    """
+
+    def __init__(self, path, identity):
+        self.path = str(path)
+        self.identity = identity
+        self.offset = 0
+        self.head = b""
+        self.tail = b""
+        self.events: list = []
+        self.by_type: dict = {}
+        self.by_symbol: dict = {}
+        self.strict: list = []
+        self.strict_by_type: dict = {}
+        self.strict_error: str | None = None
+        self.pending_raw = b""
+        self.pending: list = []
+
+    def prefix_intact(self, f) -> bool:
+        """True, если уже разобранный префикс файла не подменён."""
+        head = self.head
+        f.seek(0)
+        if f.read(len(head)) != head:
+            return False
+        tail = self.tail
+        f.seek(self.offset - len(tail))
+        return f.read(len(tail)) == tail
+
+    def consume(self, chunk: bytes) -> None:
+        """Разбирает байты, дописанные после ``offset``."""
+        end = chunk.rfind(b"\n") + 1
+        complete, rest = chunk[:end], chunk[end:]
+        if complete:
+            start = self.offset
+            for raw_line in complete[:-1].split(b"\n"):
+                self._add_line(raw_line, start)
+                start += len(raw_line) + 1
+            self.offset += len(complete)
+            if len(self.head) < _INDEX_SIGNATURE_BYTES:
+                self.head = (self.head + complete)[:_INDEX_SIGNATURE_BYTES]
+            self.tail = (self.tail + complete)[-_INDEX_SIGNATURE_BYTES:]
+        if rest != self.pending_raw:
+            self.pending_raw = rest
+            self.pending = [
+                ev for ev in (
+                    _tolerant_event(piece)
+                    for piece in _decode_or_none(rest, "").splitlines()
+                )
+                if ev is not None
+            ]
+
+    def _add_line(self, raw_line: bytes, start: int) -> None:
+        text = _decode_or_none(raw_line, None)
+        if text is None:
+            self._strict_fail("строка не в UTF-8")
+            return
+        if "\r" in text:
+            # Tolerant-чтение шло в режиме universal newlines: одиночный \r
+            # делил физическую строку на несколько логических.
+            for piece in text.splitlines():
+                self._add_tolerant(_tolerant_event(piece), start)
+        try:
+            ev = _strict_line_event(text)
+        except _OwnershipUnproven as exc:
+            self._strict_fail(str(exc))
+            return
+        if "\r" not in text:
+            self._add_tolerant(ev, start)
+        self._add_strict(ev, start)
+
+    def consume_records(self, records) -> None:
+        """Разбирает сегмент из компактной формы (:mod:`core.journal_codec`).
+
+        EVENT-записи уже декодированы и проходят те же tolerant/strict шаги,
+        что и строка JSONL; RAW-строки разбираются как обычные строки, а
+        оборванный хвост — как недописанная строка :meth:`consume`.
+        Смещения — смещения строк исходного JSONL.
+        """
+        start = self.offset
+        tail = None
+        # Поток дочитывается до конца и после TAIL: только так декодер
+        # проверяет завершающую запись и цепочку CRC.
+        for kind, jsonl_len, value in records:
+            if kind == journal_codec.EVENT:
+                self._add_tolerant(value, start)
+                self._add_strict(value, start)
+            elif kind == journal_codec.RAW:
+                self._add_line(value, start)
+            elif kind == journal_codec.TAIL:
+                tail = value
+                continue
+            start += jsonl_len
+        self.offset = start
+        if tail is not None:
+            self.consume(tail)
+
+    def _add_strict(self, ev: dict, start: int) -> None:
+        if self.strict_error is not None:
+            return
+        try:
+            event_type = _ownership_text(ev, "event")
+        except _OwnershipUnproven as exc:
+            self._strict_fail(str(exc))
+            return
+        if not event_type:
+            self._strict_fail("событие без доказанного типа")
+            return
+        self.strict.append((event_type, ev))
+        self.strict_by_type.setdefault(event_type, []).append(ev)
+        self._on_strict(event_type, ev, start)
+
+    def _add_tolerant(self, ev, start: int) -> None:
+        if ev is None:
+            return
+        self.events.append(ev)
+        event_type = ev.get("event")
+        if type(event_type) is str:
+            self.by_type.setdefault(event_type, []).append(ev)
+        symbol = ev.get("symbol")
+        if type(symbol) is str:
+            self.by_symbol.setdefault(symbol, []).append(ev)
+        self._on_tolerant(ev, start)
+
+    def _on_tolerant(self, ev: dict, start: int) -> None:
+        """Хук для событий, принятых tolerant-разбором (строка с ``start``)."""
+
+    def _on_strict(self, event_type: str, ev: dict, start: int) -> None:
+        """Хук для событий, принятых строгим разбором (строка с ``start``)."""
+
+    def _strict_fail(self, reason: str) -> None:
+        if self.strict_error is None:
+            self.strict_error = reason
+            # Недоказанный префикс больше не понадобится строгим читателям.
+            self.strict = []
+            self.strict_by_type = {}
+
+    def strict_events(self, event_type: str | None = None) -> list:
+        """Строгий снимок префикса либо :class:`_OwnershipUnproven`."""
+        if self.strict_error is not None:
+            raise _OwnershipUnproven(self.strict_error)
+        if self.pending_raw:
+            raise _OwnershipUnproven("последняя строка не терминирована")
+        if event_type is None:
+            return list(self.strict)
+        return list(self.strict_by_type.get(event_type, ()))
+
+    def select(self, event_type: str | None, symbol: str | None) -> list:
+        """Самый короткий готовый список под фильтр типа/символа (надмножество)."""
+        source = self.events
+        if event_type:
+            source = self.by_type.get(event_type, [])
+        if symbol:
+            by_symbol = self.by_symbol.get(symbol, [])
+            if len(by_symbol) < len(source):
+                source = by_symbol
+        return source
+
+
+class _JournalIndex(_SegmentIndex):
+    """Индекс всего журнала: запечатанные сегменты плюс активный файл.
+
+    Сам разбирает только активный сегмент (``JOURNAL_FILE``); запечатанные
+    сегменты (``segments``: ``(path, size, identity)`` по порядку) неизменны и
+    читаются лениво через :func:`_sealed_index`. Аномалия строгого разбора в
+    любом из них хранится в ``sealed_error`` и, как и ``strict_error``,
+    делает строгий результат недоказанным.
+
+    Materialised-свёртки (см. get_position_lifecycles,
+    get_bot_entry_identities, get_auto_protection_evidence, строгие читатели
+    связывания выхода и риска, :data:`_STRICT_FOLDS`) охватывают весь
+    журнал и ведутся по мере разбора строк, поэтому читатель платит только за
+    хвост. Строки активного сегмента до ``fold_from`` уже учтены свёртками
+    (снимком или частичным индексом) и повторно не сворачиваются.
+    """
+
+    def __init__(self, path, identity, segments=()):
+        super().__init__(path, identity)
+        self.segments = tuple(segments)
+        self.sealed_error: str | None = None
+        self.lifecycles: dict = {}
+        self.folds: dict = {name: {} for name, _step in _STRICT_FOLDS}
+        self.fold_errors: dict = {}
+        # Свёртки ведутся лишь с первого запроса к ним (:meth:`ensure_folds`):
+        # чтению событий по времени или символу незачем разбирать старые
+        # сегменты ради состояния, которое ему не нужно.
+        self.folded = False
+        self.fold_from = 0
+        # Индекс поднят из снимка lifecycle: свёртки покрывают весь журнал,
+        # а списки событий активного сегмента — только хвост после снимка.
+        self.partial = False
+
+    def _on_tolerant(self, ev: dict, start: int) -> None:
+        if self.folded and start >= self.fold_from:
+            _lifecycle_step(self.lifecycles, ev)
+
+    def _on_strict(self, event_type: str, ev: dict, start: int) -> None:
+        if self.folded and start >= self.fold_from:
+            self._fold(event_type, ev)
+
+    def _fold(self, event_type: str, ev: dict) -> None:
+        for name, step in _STRICT_FOLDS:
+            if name in self.fold_errors:
+                continue
+            try:
+                step(self.folds[name], event_type, ev)
+            except Exception as exc:
+                # Как и прежний построчный scan: первая ошибка свёртки делает
+                # её результат недоказанным до пересборки индекса.
+                self.fold_errors[name] = exc
+
+    def ensure_folds(self) -> None:
+        """Сворачивает весь журнал, если свёртки ещё не ведутся.
+
+        Запечатанные сегменты сворачиваются по порядку, затем уже разобранные
+        события активного сегмента; дальнейшие строки сворачиваются по мере
+        разбора.
+        """
+        if self.folded:
+            return
+        for segment in self.segments:
+            self.fold_sealed(_sealed_index(segment, cache=False))
+        for ev in self.events:
+            _lifecycle_step(self.lifecycles, ev)
+        if self.strict_error is None:
+            for event_type, ev in self.strict:
+                self._fold(event_type, ev)
+        self.folded = True
+        self.fold_from = self.offset
+
+    def fold_sealed(self, sealed: _SegmentIndex) -> None:
+        """Сворачивает разобранный запечатанный сегмент (или его непокрытый хвост)."""
+        for ev in sealed.events:
+            _lifecycle_step(self.lifecycles, ev)
+        if self.sealed_error is not None:
+            return
+        try:
+            strict = sealed.strict_events()
+        except _OwnershipUnproven as exc:
+            self.sealed_error = str(exc)
+            return
+        for event_type, ev in strict:
+            self._fold(event_type, ev)
+
+    def carry_folds(self, other: "_JournalIndex") -> None:
+        """Принимает свёртки *other*: они уже покрывают всё, что он разобрал."""
+        self.lifecycles = other.lifecycles
+        self.folds = other.folds
+        self.fold_errors = other.fold_errors
+        self.sealed_error = other.sealed_error
+        self.folded = other.folded
+
+    def expanded(self) -> "_JournalIndex":
+        """Полный индекс вместо частичного без повторного сворачивания.
+
+        Активный сегмент разбирается заново с начала ради списков событий,
+        а свёртки продолжаются с того места, где остановился частичный индекс.
+        """
+        index = _JournalIndex(self.path, self.identity, self.segments)
+        index.carry_folds(self)
+        index.fold_from = self.offset
+        return index
+
+
+def _decode_or_none(raw: bytes, default):
+    try:
+        return raw.decode("utf-8")
+    except UnicodeDecodeError:
+        return default
+
+
+def _tolerant_event(text: str):
+    """Событие tolerant-разбора одной логической строки либо ``None``."""
+    line = text.strip()
+    if not line:
+        return None
+    try:
+        ev = json.loads(line)
+    except (ValueError, RecursionError):
+        return None
+    return ev if isinstance(ev, dict) else None
+
+
+def _strict_line_event(text: str) -> dict:
+    """Событие одной строки строгого разбора либо :class:`_OwnershipUnproven`."""
+    line = text.strip()
+    if not line:
+        raise _OwnershipUnproven("пустая строка")
+    try:
+        ev = json.loads(line)
+    except (ValueError, RecursionError) as exc:
+        raise _OwnershipUnproven(f"невалидный JSON: {exc}") from None
+    if not isinstance(ev, dict):
+        raise _OwnershipUnproven("JSON-значение не является объектом")
+    return ev
+
+
+def _tolerant_line_events(raw_line: bytes) -> list:
+    """Tolerant-события одной физической строки — как их видит индекс."""
+    text = _decode_or_none(raw_line, None)
+    if text is None:
+        return []
+    pieces = text.splitlines() if "\r" in text else [text]
+    return [ev for ev in map(_tolerant_event, pieces) if ev is not None]
+
+
+_INDEX: _JournalIndex | None = None
+
+
+def _journal_index(full: bool = True) -> _JournalIndex | None:
+    """Актуальный индекс журнала; ``None`` — журнала ещё нет.
+
+    Вызывается под :data:`_JOURNAL_LOCK`: писатели не дописывают строку
+    посреди чтения хвоста. Индекс пересобирается с нуля, если сменился путь,
+    набор запечатанных сегментов, устройство/inode активного файла, файл стал
+    короче разобранного префикса или его начало / конец префикса не совпадают
+    с запомненными — то есть журнал подменили, а не дописали. Ошибка чтения
+    пробрасывается вызывающему.
+
+    ``full=False`` — вызывающему нужны только materialised-свёртки: тогда
+    пересборка начинается со снимка lifecycle (:func:`save_lifecycle_snapshot`),
+    если он сходится с файлами, и разбирается лишь хвост после его смещения.
+    Чтениям событий (``full=True``) такой частичный индекс не годится: он
+    расширяется до всего активного сегмента (:meth:`_JournalIndex.expanded`).
+    """
+    global _INDEX
+    segments = _journal_segments()
+    try:
+        f = open(JOURNAL_FILE, "rb")
+    except FileNotFoundError:
+        if not segments:
+            _INDEX = None
+            return None
+        # Активный сегмент после ротации ещё не создан: он пуст.
+        _INDEX = _refresh_index(None, None, 0, segments, full)
+        return _INDEX
+    with f:
+        st = os.fstat(f.fileno())
+        identity = (st.st_dev, st.st_ino)
+        _INDEX = _refresh_index(f, identity, st.st_size, segments, full)
+    return _INDEX
+
+
+def _refresh_index(f, identity, size: int, segments: tuple, full: bool):
+    index = _INDEX
+    if (
+        index is None
+        or index.path != str(JOURNAL_FILE)
+        or index.segments != segments
+        or index.identity != identity
+        or size < index.offset
+        or (f is not None and not index.prefix_intact(f))
+    ):
+        index = None
+        if not full and f is not None:
+            index = _load_lifecycle_snapshot(f, identity, size, segments)
+        if index is None:
+            index = _JournalIndex(JOURNAL_FILE, identity, segments)
+    elif full and index.partial:
+        index = index.expanded()
+    if f is not None:
+        f.seek(index.offset)
+        index.consume(f.read())
+    return index
+
+
+def _strict_snapshot(event_type: str | None = None) -> list:
+    """Строгие события всех сегментов (см. :func:`_iter_strict_events`)."""
+    with _JOURNAL_LOCK:
+        index = _journal_index()
+        if index is None:
+            return []
+        events: list = []
+        for segment in index.segments:
+            events.extend(_sealed_index(segment).strict_events(event_type))
+        events.extend(index.strict_events(event_type))
+        return events
+
+
+def _strict_fold(index: _JournalIndex, name: str):
+    """``(состояние, None)`` строгой свёртки индекса либо ``(None, причина)``.
+
+    Порядок причин тот же, что у прежнего построчного scan: аномалия строки
+    (сначала в запечатанных сегментах, затем в активном) или оборванный хвост
+    делают результат недоказанным раньше, чем ошибка самой свёртки. Состояние
+    общее с индексом и изменяться не должно.
+    """
+    if index.sealed_error is not None:
+        return None, _OwnershipUnproven(index.sealed_error)
+    if index.strict_error is not None:
+        return None, _OwnershipUnproven(index.strict_error)
+    if index.pending_raw:
+        return None, _OwnershipUnproven("последняя строка не терминирована")
+    exc = index.fold_errors.get(name)
+    if exc is not None:
+        return None, exc
+    return index.folds[name], None
+
+
+def _strict_fold_state(name: str):
+    """Состояние строгой свёртки *name* либо её исключение; ``None`` — журнала нет.
+
+    Вызывается под :data:`_JOURNAL_LOCK`; состояние общее с индексом и
+    изменяться не должно.
+    """
+    index = _folded_index()
+    if index is None:
+        return None
+    state, exc = _strict_fold(index, name)
+    if exc is not None:
+        raise exc
+    return state
+
+
+def _write_checked_json(path: str, payload: dict) -> None:
+    """Атомарно пишет *payload* вместе с его sha256 (tmp + fsync + os.replace)."""
+    text = json.dumps(payload, ensure_ascii=False, sort_keys=True)
+    document = json.dumps({
+        "sha256": hashlib.sha256(text.encode("utf-8")).hexdigest(),
+        "payload": text,
+    }, ensure_ascii=False)
+    tmp = path + ".tmp"
+    try:
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(document)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except Exception:
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+        raise
+
+
+def _read_checked_json(path: str) -> dict:
+    """Payload, записанный :func:`_write_checked_json`; иначе ``ValueError``.
+
+    Отсутствующий файл поднимает ``FileNotFoundError``.
+    """
+    with open(path, "rb") as f:
+        document = json.loads(f.read())
+    text = document["payload"]
+    if hashlib.sha256(text.encode("utf-8")).hexdigest() != document["sha256"]:
+        raise ValueError("контрольная сумма не совпала")
+    payload = json.loads(text)
+    if not isinstance(payload, dict):
+        raise ValueError("payload не является объектом")
+    return payload
+
+
+# ---------------------------------------------------------------------------
+# Сегменты журнала: активный файл + запечатанные сегменты с индексом
+# ---------------------------------------------------------------------------
+
+# Размер активного сегмента (байт), после которого он запечатывается; 0 (по
+# умолчанию) — ротации нет, журнал остаётся одним файлом. Читается напрямую
+# из окружения: модуль нужен и там, где core.config заменён заглушкой.
+try:
+    JOURNAL_SEGMENT_MAX_BYTES = max(
+        0, int(os.getenv("JOURNAL_SEGMENT_MAX_BYTES", 0))
+    )
+except ValueError:
+    JOURNAL_SEGMENT_MAX_BYTES = 0
+
+_SEGMENT_META_VERSION = 2
+
+# Разобранные запечатанные сегменты и их индексы: ключ —
+# ``(path, size, identity)``, неизменный для запечатанного файла. Свёртки
+# индекса журнала сегменты не держат (сворачивают и отпускают), а событиями
+# сегментов пользуются лишь полные чтения read_events, поэтому разобранных
+# сегментов в памяти не больше _SEALED_CACHE_SEGMENTS — последние по обращению.
+_SEALED: dict = {}
+_SEALED_CACHE_SEGMENTS = 2
+_SEGMENT_META: dict = {}
+
+# Компактная копия запечатанного сегмента ``<segment>.tjc``
+# (:mod:`core.journal_codec`): пишется при запечатывании и при первом разборе
+# сегмента без неё. Как и ``.idx``, это только кеш — сегмент JSONL остаётся
+# authoritative: копия, чья META не сходится с размером и mtime сегмента
+# (как у .pyc) или чьи записи не проходят CRC, не используется.
+JOURNAL_COMPACT_SEGMENTS = os.getenv("JOURNAL_COMPACT_SEGMENTS", "0").strip().lower() in (
+    "1", "true",
+)
+
+
+def _journal_segments() -> tuple:
+    """Запечатанные сегменты по порядку: ``((path, size, identity), ...)``.
+
+    Сегмент — ``<JOURNAL_FILE>.NNNNNN`` рядом с активным файлом; номер задаёт
+    порядок. Индексы сегментов (``.idx``), снимок и tmp-файлы сюда не входят.
+    """
+    directory, name = os.path.split(os.fspath(JOURNAL_FILE))
+    pattern = re.compile(re.escape(name) + r"\.(\d{6})")
+    try:
+        entries = os.listdir(directory or ".")
+    except FileNotFoundError:
+        return ()
+    numbered = sorted(
+        (int(match.group(1)), entry)
+        for entry in entries
+        for match in (pattern.fullmatch(entry),)
+        if match
+    )
+    segments = []
+    for _seq, entry in numbered:
+        path = os.path.join(directory, entry)
+        st = os.stat(path)
+        segments.append((path, st.st_size, (st.st_dev, st.st_ino)))
+    return tuple(segments)
+
+
+def _sealed_index(segment: tuple, cache: bool = True) -> _SegmentIndex:
+    """Разобранный запечатанный сегмент.
+
+    Запечатанный файл неизменен: другой размер или inode — подмена журнала,
+    и чтение падает, а не отдаёт смесь старого и нового содержимого.
+    ``cache=False`` — разбор нужен один раз (свёртка): сегмент не
+    вытесняет из :data:`_SEALED` те, что читаются повторно. Годная
+    компактная копия разбирается вместо JSONL, и сам сегмент не читается.
+    """
+    index = _SEALED.pop(segment, None)
+    if index is not None:
+        _SEALED[segment] = index
+        return index
+    path, size, identity = segment
+    with open(path, "rb") as f:
+        st = os.fstat(f.fileno())
+        if st.st_size != size or (st.st_dev, st.st_ino) != identity:
+            raise OSError(f"запечатанный сегмент {path} изменился")
+        index = _compact_sealed_index(path, identity, _compact_meta(st))
+        if index is None:
+            data = f.read()
+            index = _SegmentIndex(path, identity)
+            index.consume(data)
+            if JOURNAL_COMPACT_SEGMENTS:
+                _write_compact_segment(path, data, st)
+    if cache:
+        _SEALED[segment] = index
+        while len(_SEALED) > _SEALED_CACHE_SEGMENTS:
+            del _SEALED[next(iter(_SEALED))]
+    return index
+
+
+def compact_segment_path(path: str) -> str:
+    """Путь компактной копии запечатанного сегмента *path*."""
+    return path + ".tjc"
+
+
+def _compact_meta(st) -> dict:
+    """META компактной копии: размер и mtime сегмента, с которого она снята."""
+    return {"size": st.st_size, "mtime_ns": st.st_mtime_ns}
+
+
+def _write_compact_segment(path: str, data: bytes, st) -> None:
+    """Пишет компактную копию сегмента (best-effort: кеш, не журнал)."""
+    if len(data) != st.st_size:
+        return
+    meta = _compact_meta(st)
+    meta["sha256"] = hashlib.sha256(data).hexdigest()
+    try:
+        journal_codec.write_compact(compact_segment_path(path), data, meta=meta)
+    except Exception as exc:
+        logging.warning("journal segment %s: компактная копия не записана: %s", path, exc)
+
+
+def _compact_sealed_index(path: str, identity, expected: dict) -> _SegmentIndex | None:
+    """Индекс сегмента из его компактной копии; ``None`` — копии нет или она чужая.
+
+    Копия принимается только с META того же размера и mtime, что у сегмента
+    (*expected*), с целой цепочкой CRC записей и покрывающая сегмент до
+    конца: иначе сегмент разбирается из JSONL, как без копии. sha256 из
+    META — для аудита конвертацией, здесь он не пересчитывается.
+    """
+    try:
+        f = open(compact_segment_path(path), "rb")
+    except FileNotFoundError:
+        return None
+    try:
+        with f:
+            records = journal_codec.iter_records(f)
+            kind, _jsonl_len, meta = next(records, (None, 0, None))
+            if (
+                kind != journal_codec.META
+                or not isinstance(meta, dict)
+                or any(meta.get(key) != value for key, value in expected.items())
+            ):
+                return None
+            index = _SegmentIndex(path, identity)
+            index.consume_records(records)
+    except (OSError, journal_codec.CompactFormatError) as exc:
+        logging.warning("journal segment %s: компактная копия отвергнута: %s", path, exc)
+        return None
+    if index.offset != expected["size"]:
+        return None
+    return index
+
+
+def _build_segment_meta(data: bytes) -> dict:
+    """Индекс сегмента: счётчики типов, строки по символу, диапазон ts.
+
+    ``symbols`` — ``{symbol: [смещения строк]}`` по точному полю ``symbol``,
+    как у tolerant-разбора; ``timeline`` — то же по нормализованным символам
+    :func:`_timeline_symbols` (вместе с пакетными отменами). ``max_ts`` — ``None``, если хоть одно событие имеет
+    нечисловой ts: тогда отсечь сегмент по времени нельзя.
+    """
+    event_counts: dict = {}
+    symbols: dict = {}
+    timeline: dict = {}
+    min_ts = max_ts = None
+    numeric = True
+    start = 0
+    for raw_line in data.split(b"\n"):
+        for ev in _tolerant_line_events(raw_line):
+            event_type = ev.get("event")
+            if type(event_type) is str:
+                event_counts[event_type] = event_counts.get(event_type, 0) + 1
+            symbol = ev.get("symbol")
+            if type(symbol) is str:
+                offsets = symbols.setdefault(symbol, [])
+                if not offsets or offsets[-1] != start:
+                    offsets.append(start)
+            for relevant in _timeline_symbols(ev):
+                offsets = timeline.setdefault(relevant, [])
+                if not offsets or offsets[-1] != start:
+                    offsets.append(start)
+            ts = ev.get("ts", 0)
+            if isinstance(ts, (int, float)):
+                min_ts = ts if min_ts is None else min(min_ts, ts)
+                max_ts = ts if max_ts is None else max(max_ts, ts)
+            else:
+                numeric = False
+        start += len(raw_line) + 1
+    return {
+        "version": _SEGMENT_META_VERSION,
+        "size": len(data),
+        "event_counts": event_counts,
+        "symbols": symbols,
+        "timeline": timeline,
+        "min_ts": min_ts if numeric else None,
+        "max_ts": max_ts if numeric else None,
+    }
+
+
+def _segment_meta(segment: tuple) -> dict | None:
+    """Индекс запечатанного сегмента из ``.idx`` либо пересобранный по файлу.
+
+    Отсутствующий, повреждённый или не сходящийся по размеру ``.idx``
+    пересобирается и перезаписывается (best-effort). ``None`` — индекса нет,
+    сегмент читается целиком.
+    """
+    meta = _SEGMENT_META.get(segment)
+    if meta is not None:
+        return meta
+    path, size, _identity = segment
+    try:
+        meta = _read_checked_json(path + ".idx")
+        if meta.get("version") != _SEGMENT_META_VERSION or meta.get("size") != size:
+            raise ValueError("индекс не соответствует сегменту")
+    except Exception:
+        meta = None
+    if meta is None:
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+            if len(data) != size:
+                return None
+            meta = _build_segment_meta(data)
+        except OSError as exc:
+            logging.warning("journal segment %s: индекс не построен: %s", path, exc)
+            return None
+        try:
+            _write_checked_json(path + ".idx", meta)
+        except Exception as exc:
+            logging.warning("journal segment %s: индекс не записан: %s", path, exc)
+    _SEGMENT_META[segment] = meta
+    return meta
+
+
+def _read_segment_lines(path: str, offsets: list) -> list:
+    """Tolerant-события строк сегмента по смещениям из его индекса."""
+    events = []
+    with open(path, "rb") as f:
+        for offset in offsets:
+            f.seek(offset)
+            events.extend(_tolerant_line_events(f.readline().rstrip(b"\n")))
+    return events
+
+
+def _sealed_source(segment: tuple, event_type, since_ts, symbol) -> list:
+    """События сегмента, способные пройти фильтры :func:`read_events`.
+
+    Сегмент, который по своему индексу заведомо не подходит (нет такого типа
+    или символа, все ts раньше ``since_ts``), не читается вовсе; для символа
+    ещё не разобранного сегмента читаются только его строки.
+    """
+    meta = _segment_meta(segment)
+    if meta is not None:
+        if event_type and not meta["event_counts"].get(event_type):
+            return []
+        if symbol and symbol not in meta["symbols"]:
+            return []
+        if since_ts and meta["max_ts"] is not None and meta["max_ts"] < since_ts:
+            return []
+        if symbol and segment not in _SEALED:
+            return _read_segment_lines(segment[0], meta["symbols"][symbol])
+    return _sealed_index(segment).select(event_type, symbol)
+
+
+def _fsync_directory(path: str) -> None:
+    try:
+        fd = os.open(path or ".", os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def _rotate_segment_unlocked() -> bool:
+    """Запечатывает активный сегмент и начинает новый. Под :data:`_JOURNAL_LOCK`.
+
+    Запечатывается только полностью разобранный файл без оборванной строки:
+    сегмент обязан кончаться ``\\n``, иначе строгий разбор увидел бы на стыке
+    склеенную строку. Файл переименовывается в ``<JOURNAL_FILE>.NNNNNN``, рядом
+    пишется его индекс ``.idx``, создаётся пустой активный файл. Свёртки
+    индекса переходят к новому активному сегменту без повторного разбора, а
+    события запечатанного файла в памяти не остаются.
+    """
+    global _INDEX
+    index = _journal_index(full=False)
+    if index is None or index.identity is None or index.pending_raw or not index.offset:
+        return False
+    path = os.fspath(JOURNAL_FILE)
+    with open(path, "rb") as f:
+        data = f.read()
+    if len(data) != index.offset:
+        return False
+    seq = 1
+    if index.segments:
+        seq = int(index.segments[-1][0].rsplit(".", 1)[1]) + 1
+    sealed_path = f"{path}.{seq:06d}"
+    os.rename(path, sealed_path)
+    segment = (sealed_path, len(data), index.identity)
+    _INDEX = None
+    _reset_timeline_index()
+    with open(path, "ab") as f:
+        os.fsync(f.fileno())
+        st = os.fstat(f.fileno())
+    _fsync_directory(os.path.dirname(path))
+
+    meta = _build_segment_meta(data)
+    _SEGMENT_META[segment] = meta
+    try:
+        _write_checked_json(sealed_path + ".idx", meta)
+    except Exception as exc:
+        logging.warning("journal segment %s: индекс не записан: %s", sealed_path, exc)
+    if JOURNAL_COMPACT_SEGMENTS:
+        _write_compact_segment(sealed_path, data, os.stat(sealed_path))
+
+    rotated = _JournalIndex(JOURNAL_FILE, (st.st_dev, st.st_ino), index.segments + (segment,))
+    rotated.carry_folds(index)
+    if index.strict_error is not None and rotated.sealed_error is None:
+        rotated.sealed_error = index.strict_error
+    _INDEX = rotated
+    logging.info("journal: сегмент запечатан — %s (%d байт)", sealed_path, len(data))
+    return True
+
+
+# ---------------------------------------------------------------------------
+# Снимок materialised-состояния lifecycle (ускоряет старт, не заменяет журнал)
+# ---------------------------------------------------------------------------
+
+# Период записи снимка фоновой задачей (секунды); 0 = снимок не пишется.
+# Читается напрямую из окружения: модуль нужен и там, где core.config заменён
+# заглушкой.
+try:
+    JOURNAL_SNAPSHOT_INTERVAL_SEC = max(
+        0.0, float(os.getenv("JOURNAL_SNAPSHOT_INTERVAL_SEC", 900))
+    )
+except ValueError:
+    JOURNAL_SNAPSHOT_INTERVAL_SEC = 900.0
+
+_SNAPSHOT_VERSION = 3
+
+# Что последним записано в снимок: (путь, сегменты, identity, offset).
+# Повторная запись того же префикса ничего не даёт.
+_SNAPSHOT_SAVED: tuple | None = None
+
+
+def lifecycle_snapshot_path() -> str:
+    """Путь снимка: рядом с журналом, чтобы он следовал за JOURNAL_FILE."""
+    return os.fspath(JOURNAL_FILE) + ".lifecycles"
+
+
+def _snapshot_segments(segments: tuple) -> list:
+    return [
+        [os.path.basename(path), size, *identity]
+        for path, size, identity in segments
+    ]
+
+
+def _snapshot_encode(value):
+    """JSON-представление состояния свёрток без потери типов.
+
+    Каждый dict кодируется списком пар (ключи бывают кортежами), Decimal и
+    tuple — явной меткой, поэтому данные журнала с такими же ключами с
+    метками не смешиваются.
+    """
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    if isinstance(value, Decimal):
+        return {"$decimal": str(value)}
+    if isinstance(value, tuple):
+        return {"$tuple": [_snapshot_encode(item) for item in value]}
+    if isinstance(value, list):
+        return [_snapshot_encode(item) for item in value]
+    if isinstance(value, dict):
+        return {"$dict": [
+            [_snapshot_encode(k), _snapshot_encode(v)] for k, v in value.items()
+        ]}
+    raise TypeError(f"тип {type(value).__name__} в снимке не поддерживается")
+
+
+def _snapshot_decode(value):
+    if isinstance(value, list):
+        return [_snapshot_decode(item) for item in value]
+    if not isinstance(value, dict):
+        return value
+    if len(value) != 1:
+        raise ValueError("объект снимка без метки типа")
+    (tag, raw), = value.items()
+    if tag == "$decimal":
+        return Decimal(raw)
+    if tag == "$tuple":
+        return tuple(_snapshot_decode(item) for item in raw)
+    if tag == "$dict":
+        return {_snapshot_decode(k): _snapshot_decode(v) for k, v in raw}
+    raise ValueError(f"неизвестная метка снимка {tag!r}")
+
+
+def save_lifecycle_snapshot() -> bool:
+    """Записывает снимок materialised-свёрток индекса с контрольной суммой.
+
+    Снимок покрывает запечатанные сегменты и ровно разобранный префикс
+    активного файла (до конца последней полной строки): хранит список
+    сегментов, смещение, identity файла и сигнатуры начала и конца префикса.
+    Журнал остаётся authoritative: снимок лишь позволяет
+    :func:`_journal_index` после перезапуска разобрать только хвост.
+
+    Недоказанное состояние (аномалия строки, сбой свёртки) в снимок не
+    пишется: такой журнал всегда разбирается заново. Свёртка, отвергнутая
+    доказательным правилом (:class:`_OwnershipUnproven`, например
+    ENTRY_PLACED без риска для связывания), сохраняется вместе с причиной:
+    журнал append-only, и после перезапуска она осталась бы той же. Запись атомарна
+    (tmp-файл + fsync + os.replace). Возвращает True, если снимок записан.
+    """
+    global _SNAPSHOT_SAVED
+    try:
+        with _JOURNAL_LOCK:
+            index = _folded_index()
+            if (
+                index is None
+                or index.identity is None
+                or (index.offset == 0 and not index.segments)
+                or index.sealed_error is not None
+                or index.strict_error is not None
+                or not all(
+                    isinstance(exc, _OwnershipUnproven)
+                    for exc in index.fold_errors.values()
+                )
+            ):
+                return False
+            saved = (index.path, index.segments, index.identity, index.offset)
+            if saved == _SNAPSHOT_SAVED:
+                return False
+            payload = {
+                "version": _SNAPSHOT_VERSION,
+                "segments": _snapshot_segments(index.segments),
+                "identity": list(index.identity),
+                "offset": index.offset,
+                "head": index.head.hex(),
+                "tail": index.tail.hex(),
+                "lifecycles": _snapshot_encode(index.lifecycles),
+                "folds": _snapshot_encode(index.folds),
+                "fold_errors": {
+                    name: str(exc) for name, exc in index.fold_errors.items()
+                },
+            }
+    except Exception as exc:
+        logging.error("journal snapshot: состояние не собрано: %s", exc)
+        return False
+
+    try:
+        _write_checked_json(lifecycle_snapshot_path(), payload)
+    except Exception as exc:
+        logging.error("journal snapshot: запись не удалась: %s", exc)
+        return False
+    _SNAPSHOT_SAVED = saved
+    return True
+
+
+def _load_lifecycle_snapshot(f, identity, size, segments) -> _JournalIndex | None:
+    """Частичный индекс из снимка либо ``None`` — тогда разбор с нуля.
+
+    Снимок принимается только целиком: совпадают контрольная сумма, версия,
+    запечатанные сегменты снимка (началом нынешнего набора), смещение не
+    дальше конца покрытого файла и сигнатуры начала и конца его префикса.
+    Покрытый файл — активный файл той же identity либо, если после снимка
+    его запечатали, первый новый сегмент с этой identity (переименование
+    inode не меняет). Тогда довёртываются его хвост после смещения и
+    следующие сегменты, а активный файл разбирается целиком. Любое
+    расхождение — журнал подменён, усечён или снимок повреждён — снимок
+    игнорируется.
+    """
+    try:
+        payload = _read_checked_json(lifecycle_snapshot_path())
+    except FileNotFoundError:
+        return None
+    except Exception as exc:
+        logging.warning("journal snapshot: отвергнут (%s) — разбор с нуля", exc)
+        return None
+    try:
+        if payload["version"] != _SNAPSHOT_VERSION:
+            raise ValueError(f"версия {payload['version']!r}")
+        covered = len(payload["segments"])
+        if _snapshot_segments(segments)[:covered] != payload["segments"]:
+            raise ValueError("набор сегментов изменился")
+        later = segments[covered:]
+        snapshot_identity = tuple(payload["identity"])
+        index = _JournalIndex(JOURNAL_FILE, identity, segments)
+        index.offset = payload["offset"]
+        index.head = bytes.fromhex(payload["head"])
+        index.tail = bytes.fromhex(payload["tail"])
+        rest = None
+        if later:
+            sealed_path, sealed_size, sealed_identity = later[0]
+            if sealed_identity != snapshot_identity:
+                raise ValueError("файл журнала заменён")
+            with open(sealed_path, "rb") as sealed_f:
+                _check_snapshot_prefix(index, sealed_f, sealed_size)
+                sealed_f.seek(index.offset)
+                rest = _SegmentIndex(sealed_path, sealed_identity)
+                rest.consume(sealed_f.read())
+            if rest.pending_raw:
+                raise ValueError("запечатанный сегмент оборван")
+        else:
+            if snapshot_identity != identity:
+                raise ValueError("файл журнала заменён")
+            _check_snapshot_prefix(index, f, size)
+        lifecycles = _snapshot_decode(payload["lifecycles"])
+        folds = _snapshot_decode(payload["folds"])
+        fold_errors = payload["fold_errors"]
+        if (
+            not isinstance(lifecycles, dict)
+            or not isinstance(folds, dict)
+            or set(folds) != set(index.folds)
+            or not all(isinstance(state, dict) for state in folds.values())
+            or not isinstance(fold_errors, dict)
+            or not set(fold_errors) <= set(folds)
+            or not all(isinstance(reason, str) for reason in fold_errors.values())
+        ):
+            raise ValueError("структура состояния")
+        index.lifecycles = lifecycles
+        index.folds = folds
+        index.fold_errors = {
+            name: _OwnershipUnproven(reason) for name, reason in fold_errors.items()
+        }
+        if rest is not None:
+            # Снимок снят до запечатывания: его активный файл стал сегментом.
+            index.fold_sealed(rest)
+            for segment in later[1:]:
+                index.fold_sealed(_sealed_index(segment, cache=False))
+            index.offset = 0
+            index.head = index.tail = b""
+    except Exception as exc:
+        logging.warning("journal snapshot: отвергнут (%s) — разбор с нуля", exc)
+        return None
+    index.folded = True
+    index.fold_from = index.offset
+    index.partial = rest is None
+    return index
+
+
+def _check_snapshot_prefix(index: _JournalIndex, f, size: int) -> None:
+    """Смещение и сигнатуры снимка (в *index*) сходятся с файлом *f* размера *size*."""
+    offset = index.offset
+    if type(offset) is not int or not 0 <= offset <= size:
+        raise ValueError("смещение вне файла")
+    if not index.prefix_intact(f):
+        raise ValueError("префикс журнала не совпал")
+
+
+def _folded_index() -> _JournalIndex | None:
+    """Индекс с materialised-свёртками всего журнала (под :data:`_JOURNAL_LOCK`)."""
+    index = _journal_index(full=False)
+    if index is not None:
+        index.ensure_folds()
+    return index
+
+
+def _materialised_lifecycles() -> dict:
+    """:func:`get_position_lifecycles` по свёртке индекса плюс оборванный хвост."""
+    try:
+        with _JOURNAL_LOCK:
+            index = _folded_index()
+            if index is None:
+                return {}
+            lifecycles = {
+                symbol: dict(info) for symbol, info in index.lifecycles.items()
+            }
+            pending = [dict(ev) for ev in index.pending]
+    except Exception as exc:
+        logging.error("journal lifecycles read failed: %s", exc)
+        return {}
+    for ev in pending:
+        _lifecycle_step(lifecycles, ev)
+    return lifecycles
 
 
 def read_events(
@@ -502,30 +1819,35 @@ def read_events(
     ``ev.get(...)``: иначе одна legacy-строка обрывала бы чтение всего
     оставшегося файла и скрывала последующие корректные события.
 
+    События отдаются из инкрементального индекса (:func:`_journal_index`):
+    файл целиком разбирается один раз на процесс, дальше — только дописанный
+    хвост. Фильтр по типу или символу берёт готовый список индекса, а
+    запечатанный сегмент, заведомо не подходящий по своему индексу (тип,
+    символ, ``since_ts``), не читается вовсе. Каждое событие возвращается
+    копией, чтобы вызывающий код не мог изменить индекс.
+
     Журнал read-only/append-only: битые строки не исправляются и не удаляются.
     """
     events = []
-    if not JOURNAL_FILE.exists():
-        return events
     try:
-        with open(JOURNAL_FILE, "r", encoding="utf-8") as f:
-            for line in f:
-                line = line.strip()
-                if not line:
-                    continue
-                try:
-                    ev = json.loads(line)
-                except json.JSONDecodeError:
-                    continue
-                if not isinstance(ev, dict):
-                    continue
+        with _JOURNAL_LOCK:
+            index = _journal_index()
+            if index is None:
+                return events
+            sources = [
+                _sealed_source(segment, event_type, since_ts, symbol)
+                for segment in index.segments
+            ]
+            sources.append(index.select(event_type, symbol) + index.pending)
+        for source in sources:
+            for ev in source:
                 if since_ts and ev.get("ts", 0) < since_ts:
                     continue
                 if event_type and ev.get("event") != event_type:
                     continue
                 if symbol and ev.get("symbol") != symbol:
                     continue
-                events.append(ev)
+                events.append(dict(ev))
     except Exception as exc:
         logging.error("journal read_events failed: %s", exc)
     return events
@@ -571,68 +1893,71 @@ def get_position_lifecycles(events: list | None = None) -> dict:
     пропускаются.
     """
     if events is None:
-        events = read_events()
+        return _materialised_lifecycles()
 
     lifecycles: dict = {}
-
     for ev in events:
-        if not isinstance(ev, dict):
-            continue
-        symbol = normalize_symbol(ev.get("symbol"))
-        if not symbol:
-            continue
+        _lifecycle_step(lifecycles, ev)
+    return lifecycles
 
-        event_type = ev.get("event")
-        try:
-            ts = float(ev.get("ts", 0.0))
-        except (TypeError, ValueError):
-            ts = 0.0
 
-        if event_type == ENTRY_PLACED:
-            # Новый вход всегда начинает новый lifecycle, в том числе после
-            # терминального состояния.
-            lifecycles[symbol] = {
-                "state": PENDING,
-                "side": ev.get("side", ""),
-                "ts": ts,
-                "entry_event_ts": ts,
-                "source_tag": ev.get("source_tag", ""),
-                "planned_risk_usdt": ev.get("planned_risk_usdt", 0.0),
-                "qty": ev.get("qty", 0.0),
-                "entry": ev.get("entry", 0.0),
-                "stop": ev.get("stop", 0.0),
-                "order_type": ev.get("order_type", ""),
-                # Точные идентификаторы ордера для корреляции исполнения.
-                # Отсутствуют у старых событий → lifecycle останется PENDING.
-                "order_id": ev.get("order_id", ""),
-                "order_link_id": ev.get("order_link_id", ""),
-                # Идентичность позиции ENTRY_PLACED не доказывает: она
-                # появляется только из authoritative fill evidence.
-                "position_idx": None,
-            }
-        elif event_type == POSITION_CONFIRMED:
-            current = lifecycles.get(symbol)
-            if current is None or current["state"] == TERMINAL:
-                # Подтверждение без активного lifecycle игнорируется: ownership
-                # ручной позиции здесь не создаётся.
-                continue
-            current["state"] = CONFIRMED
-            current["confirmed_ts"] = ts
-            # Доказанный positionIdx переносится в lifecycle, чтобы дальнейшие
-            # события этого же lifecycle могли ссылаться на ту же идентичность.
-            # Недоказанный (отсутствующий, malformed) не затирает уже доказанный
-            # и сам выдуманным значением не подменяется.
-            proven_idx = read_position_idx(ev.get("position_idx"))
-            if proven_idx is not None:
-                current["position_idx"] = proven_idx
-        elif event_type in TERMINAL_EVENTS:
-            current = lifecycles.get(symbol)
-            if current is None:
-                continue
-            current["state"] = TERMINAL
-            current["terminal_ts"] = ts
+def _lifecycle_step(lifecycles: dict, ev) -> None:
+    """Применяет одно tolerant-событие к состоянию :func:`get_position_lifecycles`."""
+    if not isinstance(ev, dict):
+        return
+    symbol = normalize_symbol(ev.get("symbol"))
+    if not symbol:
+        return
 
-    return lifecycles
+    event_type = ev.get("event")
+    try:
+        ts = float(ev.get("ts", 0.0))
+    except (TypeError, ValueError):
+        ts = 0.0
+
+    if event_type == ENTRY_PLACED:
+        # Новый вход всегда начинает новый lifecycle, в том числе после
+        # терминального состояния.
+        lifecycles[symbol] = {
+            "state": PENDING,
+            "side": ev.get("side", ""),
+            "ts": ts,
+            "entry_event_ts": ts,
+            "source_tag": ev.get("source_tag", ""),
+            "planned_risk_usdt": ev.get("planned_risk_usdt", 0.0),
+            "qty": ev.get("qty", 0.0),
+            "entry": ev.get("entry", 0.0),
+            "stop": ev.get("stop", 0.0),
+            "order_type": ev.get("order_type", ""),
+            # Точные идентификаторы ордера для корреляции исполнения.
+            # Отсутствуют у старых событий → lifecycle останется PENDING.
+            "order_id": ev.get("order_id", ""),
+            "order_link_id": ev.get("order_link_id", ""),
+            # Идентичность позиции ENTRY_PLACED не доказывает: она
+            # появляется только из authoritative fill evidence.
+            "position_idx": None,
+        }
+    elif event_type == POSITION_CONFIRMED:
+        current = lifecycles.get(symbol)
+        if current is None or current["state"] == TERMINAL:
+            # Подтверждение без активного lifecycle игнорируется: ownership
+            # ручной позиции здесь не создаётся.
+            return
+        current["state"] = CONFIRMED
+        current["confirmed_ts"] = ts
+        # Доказанный positionIdx переносится в lifecycle, чтобы дальнейшие
+        # события этого же lifecycle могли ссылаться на ту же идентичность.
+        # Недоказанный (отсутствующий, malformed) не затирает уже доказанный
+        # и сам выдуманным значением не подменяется.
+        proven_idx = read_position_idx(ev.get("position_idx"))
+        if proven_idx is not None:
+            current["position_idx"] = proven_idx
+    elif event_type in TERMINAL_EVENTS:
+        current = lifecycles.get(symbol)
+        if current is None:
+            return
+        current["state"] = TERMINAL
+        current["terminal_ts"] = ts
 
 
 def _confirmation_identity(info: dict) -> tuple[str, str, float | None]:
@@ -677,17 +2002,15 @@ def is_current_pending_lifecycle(symbol: str, expected: dict) -> bool:
 
 
 def _current_pending_lifecycle(symbol: str, expected: dict) -> bool:
-    """Fail closed unless the strict durable scan proves the expected entry."""
+    """Fail closed unless the strict durable fold proves the expected entry."""
     try:
-        events = [event for _event_type, event in _iter_strict_events()]
+        lifecycles = _strict_fold_state("strict_lifecycles")
     except Exception as exc:
         logging.warning(
             "journal confirmation scan: lifecycle не доказан (%s)", exc
         )
         return False
-    return _same_pending_lifecycle(
-        get_position_lifecycles(events).get(symbol), expected
-    )
+    return _same_pending_lifecycle((lifecycles or {}).get(symbol), expected)
 
 
 def append_position_confirmation(event: dict, expected: dict) -> str:
@@ -787,641 +2110,671 @@ def get_auto_protection_evidence() -> dict:
     durable-событий, а не из текущей цены. Обратного перехода не существует.
     Наличие милестоуна защиту НЕ включает и exchange-запись не вызывает.
     """
-    lifecycles: dict = {}
+    with _JOURNAL_LOCK:
+        try:
+            index = _folded_index()
+        except Exception as exc:
+            logging.error("journal auto protection scan failed: %s", exc)
+            return {}
+        if index is None:
+            return {}
+        lifecycles, exc = _strict_fold(index, "protection")
+        if exc is not None:
+            if isinstance(exc, (_OwnershipUnproven, TypeError, ValueError)):
+                logging.warning(
+                    "journal auto protection scan: evidence is unproven (%s) — no writes",
+                    exc,
+                )
+            else:
+                logging.error("journal auto protection scan failed: %s", exc)
+            return {}
+        return copy.deepcopy(_auto_protection_projection(lifecycles))
 
-    def _proven_order_id(raw, field: str):
-        if raw is None:
-            return ""
-        if isinstance(raw, bool) or not isinstance(raw, str):
-            raise _OwnershipUnproven(f"поле {field} malformed")
-        return normalize_durable_order_identifier(raw)
-
-    def _proven_entry_side(raw):
-        if raw is None:
-            return ""
-        if type(raw) is not str:
-            raise _OwnershipUnproven("поле side malformed")
-        return _ENTRY_SIDE_POSITION_SIDE.get(raw, "")
-
-    def _proven_position_side(raw):
-        if type(raw) is not str:
-            return ""
-        return raw if raw in ("Buy", "Sell") else ""
-
-    def _plan_amount(ev: dict, field: str, parser):
-        if field not in ev:
-            return None
-        raw = ev.get(field)
-        if raw is None:
-            raise _OwnershipUnproven(f"поле {field} malformed")
-        value = parser(raw)
-        if value is None:
-            raise _OwnershipUnproven(f"поле {field} malformed")
-        return value
 
-    def _confirmed_idx(ev: dict):
-        if "position_idx" not in ev:
-            return None
-        raw = ev.get("position_idx")
-        value = read_position_idx(raw)
-        if value is None:
-            raise _OwnershipUnproven("поле position_idx malformed")
-        return value
+# ---------------------------------------------------------------------------
+# Строгая свёртка evidence автоматической защиты
+# ---------------------------------------------------------------------------
 
-    def _same_identity(current: dict, ev: dict) -> bool:
-        event_order_id = _proven_order_id(ev.get("order_id"), "order_id")
-        event_link_id = _proven_order_id(ev.get("order_link_id"), "order_link_id")
-        if current["order_id"]:
-            return event_order_id == current["order_id"]
-        return bool(
-            current["order_link_id"]
-            and event_link_id == current["order_link_id"]
-        )
+def _proven_order_id(raw, field: str):
+    if raw is None:
+        return ""
+    if isinstance(raw, bool) or not isinstance(raw, str):
+        raise _OwnershipUnproven(f"поле {field} malformed")
+    return normalize_durable_order_identifier(raw)
 
-    def _tp1_leg_ids(ev: dict):
-        """Точные идентификаторы ноги TP1, заявленные событием, либо ``None``.
 
-        Идентичность ноги — только точные ``tp_order_id`` / ``tp_order_link_id``
-        и канонический уровень :data:`TP_LEVEL_TP1`. Сохраняются существующие
-        правила идентичности проекта: id-only и link-only валидны, а
-        placeholder/пустое значение точной идентичностью не становится.
-        Событие другого уровня (TP2/TP3) идентичностью TP1 не является.
-        """
-        if ev.get("tp_level") != TP_LEVEL_TP1:
-            return None
-        order_id = _proven_order_id(ev.get("tp_order_id"), "tp_order_id")
-        link_id = _proven_order_id(ev.get("tp_order_link_id"), "tp_order_link_id")
-        if not order_id and not link_id:
-            return None
-        return order_id, link_id
-
-    def _tp1_parent_match(ev: dict, current: dict) -> str:
-        """Сверка РОДИТЕЛЬСКОГО lifecycle по единому контракту durable-ID.
-
-        Один и тот же контракт обязателен для ``TP_LADDER_PLACED`` и
-        ``TP_LADDER_FILL_OBSERVED``: иначе факт исполнения смог бы прикрепиться
-        к родителю, которого размещение не доказывало.
-
-        Правила те же, что во всём проекте:
-
-          * известен только ``entry_order_id`` — достаточно его совпадения;
-          * известен только ``entry_order_link_id`` — достаточно его совпадения;
-          * известны ОБА — совпасть обязаны ОБА (конъюнктивно);
-          * один совпал, другой противоречит — :data:`_TP_PARENT_CONFLICT`
-            (fail-closed): это утверждения об одном и том же входе, и выбирать
-            между ними нельзя;
-          * placeholder / пустой / ``UNKNOWN`` / malformed идентификатор
-            идентичностью не становится и совпадением не считается.
-
-        «Известен» означает доказан ОБЕИМИ сторонами: и durable-lifecycle, и
-        самим событием. Дополнительно обязана совпасть неизменная идентичность
-        позиции конфирмации — ``side`` и ``positionIdx``; ``positionIdx=0``
-        остаётся валидным.
-
-        Замечание о link-only родителе: в эту строгую проекцию lifecycle без
-        точного ``order_id`` не попадает вовсе (см. финальный фильтр), поэтому
-        практически родитель всегда имеет durable ``order_id``. Правило
-        сохранено, чтобы контракт идентичности не расходился с остальным
-        проектом.
-        """
-        event_id = _proven_order_id(ev.get("entry_order_id"), "entry_order_id")
-        event_link = _proven_order_id(
-            ev.get("entry_order_link_id"), "entry_order_link_id"
-        )
-        parent_id = current.get("order_id") or ""
-        parent_link = current.get("order_link_id") or ""
-
-        id_known = bool(parent_id and event_id)
-        link_known = bool(parent_link and event_link)
-        if not id_known and not link_known:
-            # Ни один durable идентификатор родителя не заявлен обеими
-            # сторонами: принадлежность не доказана.
-            return _TP_PARENT_OTHER
-
-        id_ok = (event_id == parent_id) if id_known else None
-        link_ok = (event_link == parent_link) if link_known else None
-        if id_ok is False or link_ok is False:
-            if id_ok is True or link_ok is True:
-                # Один durable идентификатор совпал, другой противоречит.
-                return _TP_PARENT_CONFLICT
-            return _TP_PARENT_OTHER
+def _proven_entry_side(raw):
+    if raw is None:
+        return ""
+    if type(raw) is not str:
+        raise _OwnershipUnproven("поле side malformed")
+    return _ENTRY_SIDE_POSITION_SIDE.get(raw, "")
 
-        if (
-            _proven_position_side(ev.get("side")) != current.get("side")
-            or _confirmed_idx(ev) != current.get("position_idx")
-        ):
-            return _TP_PARENT_OTHER
-        return _TP_PARENT_MATCH
 
-    try:
-        for event_type, ev in _iter_strict_events():
-            symbol = normalize_symbol(ev.get("symbol"))
-            if not symbol:
-                if event_type in (ENTRY_PLACED, POSITION_CONFIRMED, *TERMINAL_EVENTS):
-                    raise _OwnershipUnproven(
-                        f"событие {event_type} без доказанного symbol"
-                    )
-                # Lifecycle-neutral записи без одного symbol (например,
-                # пакетная отмена) не участвуют в ownership-решении.
-                continue
+def _proven_position_side(raw):
+    if type(raw) is not str:
+        return ""
+    return raw if raw in ("Buy", "Sell") else ""
 
-            if event_type == ENTRY_PLACED:
-                order_id = _proven_order_id(ev.get("order_id"), "order_id")
-                order_link_id = _proven_order_id(
-                    ev.get("order_link_id"), "order_link_id"
-                )
-                side = _proven_entry_side(ev.get("side"))
-                qty = _plan_amount(ev, "qty", _proven_positive_amount)
-                risk = _plan_amount(ev, "planned_risk_usdt", _proven_risk_usdt)
-                # Вход без точной identity или полного плана остаётся безопасно
-                # неуправляемым. Не достраиваем его из текущего exchange state.
-                if not (order_id or order_link_id) or not side:
-                    lifecycles[symbol] = {"state": "UNPROVEN"}
-                    continue
-                lifecycles[symbol] = {
-                    "state": PENDING,
-                    "order_id": order_id,
-                    "order_link_id": order_link_id,
-                    "side": side,
-                    "qty": qty,
-                    "entry": None,
-                    "planned_risk_usdt": risk,
-                    "position_idx": None,
-                    # Неизменный первичный защитный SL: фиксируется один раз в
-                    # POSITION_CONFIRMED и служит знаменателем actual immutable
-                    # initial R. Перенос/перепривязка SL его не меняет.
-                    "initial_sl": None,
-                    "sl_bindings": {},
-                    "anchored": False,
-                    "pending_change": None,
-                    # Точная durable-идентичность ноги TP1 Real-R лестницы этого
-                    # lifecycle и факт её исполнения. Новый вход всегда начинает
-                    # новый lifecycle, поэтому TP1 прошлой сделки того же
-                    # символа сюда не наследуется.
-                    "tp1": None,
-                    # Durable неизменный временной якорь входа
-                    # (exchange-время последнего исполнения точного входа) и
-                    # durable факт рынка 2R. Новый вход всегда начинает новый
-                    # lifecycle, поэтому якорь и факт прошлой сделки того же
-                    # символа сюда не наследуются.
-                    "entry_anchor": None,
-                    "mark_2r_fact": False,
-                    # Durable монотонное состояние милестоунов защиты этого
-                    # lifecycle. Новый lifecycle начинается без доказанных
-                    # милестоунов, поэтому 1R/2R прошлой сделки того же символа
-                    # сюда не переходят.
-                    "milestones": {"r1_proven": False, "r2_proven": False},
-                }
-                if qty is None or risk is None:
-                    lifecycles[symbol]["state"] = "UNPROVEN"
-
-            elif event_type == POSITION_CONFIRMED:
-                current = lifecycles.get(symbol)
-                if current is None or current.get("state") != PENDING:
-                    continue
-                if not _same_identity(current, ev):
-                    current["state"] = "UNPROVEN"
-                    continue
-                confirmed_side = _proven_entry_side(ev.get("side"))
-                if not confirmed_side or confirmed_side != current["side"]:
-                    current["state"] = "UNPROVEN"
-                    continue
-                confirmed_idx = _confirmed_idx(ev)
-                confirmed_qty = _plan_amount(
-                    ev, "cum_exec_qty", _proven_positive_amount
-                )
-                confirmed_entry = _plan_amount(
-                    ev, "avg_entry_price", _proven_positive_amount
-                )
-                if (
-                    confirmed_idx is None
-                    or confirmed_qty is None
-                    or confirmed_qty != current["qty"]
-                    or confirmed_entry is None
-                ):
-                    current["state"] = "UNPROVEN"
-                    continue
-                current["state"] = CONFIRMED
-                current["position_idx"] = confirmed_idx
-                current["qty"] = confirmed_qty
-                current["entry"] = confirmed_entry
-                anchor_order_id = _proven_order_id(
-                    ev.get("initial_sl_order_id"), "initial_sl_order_id"
-                )
-                anchor_trigger = _plan_amount(
-                    ev, "initial_sl_trigger", _proven_positive_decimal
-                )
-                anchor_source = ev.get("initial_sl_anchor_source")
-                if (
-                    anchor_order_id
-                    and anchor_trigger is not None
-                    and anchor_source == INITIAL_SL_ANCHOR_SOURCE_CONFIRMATION
-                ):
-                    current["sl_bindings"][anchor_order_id] = {
-                        "position_idx": confirmed_idx,
-                        "side": current["side"],
-                        "risk": current["planned_risk_usdt"],
-                        "trigger": anchor_trigger,
-                    }
-                    current["anchored"] = True
-                    # Иммутабельный якорь исходного R: снимается один раз здесь и
-                    # далее не переписывается ни PROTECTION_CHANGE, ни
-                    # EXIT_ORDER_BOUND — перенос/перепривязка SL знаменатель R не
-                    # меняет.
-                    current["initial_sl"] = anchor_trigger
-
-            elif event_type == PROTECTION_CHANGE:
-                current = lifecycles.get(symbol)
-                if (
-                    current is None
-                    or current.get("state") != CONFIRMED
-                    or not current.get("anchored")
-                ):
-                    continue
-                change_id = _proven_order_id(
-                    ev.get("protection_change_id"), "protection_change_id"
-                )
-                entry_order_id = _proven_order_id(
-                    ev.get("entry_order_id"), "entry_order_id"
-                )
-                previous_exit_id = _proven_order_id(
-                    ev.get("previous_exit_order_id"), "previous_exit_order_id"
-                )
-                previous_trigger = _plan_amount(
-                    ev, "previous_trigger", _proven_positive_decimal
-                )
-                requested_trigger = _plan_amount(
-                    ev, "requested_trigger", _proven_positive_decimal
-                )
-                previous_binding = current["sl_bindings"].get(previous_exit_id)
-                if (
-                    not change_id
-                    or entry_order_id != current.get("order_id")
-                    or read_position_idx(ev.get("position_idx"))
-                    != current.get("position_idx")
-                    or _proven_position_side(ev.get("side")) != current.get("side")
-                    or ev.get("protection_source") not in AUTO_PROTECTION_SOURCES
-                    or ev.get("write_outcome") != "accepted-response"
-                    or previous_binding is None
-                    or previous_binding["trigger"] != previous_trigger
-                    or requested_trigger is None
-                ):
-                    continue
-                next_change = {
-                    "change_id": change_id,
-                    "previous_exit_order_id": previous_exit_id,
-                    "previous_trigger": previous_trigger,
-                    "requested_trigger": requested_trigger,
-                }
-                known_change = current.get("pending_change")
-                if known_change is not None and known_change != next_change:
-                    current["state"] = "UNPROVEN"
-                    continue
-                current["pending_change"] = next_change
-
-            elif event_type == EXIT_ORDER_BOUND:
-                current = lifecycles.get(symbol)
-                pending = current.get("pending_change") if current else None
-                if (
-                    current is None
-                    or current.get("state") != CONFIRMED
-                    or not current.get("anchored")
-                    or pending is None
-                ):
-                    continue
-                entry_order_id = _proven_order_id(
-                    ev.get("entry_order_id"), "entry_order_id"
-                )
-                exit_order_id = _proven_order_id(
-                    ev.get("exit_order_id"), "exit_order_id"
-                )
-                if not entry_order_id or entry_order_id != current.get("order_id"):
-                    continue
-                bound_link = _proven_order_id(
-                    ev.get("entry_order_link_id"), "entry_order_link_id"
-                )
-                if (
-                    bound_link
-                    and current.get("order_link_id")
-                    and bound_link != current["order_link_id"]
-                ):
-                    current["state"] = "UNPROVEN"
-                    continue
-                binding = {
-                    "position_idx": read_position_idx(ev.get("position_idx")),
-                    "side": _proven_position_side(ev.get("side")),
-                    "risk": _plan_amount(
-                        ev, "planned_risk_usdt", _proven_risk_usdt
-                    ),
-                    "trigger": _plan_amount(
-                        ev, "trigger_price", _proven_positive_decimal
-                    ),
-                }
-                if (
-                    ev.get("exit_kind") != EXIT_KIND_SL
-                    or ev.get("binding_source") != EXIT_BINDING_SOURCE_OPEN_ORDERS
-                    or ev.get("binding_origin")
-                    != EXIT_BINDING_ORIGIN_PROTECTION_CHANGE
-                    or _proven_order_id(
-                        ev.get("protection_change_id"), "protection_change_id"
-                    ) != pending["change_id"]
-                    or not exit_order_id
-                    or binding["side"] != current.get("side")
-                    or binding["position_idx"] is None
-                    or binding["risk"] != current.get("planned_risk_usdt")
-                    or binding["trigger"] != pending["requested_trigger"]
-                ):
-                    continue
-                # Observer пишет новую binding-ревизию, когда Bybit меняет
-                # trigger защитного child, даже если его orderId сохранился.
-                # Физически последняя строгая запись — актуальное durable
-                # evidence этого же exact child/entry.
-                current["sl_bindings"][exit_order_id] = binding
-                current["pending_change"] = None
-
-            elif event_type == TP_LADDER_PLACED:
-                current = lifecycles.get(symbol)
-                if (
-                    current is None
-                    or current.get("state") != CONFIRMED
-                    or not current.get("anchored")
-                ):
-                    # Нога лестницы без активного подтверждённого родителя
-                    # владения не создаёт: неизвестный/неоднозначный родитель
-                    # fail-closed.
-                    continue
-                parent = _tp1_parent_match(ev, current)
-                if parent == _TP_PARENT_CONFLICT:
-                    # Durable-идентификаторы одного и того же входа
-                    # противоречат: это противоречие журнала, а не «другая
-                    # нога».
-                    current["state"] = "UNPROVEN"
-                    continue
-                if parent != _TP_PARENT_MATCH:
-                    continue
-                leg_ids = _tp1_leg_ids(ev)
-                tp_price = _plan_amount(ev, "tp_price", _proven_positive_decimal)
-                tp_qty = _plan_amount(ev, "tp_qty", _proven_positive_decimal)
-                if (
-                    leg_ids is None
-                    or tp_price is None
-                    or tp_qty is None
-                    or ev.get("tp_source") != TP_LADDER_SOURCE_PLACE_ORDER
-                ):
-                    continue
-                identity = {
-                    "order_id": leg_ids[0],
-                    "order_link_id": leg_ids[1],
-                    "price": tp_price,
-                    "qty": tp_qty,
-                    "side": current["side"],
-                    "position_idx": current["position_idx"],
-                    # Факт исполнения именно этой ноги; появляется только из
-                    # TP_LADDER_FILL_OBSERVED.
-                    "exec_qty": None,
-                }
-                known = current.get("tp1")
-                if known is None:
-                    current["tp1"] = identity
-                    continue
-                if any(
-                    known[field] != identity[field]
-                    for field in ("order_id", "order_link_id", "price", "qty")
-                ):
-                    # Две РАЗНЫЕ ноги TP1 для одного lifecycle: выбрать между
-                    # ними нельзя, «последняя» доказательством не является.
-                    current["state"] = "UNPROVEN"
-                # Повтор того же доказательства идемпотентен и уже доказанный
-                # факт исполнения не сбрасывает.
-
-            elif event_type == TP_LADDER_FILL_OBSERVED:
-                current = lifecycles.get(symbol)
-                tp1 = current.get("tp1") if current is not None else None
-                if (
-                    current is None
-                    or current.get("state") != CONFIRMED
-                    or not current.get("anchored")
-                    or tp1 is None
-                ):
-                    # Факт исполнения без durable-идентичности TP1 сам к
-                    # lifecycle не прикрепляется.
-                    continue
-                parent = _tp1_parent_match(ev, current)
-                if parent == _TP_PARENT_CONFLICT:
-                    # Совпал один durable идентификатор родителя, а другой
-                    # противоречит. Прикрепить факт исполнения к такому
-                    # «почти тому же» входу нельзя: это чужой lifecycle либо
-                    # порча журнала.
-                    current["state"] = "UNPROVEN"
-                    continue
-                if parent != _TP_PARENT_MATCH:
-                    continue
-                leg_ids = _tp1_leg_ids(ev)
-                exec_qty = _plan_amount(ev, "exec_qty", _proven_positive_decimal)
-                if (
-                    leg_ids is None
-                    or leg_ids[0] != tp1["order_id"]
-                    or leg_ids[1] != tp1["order_link_id"]
-                    or exec_qty is None
-                    or ev.get("fill_source") != TP_FILL_SOURCE_ORDER_HISTORY
-                ):
-                    # Исполнение другой ноги, другого lifecycle или недоказанный
-                    # объём фактом исполнения ЭТОЙ TP1 не становятся.
-                    continue
-                # ``cumExecQty`` одного ордера монотонно растёт, поэтому
-                # физически последнее строгое наблюдение — актуальный факт того
-                # же ордера, а повтор того же наблюдения противоречия не даёт.
-                tp1["exec_qty"] = exec_qty
-
-            elif event_type == ENTRY_EXECUTION_ANCHOR_PROVEN:
-                current = lifecycles.get(symbol)
-                if (
-                    current is None
-                    or current.get("state") != CONFIRMED
-                    or not current.get("anchored")
-                ):
-                    # Якорь без активного подтверждённого lifecycle сам к
-                    # lifecycle не прикрепляется.
-                    continue
-                parent = _tp1_parent_match(ev, current)
-                if parent == _TP_PARENT_CONFLICT:
-                    # Durable-идентификаторы одного и того же входа противоречат.
-                    current["state"] = "UNPROVEN"
-                    continue
-                if parent != _TP_PARENT_MATCH:
-                    continue
-                anchor_ms = read_exchange_epoch_ms(
-                    ev.get("entry_final_exec_time_ms")
-                )
-                if (
-                    anchor_ms is None
-                    or ev.get("anchor_source")
-                    != ENTRY_ANCHOR_SOURCE_EXECUTION_HISTORY
-                ):
-                    # Недоказанное время или иной источник якорем не являются;
-                    # якорь остаётся отсутствующим (NOT_PROVEN), а не «нулевым».
-                    continue
-                known_anchor = current.get("entry_anchor")
-                if known_anchor is not None and known_anchor != anchor_ms:
-                    # Два РАЗНЫХ durable-якоря одного lifecycle: выбрать между
-                    # ними («последний», «самый ранний») нельзя — это
-                    # противоречие журнала, и оно fail-closed.
-                    current["state"] = "UNPROVEN"
-                    continue
-                # Повтор того же значения идемпотентен; доказанный якорь
-                # неизменен для этого lifecycle.
-                current["entry_anchor"] = anchor_ms
-
-            elif event_type == MARK_PRICE_2R_OBSERVED:
-                current = lifecycles.get(symbol)
-                if (
-                    current is None
-                    or current.get("state") != CONFIRMED
-                    or not current.get("anchored")
-                    or current.get("entry_anchor") is None
-                ):
-                    # Причинный порядок обязателен: факт рынка без УЖЕ durable
-                    # временного якоря входа доверенным не становится и задним
-                    # числом не легализуется появившимся позже якорем.
-                    continue
-                parent = _tp1_parent_match(ev, current)
-                if parent == _TP_PARENT_CONFLICT:
-                    current["state"] = "UNPROVEN"
-                    continue
-                if parent != _TP_PARENT_MATCH:
-                    continue
-                target = _plan_amount(ev, "target_2r", _proven_positive_decimal)
-                canonical = canonical_2r_target_from_evidence(current)
-                source = ev.get("mark_2r_source")
-                if (
-                    target is None
-                    or canonical is None
-                    or target != canonical
-                    or source not in MARK_2R_SOURCES
-                ):
-                    # Цель, не равная канонической (пересчитанной из неизменной
-                    # геометрии этого lifecycle), доказательством 2R не является:
-                    # иначе «удобная» цель сделала бы proof дешевле.
-                    continue
-                if source == MARK_2R_SOURCE_CURRENT_POSITION:
-                    observed = _plan_amount(
-                        ev, "observed_mark_price", _proven_positive_decimal
-                    )
-                    if observed is None or not mark_price_crossed_2r(
-                        current["side"], observed, canonical
-                    ):
-                        continue
-                else:
-                    candle_start = read_exchange_epoch_ms(ev.get("candle_start_ms"))
-                    extreme = _plan_amount(
-                        ev, "candle_extreme_price", _proven_positive_decimal
-                    )
-                    if (
-                        candle_start is None
-                        or candle_start < current["entry_anchor"]
-                        or extreme is None
-                        or not mark_price_crossed_2r(
-                            current["side"], extreme, canonical
-                        )
-                    ):
-                        # Свеча, начавшаяся раньше якоря, перекрывает момент
-                        # входа и историческим доказательством быть не может.
-                        continue
-                # Sticky-факт: повтор того же наблюдения противоречия не даёт, а
-                # последующий ретрейс уже записанный факт не отменяет.
-                current["mark_2r_fact"] = True
-
-            elif event_type == PROTECTION_MILESTONE_PROVEN:
-                current = lifecycles.get(symbol)
-                if (
-                    current is None
-                    or current.get("state") != CONFIRMED
-                    or not current.get("anchored")
-                ):
-                    # Милестоун без активного подтверждённого lifecycle сам к
-                    # lifecycle не прикрепляется.
-                    continue
-                if ev.get("milestone") == MILESTONE_2R:
-                    parent = _tp1_parent_match(ev, current)
-                    if parent == _TP_PARENT_CONFLICT:
-                        current["state"] = "UNPROVEN"
-                        continue
-                    if parent != _TP_PARENT_MATCH:
-                        continue
-                    if (
-                        ev.get("milestone_source") != MILESTONE_SOURCE_MARK_PRICE_2R
-                        or current.get("entry_anchor") is None
-                        or current.get("mark_2r_fact") is not True
-                    ):
-                        # Объявление 2R без нижележащего durable факта рынка (и
-                        # без durable временного якоря) НЕ доверяется. Причинный
-                        # порядок: якорь → факт → милестоун. Милестоун,
-                        # оказавшийся раньше факта, доверенным задним числом не
-                        # становится: появившийся позже факт уже принятое по
-                        # этому событию решение не переписывает.
-                        continue
-                    # Sticky/монотонно: доказанный 2R остаётся доказанным.
-                    # Ретрейс, перенос/перепривязка SL, отмена TP2/TP3, неудачное
-                    # чтение и перезапуск его не сбрасывают. Обратного перехода
-                    # не существует; милестоун защиту НЕ включает.
-                    current["milestones"]["r2_proven"] = True
-                    continue
-                tp1 = current.get("tp1")
-                if tp1 is None:
-                    # Милестоун 1R без durable-идентичности TP1 не прикрепляется.
-                    continue
-                parent = _tp1_parent_match(ev, current)
-                if parent == _TP_PARENT_CONFLICT:
-                    # Durable-идентификаторы одного и того же входа противоречат:
-                    # это противоречие журнала, а не «другой родитель».
-                    current["state"] = "UNPROVEN"
-                    continue
-                if parent != _TP_PARENT_MATCH:
-                    continue
-                leg_ids = _tp1_leg_ids(ev)
-                if (
-                    ev.get("milestone") != MILESTONE_1R
-                    or ev.get("milestone_source") != MILESTONE_SOURCE_TP1_FILL
-                    or leg_ids is None
-                    or leg_ids[0] != tp1["order_id"]
-                    or leg_ids[1] != tp1["order_link_id"]
-                ):
-                    # Милестоун другого уровня/источника или без точной ссылки на
-                    # ногу TP1 ЭТОГО lifecycle доверенным милестоуном не является.
-                    continue
-                if tp1.get("exec_qty") is None:
-                    # Объявление милестоуна без нижележащего authoritative-факта
-                    # ненулевого исполнения точной ноги TP1 НЕ доверяется
-                    # (fail-closed). Причинный порядок: durable-факт TP1 обязан
-                    # предшествовать милестоуну. Милестоун, оказавшийся раньше
-                    # факта, доверенным задним числом не становится: появившийся
-                    # позже факт уже принятое по этому событию решение не
-                    # переписывает.
-                    continue
-                # Sticky/монотонно: доказанный 1R остаётся доказанным. Ретрейс
-                # цены, перенос/перепривязка SL, исчезновение TP1 из открытых
-                # ордеров, перезапуск и повтор милестоуна его не сбрасывают —
-                # он выводится только из durable-событий, а не из текущей цены.
-                current["milestones"]["r1_proven"] = True
-
-            elif event_type in TERMINAL_EVENTS:
-                current = lifecycles.get(symbol)
-                if current is None:
-                    continue
-                if current.get("state") == "CONFIRMED" and not _same_identity(current, ev):
-                    current["state"] = "UNPROVEN"
-                else:
-                    current["state"] = TERMINAL
-    except (_OwnershipUnproven, TypeError, ValueError) as exc:
-        logging.warning(
-            "journal auto protection scan: evidence is unproven (%s) — no writes",
-            exc,
+
+def _plan_amount(ev: dict, field: str, parser):
+    if field not in ev:
+        return None
+    raw = ev.get(field)
+    if raw is None:
+        raise _OwnershipUnproven(f"поле {field} malformed")
+    value = parser(raw)
+    if value is None:
+        raise _OwnershipUnproven(f"поле {field} malformed")
+    return value
+
+
+def _confirmed_idx(ev: dict):
+    if "position_idx" not in ev:
+        return None
+    raw = ev.get("position_idx")
+    value = read_position_idx(raw)
+    if value is None:
+        raise _OwnershipUnproven("поле position_idx malformed")
+    return value
+
+
+def _same_identity(current: dict, ev: dict) -> bool:
+    event_order_id = _proven_order_id(ev.get("order_id"), "order_id")
+    event_link_id = _proven_order_id(ev.get("order_link_id"), "order_link_id")
+    if current["order_id"]:
+        return event_order_id == current["order_id"]
+    return bool(
+        current["order_link_id"]
+        and event_link_id == current["order_link_id"]
+    )
+
+
+def _tp1_leg_ids(ev: dict):
+    """Точные идентификаторы ноги TP1, заявленные событием, либо ``None``.
+
+    Идентичность ноги — только точные ``tp_order_id`` / ``tp_order_link_id``
+    и канонический уровень :data:`TP_LEVEL_TP1`. Сохраняются существующие
+    правила идентичности проекта: id-only и link-only валидны, а
+    placeholder/пустое значение точной идентичностью не становится.
+    Событие другого уровня (TP2/TP3) идентичностью TP1 не является.
+    """
+    if ev.get("tp_level") != TP_LEVEL_TP1:
+        return None
+    order_id = _proven_order_id(ev.get("tp_order_id"), "tp_order_id")
+    link_id = _proven_order_id(ev.get("tp_order_link_id"), "tp_order_link_id")
+    if not order_id and not link_id:
+        return None
+    return order_id, link_id
+
+
+def _tp1_parent_match(ev: dict, current: dict) -> str:
+    """Сверка РОДИТЕЛЬСКОГО lifecycle по единому контракту durable-ID.
+
+    Один и тот же контракт обязателен для ``TP_LADDER_PLACED`` и
+    ``TP_LADDER_FILL_OBSERVED``: иначе факт исполнения смог бы прикрепиться
+    к родителю, которого размещение не доказывало.
+
+    Правила те же, что во всём проекте:
+
+      * известен только ``entry_order_id`` — достаточно его совпадения;
+      * известен только ``entry_order_link_id`` — достаточно его совпадения;
+      * известны ОБА — совпасть обязаны ОБА (конъюнктивно);
+      * один совпал, другой противоречит — :data:`_TP_PARENT_CONFLICT`
+        (fail-closed): это утверждения об одном и том же входе, и выбирать
+        между ними нельзя;
+      * placeholder / пустой / ``UNKNOWN`` / malformed идентификатор
+        идентичностью не становится и совпадением не считается.
+
+    «Известен» означает доказан ОБЕИМИ сторонами: и durable-lifecycle, и
+    самим событием. Дополнительно обязана совпасть неизменная идентичность
+    позиции конфирмации — ``side`` и ``positionIdx``; ``positionIdx=0``
+    остаётся валидным.
+
+    Замечание о link-only родителе: в эту строгую проекцию lifecycle без
+    точного ``order_id`` не попадает вовсе (см. финальный фильтр), поэтому
+    практически родитель всегда имеет durable ``order_id``. Правило
+    сохранено, чтобы контракт идентичности не расходился с остальным
+    проектом.
+    """
+    event_id = _proven_order_id(ev.get("entry_order_id"), "entry_order_id")
+    event_link = _proven_order_id(
+        ev.get("entry_order_link_id"), "entry_order_link_id"
+    )
+    parent_id = current.get("order_id") or ""
+    parent_link = current.get("order_link_id") or ""
+
+    id_known = bool(parent_id and event_id)
+    link_known = bool(parent_link and event_link)
+    if not id_known and not link_known:
+        # Ни один durable идентификатор родителя не заявлен обеими
+        # сторонами: принадлежность не доказана.
+        return _TP_PARENT_OTHER
+
+    id_ok = (event_id == parent_id) if id_known else None
+    link_ok = (event_link == parent_link) if link_known else None
+    if id_ok is False or link_ok is False:
+        if id_ok is True or link_ok is True:
+            # Один durable идентификатор совпал, другой противоречит.
+            return _TP_PARENT_CONFLICT
+        return _TP_PARENT_OTHER
+
+    if (
+        _proven_position_side(ev.get("side")) != current.get("side")
+        or _confirmed_idx(ev) != current.get("position_idx")
+    ):
+        return _TP_PARENT_OTHER
+    return _TP_PARENT_MATCH
+
+
+def _auto_protection_step(lifecycles: dict, event_type: str, ev: dict) -> None:
+    """Применяет одно строгое событие к состоянию :func:`get_auto_protection_evidence`.
+
+    Свёртка ведётся инкрементальным индексом журнала по мере разбора строк.
+    Исключение (:class:`_OwnershipUnproven`, malformed-поле) делает
+    недоказанным весь результат: индекс запоминает его и дальше не сворачивает.
+    """
+    symbol = normalize_symbol(ev.get("symbol"))
+    if not symbol:
+        if event_type in (ENTRY_PLACED, POSITION_CONFIRMED, *TERMINAL_EVENTS):
+            raise _OwnershipUnproven(
+                f"событие {event_type} без доказанного symbol"
+            )
+        # Lifecycle-neutral записи без одного symbol (например,
+        # пакетная отмена) не участвуют в ownership-решении.
+        return
+
+    if event_type == ENTRY_PLACED:
+        order_id = _proven_order_id(ev.get("order_id"), "order_id")
+        order_link_id = _proven_order_id(
+            ev.get("order_link_id"), "order_link_id"
+        )
+        side = _proven_entry_side(ev.get("side"))
+        qty = _plan_amount(ev, "qty", _proven_positive_amount)
+        risk = _plan_amount(ev, "planned_risk_usdt", _proven_risk_usdt)
+        # Вход без точной identity или полного плана остаётся безопасно
+        # неуправляемым. Не достраиваем его из текущего exchange state.
+        if not (order_id or order_link_id) or not side:
+            lifecycles[symbol] = {"state": "UNPROVEN"}
+            return
+        lifecycles[symbol] = {
+            "state": PENDING,
+            "order_id": order_id,
+            "order_link_id": order_link_id,
+            "side": side,
+            "qty": qty,
+            "entry": None,
+            "planned_risk_usdt": risk,
+            "position_idx": None,
+            # Неизменный первичный защитный SL: фиксируется один раз в
+            # POSITION_CONFIRMED и служит знаменателем actual immutable
+            # initial R. Перенос/перепривязка SL его не меняет.
+            "initial_sl": None,
+            "sl_bindings": {},
+            "anchored": False,
+            "pending_change": None,
+            # Точная durable-идентичность ноги TP1 Real-R лестницы этого
+            # lifecycle и факт её исполнения. Новый вход всегда начинает
+            # новый lifecycle, поэтому TP1 прошлой сделки того же
+            # символа сюда не наследуется.
+            "tp1": None,
+            # Durable неизменный временной якорь входа
+            # (exchange-время последнего исполнения точного входа) и
+            # durable факт рынка 2R. Новый вход всегда начинает новый
+            # lifecycle, поэтому якорь и факт прошлой сделки того же
+            # символа сюда не наследуются.
+            "entry_anchor": None,
+            "mark_2r_fact": False,
+            # Durable монотонное состояние милестоунов защиты этого
+            # lifecycle. Новый lifecycle начинается без доказанных
+            # милестоунов, поэтому 1R/2R прошлой сделки того же символа
+            # сюда не переходят.
+            "milestones": {"r1_proven": False, "r2_proven": False},
+        }
+        if qty is None or risk is None:
+            lifecycles[symbol]["state"] = "UNPROVEN"
+
+    elif event_type == POSITION_CONFIRMED:
+        current = lifecycles.get(symbol)
+        if current is None or current.get("state") != PENDING:
+            return
+        if not _same_identity(current, ev):
+            current["state"] = "UNPROVEN"
+            return
+        confirmed_side = _proven_entry_side(ev.get("side"))
+        if not confirmed_side or confirmed_side != current["side"]:
+            current["state"] = "UNPROVEN"
+            return
+        confirmed_idx = _confirmed_idx(ev)
+        confirmed_qty = _plan_amount(
+            ev, "cum_exec_qty", _proven_positive_amount
         )
-        return {}
-    except Exception as exc:
-        logging.error("journal auto protection scan failed: %s", exc)
-        return {}
+        confirmed_entry = _plan_amount(
+            ev, "avg_entry_price", _proven_positive_amount
+        )
+        if (
+            confirmed_idx is None
+            or confirmed_qty is None
+            or confirmed_qty != current["qty"]
+            or confirmed_entry is None
+        ):
+            current["state"] = "UNPROVEN"
+            return
+        current["state"] = CONFIRMED
+        current["position_idx"] = confirmed_idx
+        current["qty"] = confirmed_qty
+        current["entry"] = confirmed_entry
+        anchor_order_id = _proven_order_id(
+            ev.get("initial_sl_order_id"), "initial_sl_order_id"
+        )
+        anchor_trigger = _plan_amount(
+            ev, "initial_sl_trigger", _proven_positive_decimal
+        )
+        anchor_source = ev.get("initial_sl_anchor_source")
+        if (
+            anchor_order_id
+            and anchor_trigger is not None
+            and anchor_source == INITIAL_SL_ANCHOR_SOURCE_CONFIRMATION
+        ):
+            current["sl_bindings"][anchor_order_id] = {
+                "position_idx": confirmed_idx,
+                "side": current["side"],
+                "risk": current["planned_risk_usdt"],
+                "trigger": anchor_trigger,
+            }
+            current["anchored"] = True
+            # Иммутабельный якорь исходного R: снимается один раз здесь и
+            # далее не переписывается ни PROTECTION_CHANGE, ни
+            # EXIT_ORDER_BOUND — перенос/перепривязка SL знаменатель R не
+            # меняет.
+            current["initial_sl"] = anchor_trigger
+
+    elif event_type == PROTECTION_CHANGE:
+        current = lifecycles.get(symbol)
+        if (
+            current is None
+            or current.get("state") != CONFIRMED
+            or not current.get("anchored")
+        ):
+            return
+        change_id = _proven_order_id(
+            ev.get("protection_change_id"), "protection_change_id"
+        )
+        entry_order_id = _proven_order_id(
+            ev.get("entry_order_id"), "entry_order_id"
+        )
+        previous_exit_id = _proven_order_id(
+            ev.get("previous_exit_order_id"), "previous_exit_order_id"
+        )
+        previous_trigger = _plan_amount(
+            ev, "previous_trigger", _proven_positive_decimal
+        )
+        requested_trigger = _plan_amount(
+            ev, "requested_trigger", _proven_positive_decimal
+        )
+        previous_binding = current["sl_bindings"].get(previous_exit_id)
+        if (
+            not change_id
+            or entry_order_id != current.get("order_id")
+            or read_position_idx(ev.get("position_idx"))
+            != current.get("position_idx")
+            or _proven_position_side(ev.get("side")) != current.get("side")
+            or ev.get("protection_source") not in AUTO_PROTECTION_SOURCES
+            or ev.get("write_outcome") != "accepted-response"
+            or previous_binding is None
+            or previous_binding["trigger"] != previous_trigger
+            or requested_trigger is None
+        ):
+            return
+        next_change = {
+            "change_id": change_id,
+            "previous_exit_order_id": previous_exit_id,
+            "previous_trigger": previous_trigger,
+            "requested_trigger": requested_trigger,
+        }
+        known_change = current.get("pending_change")
+        if known_change is not None and known_change != next_change:
+            current["state"] = "UNPROVEN"
+            return
+        current["pending_change"] = next_change
+
+    elif event_type == EXIT_ORDER_BOUND:
+        current = lifecycles.get(symbol)
+        pending = current.get("pending_change") if current else None
+        if (
+            current is None
+            or current.get("state") != CONFIRMED
+            or not current.get("anchored")
+            or pending is None
+        ):
+            return
+        entry_order_id = _proven_order_id(
+            ev.get("entry_order_id"), "entry_order_id"
+        )
+        exit_order_id = _proven_order_id(
+            ev.get("exit_order_id"), "exit_order_id"
+        )
+        if not entry_order_id or entry_order_id != current.get("order_id"):
+            return
+        bound_link = _proven_order_id(
+            ev.get("entry_order_link_id"), "entry_order_link_id"
+        )
+        if (
+            bound_link
+            and current.get("order_link_id")
+            and bound_link != current["order_link_id"]
+        ):
+            current["state"] = "UNPROVEN"
+            return
+        binding = {
+            "position_idx": read_position_idx(ev.get("position_idx")),
+            "side": _proven_position_side(ev.get("side")),
+            "risk": _plan_amount(
+                ev, "planned_risk_usdt", _proven_risk_usdt
+            ),
+            "trigger": _plan_amount(
+                ev, "trigger_price", _proven_positive_decimal
+            ),
+        }
+        if (
+            ev.get("exit_kind") != EXIT_KIND_SL
+            or ev.get("binding_source") != EXIT_BINDING_SOURCE_OPEN_ORDERS
+            or ev.get("binding_origin")
+            != EXIT_BINDING_ORIGIN_PROTECTION_CHANGE
+            or _proven_order_id(
+                ev.get("protection_change_id"), "protection_change_id"
+            ) != pending["change_id"]
+            or not exit_order_id
+            or binding["side"] != current.get("side")
+            or binding["position_idx"] is None
+            or binding["risk"] != current.get("planned_risk_usdt")
+            or binding["trigger"] != pending["requested_trigger"]
+        ):
+            return
+        # Observer пишет новую binding-ревизию, когда Bybit меняет
+        # trigger защитного child, даже если его orderId сохранился.
+        # Физически последняя строгая запись — актуальное durable
+        # evidence этого же exact child/entry.
+        current["sl_bindings"][exit_order_id] = binding
+        current["pending_change"] = None
+
+    elif event_type == TP_LADDER_PLACED:
+        current = lifecycles.get(symbol)
+        if (
+            current is None
+            or current.get("state") != CONFIRMED
+            or not current.get("anchored")
+        ):
+            # Нога лестницы без активного подтверждённого родителя
+            # владения не создаёт: неизвестный/неоднозначный родитель
+            # fail-closed.
+            return
+        parent = _tp1_parent_match(ev, current)
+        if parent == _TP_PARENT_CONFLICT:
+            # Durable-идентификаторы одного и того же входа
+            # противоречат: это противоречие журнала, а не «другая
+            # нога».
+            current["state"] = "UNPROVEN"
+            return
+        if parent != _TP_PARENT_MATCH:
+            return
+        leg_ids = _tp1_leg_ids(ev)
+        tp_price = _plan_amount(ev, "tp_price", _proven_positive_decimal)
+        tp_qty = _plan_amount(ev, "tp_qty", _proven_positive_decimal)
+        if (
+            leg_ids is None
+            or tp_price is None
+            or tp_qty is None
+            or ev.get("tp_source") != TP_LADDER_SOURCE_PLACE_ORDER
+        ):
+            return
+        identity = {
+            "order_id": leg_ids[0],
+            "order_link_id": leg_ids[1],
+            "price": tp_price,
+            "qty": tp_qty,
+            "side": current["side"],
+            "position_idx": current["position_idx"],
+            # Факт исполнения именно этой ноги; появляется только из
+            # TP_LADDER_FILL_OBSERVED.
+            "exec_qty": None,
+        }
+        known = current.get("tp1")
+        if known is None:
+            current["tp1"] = identity
+            return
+        if any(
+            known[field] != identity[field]
+            for field in ("order_id", "order_link_id", "price", "qty")
+        ):
+            # Две РАЗНЫЕ ноги TP1 для одного lifecycle: выбрать между
+            # ними нельзя, «последняя» доказательством не является.
+            current["state"] = "UNPROVEN"
+        # Повтор того же доказательства идемпотентен и уже доказанный
+        # факт исполнения не сбрасывает.
+
+    elif event_type == TP_LADDER_FILL_OBSERVED:
+        current = lifecycles.get(symbol)
+        tp1 = current.get("tp1") if current is not None else None
+        if (
+            current is None
+            or current.get("state") != CONFIRMED
+            or not current.get("anchored")
+            or tp1 is None
+        ):
+            # Факт исполнения без durable-идентичности TP1 сам к
+            # lifecycle не прикрепляется.
+            return
+        parent = _tp1_parent_match(ev, current)
+        if parent == _TP_PARENT_CONFLICT:
+            # Совпал один durable идентификатор родителя, а другой
+            # противоречит. Прикрепить факт исполнения к такому
+            # «почти тому же» входу нельзя: это чужой lifecycle либо
+            # порча журнала.
+            current["state"] = "UNPROVEN"
+            return
+        if parent != _TP_PARENT_MATCH:
+            return
+        leg_ids = _tp1_leg_ids(ev)
+        exec_qty = _plan_amount(ev, "exec_qty", _proven_positive_decimal)
+        if (
+            leg_ids is None
+            or leg_ids[0] != tp1["order_id"]
+            or leg_ids[1] != tp1["order_link_id"]
+            or exec_qty is None
+            or ev.get("fill_source") != TP_FILL_SOURCE_ORDER_HISTORY
+        ):
+            # Исполнение другой ноги, другого lifecycle или недоказанный
+            # объём фактом исполнения ЭТОЙ TP1 не становятся.
+            return
+        # ``cumExecQty`` одного ордера монотонно растёт, поэтому
+        # физически последнее строгое наблюдение — актуальный факт того
+        # же ордера, а повтор того же наблюдения противоречия не даёт.
+        tp1["exec_qty"] = exec_qty
+
+    elif event_type == ENTRY_EXECUTION_ANCHOR_PROVEN:
+        current = lifecycles.get(symbol)
+        if (
+            current is None
+            or current.get("state") != CONFIRMED
+            or not current.get("anchored")
+        ):
+            # Якорь без активного подтверждённого lifecycle сам к
+            # lifecycle не прикрепляется.
+            return
+        parent = _tp1_parent_match(ev, current)
+        if parent == _TP_PARENT_CONFLICT:
+            # Durable-идентификаторы одного и того же входа противоречат.
+            current["state"] = "UNPROVEN"
+            return
+        if parent != _TP_PARENT_MATCH:
+            return
+        anchor_ms = read_exchange_epoch_ms(
+            ev.get("entry_final_exec_time_ms")
+        )
+        if (
+            anchor_ms is None
+            or ev.get("anchor_source")
+            != ENTRY_ANCHOR_SOURCE_EXECUTION_HISTORY
+        ):
+            # Недоказанное время или иной источник якорем не являются;
+            # якорь остаётся отсутствующим (NOT_PROVEN), а не «нулевым».
+            return
+        known_anchor = current.get("entry_anchor")
+        if known_anchor is not None and known_anchor != anchor_ms:
+            # Два РАЗНЫХ durable-якоря одного lifecycle: выбрать между
+            # ними («последний», «самый ранний») нельзя — это
+            # противоречие журнала, и оно fail-closed.
+            current["state"] = "UNPROVEN"
+            return
+        # Повтор того же значения идемпотентен; доказанный якорь
+        # неизменен для этого lifecycle.
+        current["entry_anchor"] = anchor_ms
+
+    elif event_type == MARK_PRICE_2R_OBSERVED:
+        current = lifecycles.get(symbol)
+        if (
+            current is None
+            or current.get("state") != CONFIRMED
+            or not current.get("anchored")
+            or current.get("entry_anchor") is None
+        ):
+            # Причинный порядок обязателен: факт рынка без УЖЕ durable
+            # временного якоря входа доверенным не становится и задним
+            # числом не легализуется появившимся позже якорем.
+            return
+        parent = _tp1_parent_match(ev, current)
+        if parent == _TP_PARENT_CONFLICT:
+            current["state"] = "UNPROVEN"
+            return
+        if parent != _TP_PARENT_MATCH:
+            return
+        target = _plan_amount(ev, "target_2r", _proven_positive_decimal)
+        canonical = canonical_2r_target_from_evidence(current)
+        source = ev.get("mark_2r_source")
+        if (
+            target is None
+            or canonical is None
+            or target != canonical
+            or source not in MARK_2R_SOURCES
+        ):
+            # Цель, не равная канонической (пересчитанной из неизменной
+            # геометрии этого lifecycle), доказательством 2R не является:
+            # иначе «удобная» цель сделала бы proof дешевле.
+            return
+        if source == MARK_2R_SOURCE_CURRENT_POSITION:
+            observed = _plan_amount(
+                ev, "observed_mark_price", _proven_positive_decimal
+            )
+            if observed is None or not mark_price_crossed_2r(
+                current["side"], observed, canonical
+            ):
+                return
+        else:
+            candle_start = read_exchange_epoch_ms(ev.get("candle_start_ms"))
+            extreme = _plan_amount(
+                ev, "candle_extreme_price", _proven_positive_decimal
+            )
+            if (
+                candle_start is None
+                or candle_start < current["entry_anchor"]
+                or extreme is None
+                or not mark_price_crossed_2r(
+                    current["side"], extreme, canonical
+                )
+            ):
+                # Свеча, начавшаяся раньше якоря, перекрывает момент
+                # входа и историческим доказательством быть не может.
+                return
+        # Sticky-факт: повтор того же наблюдения противоречия не даёт, а
+        # последующий ретрейс уже записанный факт не отменяет.
+        current["mark_2r_fact"] = True
+
+    elif event_type == PROTECTION_MILESTONE_PROVEN:
+        current = lifecycles.get(symbol)
+        if (
+            current is None
+            or current.get("state") != CONFIRMED
+            or not current.get("anchored")
+        ):
+            # Милестоун без активного подтверждённого lifecycle сам к
+            # lifecycle не прикрепляется.
+            return
+        if ev.get("milestone") == MILESTONE_2R:
+            parent = _tp1_parent_match(ev, current)
+            if parent == _TP_PARENT_CONFLICT:
+                current["state"] = "UNPROVEN"
+                return
+            if parent != _TP_PARENT_MATCH:
+                return
+            if (
+                ev.get("milestone_source") != MILESTONE_SOURCE_MARK_PRICE_2R
+                or current.get("entry_anchor") is None
+                or current.get("mark_2r_fact") is not True
+            ):
+                # Объявление 2R без нижележащего durable факта рынка (и
+                # без durable временного якоря) НЕ доверяется. Причинный
+                # порядок: якорь → факт → милестоун. Милестоун,
+                # оказавшийся раньше факта, доверенным задним числом не
+                # становится: появившийся позже факт уже принятое по
+                # этому событию решение не переписывает.
+                return
+            # Sticky/монотонно: доказанный 2R остаётся доказанным.
+            # Ретрейс, перенос/перепривязка SL, отмена TP2/TP3, неудачное
+            # чтение и перезапуск его не сбрасывают. Обратного перехода
+            # не существует; милестоун защиту НЕ включает.
+            current["milestones"]["r2_proven"] = True
+            return
+        tp1 = current.get("tp1")
+        if tp1 is None:
+            # Милестоун 1R без durable-идентичности TP1 не прикрепляется.
+            return
+        parent = _tp1_parent_match(ev, current)
+        if parent == _TP_PARENT_CONFLICT:
+            # Durable-идентификаторы одного и того же входа противоречат:
+            # это противоречие журнала, а не «другой родитель».
+            current["state"] = "UNPROVEN"
+            return
+        if parent != _TP_PARENT_MATCH:
+            return
+        leg_ids = _tp1_leg_ids(ev)
+        if (
+            ev.get("milestone") != MILESTONE_1R
+            or ev.get("milestone_source") != MILESTONE_SOURCE_TP1_FILL
+            or leg_ids is None
+            or leg_ids[0] != tp1["order_id"]
+            or leg_ids[1] != tp1["order_link_id"]
+        ):
+            # Милестоун другого уровня/источника или без точной ссылки на
+            # ногу TP1 ЭТОГО lifecycle доверенным милестоуном не является.
+            return
+        if tp1.get("exec_qty") is None:
+            # Объявление милестоуна без нижележащего authoritative-факта
+            # ненулевого исполнения точной ноги TP1 НЕ доверяется
+            # (fail-closed). Причинный порядок: durable-факт TP1 обязан
+            # предшествовать милестоуну. Милестоун, оказавшийся раньше
+            # факта, доверенным задним числом не становится: появившийся
+            # позже факт уже принятое по этому событию решение не
+            # переписывает.
+            return
+        # Sticky/монотонно: доказанный 1R остаётся доказанным. Ретрейс
+        # цены, перенос/перепривязка SL, исчезновение TP1 из открытых
+        # ордеров, перезапуск и повтор милестоуна его не сбрасывают —
+        # он выводится только из durable-событий, а не из текущей цены.
+        current["milestones"]["r1_proven"] = True
+
+    elif event_type in TERMINAL_EVENTS:
+        current = lifecycles.get(symbol)
+        if current is None:
+            return
+        if current.get("state") == "CONFIRMED" and not _same_identity(current, ev):
+            current["state"] = "UNPROVEN"
+        else:
+            current["state"] = TERMINAL
 
+
+def _auto_protection_projection(lifecycles: dict) -> dict:
+    """Результат :func:`get_auto_protection_evidence` из свёрнутого состояния."""
     return {
         symbol: {
             "order_id": info["order_id"],
@@ -1668,6 +3021,46 @@ def _ownership_identity(ev: dict) -> tuple:
     return symbol, order_id, order_link_id
 
 
+def get_position_open_times() -> dict:
+    """Время открытия активных позиций бота из журнала — для time management.
+
+    Для каждого ``CONFIRMED`` lifecycle — лучшее durable-время входа:
+    exchange-время из ``ENTRY_EXECUTION_ANCHOR_PROVEN`` того же входа
+    (строго, через :func:`get_auto_protection_evidence`), а без него — время
+    записи ``POSITION_CONFIRMED`` (подтверждение приходит уже после
+    исполнения, возраст позиции не завышается).
+
+    Возвращает ``{symbol: {"side": str, "order_id": str, "open_ms": int,
+    "source": ENTRY_EXECUTION_ANCHOR_PROVEN | POSITION_CONFIRMED}}``. Это
+    только оценка возраста для предупреждений: защита и милестоуны на неё
+    не опираются.
+    """
+    evidence = get_auto_protection_evidence()
+    open_times: dict = {}
+    for symbol, info in get_position_lifecycles().items():
+        if info.get("state") != CONFIRMED:
+            continue
+        order_id = info.get("order_id") or ""
+        plan = evidence.get(symbol)
+        anchor = None
+        if plan is not None and order_id and plan.get("order_id") == order_id:
+            anchor = plan.get("entry_final_exec_time_ms")
+        if anchor is not None:
+            open_ms, source = anchor, ENTRY_EXECUTION_ANCHOR_PROVEN
+        else:
+            confirmed_ts = info.get("confirmed_ts")
+            if not isinstance(confirmed_ts, (int, float)) or confirmed_ts <= 0:
+                continue
+            open_ms, source = int(confirmed_ts * 1000), POSITION_CONFIRMED
+        open_times[symbol] = {
+            "side": info.get("side", ""),
+            "order_id": order_id,
+            "open_ms": open_ms,
+            "source": source,
+        }
+    return open_times
+
+
 def get_bot_entry_identities() -> dict:
     """
     Точные идентичности входных ордеров бота — строгий read-only scan журнала.
@@ -1678,8 +3071,9 @@ def get_bot_entry_identities() -> dict:
     чужой, ручной или защитный ордер, а два lifecycle одного символа обязаны
     остаться разными записями.
 
-    Собственный tolerant-разбор вместо read_events()/get_position_lifecycles():
-    для владения пропуск повреждённой строки недопустим. Пропущенное
+    Строгий разбор (:func:`_iter_strict_events`) вместо
+    read_events()/get_position_lifecycles(): для владения пропуск повреждённой
+    строки недопустим. Пропущенное
     терминальное событие оставило бы отменённый или закрытый вход «активным»,
     поэтому ЛЮБАЯ аномалия делает весь результат недоказанным и возвращает
     пустую карту: ошибка открытия или чтения, невалидный JSON, JSON-значение не
@@ -1699,71 +3093,76 @@ def get_bot_entry_identities() -> dict:
     discriminator-проверки. Журнал только читается: он не переписывается, не
     исправляется и не мигрируется.
     """
-    candidates: dict = {}
-    try:
-        if not JOURNAL_FILE.exists():
-            # Журнала ещё нет: доказательств владения нет, но и аномалии нет.
+    with _JOURNAL_LOCK:
+        try:
+            index = _folded_index()
+        except Exception as exc:
+            logging.error("journal ownership scan failed: %s", exc)
             return {}
-        # newline="" отключает universal newlines: единственная строка без
-        # завершающего "\n" — это физически оборванный конец файла.
-        with open(JOURNAL_FILE, "r", encoding="utf-8", newline="") as f:
-            for raw_line in f:
-                if not raw_line.endswith("\n"):
-                    raise _OwnershipUnproven("последняя строка не терминирована")
-                line = raw_line.strip()
-                if not line:
-                    raise _OwnershipUnproven("пустая строка")
-                try:
-                    ev = json.loads(line)
-                except ValueError as exc:
-                    raise _OwnershipUnproven(f"невалидный JSON: {exc}") from exc
-                if not isinstance(ev, dict):
-                    raise _OwnershipUnproven("JSON-значение не является объектом")
-
-                event_type = _ownership_text(ev, "event")
-                if not event_type:
-                    # Без доказанного типа нельзя утверждать ни что это вход,
-                    # ни что это терминальное событие: пропуск такой строки мог
-                    # бы сохранить владение закрытым ордером.
-                    raise _OwnershipUnproven("событие без доказанного типа")
-                if event_type == ENTRY_PLACED:
-                    symbol, order_id, order_link_id = _ownership_identity(ev)
-                    if not symbol or not order_id:
-                        # Старое событие без точной идентичности владения не
-                        # доказывает, но и порчей журнала не является.
-                        continue
-                    candidates[(symbol, order_id)] = {
-                        "order_link_id": order_link_id,
-                    }
-                elif event_type in TERMINAL_EVENTS:
-                    symbol, order_id, order_link_id = _ownership_identity(ev)
-                    if not symbol or not order_id:
-                        continue
-                    known = candidates.get((symbol, order_id))
-                    if known is None:
-                        continue
-                    known_link = known.get("order_link_id", "")
-                    if known_link and order_link_id and known_link != order_link_id:
-                        # Совпала пара, но доказанные orderLinkId разные — это
-                        # другая строка, и снимать владение ею нельзя.
-                        continue
-                    del candidates[(symbol, order_id)]
-    except _OwnershipUnproven as exc:
-        logging.warning(
-            "journal ownership scan: владение не доказано (%s) — карта пуста", exc
-        )
-        return {}
-    except Exception as exc:
-        logging.error("journal ownership scan failed: %s", exc)
-        return {}
+        if index is None:
+            return {}
+        candidates, exc = _strict_fold(index, "owned")
+        if exc is not None:
+            if isinstance(exc, _OwnershipUnproven):
+                logging.warning(
+                    "journal ownership scan: владение не доказано (%s) — карта пуста",
+                    exc,
+                )
+            else:
+                logging.error("journal ownership scan failed: %s", exc)
+            return {}
+        return {
+            (symbol, order_id): {
+                "order_id": order_id,
+                "order_link_id": info.get("order_link_id", ""),
+            }
+            for (symbol, order_id), info in candidates.items()
+        }
 
-    return {
-        (symbol, order_id): {
-            "order_id": order_id,
-            "order_link_id": info.get("order_link_id", ""),
+
+def _ownership_step(candidates: dict, event_type: str, ev: dict) -> None:
+    """Применяет одно строгое событие к карте :func:`get_bot_entry_identities`.
+
+    Строгий разбор индекса уже отверг битые, пустые, оборванные строки и
+    события без доказанного типа: пропуск такой строки мог бы сохранить
+    владение закрытым ордером. Malformed-поле поднимает
+    :class:`_OwnershipUnproven` и делает недоказанной всю карту.
+    """
+    if event_type == ENTRY_PLACED:
+        symbol, order_id, order_link_id = _ownership_identity(ev)
+        if not symbol or not order_id:
+            # Старое событие без точной идентичности владения не
+            # доказывает, но и порчей журнала не является.
+            return
+        candidates[(symbol, order_id)] = {
+            "order_link_id": order_link_id,
         }
-        for (symbol, order_id), info in candidates.items()
-    }
+    elif event_type in TERMINAL_EVENTS:
+        symbol, order_id, order_link_id = _ownership_identity(ev)
+        if not symbol or not order_id:
+            return
+        known = candidates.get((symbol, order_id))
+        if known is None:
+            return
+        known_link = known.get("order_link_id", "")
+        if known_link and order_link_id and known_link != order_link_id:
+            # Совпала пара, но доказанные orderLinkId разные — это
+            # другая строка, и снимать владение ею нельзя.
+            return
+        del candidates[(symbol, order_id)]
+
+
+def _strict_lifecycle_step(lifecycles: dict, event_type: str, ev: dict) -> None:
+    """:func:`_lifecycle_step` по строгим событиям (подтверждение позиции)."""
+    _lifecycle_step(lifecycles, ev)
+
+
+def _events_of_type_step(event_type: str):
+    """Шаг свёртки, собирающий строгие события одного типа в ``state["events"]``."""
+    def step(state: dict, seen_type: str, ev: dict) -> None:
+        if seen_type == event_type:
+            state.setdefault("events", []).append(ev)
+    return step
 
 
 # ---------------------------------------------------------------------------
@@ -1780,33 +3179,20 @@ def _iter_strict_events():
     или не терминированная ``\\n`` (оборванная) строка, событие без
     доказанного типа — поднимает :class:`_OwnershipUnproven`. Отсутствие файла
     аномалией не является: доказательств нет, но и журнал не повреждён.
+
+    Разбор выполняется один раз инкрементальным индексом
+    (:func:`_journal_index`); аномалия в любом месте файла, включая только что
+    дописанный хвост, по-прежнему делает недоказанным весь результат. События
+    общие с индексом и изменяться вызывающим кодом не должны.
     """
-    if not JOURNAL_FILE.exists():
-        return
-    # newline="" отключает universal newlines: единственная строка без
-    # завершающего "\n" — это физически оборванный конец файла.
-    with open(JOURNAL_FILE, "r", encoding="utf-8", newline="") as f:
-        for raw_line in f:
-            if not raw_line.endswith("\n"):
-                raise _OwnershipUnproven("последняя строка не терминирована")
-            line = raw_line.strip()
-            if not line:
-                raise _OwnershipUnproven("пустая строка")
-            try:
-                ev = json.loads(line)
-            except ValueError as exc:
-                raise _OwnershipUnproven(f"невалидный JSON: {exc}") from exc
-            if not isinstance(ev, dict):
-                raise _OwnershipUnproven("JSON-значение не является объектом")
-            event_type = _ownership_text(ev, "event")
-            if not event_type:
-                raise _OwnershipUnproven("событие без доказанного типа")
-            yield event_type, ev
+    yield from _strict_snapshot()
 
 
-def _strict_journal_events(event_type: str) -> list:
-    """Строгий read-only список событий одного типа (см. :func:`_iter_strict_events`)."""
-    return [ev for actual, ev in _iter_strict_events() if actual == event_type]
+def _strict_fold_events(name: str) -> list:
+    """Копии событий, собранных строгой свёрткой *name* (см. :func:`_events_of_type_step`)."""
+    with _JOURNAL_LOCK:
+        state = _strict_fold_state(name) or {}
+        return [dict(ev) for ev in state.get("events", ())]
 
 
 def _proven_positive_amount(raw):
@@ -1911,51 +3297,11 @@ def get_exit_binding_candidates() -> dict:
     вызывающий код по точной идентичности (symbol, side, positionIdx, size,
     avgPrice) — журнал её не заменяет.
     """
-    candidates: dict = {}
     try:
-        for event_type, ev in _iter_strict_events():
-            if event_type != ENTRY_PLACED:
-                continue
-            symbol, order_id, order_link_id = _ownership_identity(ev)
-            if not symbol or not order_id:
-                # Старый вход без точного order_id план не доказывает, но
-                # порчей журнала не является.
-                continue
-            # Сторона читается СЫРОЙ, без _ownership_text(): тот обрезает
-            # пробелы, и " LONG " дошло бы до перевода уже «починенным», то есть
-            # запись вне контракта журнала стала бы доказанным направлением.
-            # Общий helper при этом не меняется: у остальных его потребителей
-            # своя, уже существующая semantics.
-            raw_side = ev.get("side")
-            position_side = entry_side_to_position_side(raw_side)
-            if not position_side:
-                # Сторона не является каноническим LONG/SHORT: отсутствует,
-                # обрамлена пробелами, написана в другом регистре, содержит
-                # сторону биржи или имеет неверный тип. Это расхождение
-                # контракта журнала, а не «сторона неизвестна». Угадывать
-                # направление запрещено, поэтому кандидат не создаётся и весь
-                # результат остаётся недоказанным — иначе предыдущий вход
-                # остался бы кандидатом этого символа.
-                raise _OwnershipUnproven(
-                    f"ENTRY_PLACED {symbol}: сторона {raw_side!r} вне контракта "
-                    f"{ENTRY_SIDE_LONG}/{ENTRY_SIDE_SHORT}"
-                )
-            qty = _proven_positive_amount(ev.get("qty"))
-            if qty is None:
-                raise _OwnershipUnproven(
-                    f"ENTRY_PLACED {symbol} без доказанного количества"
-                )
-            risk = _proven_risk_usdt(ev.get("planned_risk_usdt"))
-            if risk is None:
-                raise _OwnershipUnproven(
-                    f"ENTRY_PLACED {symbol} без доказанного риска"
-                )
-            candidates[symbol] = {
-                "order_id": order_id,
-                "order_link_id": order_link_id,
-                "side": position_side,
-                "qty": qty,
-                "planned_risk_usdt": risk,
+        with _JOURNAL_LOCK:
+            candidates = _strict_fold_state("binding")
+            return {
+                symbol: dict(info) for symbol, info in (candidates or {}).items()
             }
     except _OwnershipUnproven as exc:
         logging.warning(
@@ -1966,7 +3312,52 @@ def get_exit_binding_candidates() -> dict:
         logging.error("journal binding scan failed: %s", exc)
         return {}
 
-    return candidates
+
+def _binding_step(candidates: dict, event_type: str, ev: dict) -> None:
+    """Применяет одно строгое событие к карте :func:`get_exit_binding_candidates`."""
+    if event_type != ENTRY_PLACED:
+        return
+    symbol, order_id, order_link_id = _ownership_identity(ev)
+    if not symbol or not order_id:
+        # Старый вход без точного order_id план не доказывает, но
+        # порчей журнала не является.
+        return
+    # Сторона читается СЫРОЙ, без _ownership_text(): тот обрезает
+    # пробелы, и " LONG " дошло бы до перевода уже «починенным», то есть
+    # запись вне контракта журнала стала бы доказанным направлением.
+    # Общий helper при этом не меняется: у остальных его потребителей
+    # своя, уже существующая semantics.
+    raw_side = ev.get("side")
+    position_side = entry_side_to_position_side(raw_side)
+    if not position_side:
+        # Сторона не является каноническим LONG/SHORT: отсутствует,
+        # обрамлена пробелами, написана в другом регистре, содержит
+        # сторону биржи или имеет неверный тип. Это расхождение
+        # контракта журнала, а не «сторона неизвестна». Угадывать
+        # направление запрещено, поэтому кандидат не создаётся и весь
+        # результат остаётся недоказанным — иначе предыдущий вход
+        # остался бы кандидатом этого символа.
+        raise _OwnershipUnproven(
+            f"ENTRY_PLACED {symbol}: сторона {raw_side!r} вне контракта "
+            f"{ENTRY_SIDE_LONG}/{ENTRY_SIDE_SHORT}"
+        )
+    qty = _proven_positive_amount(ev.get("qty"))
+    if qty is None:
+        raise _OwnershipUnproven(
+            f"ENTRY_PLACED {symbol} без доказанного количества"
+        )
+    risk = _proven_risk_usdt(ev.get("planned_risk_usdt"))
+    if risk is None:
+        raise _OwnershipUnproven(
+            f"ENTRY_PLACED {symbol} без доказанного риска"
+        )
+    candidates[symbol] = {
+        "order_id": order_id,
+        "order_link_id": order_link_id,
+        "side": position_side,
+        "qty": qty,
+        "planned_risk_usdt": risk,
+    }
 
 
 def get_exit_binding_events() -> list | None:
@@ -1982,7 +3373,7 @@ def get_exit_binding_events() -> list | None:
     Журнал только читается: не исправляется и не мигрируется.
     """
     try:
-        return _strict_journal_events(EXIT_ORDER_BOUND)
+        return _strict_fold_events("exit_bound")
     except _OwnershipUnproven as exc:
         logging.warning(
             "journal exit binding events: журнал не доказан (%s) — связывание "
@@ -2008,7 +3399,7 @@ def get_tp_ladder_fill_events() -> list | None:
     Журнал только читается: не исправляется и не мигрируется.
     """
     try:
-        return _strict_journal_events(TP_LADDER_FILL_OBSERVED)
+        return _strict_fold_events("tp_fills")
     except _OwnershipUnproven as exc:
         logging.warning(
             "journal tp ladder fill events: журнал не доказан (%s) — наблюдение "
@@ -2154,7 +3545,9 @@ def get_exit_order_risk_evidence(events: list | None = None) -> dict:
     """
     if events is None:
         try:
-            events = _strict_journal_events(EXIT_ORDER_BOUND)
+            with _JOURNAL_LOCK:
+                state = _strict_fold_state("exit_risk") or {}
+                return {key: risk for key, risk in state.items() if risk is not None}
         except _OwnershipUnproven as exc:
             logging.warning(
                 "journal exit risk evidence: журнал не доказан (%s) — карта пуста",
@@ -2165,36 +3558,51 @@ def get_exit_order_risk_evidence(events: list | None = None) -> dict:
             logging.error("journal exit risk evidence failed: %s", exc)
             return {}
 
-    evidence: dict = {}
-    conflicting: set = set()
+    state: dict = {}
     for ev in events:
-        if not isinstance(ev, dict):
-            continue
-        if ev.get("event") != EXIT_ORDER_BOUND:
-            continue
-        symbol = normalize_symbol(ev.get("symbol"))
-        if not symbol:
-            continue
-        raw_exit_id = ev.get("exit_order_id")
-        if not isinstance(raw_exit_id, str):
-            continue
-        exit_order_id = raw_exit_id.strip()
-        if not exit_order_id:
-            continue
-        risk = _proven_risk_usdt(ev.get("planned_risk_usdt"))
-        if risk is None:
-            continue
-        key = (symbol, exit_order_id)
-        if key in conflicting:
-            continue
-        known = evidence.get(key)
-        if known is not None and known != risk:
-            # Противоречивое evidence знаменателем быть не может.
-            del evidence[key]
-            conflicting.add(key)
-            continue
-        evidence[key] = risk
-    return evidence
+        if isinstance(ev, dict):
+            _exit_risk_step(state, EXIT_ORDER_BOUND, ev)
+    return {key: risk for key, risk in state.items() if risk is not None}
+
+
+def _exit_risk_step(state: dict, event_type: str, ev: dict) -> None:
+    """Применяет одно событие к карте :func:`get_exit_order_risk_evidence`.
+
+    ``None`` в *state* — противоречивый ключ: он остаётся вне результата и
+    следующими записями не восстанавливается.
+    """
+    if event_type != EXIT_ORDER_BOUND or ev.get("event") != EXIT_ORDER_BOUND:
+        return
+    symbol = normalize_symbol(ev.get("symbol"))
+    if not symbol:
+        return
+    raw_exit_id = ev.get("exit_order_id")
+    if not isinstance(raw_exit_id, str):
+        return
+    exit_order_id = raw_exit_id.strip()
+    if not exit_order_id:
+        return
+    risk = _proven_risk_usdt(ev.get("planned_risk_usdt"))
+    if risk is None:
+        return
+    key = (symbol, exit_order_id)
+    if key in state and state[key] != risk:
+        # Противоречивое evidence знаменателем быть не может.
+        state[key] = None
+        return
+    state[key] = risk
+
+
+# Строгие свёртки, которые ведёт инкрементальный индекс: имя → шаг.
+_STRICT_FOLDS = (
+    ("owned", _ownership_step),
+    ("protection", _auto_protection_step),
+    ("strict_lifecycles", _strict_lifecycle_step),
+    ("binding", _binding_step),
+    ("exit_bound", _events_of_type_step(EXIT_ORDER_BOUND)),
+    ("tp_fills", _events_of_type_step(TP_LADDER_FILL_OBSERVED)),
+    ("exit_risk", _exit_risk_step),
+)
 
 
 # ---------------------------------------------------------------------------
@@ -2508,6 +3916,249 @@ def _cancel_batch_relevant(ev: dict, symbol: str) -> bool:
     )
 
 
+def _timeline_symbols(ev: dict) -> set:
+    """Нормализованные символы, в timeline которых попадает событие.
+
+    Для ``ORDER_CANCEL_BATCH`` — символы из ``symbols`` и из точных пар
+    ``SYMBOL:orderId`` (как в :func:`_cancel_batch_relevant`), для остальных —
+    собственный ``symbol``.
+    """
+    if ev.get("event") != ORDER_CANCEL_BATCH:
+        return {normalize_symbol(ev.get("symbol"))} - {""}
+    symbols = _cancel_batch_symbols(ev)
+    for field in _CANCEL_PAIR_FIELDS:
+        raw = ev.get(field)
+        if not isinstance(raw, list):
+            continue
+        for item in raw:
+            if not isinstance(item, str):
+                continue
+            head, sep, tail = item.partition(":")
+            if sep and tail.strip():
+                symbols.add(normalize_symbol(head))
+    return symbols - {""}
+
+
+def _line_timeline_symbols(raw_line: bytes) -> list:
+    symbols: set = set()
+    for ev in _tolerant_line_events(raw_line):
+        symbols |= _timeline_symbols(ev)
+    return sorted(symbols)
+
+
+# ---------------------------------------------------------------------------
+# Индекс строк активного сегмента по символу (для /timeline)
+# ---------------------------------------------------------------------------
+
+_TIMELINE_INDEX_VERSION = 1
+
+
+class _TimelineIndex:
+    """Смещения строк активного сегмента по нормализованному символу.
+
+    На диске — ``<JOURNAL_FILE>.timeline``: строка-заголовок с identity файла
+    и по одной JSON-записи ``[start, end, [symbols]]`` на каждую строку
+    журнала подряд с нуля. Записи дописываются вслед за append_event; это
+    только кеш: журнал authoritative, а несходящийся индекс пересобирается.
+    """
+
+    def __init__(self, path, identity):
+        self.path = str(path)
+        self.identity = identity
+        self.covered = 0
+        self.head = b""
+        self.tail = b""
+        self.by_symbol: dict = {}
+        self.pending: list = []
+
+    def add(self, start: int, end: int, symbols) -> None:
+        for symbol in symbols:
+            self.by_symbol.setdefault(symbol, []).append(start)
+        self.covered = end
+
+    def remember_signature(self, f) -> None:
+        f.seek(0)
+        self.head = f.read(min(self.covered, _INDEX_SIGNATURE_BYTES))
+        f.seek(self.covered - min(self.covered, _INDEX_SIGNATURE_BYTES))
+        self.tail = f.read(min(self.covered, _INDEX_SIGNATURE_BYTES))
+
+    def prefix_intact(self, f) -> bool:
+        f.seek(0)
+        if f.read(len(self.head)) != self.head:
+            return False
+        f.seek(self.covered - len(self.tail))
+        return f.read(len(self.tail)) == self.tail
+
+
+_TIMELINE: _TimelineIndex | None = None
+
+
+def timeline_index_path() -> str:
+    """Путь индекса timeline активного сегмента (рядом с JOURNAL_FILE)."""
+    return os.fspath(JOURNAL_FILE) + ".timeline"
+
+
+def _reset_timeline_index() -> None:
+    """Забывает индекс timeline (активный сегмент запечатан или заменён)."""
+    global _TIMELINE
+    _TIMELINE = None
+    try:
+        os.remove(timeline_index_path())
+    except FileNotFoundError:
+        pass
+
+
+def _load_timeline_index(f, identity, size) -> _TimelineIndex | None:
+    """Индекс timeline с диска либо ``None``, если он не сходится с файлом.
+
+    Записи обязаны идти подряд с нуля и не выходить за файл; первая и
+    последняя записи сверяются с содержимым журнала (границы строк и символы).
+    """
+    try:
+        with open(timeline_index_path(), "rb") as idx:
+            lines = idx.read().split(b"\n")
+    except FileNotFoundError:
+        return None
+    try:
+        header = json.loads(lines[0])
+        if (
+            header.get("version") != _TIMELINE_INDEX_VERSION
+            or tuple(header.get("identity") or ()) != identity
+        ):
+            return None
+        index = _TimelineIndex(JOURNAL_FILE, identity)
+        records = [json.loads(line) for line in lines[1:] if line]
+        for start, end, symbols in records:
+            if type(start) is not int or start != index.covered or end <= start:
+                return None
+            index.add(start, end, symbols)
+        if index.covered > size:
+            return None
+        for start, end, symbols in (records[:1] + records[-1:]):
+            f.seek(start - 1 if start else 0)
+            raw = f.read(end - start + (1 if start else 0))
+            if start and raw[:1] != b"\n":
+                return None
+            if raw[-1:] != b"\n" or _line_timeline_symbols(
+                raw[(1 if start else 0):-1]
+            ) != symbols:
+                return None
+    except (ValueError, TypeError, KeyError, AttributeError):
+        return None
+    index.remember_signature(f)
+    return index
+
+
+def _rebuild_timeline_index(identity) -> _TimelineIndex:
+    index = _TimelineIndex(JOURNAL_FILE, identity)
+    path = timeline_index_path()
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as idx:
+        idx.write(json.dumps({
+            "version": _TIMELINE_INDEX_VERSION, "identity": list(identity),
+        }) + "\n")
+    os.replace(tmp, path)
+    return index
+
+
+def _timeline_index() -> _TimelineIndex | None:
+    """Актуальный индекс timeline активного сегмента (под :data:`_JOURNAL_LOCK`).
+
+    Строки, дописанные после покрытого смещения (append_event или запись
+    мимо него), разбираются и дописываются в индекс; оборванная последняя
+    строка учитывается только в памяти, как tolerant-чтение. ``None`` —
+    активного файла нет.
+    """
+    global _TIMELINE
+    try:
+        f = open(JOURNAL_FILE, "rb")
+    except FileNotFoundError:
+        _TIMELINE = None
+        return None
+    with f:
+        st = os.fstat(f.fileno())
+        identity = (st.st_dev, st.st_ino)
+        index = _TIMELINE
+        if (
+            index is None
+            or index.path != str(JOURNAL_FILE)
+            or index.identity != identity
+            or st.st_size < index.covered
+            or not index.prefix_intact(f)
+        ):
+            index = _load_timeline_index(f, identity, st.st_size)
+            if index is None:
+                index = _rebuild_timeline_index(identity)
+        f.seek(index.covered)
+        chunk = f.read()
+        end = chunk.rfind(b"\n") + 1
+        records = []
+        start = index.covered
+        for raw_line in chunk[:end].split(b"\n")[:-1] if end else ():
+            line_end = start + len(raw_line) + 1
+            symbols = _line_timeline_symbols(raw_line)
+            records.append(json.dumps([start, line_end, symbols]) + "\n")
+            index.add(start, line_end, symbols)
+            start = line_end
+        if records:
+            with open(timeline_index_path(), "a", encoding="utf-8") as idx:
+                idx.write("".join(records))
+            index.remember_signature(f)
+        index.pending = [
+            ev for ev in (
+                _tolerant_event(piece)
+                for piece in _decode_or_none(chunk[end:], "").splitlines()
+            )
+            if ev is not None
+        ]
+    _TIMELINE = index
+    return index
+
+
+def _timeline_events(symbol: str, limit: int) -> list:
+    """Последние *limit* событий timeline *symbol* в физическом порядке строк.
+
+    Читаются только строки, которые индекс относит к символу: активный
+    сегмент — по :class:`_TimelineIndex`, запечатанные — по их ``.idx``, от
+    новых к старым, пока не набрано *limit* событий.
+    """
+    collected: list = []
+
+    def take(events) -> bool:
+        for ev in reversed(events):
+            if symbol in _timeline_symbols(ev):
+                collected.append(ev)
+                if len(collected) >= limit:
+                    return True
+        return False
+
+    def take_lines(path, offsets) -> bool:
+        with open(path, "rb") as f:
+            for offset in reversed(offsets):
+                f.seek(offset)
+                if take(_tolerant_line_events(f.readline().rstrip(b"\n"))):
+                    return True
+        return False
+
+    with _JOURNAL_LOCK:
+        active = _timeline_index()
+        done = False
+        if active is not None:
+            done = take(active.pending) or take_lines(
+                os.fspath(JOURNAL_FILE), active.by_symbol.get(symbol, [])
+            )
+        for segment in reversed(_journal_segments()):
+            if done:
+                break
+            meta = _segment_meta(segment)
+            if meta is None:
+                done = take(_sealed_index(segment).events)
+            else:
+                done = take_lines(segment[0], meta["timeline"].get(symbol, []))
+    collected.reverse()
+    return collected
+
+
 def get_trade_timeline(symbol, limit: int = TIMELINE_DEFAULT_LIMIT) -> list:
     """Возвращает хронологию событий журнала по одному инструменту.
 
@@ -2531,6 +4182,10 @@ def get_trade_timeline(symbol, limit: int = TIMELINE_DEFAULT_LIMIT) -> list:
 
     ``limit`` применяется к ПОСЛЕДНИМ relevant-событиям; ``limit <= 0`` даёт
     пустой результат, некорректное значение — умолчание.
+
+    Журнал целиком не разбирается: индекс строк по символу
+    (:func:`_timeline_events`) ведёт прямо к последним ``limit`` relevant-строкам.
+    Сбой индекса — полный просмотр через :func:`read_events`.
     """
     normalized = normalize_symbol(symbol)
     if not normalized:
@@ -2545,8 +4200,16 @@ def get_trade_timeline(symbol, limit: int = TIMELINE_DEFAULT_LIMIT) -> list:
     if max_events <= 0:
         return []
 
+    try:
+        events = _timeline_events(normalized, max_events)
+    except Exception as exc:
+        logging.warning(
+            "journal timeline index failed (%s) — полный просмотр журнала", exc
+        )
+        events = [ev for ev in read_events() if normalized in _timeline_symbols(ev)]
+
     timeline: list = []
-    for ev in read_events():
+    for ev in events:
         if not isinstance(ev, dict):
             continue
         event_type = ev.get("event")
@@ -2613,6 +4276,256 @@ def get_trade_timeline(symbol, limit: int = TIMELINE_DEFAULT_LIMIT) -> list:
 # Статистика источников сигналов
 # ---------------------------------------------------------------------------
 
+def _tag_stats(pnls: list, rs: list) -> dict:
+    """Статистика одного источника по его сделкам в порядке строк журнала."""
+    wins   = sum(1 for p in pnls if p > 0)
+    losses = sum(1 for p in pnls if p <= 0)
+    total  = wins + losses
+
+    # Максимальная просадка: наибольшее падение кумулятивного PnL от пика до дна
+    max_dd, peak, cum = 0.0, 0.0, 0.0
+    for p in pnls:
+        cum += p
+        peak = max(peak, cum)
+        max_dd = max(max_dd, peak - cum)
+
+    # Текущая серия убытков (с последней сделки в обратном порядке)
+    streak = 0
+    for p in reversed(pnls):
+        if p <= 0:
+            streak += 1
+        else:
+            break
+
+    return {
+        "total_pnl":   round(sum(pnls), 2),
+        "wins":        wins,
+        "losses":      losses,
+        "winrate":     round(wins / total * 100, 1) if total else 0.0,
+        "avg_r":       round(sum(rs) / len(rs), 2) if rs else 0.0,
+        "max_dd":      round(max_dd, 2),
+        "loss_streak": streak,
+        "trade_count": total,
+        "last20":      [{"pnl": p, "R": r} for p, r in zip(pnls[-20:], rs[-20:])],
+    }
+
+
+def _tag_stats_numpy(pnls, rs) -> dict:
+    """То же, что :func:`_tag_stats`, векторно: накопленный максимум для
+    просадки и длина хвостовой серии ``pnl <= 0`` для серии убытков.
+
+    Все значения конечны (иначе столбцы помечены irregular), поэтому
+    cumsum и maximum.accumulate дают те же числа, что и построчный цикл.
+    """
+    n = len(pnls)
+    cum = _np.cumsum(pnls)
+    peak = _np.maximum(_np.maximum.accumulate(cum), 0.0)
+    losing = pnls <= 0
+    losses = int(losing.sum())
+    wins = n - losses
+    not_losing = _np.flatnonzero(~losing)
+    streak = n if not_losing.size == 0 else n - 1 - int(not_losing[-1])
+    return {
+        "total_pnl":   round(float(cum[-1]), 2),
+        "wins":        wins,
+        "losses":      losses,
+        "winrate":     round(wins / n * 100, 1),
+        "avg_r":       round(float(_np.cumsum(rs)[-1]) / n, 2),
+        "max_dd":      round(max(0.0, float((peak - cum).max())), 2),
+        "loss_streak": streak,
+        "trade_count": n,
+        "last20":      [
+            {"pnl": p, "R": r}
+            for p, r in zip(pnls[-20:].tolist(), rs[-20:].tolist())
+        ],
+    }
+
+
+class _ClosedColumns:
+    """События CLOSED столбцами: ts, id тега источника, pnl, R.
+
+    Строки идут в порядке :func:`read_events` с ``event_type=CLOSED``. Столбцы —
+    компактные ``array`` (без dict на сделку); numpy, если установлен,
+    читает их без копирования. Событие, которое столбцами точно не выразить
+    (нечисловой или нечисловой-строкой ts, тег не строка, pnl/R не
+    конечное число), помечает столбцы ``irregular``: тогда статистика
+    считается прежним построчным путём с его же ошибками.
+    """
+
+    def __init__(self):
+        self.ts = array("d")
+        self.tag = array("q")
+        self.pnl = array("d")
+        self.r = array("d")
+        self.tags: list = []
+        self.tag_ids: dict = {}
+        self.irregular = False
+        # Для активного сегмента: чей список CLOSED и сколько из него учтено.
+        self.source = None
+        self.consumed = 0
+
+    def add(self, ev: dict) -> None:
+        if self.irregular:
+            return
+        ts = ev.get("ts", 0)
+        tag = ev.get("source_tag") or "unknown"
+        try:
+            pnl = float(ev.get("pnl_usdt", 0.0))
+            r = float(ev.get("R", 0.0))
+        except (TypeError, ValueError):
+            self.irregular = True
+            return
+        if (
+            type(ts) not in (int, float)
+            or type(tag) is not str
+            or not math.isfinite(pnl)
+            or not math.isfinite(r)
+        ):
+            self.irregular = True
+            return
+        tag_id = self.tag_ids.get(tag)
+        if tag_id is None:
+            tag_id = self.tag_ids[tag] = len(self.tags)
+            self.tags.append(tag)
+        self.ts.append(ts)
+        self.tag.append(tag_id)
+        self.pnl.append(pnl)
+        self.r.append(r)
+
+    def extend(self, other: "_ClosedColumns") -> None:
+        if other.irregular:
+            self.irregular = True
+        if self.irregular:
+            return
+        remap = array("q", (self._tag_id(tag) for tag in other.tags))
+        self.ts.extend(other.ts)
+        self.tag.extend(remap[tag_id] for tag_id in other.tag)
+        self.pnl.extend(other.pnl)
+        self.r.extend(other.r)
+
+    def _tag_id(self, tag: str) -> int:
+        tag_id = self.tag_ids.get(tag)
+        if tag_id is None:
+            tag_id = self.tag_ids[tag] = len(self.tags)
+            self.tags.append(tag)
+        return tag_id
+
+    def windows(self, windows: dict) -> dict:
+        """Статистика источников для всех окон ``{имя: since_ts}`` за один проход."""
+        if _np is not None:
+            return self._windows_numpy(windows)
+        result = {}
+        for name, since_ts in windows.items():
+            groups: dict = {}
+            ts, pnl, r = self.ts, self.pnl, self.r
+            for row, tag_id in enumerate(self.tag):
+                if since_ts and ts[row] < since_ts:
+                    continue
+                pnls, rs = groups.setdefault(tag_id, ([], []))
+                pnls.append(pnl[row])
+                rs.append(r[row])
+            result[name] = {
+                self.tags[tag_id]: _tag_stats(pnls, rs)
+                for tag_id, (pnls, rs) in groups.items()
+            }
+        return result
+
+    def _windows_numpy(self, windows: dict) -> dict:
+        ts = _np.frombuffer(self.ts, dtype=_np.float64)
+        tags = _np.frombuffer(self.tag, dtype=_np.int64)
+        pnl = _np.frombuffer(self.pnl, dtype=_np.float64)
+        r = _np.frombuffer(self.r, dtype=_np.float64)
+        result = {}
+        for name, since_ts in windows.items():
+            rows = _np.flatnonzero(~(ts < since_ts)) if since_ts else _np.arange(len(ts))
+            window_tags = tags[rows]
+            order = _np.argsort(window_tags, kind="stable")
+            bounds = _np.flatnonzero(_np.diff(window_tags[order])) + 1
+            groups = _np.split(rows[order], bounds) if len(rows) else []
+            # Порядок источников — по первой сделке в окне, как у построчного пути.
+            groups.sort(key=lambda group: group[0])
+            result[name] = {
+                self.tags[int(tags[group[0]])]: _tag_stats_numpy(pnl[group], r[group])
+                for group in groups
+            }
+        return result
+
+
+# Столбцы CLOSED запечатанных сегментов (ключ — сегмент, как у _SEALED) и
+# активного сегмента; дописываются по мере роста индекса журнала.
+_CLOSED_SEALED: dict = {}
+_CLOSED_ACTIVE: _ClosedColumns | None = None
+
+
+def _closed_columns(since_ts: float = 0.0) -> _ClosedColumns:
+    """CLOSED журнала столбцами (под :data:`_JOURNAL_LOCK`).
+
+    Запечатанный сегмент переводится в столбцы один раз; у активного
+    добавляются только события, появившиеся в индексе после прошлого вызова.
+    Новый индекс (пересборка, ротация) — столбцы активного строятся заново.
+    Запечатанные сегменты, целиком более ранние, чем ``since_ts`` (по их
+    ``.idx``), пропускаются, как в :func:`read_events`.
+    """
+    global _CLOSED_ACTIVE
+    combined = _ClosedColumns()
+    index = _journal_index()
+    if index is None:
+        return combined
+    for segment in index.segments:
+        if since_ts:
+            meta = _segment_meta(segment)
+            if meta is not None and meta["max_ts"] is not None and meta["max_ts"] < since_ts:
+                continue
+        columns = _CLOSED_SEALED.get(segment)
+        if columns is None:
+            columns = _ClosedColumns()
+            for ev in _sealed_source(segment, CLOSED, 0.0, None):
+                columns.add(ev)
+            _CLOSED_SEALED[segment] = columns
+        combined.extend(columns)
+    active = _CLOSED_ACTIVE
+    closed = index.by_type.get(CLOSED, [])
+    if active is None or active.source is not closed:
+        active = _ClosedColumns()
+        active.source = closed
+    for ev in closed[active.consumed:]:
+        active.add(ev)
+    active.consumed = len(closed)
+    _CLOSED_ACTIVE = active
+    combined.extend(active)
+    for ev in index.pending:
+        if ev.get("event") == CLOSED:
+            combined.add(ev)
+    return combined
+
+
+def compute_source_stats_windows(windows: dict) -> dict:
+    """
+    Статистика источников сразу для нескольких окон: ``{имя: since_ts}`` →
+    ``{имя: статистика как у compute_source_stats(since_ts=...)}``.
+
+    Журнал не перечитывается на каждое окно: все окна считаются по одним и тем
+    же столбцам CLOSED (:class:`_ClosedColumns`), которые ведутся
+    инкрементально. Если столбцы недоступны или событие в них не выразить,
+    каждое окно считается прежним построчным путём.
+    """
+    # Сегмент, целиком более ранний, чем самое широкое окно, не нужен ни одному.
+    since_values = list(windows.values())
+    floor = min(since_values) if since_values and all(since_values) else 0.0
+    try:
+        with _JOURNAL_LOCK:
+            columns = _closed_columns(floor)
+    except Exception as exc:
+        logging.error("journal source stats columns failed: %s", exc)
+        columns = None
+    if columns is None or columns.irregular:
+        return {
+            name: compute_source_stats(read_events(event_type=CLOSED, since_ts=since_ts))
+            for name, since_ts in windows.items()
+        }
+    return columns.windows(windows)
+
+
 def compute_source_stats(
     events: list | None = None,
     since_ts: float = 0.0,
@@ -2620,55 +4533,24 @@ def compute_source_stats(
     """
     Рассчитывает статистику по источникам из событий CLOSED.
 
+    Без ``events`` статистика считается по столбцам CLOSED журнала
+    (:func:`compute_source_stats_windows`); с явным списком — построчно.
+
     Возвращает:
         {source_tag: {total_pnl, wins, losses, winrate, avg_r, max_dd,
                       loss_streak, trade_count, last20}}
     """
     if events is None:
-        events = read_events(event_type=CLOSED, since_ts=since_ts)
+        return compute_source_stats_windows({"stats": since_ts})["stats"]
 
-    raw: dict = {}   # tag → список {"pnl": float, "R": float}
+    raw: dict = {}   # tag → ([pnl, ...], [R, ...])
     for ev in events:
         tag = ev.get("source_tag") or "unknown"
-        raw.setdefault(tag, []).append(
-            {"pnl": float(ev.get("pnl_usdt", 0.0)), "R": float(ev.get("R", 0.0))}
-        )
+        pnls, rs = raw.setdefault(tag, ([], []))
+        pnls.append(float(ev.get("pnl_usdt", 0.0)))
+        rs.append(float(ev.get("R", 0.0)))
 
-    stats: dict = {}
-    for tag, trades in raw.items():
-        pnls = [t["pnl"] for t in trades]
-        rs   = [t["R"]   for t in trades]
-        wins   = sum(1 for p in pnls if p > 0)
-        losses = sum(1 for p in pnls if p <= 0)
-        total  = wins + losses
-
-        # Максимальная просадка: наибольшее падение кумулятивного PnL от пика до дна
-        max_dd, peak, cum = 0.0, 0.0, 0.0
-        for p in pnls:
-            cum += p
-            peak = max(peak, cum)
-            max_dd = max(max_dd, peak - cum)
-
-        # Текущая серия убытков (с последней сделки в обратном порядке)
-        streak = 0
-        for p in reversed(pnls):
-            if p <= 0:
-                streak += 1
-            else:
-                break
-
-        stats[tag] = {
-            "total_pnl":   round(sum(pnls), 2),
-            "wins":        wins,
-            "losses":      losses,
-            "winrate":     round(wins / total * 100, 1) if total else 0.0,
-            "avg_r":       round(sum(rs) / len(rs), 2) if rs else 0.0,
-            "max_dd":      round(max_dd, 2),
-            "loss_streak": streak,
-            "trade_count": total,
-            "last20":      trades[-20:],
-        }
-    return stats
+    return {tag: _tag_stats(pnls, rs) for tag, (pnls, rs) in raw.items()}
 
 
 # ---------------------------------------------------------------------------
@@ -2692,13 +4574,21 @@ def check_and_quarantine_sources(
     """
     newly_quarantined = []
 
-    # Вычисляем статистику по требованию, если не передана
+    # Вычисляем статистику по требованию, если не передана: все нужные окна
+    # считаются за один проход по столбцам CLOSED.
+    now = time.time()
+    windows = {}
     if stats is None:
-        stats = compute_source_stats()
+        windows["stats"] = 0.0
     if daily_stats is None and QUARANTINE_DAILY_PNL_USDT != 0:
-        daily_stats = compute_source_stats(since_ts=time.time() - 86400)
+        windows["daily"] = now - 86400
     if weekly_stats is None and QUARANTINE_WEEKLY_PNL_USDT != 0:
-        weekly_stats = compute_source_stats(since_ts=time.time() - 7 * 86400)
+        windows["weekly"] = now - 7 * 86400
+    if windows:
+        computed = compute_source_stats_windows(windows)
+        stats = computed.get("stats", stats)
+        daily_stats = computed.get("daily", daily_stats)
+        weekly_stats = computed.get("weekly", weekly_stats)
 
     all_tags = set(stats.keys())
     if daily_stats:
@@ -0,0 +1,306 @@
+"""
+Компактная двоичная кодировка журнала сделок (trade_journal.jsonl).
+
+Журнал остаётся JSONL: это формат записи, аудита и тестов. Компактная форма —
+производная копия (кеш) того же содержимого, которую быстрее разбирать:
+большинство событий повторяют одни и те же ключи и строки типа/символа, и
+в компактной форме они хранятся один раз.
+
+Формат (версия 2): магия ``TJC\\x02``, затем записи подряд и в конце
+``END``. Запись — заголовок
+``<kind:u8><length:u32 LE><jsonl_len:u32 LE><crc:u32 LE>`` и ``length`` байт
+payload; ``jsonl_len`` — длина соответствующей строки JSONL вместе с ``\\n``
+(для служебных записей 0), поэтому смещения строк исходного файла
+восстанавливаются без повторного кодирования. ``crc`` — CRC-32 полей
+заголовка и payload, продолжающий CRC предыдущей записи (первой — CRC
+магии): повреждённая, выпавшая или переставленная запись ломает цепочку, а
+файл без ``END`` считается оборванным. Payload служебных записей — JSON,
+поэтому формат не зависит от версии Python.
+
+  * ``META``   — JSON-объект, заданный вызывающим (например, размер и sha256
+    исходного файла); в JSONL не попадает;
+  * ``STRING`` — UTF-8 строка, добавляется в таблицу интернирования
+    (значения ``event`` и ``symbol``);
+  * ``SHAPE``  — JSON ``[ключи, позиции интернированных значений]``,
+    добавляется в таблицу форм событий;
+  * ``EVENT``  — JSON ``[shape_id, значения]``. Так хранится только
+    строка, совпадающая побайтово с ``json.dumps(event, ensure_ascii=False)``
+    для JSON-объекта — ровно то, что пишет append_event;
+  * ``RAW``    — любая другая строка как есть (битая, не-объект, не в UTF-8,
+    неканоническая запись), без ``\\n``;
+  * ``TAIL``   — оборванная последняя строка без ``\\n``;
+  * ``END``    — пустая завершающая запись.
+
+Строка, которую нельзя восстановить побайтово, хранится как RAW, поэтому
+JSONL → компактная форма → JSONL даёт исходные байты, а разбор RAW-строк
+остаётся за тем же кодом, что и у JSONL (аномалия остаётся аномалией).
+Таблицы ведутся потоково: запись таблицы всегда идёт до первого
+использования, и декодер читает файл одним проходом.
+
+Модуль чистый: журнал он не импортирует и состояния не держит.
+
+Конвертация для аудита::
+
+    python -m core.journal_codec to-jsonl trade_journal.jsonl.000001.tjc out.jsonl
+    python -m core.journal_codec to-compact trade_journal.jsonl out.tjc
+"""
+
+import json
+import os
+import struct
+import zlib
+
+MAGIC = b"TJC\x02"
+
+META = 0
+STRING = 1
+SHAPE = 2
+EVENT = 3
+RAW = 4
+TAIL = 5
+END = 6
+
+# Значения этих ключей (если это строки) хранятся индексом в таблице строк.
+INTERNED_KEYS = ("event", "symbol")
+
+_HEADER = struct.Struct("<BIII")
+_CRC_FIELDS = struct.Struct("<BII")
+_READ_CHUNK = 1 << 20
+_COMPACT_JSON = {"ensure_ascii": False, "separators": (",", ":")}
+
+
+class CompactFormatError(ValueError):
+    """Компактный файл повреждён, оборван или не того формата."""
+
+
+def _record_crc(prev: int, kind: int, payload, jsonl_len: int) -> int:
+    crc = zlib.crc32(_CRC_FIELDS.pack(kind, len(payload), jsonl_len), prev)
+    return zlib.crc32(payload, crc)
+
+
+def _json_payload(value) -> bytes:
+    return json.dumps(value, **_COMPACT_JSON).encode("utf-8")
+
+
+def _canonical_event(raw_line: bytes):
+    """JSON-объект строки, если строка — его каноническая запись; иначе ``None``."""
+    try:
+        text = raw_line.decode("utf-8")
+        ev = json.loads(text)
+    except (UnicodeDecodeError, ValueError, RecursionError):
+        return None
+    if not isinstance(ev, dict):
+        return None
+    try:
+        if json.dumps(ev, ensure_ascii=False) != text:
+            return None
+    except (ValueError, RecursionError):
+        return None
+    return ev
+
+
+class CompactEncoder:
+    """Потоковый кодировщик строк JSONL (таблицы растут по мере записи)."""
+
+    def __init__(self):
+        self._strings: dict = {}
+        self._shapes: dict = {}
+        self._crc = zlib.crc32(MAGIC)
+
+    def _record(self, kind: int, payload: bytes, jsonl_len: int = 0) -> bytes:
+        self._crc = _record_crc(self._crc, kind, payload, jsonl_len)
+        return _HEADER.pack(kind, len(payload), jsonl_len, self._crc) + payload
+
+    def header(self, meta: dict | None = None) -> bytes:
+        """Магия и необязательная META-запись; пишется один раз в начало."""
+        out = MAGIC
+        if meta is not None:
+            out += self._record(META, json.dumps(meta, sort_keys=True).encode("utf-8"))
+        return out
+
+    def footer(self) -> bytes:
+        """Завершающая запись ``END``; без неё файл считается оборванным."""
+        return self._record(END, b"")
+
+    def encode_line(self, raw_line: bytes, terminated: bool = True) -> bytes:
+        """Записи для одной строки JSONL (``raw_line`` без ``\\n``)."""
+        if not terminated:
+            return self._record(TAIL, raw_line, len(raw_line))
+        ev = _canonical_event(raw_line)
+        if ev is None:
+            return self._record(RAW, raw_line, len(raw_line) + 1)
+        out = []
+        keys = tuple(ev)
+        values = list(ev.values())
+        interned = []
+        for pos, key in enumerate(keys):
+            if key in INTERNED_KEYS and type(values[pos]) is str:
+                values[pos] = self._intern(values[pos], out)
+                interned.append(pos)
+        shape = (keys, tuple(interned))
+        shape_id = self._shapes.get(shape)
+        if shape_id is None:
+            shape_id = self._shapes[shape] = len(self._shapes)
+            out.append(self._record(SHAPE, _json_payload([keys, interned])))
+        out.append(self._record(
+            EVENT, _json_payload([shape_id, values]), len(raw_line) + 1,
+        ))
+        return b"".join(out)
+
+    def _intern(self, text: str, out: list) -> int:
+        string_id = self._strings.get(text)
+        if string_id is None:
+            string_id = self._strings[text] = len(self._strings)
+            out.append(self._record(STRING, text.encode("utf-8")))
+        return string_id
+
+
+def encode_jsonl(data: bytes, meta: dict | None = None) -> bytes:
+    """Компактная форма байтов JSONL целиком."""
+    encoder = CompactEncoder()
+    parts = [encoder.header(meta)]
+    lines = data.split(b"\n")
+    for raw_line in lines[:-1]:
+        parts.append(encoder.encode_line(raw_line))
+    if lines[-1]:
+        parts.append(encoder.encode_line(lines[-1], terminated=False))
+    parts.append(encoder.footer())
+    return b"".join(parts)
+
+
+def _read_exact(f, buffer: bytearray, pos: int, size: int):
+    """Дочитывает *buffer* так, чтобы с *pos* было не меньше *size* байт."""
+    if len(buffer) - pos >= size:
+        return buffer, pos
+    buffer = buffer[pos:]
+    while len(buffer) < size:
+        chunk = f.read(max(_READ_CHUNK, size - len(buffer)))
+        if not chunk:
+            raise CompactFormatError("компактный файл оборван")
+        buffer += chunk
+    return buffer, 0
+
+
+def iter_records(f):
+    """Поток ``(kind, jsonl_len, value)`` из открытого в ``rb`` файла.
+
+    ``value`` — dict для EVENT, байты строки для RAW/TAIL, dict для META.
+    Служебные STRING/SHAPE/END поглощаются декодером и наружу не выходят.
+    Нарушение формата — в том числе несошедшийся CRC, данные после ``END``
+    и файл без ``END`` — поднимает :class:`CompactFormatError`.
+    """
+    if f.read(len(MAGIC)) != MAGIC:
+        raise CompactFormatError("нет сигнатуры компактного журнала")
+    strings: list = []
+    shapes: list = []
+    buffer = bytearray()
+    pos = 0
+    crc = zlib.crc32(MAGIC)
+    header_size = _HEADER.size
+    while True:
+        if pos == len(buffer):
+            buffer, pos = bytearray(f.read(_READ_CHUNK)), 0
+            if not buffer:
+                raise CompactFormatError("компактный файл оборван: нет END")
+        buffer, pos = _read_exact(f, buffer, pos, header_size)
+        kind, length, jsonl_len, stored_crc = _HEADER.unpack_from(buffer, pos)
+        buffer, pos = _read_exact(f, buffer, pos, header_size + length)
+        payload = bytes(buffer[pos + header_size:pos + header_size + length])
+        pos += header_size + length
+        crc = _record_crc(crc, kind, payload, jsonl_len)
+        if crc != stored_crc:
+            raise CompactFormatError("контрольная сумма записи не совпала")
+        try:
+            if kind == EVENT:
+                shape_id, values = json.loads(payload)
+                if type(shape_id) is not int or shape_id < 0:
+                    raise CompactFormatError("номер формы не является индексом")
+                keys, interned = shapes[shape_id]
+                if type(values) is not list or len(values) != len(keys):
+                    raise CompactFormatError("значений не столько, сколько ключей")
+                for at in interned:
+                    string_id = values[at]
+                    if type(string_id) is not int or string_id < 0:
+                        raise CompactFormatError("номер строки не является индексом")
+                    values[at] = strings[string_id]
+                yield EVENT, jsonl_len, dict(zip(keys, values))
+            elif kind == STRING:
+                strings.append(payload.decode("utf-8"))
+            elif kind == SHAPE:
+                keys, interned = json.loads(payload)
+                shapes.append((tuple(keys), tuple(interned)))
+            elif kind in (RAW, TAIL):
+                yield kind, jsonl_len, payload
+            elif kind == META:
+                yield META, 0, json.loads(payload)
+            elif kind == END:
+                if pos != len(buffer) or f.read(1):
+                    raise CompactFormatError("данные после END")
+                return
+            else:
+                raise CompactFormatError(f"неизвестный тип записи {kind}")
+        except CompactFormatError:
+            raise
+        except (ValueError, TypeError, IndexError, KeyError) as exc:
+            raise CompactFormatError(f"повреждённая запись: {exc}") from exc
+
+
+def iter_jsonl_lines(f):
+    """Строки исходного JSONL (байты вместе с ``\\n``) из компактного файла."""
+    for kind, _jsonl_len, value in iter_records(f):
+        if kind == EVENT:
+            yield (json.dumps(value, ensure_ascii=False) + "\n").encode("utf-8")
+        elif kind == RAW:
+            yield value + b"\n"
+        elif kind == TAIL:
+            yield value
+
+
+def _write_replacing(path: str, chunks) -> None:
+    tmp = f"{path}.tmp"
+    with open(tmp, "wb") as out:
+        for chunk in chunks:
+            out.write(chunk)
+        out.flush()
+        os.fsync(out.fileno())
+    os.replace(tmp, path)
+
+
+def write_compact(dst: str, data: bytes, meta: dict | None = None) -> None:
+    """Пишет компактную форму байтов JSONL в *dst* (tmp + fsync + replace)."""
+    _write_replacing(dst, [encode_jsonl(data, meta)])
+
+
+def jsonl_to_compact(src: str, dst: str, meta: dict | None = None) -> None:
+    """Конвертирует файл JSONL в компактную форму."""
+    with open(src, "rb") as f:
+        data = f.read()
+    write_compact(dst, data, meta)
+
+
+def compact_to_jsonl(src: str, dst: str) -> None:
+    """Восстанавливает исходный JSONL побайтово из компактного файла."""
+    with open(src, "rb") as f:
+        _write_replacing(dst, iter_jsonl_lines(f))
+
+
+def _main(argv=None) -> int:
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        prog="python -m core.journal_codec",
+        description="Lossless conversion between JSONL and compact journal files.",
+    )
+    parser.add_argument("direction", choices=("to-compact", "to-jsonl"))
+    parser.add_argument("src")
+    parser.add_argument("dst")
+    args = parser.parse_args(argv)
+    if args.direction == "to-compact":
+        jsonl_to_compact(args.src, args.dst)
+    else:
+        compact_to_jsonl(args.src, args.dst)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(_main())
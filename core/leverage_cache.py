@@ -0,0 +1,125 @@
+"""
+Кеш текущего плеча по символу (category=linear).
+
+Сигнал и подтверждение Market раньше всегда отправляли ``set_leverage``;
+обычно биржа отвечала 110043 ("not modified"), а приватная запись всё равно
+занимала round trip и лимит торгового эндпоинта. Теперь запись уходит только
+если плечо символа не доказано равным цели:
+
+  * каждый успешный ``get_positions`` через :func:`core.bybit_call.bybit_call`
+    засевает кеш полем ``leverage`` строк ответа. Запрос по одному символу
+    (проверка конфликта сигнала) возвращает строку и без позиции, поэтому
+    на пути сигнала кеш засеян чтением секундной давности;
+  * успешная запись и 110043 запоминают записанное значение, любой другой
+    исход записи — сбрасывает символ (плечо не доказано);
+  * строки одного символа с разным плечом (hedge mode) и строка без
+    разборного ``leverage`` сбрасывают символ;
+  * чтение, отправленное раньше последней записи символа, кеш не меняет;
+  * значение старше LEVERAGE_CACHE_TTL_SEC (от отправки доказавшего запроса)
+    не доказывает ничего: плечо могли сменить вручную на сайте биржи.
+
+Переменные окружения:
+  LEVERAGE_CACHE_TTL_SEC — 300 (секунды); 0 = запись на каждом сигнале, как раньше
+"""
+import logging
+import os
+import time
+from collections import namedtuple
+from decimal import Decimal, InvalidOperation
+
+# Читается напрямую из окружения (как INSTRUMENT_CACHE_TTL_SEC): модуль нужен
+# bybit_call и там, где core.config заменён заглушкой.
+try:
+    LEVERAGE_CACHE_TTL_SEC = max(0.0, float(os.getenv("LEVERAGE_CACHE_TTL_SEC", 300)))
+except ValueError:
+    LEVERAGE_CACHE_TTL_SEC = 300.0
+
+_Entry = namedtuple("_Entry", ("leverage", "proven_at"))
+
+# symbol → _Entry
+_LEVERAGE: dict = {}
+# symbol → time.monotonic() отправки последней записи плеча
+_WRITTEN: dict = {}
+
+
+def _parse_leverage(raw):
+    if isinstance(raw, bool) or not isinstance(raw, (str, int)):
+        return None
+    try:
+        value = Decimal(str(raw).strip())
+    except InvalidOperation:
+        return None
+    return value if value.is_finite() and value > 0 else None
+
+
+def forget_leverage(symbol: str | None = None) -> None:
+    """Сбрасывает символ (или весь кеш при ``symbol=None``)."""
+    if symbol is None:
+        _LEVERAGE.clear()
+        return
+    _LEVERAGE.pop(symbol, None)
+
+
+def leverage_is_set(symbol: str, leverage) -> bool:
+    """True, если плечо *symbol* доказанно равно *leverage* (запись не нужна)."""
+    if LEVERAGE_CACHE_TTL_SEC <= 0:
+        return False
+    cached = _LEVERAGE.get(symbol)
+    target = _parse_leverage(leverage)
+    if cached is None or target is None:
+        return False
+    if time.monotonic() - cached.proven_at > LEVERAGE_CACHE_TTL_SEC:
+        return False
+    return cached.leverage == target
+
+
+def note_leverage_write(symbol: str, leverage, requested_at: float, proven: bool) -> None:
+    """Итог записи плеча: ``proven`` — биржа приняла запись или ответила 110043."""
+    _WRITTEN[symbol] = max(_WRITTEN.get(symbol, float("-inf")), requested_at)
+    value = _parse_leverage(leverage)
+    if proven and value is not None:
+        _LEVERAGE[symbol] = _Entry(value, requested_at)
+    else:
+        forget_leverage(symbol)
+
+
+def note_positions_response(resp, requested_at: float) -> None:
+    """Засевает кеш строками успешного ответа ``get_positions`` (из bybit_call)."""
+    if not isinstance(resp, dict):
+        return
+    code = resp.get("retCode")
+    result = resp.get("result")
+    if type(code) is not int or code != 0 or not isinstance(result, dict):
+        return
+    rows = result.get("list")
+    if not isinstance(rows, list):
+        return
+
+    seen: dict = {}
+    for row in rows:
+        symbol = row.get("symbol") if isinstance(row, dict) else None
+        if not isinstance(symbol, str) or not symbol:
+            continue
+        value = _parse_leverage(row.get("leverage"))
+        if symbol in seen and seen[symbol] != value:
+            value = None
+        seen[symbol] = value
+
+    for symbol, value in seen.items():
+        cached = _LEVERAGE.get(symbol)
+        if _WRITTEN.get(symbol, float("-inf")) >= requested_at or (
+            cached is not None and cached.proven_at > requested_at
+        ):
+            continue
+        if value is None:
+            if symbol in _LEVERAGE:
+                logging.debug("Leverage cache: %s сброшен (плечо не доказано)", symbol)
+            forget_leverage(symbol)
+        else:
+            _LEVERAGE[symbol] = _Entry(value, requested_at)
+
+
+def reset_leverage_cache() -> None:
+    """Сбрасывает кеш и отметки записей (для тестов)."""
+    _LEVERAGE.clear()
+    _WRITTEN.clear()
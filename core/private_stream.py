@@ -0,0 +1,375 @@
+"""
+Приватный WebSocket-поток Bybit V5: топики position, order, execution.
+
+Опциональная подсистема (PRIVATE_STREAM_ENABLED). Прежде всего это сигнал
+пробуждения: об изменении любого топика поток сообщает вызывающему, чтобы
+auto-BE и exit binding реагировали на перенос SL, исполнение TP1 и закрытие за
+секунду, а не на следующем тике в 30–60 с. Дополнительно поток держит в памяти
+зеркало открытых позиций аккаунта (category=linear) для информационных
+читателей (пульс); ордера и исполнения не зеркалируются — их топики только
+будят задачи.
+
+Контракт доказательств не меняется:
+
+  * решения о записи (перенос SL, durable-факты TP1/1R) по-прежнему принимаются
+    только по REST-снимку и REST read-back. Событие потока — лишь сигнал
+    «состояние изменилось, перечитай сейчас», а не доказательство; зеркало
+    позиций читают только те, кто ничего не пишет на биржу и в журнал;
+  * зеркало считается пригодным только после засева из REST-снимка и пока поток
+    жив (сообщение или pong не старше ``max_age``). Разрыв соединения сразу
+    делает зеркало непригодным до следующего засева: пропущенные за время
+    разрыва события ничем не восстанавливаются, кроме REST;
+  * устаревший или выключенный поток ничего не ломает — периодические задачи
+    и информационные читатели работают по REST как раньше.
+
+Поток живёт в отдельном daemon-потоке на синхронном ``websocket-client``
+(уже зависимость pybit): цикл событий бота он не блокирует, а уведомления
+передаёт через колбэк ``on_change(topics)``, вызываемый из этого потока —
+переносить их в цикл событий обязан вызывающий (``call_soon_threadsafe``).
+
+Сети в модуле нет, кроме самого WebSocket; ключи в лог не пишутся.
+"""
+import hashlib
+import hmac
+import json
+import logging
+import threading
+import time
+
+import websocket
+
+TOPIC_POSITION = "position"
+TOPIC_ORDER = "order"
+TOPIC_EXECUTION = "execution"
+STREAM_TOPICS = (TOPIC_POSITION, TOPIC_ORDER, TOPIC_EXECUTION)
+# Псевдотопик: соединение (пере)подписано, зеркало нужно засеять из REST.
+STREAM_SUBSCRIBED = "subscribed"
+
+PRIVATE_STREAM_MAINNET_URL = "wss://stream.bybit.com/v5/private"
+# IS_DEMO у HTTP-сессии означает testnet=True, поэтому и поток — testnet.
+PRIVATE_STREAM_TESTNET_URL = "wss://stream-testnet.bybit.com/v5/private"
+
+# Срок жизни подписи auth: биржа отвергает запрос с истёкшим expires.
+_AUTH_EXPIRES_MS = 10_000
+
+
+def build_auth_message(api_key: str, api_secret: str, expires_ms: int) -> dict:
+    """Сообщение ``op=auth`` V5: HMAC-SHA256 от ``GET/realtime{expires}``."""
+    signature = hmac.new(
+        api_secret.encode("utf-8"),
+        f"GET/realtime{expires_ms}".encode("utf-8"),
+        hashlib.sha256,
+    ).hexdigest()
+    return {"op": "auth", "args": [api_key, expires_ms, signature]}
+
+
+def _version(row: dict) -> int:
+    """``updatedTime`` строки (мс) как версия; нечитаемое значение — 0."""
+    try:
+        return int(row.get("updatedTime") or 0)
+    except (TypeError, ValueError):
+        return 0
+
+
+def _position_key(row: dict):
+    symbol = row.get("symbol")
+    try:
+        idx = int(row.get("positionIdx", 0))
+    except (TypeError, ValueError):
+        return None
+    if not isinstance(symbol, str) or not symbol:
+        return None
+    return symbol, idx
+
+
+def _position_open(row: dict) -> bool:
+    try:
+        return float(row.get("size") or 0) > 0
+    except (TypeError, ValueError):
+        return False
+
+
+def _linear(row) -> bool:
+    return isinstance(row, dict) and row.get("category", "linear") == "linear"
+
+
+class PrivateStreamMirror:
+    """Потокобезопасное зеркало открытых позиций и свежести потока.
+
+    Строки хранятся как пришли от биржи. Более старая версия строки
+    (``updatedTime``) не затирает более новую, поэтому дельты, пришедшие во
+    время засева, переигрываются поверх REST-снимка без отката состояния.
+    Сообщения топиков order и execution только продлевают свежесть.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._positions: dict = {}
+        # key → версия удаления: засев не воскрешает уже закрытую позицию.
+        self._removed: dict = {}
+        self._connected = False
+        self._seeded = False
+        self._seed_buffer = None
+        self._last_message = None
+        # Номер соединения: засев, начатый в прошлом соединении, не применяется.
+        self._epoch = 0
+
+    # --- состояние соединения -------------------------------------------
+
+    def connected(self) -> None:
+        with self._lock:
+            self._connected = True
+            self._epoch += 1
+            self._last_message = time.monotonic()
+
+    def disconnected(self) -> None:
+        """Разрыв: события могли потеряться, зеркало ждёт нового засева."""
+        with self._lock:
+            self._connected = False
+            self._seeded = False
+            self._seed_buffer = None
+
+    def touch(self) -> None:
+        with self._lock:
+            self._last_message = time.monotonic()
+
+    @property
+    def needs_seed(self) -> bool:
+        with self._lock:
+            return self._connected and not self._seeded
+
+    def is_fresh(self, max_age: float) -> bool:
+        """Засеяно, соединено и последнее сообщение не старше ``max_age`` с."""
+        with self._lock:
+            return (
+                self._connected
+                and self._seeded
+                and self._last_message is not None
+                and time.monotonic() - self._last_message <= max_age
+            )
+
+    # --- засев из REST --------------------------------------------------
+
+    def begin_seed(self) -> int:
+        """Начинает запоминать дельты; вызывать ДО REST-запроса засева.
+
+        Возвращает номер соединения, который передаётся в :meth:`seed`.
+        """
+        with self._lock:
+            self._seed_buffer = []
+            return self._epoch
+
+    def seed(self, epoch: int, position_rows) -> bool:
+        """Заменяет позиции REST-снимком и переигрывает дельты после begin_seed.
+
+        Возвращает False без изменений, если соединение с begin_seed сменилось
+        или оборвалось: дельты между ними потеряны, нужен новый засев.
+        """
+        with self._lock:
+            if epoch != self._epoch or not self._connected or self._seed_buffer is None:
+                return False
+            buffered = self._seed_buffer
+            self._seed_buffer = None
+            self._positions.clear()
+            self._removed.clear()
+            for row in position_rows:
+                key = _position_key(row) if _linear(row) else None
+                if key is not None and _position_open(row):
+                    self._positions[key] = dict(row)
+            for rows in buffered:
+                self._apply_positions(rows)
+            self._seeded = True
+            return True
+
+    # --- дельты потока --------------------------------------------------
+
+    def apply(self, message: dict) -> str | None:
+        """Применяет сообщение топика; возвращает топик или None, если не данные."""
+        topic = message.get("topic")
+        rows = message.get("data")
+        if topic not in STREAM_TOPICS or not isinstance(rows, list):
+            return None
+        with self._lock:
+            self._last_message = time.monotonic()
+            if topic == TOPIC_POSITION:
+                rows = [row for row in rows if _linear(row)]
+                if self._seed_buffer is not None:
+                    self._seed_buffer.append(rows)
+                self._apply_positions(rows)
+        return topic
+
+    def _apply_positions(self, rows: list) -> None:
+        for row in rows:
+            key = _position_key(row)
+            if key is None:
+                continue
+            version = _version(row)
+            current = self._positions.get(key)
+            if current is not None and _version(current) > version:
+                continue
+            if self._removed.get(key, -1) > version:
+                continue
+            if _position_open(row):
+                self._positions[key] = dict(row)
+                self._removed.pop(key, None)
+            else:
+                self._positions.pop(key, None)
+                self._removed[key] = version
+
+    # --- чтение ---------------------------------------------------------
+
+    def positions(self, max_age: float) -> list | None:
+        """Копии открытых позиций или None, если зеркало не пригодно."""
+        if not self.is_fresh(max_age):
+            return None
+        with self._lock:
+            return [dict(row) for row in self._positions.values()]
+
+
+class PrivateStream:
+    """Фоновое соединение с приватным потоком и переподключением с backoff.
+
+    ``on_change(topics)`` вызывается из потока соединения с множеством
+    изменившихся топиков (или ``{STREAM_SUBSCRIBED}`` после (пере)подписки).
+    Исключение колбэка логируется и соединение не рвёт.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        api_key: str,
+        api_secret: str,
+        *,
+        mirror: PrivateStreamMirror | None = None,
+        on_change=None,
+        ping_interval: float = 20.0,
+        reconnect_delay: float = 1.0,
+        max_reconnect_delay: float = 30.0,
+        connect=None,
+    ):
+        self.url = url
+        self._api_key = api_key
+        self._api_secret = api_secret
+        self.mirror = mirror if mirror is not None else PrivateStreamMirror()
+        self._on_change = on_change
+        self._ping_interval = ping_interval
+        self._reconnect_delay = reconnect_delay
+        self._max_reconnect_delay = max_reconnect_delay
+        self._connect = connect or websocket.create_connection
+        self._stop = threading.Event()
+        self._thread = None
+        self._ws = None
+        self.reconnects = 0
+        # Соединение дошло до подписки: backoff после его разрыва начинается
+        # заново, а не с накопленной прежними сбоями задержки.
+        self._subscribed = False
+
+    def start(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="bybit-private-stream", daemon=True,
+        )
+        self._thread.start()
+
+    def stop(self, timeout: float | None = 5.0) -> None:
+        self._stop.set()
+        ws = self._ws
+        if ws is not None:
+            try:
+                ws.close()
+            except Exception:
+                pass
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def _notify(self, topics: set) -> None:
+        if not topics or self._on_change is None:
+            return
+        try:
+            self._on_change(topics)
+        except Exception:
+            logging.exception("Private stream: ошибка обработчика изменений")
+
+    def _run(self) -> None:
+        delay = self._reconnect_delay
+        while not self._stop.is_set():
+            self._subscribed = False
+            try:
+                self._session()
+            except Exception as e:
+                if self._stop.is_set():
+                    break
+                if self._subscribed:
+                    delay = self._reconnect_delay
+                logging.warning(
+                    "Private stream: соединение потеряно (%s), повтор через %.1f с",
+                    type(e).__name__, delay,
+                )
+            finally:
+                self.mirror.disconnected()
+                ws, self._ws = self._ws, None
+                if ws is not None:
+                    try:
+                        ws.close()
+                    except Exception:
+                        pass
+            if self._stop.wait(delay):
+                break
+            delay = min(delay * 2, self._max_reconnect_delay)
+            self.reconnects += 1
+
+    def _send(self, payload: dict) -> None:
+        self._ws.send(json.dumps(payload))
+
+    def _recv(self):
+        raw = self._ws.recv()
+        if not raw:
+            raise ConnectionError("private stream closed")
+        return json.loads(raw)
+
+    def _await_op(self, op: str) -> None:
+        """Ждёт ответ на ``op``; дельты данных, пришедшие раньше, применяет."""
+        while True:
+            message = self._recv()
+            if message.get("op") == op:
+                if message.get("success") is not True:
+                    raise PermissionError(f"{op} rejected: {message.get('ret_msg')}")
+                return
+            self._handle(message)
+
+    def _session(self) -> None:
+        self._ws = self._connect(self.url, timeout=self._ping_interval)
+        expires = int(time.time() * 1000) + _AUTH_EXPIRES_MS
+        self._send(build_auth_message(self._api_key, self._api_secret, expires))
+        self._await_op("auth")
+        self._send({"op": "subscribe", "args": list(STREAM_TOPICS)})
+        self._await_op("subscribe")
+        self.mirror.connected()
+        self._subscribed = True
+        logging.info("Private stream: подписка на %s активна", ", ".join(STREAM_TOPICS))
+        self._notify({STREAM_SUBSCRIBED})
+
+        silent_since = time.monotonic()
+        while not self._stop.is_set():
+            try:
+                message = self._recv()
+            except websocket.WebSocketTimeoutException:
+                # Тишина дольше двух интервалов пинга — соединение мертво.
+                if time.monotonic() - silent_since > 2 * self._ping_interval:
+                    raise
+                self._send({"op": "ping"})
+                continue
+            silent_since = time.monotonic()
+            self._handle(message)
+
+    def _handle(self, message) -> None:
+        if not isinstance(message, dict):
+            return
+        if message.get("op") in ("pong", "ping"):
+            self.mirror.touch()
+            return
+        topic = self.mirror.apply(message)
+        if topic is not None:
+            self._notify({topic})
@@ -0,0 +1,53 @@
+"""
+Token bucket для запросов к Bybit.
+
+Bybit ограничивает частоту запросов отдельно по каждому эндпоинту (окно —
+секунда). Вместо фиксированных пауз между запросами вызывающий резервирует
+токен: пока ведро не пусто, запрос уходит сразу, иначе ждёт ровно столько,
+сколько нужно для пополнения.
+
+Резервирование не крутит цикл: токен списывается сразу (баланс может уйти в
+минус), и вызывающий спит на время погашения долга. Поэтому параллельные
+задачи выстраиваются в очередь по порядку резервирования, а подменённый в
+тестах ``asyncio.sleep`` не превращается в бесконечный цикл.
+"""
+import asyncio
+import time
+
+
+class TokenBucket:
+    """Ведро на ``rate`` запросов в секунду с запасом ``capacity`` на всплеск."""
+
+    def __init__(self, rate: float, capacity: float):
+        if rate <= 0 or capacity <= 0:
+            raise ValueError("rate и capacity должны быть положительными")
+        self.rate = float(rate)
+        self.capacity = float(capacity)
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+
+    def reserve(self, tokens: float = 1.0) -> float:
+        """Списывает ``tokens`` и возвращает, сколько секунд нужно подождать."""
+        now = time.monotonic()
+        self._tokens = min(
+            self.capacity, self._tokens + (now - self._updated) * self.rate
+        )
+        self._updated = now
+        self._tokens -= tokens
+        return max(0.0, -self._tokens / self.rate)
+
+    async def acquire(self, tokens: float = 1.0) -> float:
+        """Ждёт своей очереди; возвращает фактическое ожидание в секундах."""
+        wait = self.reserve(tokens)
+        if wait > 0:
+            await asyncio.sleep(wait)
+        return wait
+
+    def drain(self, seconds: float) -> None:
+        """Опустошает ведро так, чтобы следующий запрос ждал ``seconds``.
+
+        Применяется, когда биржа сама сообщила об исчерпанном лимите.
+        """
+        now = time.monotonic()
+        self._updated = now
+        self._tokens = min(self._tokens, -max(0.0, seconds) * self.rate)
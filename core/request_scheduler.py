@@ -0,0 +1,291 @@
+"""
+Планировщик запросов Bybit: общий для всех вызовов :func:`core.bybit_call.bybit_call`.
+
+Когда несколько задач срабатывают одновременно, запросы раньше уходили
+пачкой и получали 10006 (rate limit), а алерты о них засоряли чат. Теперь
+каждый вызов проходит две очереди:
+
+  * token bucket своего эндпоинта (имя метода SDK). Ведро засеяно
+    документированным лимитом V5 (:data:`ENDPOINT_LIMITS`, с запасом
+    :data:`LIMIT_SAFETY`) и подстраивается по заголовкам ответа
+    ``X-Bapi-Limit`` / ``X-Bapi-Limit-Status`` /
+    ``X-Bapi-Limit-Reset-Timestamp``. Сессия pybit отдаёт заголовки только
+    вместе с исключением (``resp_headers``), поэтому подстройка идёт по ним
+    и по отказам 10006; эндпоинт вне таблицы своего ведра не имеет;
+  * приоритетные слоты: одновременно выполняется не больше
+    BYBIT_MAX_IN_FLIGHT запросов, а при нехватке слотов первыми проходят
+    записи (ордера, SL/TP), затем чтения состояния, затем фоновые чтения
+    (свечи, история исполнений и ордеров, closed-PnL, инструменты).
+    Внутри класса — порядок поступления.
+
+Пока ни ведро, ни слоты не исчерпаны, вызов не ждёт и не уступает event loop.
+Время ожидания в очередях копится в :func:`get_scheduler_stats` (видно в /health).
+
+Переменные окружения:
+  BYBIT_RATE_LIMIT    — 1 (0 = без очередей, как раньше)
+  BYBIT_MAX_IN_FLIGHT — 8 одновременных запросов
+"""
+import asyncio
+import contextlib
+import heapq
+import itertools
+import logging
+import os
+import time
+import weakref
+
+from core.rate_limit import TokenBucket
+from core.write_verify import read_status_code
+
+# Читаются напрямую из окружения (как BYBIT_SLOW_CALL_WARN): модуль нужен
+# bybit_call и там, где core.config заменён заглушкой.
+RATE_LIMIT_ENABLED = os.getenv("BYBIT_RATE_LIMIT", "1").lower() not in ("0", "false")
+try:
+    MAX_IN_FLIGHT = max(1, int(os.getenv("BYBIT_MAX_IN_FLIGHT", 8)))
+except ValueError:
+    MAX_IN_FLIGHT = 8
+
+PRIORITY_WRITE = 0
+PRIORITY_READ = 1
+PRIORITY_BACKGROUND = 2
+PRIORITY_NAMES = {
+    PRIORITY_WRITE: "write",
+    PRIORITY_READ: "read",
+    PRIORITY_BACKGROUND: "background",
+}
+
+# Документированные лимиты Bybit V5 (запросов в секунду): торговые и
+# позиционные — на UID, рыночные — на IP (600 за 5 с).
+ENDPOINT_LIMITS = {
+    "place_order": 10,
+    "amend_order": 10,
+    "cancel_order": 10,
+    "cancel_all_orders": 10,
+    "place_batch_order": 10,
+    "amend_batch_order": 10,
+    "cancel_batch_order": 10,
+    "set_trading_stop": 10,
+    "set_leverage": 10,
+    "get_open_orders": 50,
+    "get_order_history": 50,
+    "get_executions": 50,
+    "get_positions": 50,
+    "get_closed_pnl": 50,
+    "get_wallet_balance": 50,
+    "get_tickers": 120,
+    "get_kline": 120,
+    "get_mark_price_kline": 120,
+    "get_instruments_info": 120,
+}
+# Доля документированного лимита, которую занимает бот: остаток — запас на
+# ручную торговлю в том же аккаунте и неточность часов.
+LIMIT_SAFETY = 0.8
+
+BACKGROUND_ENDPOINTS = frozenset({
+    "get_kline",
+    "get_mark_price_kline",
+    "get_executions",
+    "get_order_history",
+    "get_closed_pnl",
+    "get_instruments_info",
+})
+_READ_PREFIXES = ("get_", "check_", "fetch_")
+
+# Обёртки, которые вызываются через bybit_call целиком (handlers.orders,
+# core.trading_core): по имени функции их не найти ни в таблице лимитов, ни
+# среди классов приоритета. Здесь — эндпоинт, лимит которого они расходуют.
+WRAPPER_ENDPOINTS = {
+    "place_limit_order": "place_order",
+    "place_market_with_retry": "place_order",
+    "close_position_market": "place_order",
+    "set_leverage_safe": "set_leverage",
+    "check_daily_limit": "get_wallet_balance",
+}
+
+RATE_LIMIT_CODE = 10006
+
+_BUCKETS: dict = {}
+# event loop → _Slots: очередь живёт в том loop, где ждут её futures.
+_SLOTS: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+
+
+def _new_stats() -> dict:
+    return {"calls": 0, "waited": 0, "wait_total": 0.0, "wait_max": 0.0}
+
+
+_STATS = {
+    "priority": {p: _new_stats() for p in PRIORITY_NAMES},
+    "rate_limited": 0,
+}
+
+
+def request_endpoint(name: str) -> str:
+    """Эндпоинт SDK для имени вызова: обёртка разворачивается в свой метод."""
+    return WRAPPER_ENDPOINTS.get(name, name)
+
+
+def request_priority(name: str) -> int:
+    """Класс приоритета вызова по имени метода SDK."""
+    if not (isinstance(name, str) and name.startswith(_READ_PREFIXES)):
+        return PRIORITY_WRITE
+    if name in BACKGROUND_ENDPOINTS:
+        return PRIORITY_BACKGROUND
+    return PRIORITY_READ
+
+
+def _bucket(name: str):
+    limit = ENDPOINT_LIMITS.get(name)
+    if limit is None:
+        return None
+    bucket = _BUCKETS.get(name)
+    if bucket is None:
+        rate = limit * LIMIT_SAFETY
+        bucket = _BUCKETS[name] = TokenBucket(rate, rate)
+    return bucket
+
+
+class _Slots:
+    """Ограничение числа одновременных запросов с очередью по приоритету."""
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.in_flight = 0
+        self.waiters: list = []
+        self._seq = itertools.count()
+
+    async def acquire(self, priority: int) -> bool:
+        """Занимает слот; True, если пришлось ждать в очереди."""
+        if self.in_flight < self.limit and not self.waiters:
+            self.in_flight += 1
+            return False
+        fut = asyncio.get_running_loop().create_future()
+        heapq.heappush(self.waiters, (priority, next(self._seq), fut))
+        try:
+            await fut
+        except asyncio.CancelledError:
+            if fut.done() and not fut.cancelled():
+                # Слот уже передан этому ожидающему — вернуть его следующему.
+                self.release()
+            raise
+        return True
+
+    def release(self) -> None:
+        while self.waiters:
+            _, _, fut = heapq.heappop(self.waiters)
+            if not fut.done():
+                fut.set_result(None)     # слот переходит ожидающему
+                return
+        self.in_flight -= 1
+
+
+def _slots() -> _Slots:
+    loop = asyncio.get_running_loop()
+    slots = _SLOTS.get(loop)
+    if slots is None:
+        slots = _SLOTS[loop] = _Slots(MAX_IN_FLIGHT)
+    return slots
+
+
+def _record_wait(priority: int, queued: bool, waited: float) -> None:
+    stats = _STATS["priority"][priority]
+    stats["calls"] += 1
+    if queued:
+        stats["waited"] += 1
+        stats["wait_total"] += waited
+        stats["wait_max"] = max(stats["wait_max"], waited)
+
+
+@contextlib.asynccontextmanager
+async def request_slot(name: str):
+    """Очередь эндпоинта и слот выполнения на время одного запроса."""
+    if not RATE_LIMIT_ENABLED:
+        yield
+        return
+    priority = request_priority(name)
+    t0 = time.monotonic()
+    bucket = _bucket(name)
+    queued = bucket is not None and await bucket.acquire() > 0
+    slots = _slots()
+    queued = await slots.acquire(priority) or queued
+    try:
+        _record_wait(priority, queued, time.monotonic() - t0)
+        yield
+    finally:
+        slots.release()
+
+
+def _header(headers, key):
+    try:
+        raw = headers.get(key)
+    except AttributeError:
+        return None
+    if isinstance(raw, bool) or not isinstance(raw, (str, int)):
+        return None
+    try:
+        return int(raw)
+    except (TypeError, ValueError):
+        return None
+
+
+def note_rate_limit_headers(name: str, headers) -> None:
+    """Подстраивает ведро эндпоинта по заголовкам ``X-Bapi-Limit*`` ответа.
+
+    ``X-Bapi-Limit`` задаёт фактический лимит аккаунта; исчерпанный
+    ``X-Bapi-Limit-Status`` останавливает эндпоинт до
+    ``X-Bapi-Limit-Reset-Timestamp``.
+    """
+    bucket = _bucket(name)
+    if bucket is None or headers is None:
+        return
+    limit = _header(headers, "X-Bapi-Limit")
+    if limit is not None and limit > 0:
+        rate = limit * LIMIT_SAFETY
+        bucket.rate = rate
+        bucket.capacity = rate
+    remaining = _header(headers, "X-Bapi-Limit-Status")
+    reset_ms = _header(headers, "X-Bapi-Limit-Reset-Timestamp")
+    if remaining is not None and remaining <= 0:
+        pause = 1.0
+        if reset_ms is not None:
+            pause = min(10.0, max(0.0, reset_ms / 1000 - time.time()))
+        bucket.drain(pause)
+
+
+def note_request_error(name: str, exc: Exception) -> bool:
+    """Учитывает исключение запроса; True, если это отказ 10006."""
+    note_rate_limit_headers(name, getattr(exc, "resp_headers", None))
+    if read_status_code(exc) != RATE_LIMIT_CODE:
+        return False
+    _STATS["rate_limited"] += 1
+    bucket = _bucket(name)
+    if bucket is not None:
+        bucket.drain(1.0)
+    logging.warning("Bybit rate limit (10006) на %s: эндпоинт приостановлен", name)
+    return True
+
+
+def get_scheduler_stats() -> dict:
+    """Снимок метрик очередей: по классам приоритета и число отказов 10006."""
+    by_priority = {}
+    for priority, stats in _STATS["priority"].items():
+        calls = stats["calls"]
+        by_priority[PRIORITY_NAMES[priority]] = {
+            "calls": calls,
+            "waited": stats["waited"],
+            "wait_avg_ms": round(stats["wait_total"] / calls * 1000, 1) if calls else 0.0,
+            "wait_max_ms": round(stats["wait_max"] * 1000, 1),
+        }
+    return {
+        "enabled": RATE_LIMIT_ENABLED,
+        "max_in_flight": MAX_IN_FLIGHT,
+        "priority": by_priority,
+        "rate_limited": _STATS["rate_limited"],
+    }
+
+
+def reset_request_scheduler() -> None:
+    """Сбрасывает вёдра эндпоинтов и метрики (для тестов)."""
+    _BUCKETS.clear()
+    for priority in _STATS["priority"]:
+        _STATS["priority"][priority] = _new_stats()
+    _STATS["rate_limited"] = 0
@@ -0,0 +1,161 @@
+"""
+Конвейер обработки торговых сигналов: параллельно по разным символам,
+строго по очереди внутри одного символа.
+
+Обработчик сигналов зарегистрирован в PTB неблокирующим (``block=False``):
+пока один сигнал ждёт Bybit, следующие обновления — другие сигналы и
+команды управления (/pos, /stop, …) — обрабатываются сразу, команды не
+стоят в очереди за сигналами. Сам сигнал проходит :func:`signal_slot`:
+
+  * замок символа (keyed ``asyncio.Lock``): второй сигнал по тому же символу
+    ждёт, пока первый не покажет карточку или не разместит ордер, и его
+    проверка конфликта уже видит результат первого — двойной вход по
+    одновременным сигналам невозможен;
+  * слот обработки: одновременно обрабатывается не больше
+    SIGNAL_PIPELINE_WORKERS сигналов. Слот занимается ПОСЛЕ замка символа,
+    поэтому пачка сигналов по одному символу не занимает слоты, нужные
+    другим символам.
+
+Глубина очереди, время ожидания и время «сигнал → карточка» копятся в
+:func:`get_signal_pipeline_stats` (видно в /health).
+
+Переменные окружения:
+  SIGNAL_PIPELINE_WORKERS — 4 одновременно обрабатываемых сигнала
+"""
+import asyncio
+import contextlib
+import logging
+import os
+import time
+import weakref
+from collections import deque
+
+# Читается напрямую из окружения (как BYBIT_MAX_IN_FLIGHT): модуль нужен
+# обработчику и там, где core.config заменён заглушкой.
+try:
+    SIGNAL_PIPELINE_WORKERS = max(1, int(os.getenv("SIGNAL_PIPELINE_WORKERS", 4)))
+except ValueError:
+    SIGNAL_PIPELINE_WORKERS = 4
+
+# Последние замеры «сигнал → карточка»: (symbol, мс). Только память процесса.
+SIGNAL_LATENCY_HISTORY = 100
+
+# symbol → [asyncio.Lock, число держателей и ждущих]
+_SYMBOL_LOCKS: dict = {}
+# event loop → asyncio.Semaphore: семафор живёт в том loop, где его ждут.
+_WORKERS: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+_LATENCY: deque = deque(maxlen=SIGNAL_LATENCY_HISTORY)
+
+
+def _new_stats() -> dict:
+    return {
+        "queued": 0, "peak_queued": 0, "running": 0, "processed": 0,
+        "waited": 0, "symbol_waits": 0, "wait_total": 0.0, "wait_max": 0.0,
+    }
+
+
+_STATS = _new_stats()
+
+
+def _workers() -> asyncio.Semaphore:
+    loop = asyncio.get_running_loop()
+    sem = _WORKERS.get(loop)
+    if sem is None:
+        sem = _WORKERS[loop] = asyncio.Semaphore(SIGNAL_PIPELINE_WORKERS)
+    return sem
+
+
+@contextlib.asynccontextmanager
+async def _symbol_lock(symbol: str):
+    entry = _SYMBOL_LOCKS.get(symbol)
+    if entry is None:
+        entry = _SYMBOL_LOCKS[symbol] = [asyncio.Lock(), 0]
+    entry[1] += 1
+    try:
+        if entry[0].locked():
+            _STATS["symbol_waits"] += 1
+        async with entry[0]:
+            yield
+    finally:
+        entry[1] -= 1
+        if entry[1] == 0 and _SYMBOL_LOCKS.get(symbol) is entry:
+            del _SYMBOL_LOCKS[symbol]
+
+
+@contextlib.asynccontextmanager
+async def signal_slot(symbol: str):
+    """Замок символа и слот обработки на время обработки одного сигнала."""
+    t0 = time.monotonic()
+    _STATS["queued"] += 1
+    _STATS["peak_queued"] = max(_STATS["peak_queued"], _STATS["queued"])
+    queued = True
+    try:
+        async with _symbol_lock(symbol):
+            async with _workers():
+                _STATS["queued"] -= 1
+                queued = False
+                waited = time.monotonic() - t0
+                _record_wait(waited)
+                if waited >= 1.0:
+                    logging.info(
+                        "Signal %s: ждал очереди конвейера %.1f с", symbol, waited,
+                    )
+                _STATS["running"] += 1
+                try:
+                    yield
+                finally:
+                    _STATS["running"] -= 1
+                    _STATS["processed"] += 1
+    finally:
+        if queued:
+            _STATS["queued"] -= 1
+
+
+def _record_wait(waited: float) -> None:
+    # Ожиданием считается всё, что дольше одного прохода event loop.
+    if waited <= 0.001:
+        return
+    _STATS["waited"] += 1
+    _STATS["wait_total"] += waited
+    _STATS["wait_max"] = max(_STATS["wait_max"], waited)
+
+
+def record_signal_latency(symbol: str, started: float) -> None:
+    """Записывает время от получения сигнала (``time.monotonic()``) до карточки."""
+    elapsed_ms = (time.monotonic() - started) * 1000
+    _LATENCY.append((symbol, elapsed_ms))
+    logging.info("⏱ Signal %s: карточка через %.0f мс", symbol, elapsed_ms)
+
+
+def get_signal_pipeline_stats() -> dict:
+    """Снимок очереди сигналов и замеров «сигнал → карточка»."""
+    waited = _STATS["waited"]
+    samples = [elapsed for _symbol, elapsed in _LATENCY]
+    latency = {"count": len(samples)}
+    if samples:
+        latency.update(
+            last_ms=round(samples[-1], 1),
+            avg_ms=round(sum(samples) / len(samples), 1),
+            max_ms=round(max(samples), 1),
+        )
+    return {
+        "workers": SIGNAL_PIPELINE_WORKERS,
+        "queued": _STATS["queued"],
+        "peak_queued": _STATS["peak_queued"],
+        "running": _STATS["running"],
+        "processed": _STATS["processed"],
+        "waited": waited,
+        "symbol_waits": _STATS["symbol_waits"],
+        "wait_avg_ms": round(_STATS["wait_total"] / waited * 1000, 1) if waited else 0.0,
+        "wait_max_ms": round(_STATS["wait_max"] * 1000, 1),
+        "latency": latency,
+    }
+
+
+def reset_signal_pipeline() -> None:
+    """Сбрасывает замки, семафоры и метрики (для тестов)."""
+    _SYMBOL_LOCKS.clear()
+    _WORKERS.clear()
+    _LATENCY.clear()
+    _STATS.clear()
+    _STATS.update(_new_stats())
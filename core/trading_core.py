@@ -5,9 +5,9 @@
 (`calculate_targets`), управления дневным лимитом (`check_daily_limit`) и
 асинхронного выставления TP-ордеров (`place_tp_ladder`).
 """
-import asyncio
 import logging
 import math
+import threading
 import time
 from datetime import datetime
 from decimal import Decimal, InvalidOperation
@@ -16,7 +16,10 @@ from core.config import (
     BYBIT_API_KEY, BYBIT_API_SECRET, IS_DEMO,
     DAILY_LOSS_LIMIT, USER_RISK_USD
 )
+from core.executors import run_disk
 from core.bybit_call import bybit_call
+from core.instrument_cache import get_instrument_info
+from core.exchange_snapshot import peek_wallet_snapshot
 from core.exit_binding import build_tp1_ladder_event, find_continuation_position_row
 from core.journal import (
     actual_initial_r_from_evidence,
@@ -29,7 +32,7 @@ from core.utils import safe_float
 # Единый контракт конверта ответа Bybit (HIGH-6): успехом считается только
 # доказанный ``retCode == 0`` строгого типа. Второго парсера успеха здесь не
 # появляется — используется уже существующий примитив.
-from core.write_verify import envelope_ok, read_ret_code
+from core.write_verify import envelope_ok, proven_rejection_code, read_ret_code
 
 # --- 1. Инициализация Сессии Bybit ---
 # Этот объект session мы будем импортировать в другие файлы
@@ -46,7 +49,6 @@ except Exception as e:
 # --- 2. Глобальные переменные состояния (Кэш) ---
 # Храним здесь, чтобы иметь к ним доступ из bot_handlers.py
 TP_CACHE = {}  # Кэш рассчитанных целей для кнопок "Auto-TP"
-LAST_TRADES = {}  # Анти-спам (время последнего сигнала по монете)
 
 
 # --- 3. Математика Трейдинга ---
@@ -194,6 +196,104 @@ def _daily_closed_pnl_rows(ts_start: int) -> list:
     )
 
 
+# Перекрытие окна догрузки: закрытие, которое биржа отдала с опозданием и
+# временем чуть раньше уже учтённых, всё равно попадёт в выборку, а повтор
+# отсекается по ключу (orderId, updatedTime).
+_DAILY_PNL_OVERLAP_MS = 5 * 60 * 1000
+
+
+class _DailyPnlState:
+    """Учтённый realized PnL дня для одной session.
+
+    ``high_water`` — максимальный ``updatedTime`` учтённых строк, ``seen`` —
+    их ключи ``(orderId, updatedTime)``. ``incremental`` ложно, если хоть одна
+    строка дня без доказанного ключа: тогда догрузка невозможна, и следующая
+    проверка снова пересчитывает день целиком.
+    """
+
+    __slots__ = ("session", "day_start", "realized", "high_water", "seen", "incremental")
+
+    def __init__(self, session, day_start):
+        self.session = session
+        self.day_start = day_start
+        self.realized = 0.0
+        self.high_water = None
+        self.seen = set()
+        self.incremental = True
+
+
+_DAILY_PNL_LOCK = threading.Lock()
+_daily_pnl_state = None
+
+
+def _closed_pnl_key(row):
+    """Ключ ``(orderId, updatedTime)`` строки closed-PnL либо None."""
+    if not isinstance(row, dict):
+        return None
+    order_id = row.get("orderId")
+    updated = row.get("updatedTime")
+    if not isinstance(order_id, str) or not order_id or isinstance(updated, bool):
+        return None
+    try:
+        return order_id, int(updated)
+    except (TypeError, ValueError):
+        return None
+
+
+def _daily_realized_pnl(ts_start: int) -> float:
+    """
+    Realized PnL дня с догрузкой только новых закрытий.
+
+    Первая проверка дня (новая session, смена дня, недоказуемые ключи) читает
+    все страницы с полуночи. Следующие читают окно от ``high_water`` минус
+    ``_DAILY_PNL_OVERLAP_MS`` тем же fail-closed сборщиком и добавляют только
+    строки с ещё не учтённым ключом. Ошибка выборки пробрасывается, а накопитель
+    не меняется: частично прочитанное окно в сумму не попадает.
+    """
+    global _daily_pnl_state
+    with _DAILY_PNL_LOCK:
+        state = _daily_pnl_state
+        if (
+            state is None
+            or state.session is not session
+            or state.day_start != ts_start
+            or not state.incremental
+        ):
+            state = _DailyPnlState(session, ts_start)
+
+        while True:
+            window_start = ts_start
+            if state.high_water is not None:
+                window_start = max(ts_start, state.high_water - _DAILY_PNL_OVERLAP_MS)
+            rows = _daily_closed_pnl_rows(window_start)
+
+            keys = [_closed_pnl_key(row) for row in rows]
+            if state.high_water is not None and None in keys:
+                # Окно перекрывает учтённое, а повтор не отличить: день заново.
+                state = _DailyPnlState(session, ts_start)
+                continue
+            break
+
+        realized = state.realized
+        high_water = state.high_water
+        seen = set(state.seen)
+        for row, key in zip(rows, keys):
+            if key is not None:
+                if key in seen:
+                    continue
+                seen.add(key)
+                high_water = key[1] if high_water is None else max(high_water, key[1])
+            realized += float(row['closedPnl'])
+
+        updated = _DailyPnlState(session, ts_start)
+        updated.realized = realized
+        updated.high_water = high_water
+        updated.seen = seen
+        updated.incremental = None not in keys and state.incremental
+        _daily_pnl_state = updated
+        return realized
+
+
 def check_daily_limit():
     """
     Строгая проверка просадки (Prop-Style).
@@ -202,7 +302,8 @@ def check_daily_limit():
 
     Realized PnL считается по ВСЕМ страницам закрытых сделок дня. Недоказанная
     полнота выборки уходит в тот же fail-closed выход, что и ошибка API:
-    торговать по недосчитанному дневному убытку нельзя.
+    торговать по недосчитанному дневному убытку нельзя. Уже учтённые закрытия
+    повторно не запрашиваются (см. :func:`_daily_realized_pnl`).
     """
     try:
         # 1. Считаем РЕАЛИЗОВАННЫЙ PnL с начала дня (00:00)
@@ -210,15 +311,16 @@ def check_daily_limit():
         start_of_day = datetime(now.year, now.month, now.day)
         ts_start = int(start_of_day.timestamp() * 1000)
 
-        # Запрашиваем закрытые сделки — все страницы дня, а не только первую
-        closed_rows = _daily_closed_pnl_rows(ts_start)
-
-        # Суммируем всё, что наторговали и закрыли сегодня
-        realized_pnl = sum(float(t['closedPnl']) for t in closed_rows)
+        # Накопитель дня: запрашиваются только закрытия новее уже учтённых,
+        # каждая выборка — все её страницы, а не только первая
+        realized_pnl = _daily_realized_pnl(ts_start)
 
         # 2. Считаем ПЛАВАЮЩИЙ PnL (Unrealized)
         # Это "честный" результат прямо сейчас. Если висят минуса - они вычитаются.
-        wallet_resp = session.get_wallet_balance(accountType="UNIFIED", coin="USDT")
+        # Свежий общий снимок баланса (core.exchange_snapshot), иначе свой запрос
+        wallet_resp = peek_wallet_snapshot(session)
+        if wallet_resp is None:
+            wallet_resp = session.get_wallet_balance(accountType="UNIFIED", coin="USDT")
 
         # totalPerpUPL — это общий PnL всех открытых деривативных позиций
         unrealized_pnl = float(wallet_resp['result']['list'][0]['totalPerpUPL'])
@@ -282,6 +384,52 @@ def _tp_ladder_proven_position(sym, plan, rows, live_pos):
     return proven
 
 
+def _batch_leg_responses(resp, count):
+    """Ответ ``place_batch_order`` → ответы отдельных ног в форме ``place_order``.
+
+    Bybit отвечает на пакет общим конвертом и двумя параллельными списками в
+    порядке запроса: ``result.list`` (``orderId``/``orderLinkId`` ноги) и
+    ``retExtInfo.list`` (``code``/``msg`` ноги). Нога получает конверт
+    ``{"retCode": code, "retMsg": msg, "result": строка}``, который разбирают
+    те же ``envelope_ok`` / ``extract_order_ids``, что и ответ одиночного
+    размещения. Элемент без ``code`` даёт конверт без ``retCode`` — успех не
+    доказан.
+
+    Недоказанный общий конверт достаётся каждой ноге как есть: доказанный
+    отказ пакета тогда — доказанный отказ каждой ноги. Списки другой длины
+    или не-dict элементы сопоставить с ногами нельзя — все ноги получают None.
+    """
+    if not envelope_ok(resp):
+        return [resp] * count
+    result = resp.get("result")
+    ext_info = resp.get("retExtInfo")
+    rows = result.get("list") if isinstance(result, dict) else None
+    codes = ext_info.get("list") if isinstance(ext_info, dict) else None
+    if (
+        not isinstance(rows, list)
+        or not isinstance(codes, list)
+        or len(rows) != count
+        or len(codes) != count
+    ):
+        return [None] * count
+    legs = []
+    for row, code in zip(rows, codes):
+        if not isinstance(row, dict) or not isinstance(code, dict):
+            legs.append(None)
+            continue
+        leg = {"result": row}
+        if "code" in code:
+            leg["retCode"] = code["code"]
+            leg["retMsg"] = code.get("msg")
+        legs.append(leg)
+    return legs
+
+
+# Имя ноги TP1 в лестнице: по нему (а не по позиции в списке) пишется
+# durable-идентичность TP1.
+TP1_LEG_NAME = "TP1 (1R)"
+
+
 async def place_tp_ladder(symbol):
     """Ставит тейки (TP1, TP2, TP3) от актуального неизменного исходного R.
 
@@ -297,9 +445,13 @@ async def place_tp_ladder(symbol):
     нет вовсе (ручная/внешняя позиция).
     Деградирует до 2 или 1 TP-ордера, если позиция слишком маленькая для сплита.
 
+    Ноги уходят одним ``place_batch_order``, чтобы позиция не стояла частично
+    без тейков несколько round trip; доказанно отклонённые ноги повторяются
+    по одной.
+
     Для доказанного lifecycle дополнительно фиксируется точная durable-
-    идентичность ноги TP1 (её собственные ``orderId``/``orderLinkId`` из ответа
-    на размещение). Это только evidence: защиту, милестоуны и Risk Cut оно не
+    идентичность ноги TP1 (её собственные ``orderId``/``orderLinkId`` из
+    элемента ответа пакета). Это только evidence: защиту, милестоуны и Risk Cut оно не
     включает, а на размещение ног не влияет.
     """
     try:
@@ -328,7 +480,7 @@ async def place_tp_ladder(symbol):
         r_price_dist = None
         r_basis_entry = entry_price
 
-        evidence = await asyncio.to_thread(get_auto_protection_evidence)
+        evidence = await run_disk(get_auto_protection_evidence)
         sym = normalize_symbol(symbol)
         plan = evidence.get(sym)
         if plan is not None:
@@ -387,7 +539,7 @@ async def place_tp_ladder(symbol):
             targets['tp3'] = r_basis_entry - (3.0 * r_price_dist)
 
         # 5. Инфо по инструменту
-        _info_resp = await bybit_call(session.get_instruments_info, category="linear", symbol=symbol)
+        _info_resp = await get_instrument_info(bybit_call, session, symbol)
         info = _info_resp['result']['list'][0]
         qty_step = safe_float(info['lotSizeFilter'].get('qtyStep'), field='qtyStep')
         min_order_qty = safe_float(info['lotSizeFilter'].get('minOrderQty', qty_step), field='minOrderQty')
@@ -404,9 +556,20 @@ async def place_tp_ladder(symbol):
         close_side = "Sell" if is_long else "Buy"
         logs = [f"📉 <b>Risk Check:</b> Стоп на {stop_loss}. Риск позиции: <b>{total_risk_usd:.2f}$</b> (1R)"]
 
+        def leg_request(q, p):
+            return dict(
+                symbol=symbol, side=close_side, orderType="Limit",
+                qty=str(q), price=str(p), reduceOnly=True, timeInForce="GTC",
+            )
+
+        def log_placed(q, p, r_name):
+            est_profit = q * abs(entry_price - p)
+            logs.append(f"✅ {r_name}: {p} (Vol: {q}) → <b>+{est_profit:.2f}$</b>")
+
         async def send_limit(q, p, r_name):
             """Ставит одну ногу лестницы и возвращает СЫРОЙ ответ биржи.
 
+            Используется для повтора ноги, которую пакет доказанно отклонил.
             ``None`` означает, что нога размещена НЕ была: нулевой объём или
             исключение вызова. Иначе возвращается ответ биржи КАК ЕСТЬ, без
             разбора успеха и без извлечения идентификаторов: доказательство
@@ -420,25 +583,22 @@ async def place_tp_ladder(symbol):
                 return None
             try:
                 resp = await bybit_call(
-                    session.place_order,
-                    category="linear", symbol=symbol, side=close_side,
-                    orderType="Limit", qty=str(q), price=str(p),
-                    reduceOnly=True, timeInForce="GTC",
+                    session.place_order, category="linear", **leg_request(q, p),
                 )
-                est_profit = q * abs(entry_price - p)
-                logs.append(f"✅ {r_name}: {p} (Vol: {q}) → <b>+{est_profit:.2f}$</b>")
+                log_placed(q, p, r_name)
                 return resp
             except Exception as ex:
                 logs.append(f"❌ Err {r_name}: {ex}")
                 return None
 
-        async def send_tp1(q):
-            """Ставит ногу TP1 и фиксирует её точную durable-идентичность.
+        async def record_tp1(resp, q):
+            """Фиксирует точную durable-идентичность размещённой ноги TP1.
 
             TP1 — ПЕРВАЯ логическая Real-R цель подтверждённого lifecycle; во
-            всех схемах сплита (3/2/1 ноги) она размещается первой и по одной и
+            всех схемах сплита (3/2/1 ноги) она идёт первой и по одной и
             той же цене ``targets['tp1']``, поэтому деградация схемы логический
-            уровень ноги не меняет.
+            уровень ноги не меняет. ``resp`` — ответ именно этой ноги: элемент
+            пакета (:func:`_batch_leg_responses`) либо ответ её повтора.
 
             Порядок доказательств строго разделён:
 
@@ -465,16 +625,15 @@ async def place_tp_ladder(symbol):
             включает. Сбой записи журнала только логируется — повторять уже
             принятую биржей запись нельзя.
             """
-            resp = await send_limit(q, targets['tp1'], "TP1 (1R)")
             if resp is None or plan is None:
-                return resp
+                return
             if not envelope_ok(resp):
                 logging.warning(
                     "Auto-TP %s: ответ на размещение TP1 не доказан как успешный "
                     "(retCode=%r) — durable evidence не записано",
                     sym, read_ret_code(resp),
                 )
-                return resp
+                return
             ids = extract_order_ids(resp)
             event = build_tp1_ladder_event(
                 symbol=sym,
@@ -492,37 +651,82 @@ async def place_tp_ladder(symbol):
                     "Auto-TP %s: точная идентичность TP1 не доказана — durable "
                     "evidence не записано", sym,
                 )
-                return resp
+                return
             try:
-                written = await asyncio.to_thread(append_event, event)
+                written = await run_disk(append_event, event)
             except Exception as exc:
                 logging.error("Auto-TP %s: evidence TP1 не записано: %s", sym, exc)
-                return resp
+                return
             if not written:
                 logging.error("Auto-TP %s: evidence TP1 не записано", sym)
-            return resp
+
+        async def place_legs(legs):
+            """Ставит ноги ``[(qty, price, name)]`` одним ``place_batch_order``.
+
+            TP1 — нога с именем :data:`TP1_LEG_NAME`, а не первая по
+            порядку: нога с нулевым объёмом отбрасывается, и следующая за ней
+            TP1-идентичностью не становится. Исход каждой ноги разбирается по её элементу
+            ответа пакета: доказанно размещённая нога логируется, доказанно
+            отклонённая (business-код, в том числе отказ всего пакета)
+            повторяется ОДИН раз отдельным ``place_order``, нога с
+            недоказанным исходом (таймаут, malformed ответ) не повторяется —
+            она могла быть принята, и повтор удвоил бы reduce-only объём.
+            """
+            legs = [leg for leg in legs if leg[0] > 0]
+            if not legs:
+                return
+            try:
+                batch_resp = await bybit_call(
+                    session.place_batch_order, category="linear",
+                    request=[leg_request(q, p) for q, p, _ in legs],
+                )
+                leg_resps = _batch_leg_responses(batch_resp, len(legs))
+                batch_exc = None
+            except Exception as ex:
+                leg_resps = [None] * len(legs)
+                batch_exc = ex
+
+            for (q, p, r_name), resp in zip(legs, leg_resps):
+                if batch_exc is not None:
+                    rejected = proven_rejection_code(batch_exc) is not None
+                    detail = batch_exc
+                else:
+                    rejected = proven_rejection_code(resp) is not None
+                    detail = f"retCode={read_ret_code(resp)!r}"
+                if envelope_ok(resp):
+                    log_placed(q, p, r_name)
+                elif rejected:
+                    resp = await send_limit(q, p, r_name)
+                else:
+                    logs.append(f"❌ Err {r_name}: исход в пакете не подтверждён ({detail})")
+                if r_name == TP1_LEG_NAME:
+                    await record_tp1(resp, q)
 
         # 7. Выбираем схему сплита с учётом minOrderQty
         qty_30 = round(math.floor((total_qty * 0.30) / qty_step) * qty_step, 6)
         if qty_30 >= min_order_qty:
             # Стандартная 3-ступенчатая схема: 30% / 30% / остаток
             qty_rem = round(total_qty - qty_30 - qty_30, 6)
-            await send_tp1(qty_30)
-            await send_limit(qty_30, targets['tp2'], "TP2 (2R)")
-            await send_limit(qty_rem, targets['tp3'], "TP3 (3R)")
+            await place_legs([
+                (qty_30, targets['tp1'], TP1_LEG_NAME),
+                (qty_30, targets['tp2'], "TP2 (2R)"),
+                (qty_rem, targets['tp3'], "TP3 (3R)"),
+            ])
             legs_note = ""
         else:
             # Попытка 2-ступенчатой схемы: 50% / остаток
             qty_half = round(math.floor((total_qty * 0.50) / qty_step) * qty_step, 6)
             if qty_half >= min_order_qty:
                 qty_rem2 = round(total_qty - qty_half, 6)
-                await send_tp1(qty_half)
-                await send_limit(qty_rem2, targets['tp2'], "TP2 (2R)")
+                await place_legs([
+                    (qty_half, targets['tp1'], TP1_LEG_NAME),
+                    (qty_rem2, targets['tp2'], "TP2 (2R)"),
+                ])
                 legs_note = " (degraded: qty too small for 3 legs → placed 2)"
                 logs.append("⚠️ Позиция слишком маленькая для 3 TP: поставлено 2 ордера.")
             else:
                 # 1 уровень: вся позиция на TP1
-                await send_tp1(total_qty)
+                await place_legs([(total_qty, targets['tp1'], TP1_LEG_NAME)])
                 legs_note = " (degraded: qty too small to split → placed 1)"
                 logs.append("⚠️ Позиция слишком маленькая для сплита: поставлен 1 TP-ордер.")
 
@@ -12,7 +12,11 @@ from telegram import error as tg_error
 from telegram.ext import ContextTypes
 
 from core.config import ALLOWED_ID, REQUIRE_MARKET_CONFIRM, MARKET_PREVIEW_TTL_SEC
+from core.exchange_snapshot import get_wallet_snapshot
+from core.executors import run_disk
 from core.database import update_risk_for_symbol, log_source, pop_market_pending, _MARKET_PENDING
+from core.instrument_cache import get_instrument_info
+from core.leverage_cache import leverage_is_set
 from core.journal import append_event, extract_order_ids, ENTRY_PLACED
 from core.sl_percent import (
     SL_PERCENT, SignalSLError, compute_percent_sl, decimal_from_price,
@@ -300,7 +304,7 @@ async def button_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
                 pos = pos_resp['result']['list'][0]
                 entry_price = safe_float(pos.get('avgPrice'), field='avgPrice')
 
-                info_resp = await bybit_call(session.get_instruments_info, category="linear", symbol=sym)
+                info_resp = await get_instrument_info(bybit_call, session, sym)
                 info = info_resp['result']['list'][0]
                 tick_size = safe_float(info['priceFilter'].get('tickSize'), field='tickSize')
 
@@ -556,11 +560,11 @@ async def button_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
                 ticker = await bybit_call(session.get_tickers, category="linear", symbol=sym)
                 fresh_price = float(ticker['result']['list'][0]['lastPrice'])
 
-                wallet = await bybit_call(session.get_wallet_balance, accountType="UNIFIED", coin="USDT")
+                wallet = (await get_wallet_snapshot(bybit_call, session)).resp
                 account_data = wallet['result']['list'][0]
                 available_usd, avail_src = get_available_usd(account_data)
 
-                info_resp = await bybit_call(session.get_instruments_info, category="linear", symbol=sym)
+                info_resp = await get_instrument_info(bybit_call, session, sym)
                 info = info_resp['result']['list'][0]
                 tick_raw = read_tick_size(info)
                 lot_filter = info['lotSizeFilter']
@@ -751,9 +755,11 @@ async def button_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
 
             # Все fail-closed проверки пройдены (свежая цена, SL, риск, объём) —
             # только теперь единственный live write плеча (§3). set_leverage_safe
-            # тихо игнорирует 110043 ("not modified").
+            # тихо игнорирует 110043 ("not modified"); доказанное кешем
+            # плечо (core.leverage_cache) не переписывается.
             try:
-                await bybit_call(set_leverage_safe, sym, lev)
+                if not leverage_is_set(sym, lev):
+                    await bybit_call(set_leverage_safe, sym, lev)
             except Exception as lev_err:
                 logging.warning("set_leverage(%s, x%s) unexpected error: %s", sym, lev, lev_err)
 
@@ -799,8 +805,8 @@ async def button_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
                     pending = pop_market_pending(sym)
                     if pending:
                         risk_val, src_val = pending
-                        await asyncio.to_thread(update_risk_for_symbol, sym, risk_val)
-                        await asyncio.to_thread(log_source, sym, src_val)
+                        await run_disk(update_risk_for_symbol, sym, risk_val)
+                        await run_disk(log_source, sym, src_val)
                 except Exception as pend_err:
                     logging.warning("post-market pending write failed for %s: %s", sym, pend_err)
                 # Опрашиваем реальную цену исполнения; fallback — fresh_price из preflight.
@@ -926,7 +932,7 @@ async def button_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
                             "сверка исполнения недоступна, lifecycle останется PENDING",
                             sym,
                         )
-                    journal_ok = await asyncio.to_thread(append_event, entry_event)
+                    journal_ok = await run_disk(append_event, entry_event)
                     if not journal_ok:
                         # Ордер уже исполнен: не переразмещаем и не отменяем его.
                         logging.error(
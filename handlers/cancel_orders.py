@@ -4,14 +4,15 @@
 Операторский поток:
 
     «⛔ Отменить лимитные входы» → authoritative-чтение ордеров → preview →
-    отдельное подтверждение → индивидуальная отмена по точному orderId →
+    отдельное подтверждение → отмена точных пар пакетами cancel_batch_order →
     bounded readback защиты позиций → правдивый результат + durable-журнал.
 
 Глобальный ``cancel_all_orders`` из этого пути удалён полностью и не
 используется ни с ``orderFilter``, ни без него: массовая отмена на стороне
 биржи неотличима от отмены защитных TP/SL и conditional-ордеров. Каждый ордер
-отменяется отдельным вызовом ``cancel_order`` с точными ``symbol`` + ``orderId``,
-максимум один раз за операцию.
+отменяется элементом ``cancel_batch_order`` (до :data:`BATCH_CANCEL_MAX` в
+запросе) с точными ``symbol`` + ``orderId``, максимум один раз за операцию;
+исход каждого элемента классифицируется отдельно.
 
 Ордер попадает в список отмены только если ВСЁ доказано (fail-closed):
 
@@ -89,6 +90,8 @@ import time
 from telegram import InlineKeyboardButton, InlineKeyboardMarkup
 
 from core.config import ALLOWED_ID
+from core.exchange_snapshot import get_open_orders_snapshot
+from core.executors import run_disk
 from core.journal import append_event, get_bot_entry_identities, ORDER_CANCEL_BATCH
 from core.trading_core import session
 from core.write_verify import (
@@ -156,6 +159,9 @@ _PENDING_CANCEL: dict = {}
 # TTL preview-снимка (секунды).
 PREVIEW_TTL_SEC = 120
 
+# Максимум ордеров в одном cancel_batch_order.
+BATCH_CANCEL_MAX = 10
+
 # Максимум строк ордеров в preview-сообщении Telegram.
 PREVIEW_MAX_ROWS = 8
 
@@ -259,6 +265,80 @@ def classify_cancel_response(resp, exc=None) -> str:
     return UNVERIFIED
 
 
+def classify_batch_cancel_response(resp, pairs) -> list:
+    """Исходы отмены каждой пары одного ``cancel_batch_order``.
+
+    Bybit отвечает на пакет общим конвертом и двумя параллельными списками:
+    ``result.list`` (эхо ``symbol``/``orderId``) и ``retExtInfo.list``
+    (``code``/``msg`` по каждому элементу в порядке запроса). Исход элемента
+    определяет :func:`classify_cancel_response` по его собственному коду, с
+    тем же строгим контрактом, что и у одиночной отмены.
+
+    Недоказанный общий конвертом исход распространяется на весь пакет.
+    Списки другой длины, не-dict элемент и :data:`CANCELLED` без точного эха
+    ``(symbol, orderId)`` дают :data:`UNVERIFIED`: сопоставить ответ с парой
+    по позиции тогда нельзя.
+    """
+    if not envelope_ok(resp):
+        outcome = classify_cancel_response(resp, exc=None)
+        return [outcome] * len(pairs)
+    result = resp.get("result")
+    ext_info = resp.get("retExtInfo")
+    rows = result.get("list") if isinstance(result, dict) else None
+    codes = ext_info.get("list") if isinstance(ext_info, dict) else None
+    if (
+        not isinstance(rows, list)
+        or not isinstance(codes, list)
+        or len(rows) != len(pairs)
+        or len(codes) != len(pairs)
+    ):
+        return [UNVERIFIED] * len(pairs)
+
+    outcomes = []
+    for (symbol, order_id), row, code in zip(pairs, rows, codes):
+        if not isinstance(code, dict) or not isinstance(row, dict):
+            outcomes.append(UNVERIFIED)
+            continue
+        item = {"retCode": code["code"]} if "code" in code else {}
+        outcome = classify_cancel_response(item, exc=None)
+        if outcome == CANCELLED and (
+            _read_text(row, "symbol") != symbol or _read_text(row, "orderId") != order_id
+        ):
+            outcome = UNVERIFIED
+        outcomes.append(outcome)
+    return outcomes
+
+
+async def cancel_orders_batched(call, session, pairs) -> dict:
+    """Отменяет точные пары ``(symbol, orderId)`` пакетами ``cancel_batch_order``.
+
+    Пары идут пачками по :data:`BATCH_CANCEL_MAX`, каждая пара отправляется
+    ровно один раз: недоказанный исход не повторяется. Исключение пакета
+    классифицируется как у одиночной отмены и относится ко всем его парам;
+    следующие пакеты всё равно отправляются. Возвращает ``{pair: исход}``.
+    """
+    outcomes: dict = {}
+    pairs = list(pairs)
+    for start in range(0, len(pairs), BATCH_CANCEL_MAX):
+        chunk = pairs[start:start + BATCH_CANCEL_MAX]
+        request = [{"symbol": sym, "orderId": oid} for sym, oid in chunk]
+        try:
+            resp = await call(
+                session.cancel_batch_order, category=CATEGORY, request=request
+            )
+            chunk_outcomes = classify_batch_cancel_response(resp, chunk)
+        except Exception as exc:
+            outcome = classify_cancel_response(None, exc=exc)
+            if outcome == UNVERIFIED:
+                logging.warning(
+                    "cancel_batch: пакет из %d орд. — исход не доказан: %s",
+                    len(chunk), exc,
+                )
+            chunk_outcomes = [outcome] * len(chunk)
+        outcomes.update(zip(chunk, chunk_outcomes))
+    return outcomes
+
+
 def is_bot_owned_entry(order, owned_entries) -> bool:
     """True только при доказанном точном совпадении с текущим ENTRY_PLACED.
 
@@ -410,7 +490,7 @@ async def read_bot_owned_entries() -> dict:
     гасится в пользу более строгой классификации, а не наоборот.
     """
     try:
-        owned = await asyncio.to_thread(get_bot_entry_identities)
+        owned = await run_disk(get_bot_entry_identities)
     except Exception as exc:
         logging.warning(
             "cancel_batch: durable-владение ордерами не прочитано: %s", exc
@@ -726,9 +806,9 @@ async def preview_cancel_orders(update, context):
         return
 
     try:
-        orders_resp = await bybit_call(
-            session.get_open_orders, category=CATEGORY, settleCoin="USDT"
-        )
+        orders_resp = (
+            await get_open_orders_snapshot(bybit_call, session, fresh=True)
+        ).resp
         orders = read_open_orders(orders_resp)
         if orders is None:
             await query.edit_message_text(
@@ -983,7 +1063,7 @@ async def confirm_cancel_orders(update, context, token: str):
             ),
         }
         try:
-            written = await asyncio.to_thread(append_event, event)
+            written = await run_disk(append_event, event)
         except Exception as journal_exc:
             logging.error(
                 "journal ORDER_CANCEL_BATCH: запись не удалась: %s", journal_exc
@@ -1003,9 +1083,9 @@ async def confirm_cancel_orders(update, context, token: str):
 
     # --- Повторное authoritative-чтение ---
     try:
-        orders_resp = await bybit_call(
-            session.get_open_orders, category=CATEGORY, settleCoin="USDT"
-        )
+        orders_resp = (
+            await get_open_orders_snapshot(bybit_call, session, fresh=True)
+        ).resp
         current_orders = read_open_orders(orders_resp)
         if current_orders is None:
             # Токен израсходован — операция обязана оставить след даже здесь.
@@ -1128,24 +1208,12 @@ async def confirm_cancel_orders(update, context, token: str):
             affected_symbols, attempts=1
         )
 
-        # --- Индивидуальная отмена каждого ордера ---
-        for o in to_cancel:
-            sym = o["symbol"]
-            oid = o["orderId"]
-            pair = (sym, oid)
-            audit["attempted"].append(pair)
-            try:
-                resp = await bybit_call(
-                    session.cancel_order, category=CATEGORY, symbol=sym, orderId=oid
-                )
-                outcome = classify_cancel_response(resp, exc=None)
-            except Exception as exc:
-                outcome = classify_cancel_response(None, exc=exc)
-                if outcome == UNVERIFIED:
-                    logging.warning(
-                        "cancel_batch: %s/%s — исход не доказан: %s", sym, oid, exc
-                    )
-            audit["results"][outcome].append(pair)
+        # --- Отмена точных пар пакетами cancel_batch_order ---
+        pairs = [(o["symbol"], o["orderId"]) for o in to_cancel]
+        audit["attempted"].extend(pairs)
+        outcomes = await cancel_orders_batched(bybit_call, session, pairs)
+        for pair in pairs:
+            audit["results"][outcomes[pair]].append(pair)
 
         # --- Снимок защиты ПОСЛЕ отмены (bounded readback) ---
         audit["protection_after"] = await read_protection_snapshot(
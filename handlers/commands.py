@@ -2,7 +2,6 @@
 Обработчики команд Telegram — /start, /stop, /risk, /note, /status.
 """
 
-import asyncio
 import logging
 from datetime import datetime
 
@@ -10,6 +9,7 @@ from telegram import Update
 from telegram.ext import ContextTypes
 
 from core.config import ALLOWED_ID, IS_DEMO
+from core.executors import run_disk
 from core.database import (
     add_comment,
     is_trading_enabled, set_trading_enabled,
@@ -18,6 +18,7 @@ from core.database import (
 )
 
 from core.bybit_call import bybit_call
+from core.exchange_snapshot import get_open_orders_snapshot, get_positions_snapshot
 from core.notifier import sanitize_operator_text
 from handlers.ui import (
     format_action,
@@ -45,7 +46,7 @@ def _build_stop_msg() -> str:
 async def start_trading(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Команда /start — включает приём сигналов."""
     if str(update.effective_user.id) != ALLOWED_ID: return
-    await asyncio.to_thread(set_trading_enabled, True)
+    await run_disk(set_trading_enabled, True)
     await update.message.reply_text(
         _build_start_msg(get_global_risk(), _network_label()),
         parse_mode='HTML',
@@ -55,7 +56,7 @@ async def start_trading(update: Update, context: ContextTypes.DEFAULT_TYPE):
 async def stop_trading(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Команда /stop — приостанавливает приём сигналов."""
     if str(update.effective_user.id) != ALLOWED_ID: return
-    await asyncio.to_thread(set_trading_enabled, False)
+    await run_disk(set_trading_enabled, False)
     await update.message.reply_text(_build_stop_msg(), parse_mode='HTML')
 
 
@@ -90,7 +91,7 @@ async def set_risk_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
             )
             return
 
-        await asyncio.to_thread(set_global_risk, new_risk)
+        await run_disk(set_global_risk, new_risk)
         await msg.reply_text(
             f"{format_header('✅', 'RISK UPDATED')}\n\n"
             f"🛡 <b>Риск</b>\n"
@@ -129,7 +130,7 @@ async def add_note_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
 
         sym = context.args[0].upper()
         text = " ".join(context.args[1:])
-        await asyncio.to_thread(add_comment, sym, text)
+        await run_disk(add_comment, sym, text)
         await update.message.reply_text(
             f"{format_header('✅', 'NOTE SAVED')}\n\n"
             f"Заметка для {h(sym)} сохранена.",
@@ -259,15 +260,11 @@ async def status_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
         _, pnl = await bybit_call(check_daily_limit)
         daily_pnl = pnl
 
-        pos_resp = await bybit_call(
-            session.get_positions, category="linear", settleCoin="USDT"
-        )
+        pos_resp = (await get_positions_snapshot(bybit_call, session)).resp
         positions = [p for p in pos_resp["result"]["list"] if float(p["size"]) > 0]
         pos_count = len(positions)
 
-        orders_resp = await bybit_call(
-            session.get_open_orders, category="linear", settleCoin="USDT"
-        )
+        orders_resp = (await get_open_orders_snapshot(bybit_call, session)).resp
         entry_orders_count = len([
             o for o in orders_resp["result"]["list"]
             if not o.get("reduceOnly", False)
@@ -1,5 +1,7 @@
 """
-Команда /health — состояние наблюдаемости транспорта Telegram.
+Команда /health — состояние наблюдаемости транспорта Telegram и очередей
+запросов Bybit (core.request_scheduler), загрузка пулов потоков
+(core.executors), очередь сигналов (core.signal_pipeline).
 
 Только чтение процесс-локального состояния в памяти: обращений к Bybit нет,
 записей нет, журнал не трогается. Карточка показывает rolling-счётчики за
@@ -20,6 +22,9 @@ from telegram import Update
 from telegram.ext import ContextTypes
 
 from core.config import ALLOWED_ID
+from core.executors import get_executor_stats
+from core.request_scheduler import get_scheduler_stats
+from core.signal_pipeline import get_signal_pipeline_stats
 from core.telegram_health import (
     DEGRADED_THRESHOLD,
     get_health_snapshot,
@@ -46,11 +51,76 @@ _DEGRADED_ACTION = (
 )
 
 
-def build_health_message(snapshot: dict) -> str:
+def _format_bybit_queue(stats: dict) -> str:
+    """Блок очередей запросов Bybit из снимка core.request_scheduler."""
+    if not stats.get("enabled"):
+        return format_value_block([("Очереди", "выключены (BYBIT_RATE_LIMIT=0)")])
+    rows = []
+    for name, label in (("write", "Записи"), ("read", "Чтения"),
+                        ("background", "Фоновые")):
+        item = stats.get("priority", {}).get(name)
+        if item is None:
+            rows.append((label, "UNKNOWN"))
+            continue
+        rows.append((
+            label,
+            f"{item['calls']} (ждали {item['waited']}, "
+            f"ср. {item['wait_avg_ms']:g} мс, макс {item['wait_max_ms']:g} мс)",
+        ))
+    rows.append(("Отказы 10006", stats.get("rate_limited", "UNKNOWN")))
+    return format_value_block(rows)
+
+
+def _format_executors(stats: dict) -> str:
+    """Блок пулов потоков из снимка core.executors."""
+    rows = []
+    for name, label in (("network", "Сеть (SDK)"), ("disk", "Диск")):
+        item = stats.get(name)
+        if item is None:
+            rows.append((label, "UNKNOWN"))
+            continue
+        rows.append((
+            label,
+            f"занято {item['active']}/{item['workers']}, "
+            f"очередь {item['queued']} (пик {item['peak_queued']})",
+        ))
+    return format_value_block(rows)
+
+
+def _format_signal_pipeline(stats: dict) -> str:
+    """Блок очереди сигналов из снимка core.signal_pipeline."""
+    latency = stats.get("latency", {})
+    if latency.get("count"):
+        latency_text = (
+            f"посл. {latency['last_ms']:g} мс, ср. {latency['avg_ms']:g} мс, "
+            f"макс {latency['max_ms']:g} мс ({latency['count']})"
+        )
+    else:
+        latency_text = "нет замеров"
+    return format_value_block([
+        ("В обработке", f"{stats.get('running', 'UNKNOWN')}/{stats.get('workers', 'UNKNOWN')}"),
+        ("В очереди", f"{stats.get('queued', 'UNKNOWN')} (пик {stats.get('peak_queued', 'UNKNOWN')})"),
+        ("Ждали", (
+            f"{stats.get('waited', 'UNKNOWN')} (по символу {stats.get('symbol_waits', 'UNKNOWN')}, "
+            f"ср. {stats.get('wait_avg_ms', 0):g} мс, макс {stats.get('wait_max_ms', 0):g} мс)"
+        )),
+        ("Сигнал → карточка", latency_text),
+    ])
+
+
+def build_health_message(
+    snapshot: dict,
+    bybit_stats: dict | None = None,
+    executor_stats: dict | None = None,
+    signal_stats: dict | None = None,
+) -> str:
     """Формирует HTML-карточку здоровья. Чистая функция без I/O.
 
     Значения берутся только из снимка счётчиков. Отсутствующий ключ
     отображается как UNKNOWN — недоказанное число не выдаётся за ноль.
+    ``bybit_stats`` — снимок очередей запросов Bybit, ``executor_stats`` —
+    загрузка пулов потоков, ``signal_stats`` — очередь сигналов; без снимка
+    соответствующий блок не выводится.
     """
     def value(key):
         raw = snapshot.get(key)
@@ -79,10 +149,23 @@ def build_health_message(snapshot: dict) -> str:
         "Счётчики живут только в памяти процесса: перезапуск бота обнуляет их."
     )
 
+    bybit = ""
+    if bybit_stats is not None:
+        bybit = f"🔌 <b>Очереди Bybit</b>\n{_format_bybit_queue(bybit_stats)}\n\n"
+    pools = ""
+    if executor_stats is not None:
+        pools = f"🧵 <b>Пулы потоков</b>\n{_format_executors(executor_stats)}\n\n"
+    signals = ""
+    if signal_stats is not None:
+        signals = f"📨 <b>Сигналы</b>\n{_format_signal_pipeline(signal_stats)}\n\n"
+
     return (
         f"{header}\n\n"
         f"{status_line}\n\n"
         f"📊 <b>Счётчики</b>\n{counters}\n\n"
+        f"{bybit}"
+        f"{pools}"
+        f"{signals}"
         f"{note}\n\n"
         f"{action}"
     )
@@ -94,7 +177,11 @@ async def health_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
         return
 
     await update.message.reply_text(
-        build_health_message(get_health_snapshot()), parse_mode='HTML'
+        build_health_message(
+            get_health_snapshot(), get_scheduler_stats(), get_executor_stats(),
+            get_signal_pipeline_stats(),
+        ),
+        parse_mode='HTML',
     )
 
 
@@ -8,8 +8,11 @@ bybit_call() — async-хелпер для неблокирующего вызо
 """
 
 import logging
+import time
 
 from core.bybit_call import bybit_call, _SLOW_CALL_THRESHOLD  # noqa: F401 — re-export
+from core.instrument_cache import note_instrument_rejection
+from core.leverage_cache import note_leverage_write
 from core.trading_core import session
 from core.utils import safe_float
 from core.write_verify import proven_rejection_code
@@ -21,16 +24,21 @@ def set_leverage_safe(sym: str, lev: int) -> int:
     Устанавливает плечо. Возвращает effective_lev.
     110043 = 'not modified' — плечо уже такое, это OK.
     При другой ошибке — fallback к x1.
+    Итог записи отмечается в core.leverage_cache.
     """
+    requested_at = time.monotonic()
     try:
         session.set_leverage(
             category="linear", symbol=sym,
             buyLeverage=str(lev), sellLeverage=str(lev),
         )
+        note_leverage_write(sym, lev, requested_at, True)
         return lev
     except Exception as e:
         if "110043" in str(e):
+            note_leverage_write(sym, lev, requested_at, True)
             return lev
+        note_leverage_write(sym, lev, requested_at, False)
         logging.warning(f"⚠️ set_leverage({sym}, x{lev}) failed: {e} — using x1 for preflight")
         return 1
 
@@ -91,6 +99,9 @@ def place_market_with_retry(
         logging.info(f"⚡ Market order: {sym} | {order_side} | qty={qty}")
         return True, f"⚡️ Исполнен Маркет по {sym}", qty, resp, None
     except Exception as ord_err:
+        # Исключение гасится здесь, и bybit_call его не увидит: отказ по
+        # фильтрам цены/объёма сбрасывает кеш инструмента прямо на месте.
+        note_instrument_rejection(sym, ord_err)
         reject_code = proven_rejection_code(ord_err)
         if "110007" in str(ord_err) and qty_step > 0:
             retry_qty = floor_qty(qty - qty_step, qty_step)
@@ -107,6 +118,7 @@ def place_market_with_retry(
                         retry_qty, retry_resp, None,
                     )
                 except Exception as retry_err:
+                    note_instrument_rejection(sym, retry_err)
                     logging.error(f"Market retry failed: {retry_err}")
                     return (False, f"❌ Market {sym}: {retry_err}", 0.0, None,
                             proven_rejection_code(retry_err))
@@ -39,7 +39,9 @@ from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
 from telegram.ext import ApplicationHandlerStop, ContextTypes
 
 from core.config import ALLOWED_ID, MARKET_PREVIEW_TTL_SEC
+from core.executors import run_disk
 from core.trading_core import session
+from core.instrument_cache import get_instrument_info
 from core.write_verify import (
     MALFORMED,
     MISSING,
@@ -126,7 +128,7 @@ async def _journal_protection_write(kind: str, evidence: dict) -> None:
     }
     event.update(journal_fields(evidence))
     try:
-        ok = await asyncio.to_thread(append_event, event)
+        ok = await run_disk(append_event, event)
     except Exception as exc:
         logging.error("journal PROTECTION_WRITE failed для %s: %s",
                       evidence.get("symbol"), exc)
@@ -484,7 +486,7 @@ async def _fetch_price_filter(symbol: str) -> tuple:
     означают «метаданные не доказаны»: превью не создаётся и запись не
     выполняется. Явный числовой ноль допустим только для ``minPrice``.
     """
-    resp = await bybit_call(session.get_instruments_info, category="linear", symbol=symbol)
+    resp = await get_instrument_info(bybit_call, session, symbol)
     try:
         price_filter = resp["result"]["list"][0]["priceFilter"]
     except (KeyError, IndexError, TypeError):
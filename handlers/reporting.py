@@ -31,6 +31,10 @@ post-close реконструкция родства невозможна в п
 не является. Неполная выборка страниц агрегатом отчёта стать не может: занижённые
 PnL, R, winrate и число сделок выглядят как правда, поэтому любая аномалия
 пагинации — ошибка отчёта, а не «данные закончились».
+
+Завершённые интервалы, выбранные полностью, сохраняются в локальную историю
+(core.closed_pnl_store); следующие отчёты читают их с диска и запрашивают у
+биржи только непокрытые промежутки и ещё открытый хвост.
 """
 
 import csv
@@ -42,7 +46,9 @@ from datetime import datetime, timedelta, timezone
 from telegram import Update
 from telegram.ext import ContextTypes
 
+from core.closed_pnl_store import CLOSED_PNL_SETTLE_MS, get_closed_pnl_store
 from core.config import ALLOWED_ID
+from core.executors import run_disk
 from core.trading_core import session
 from core.database import get_source_at_time
 from core.journal import (
@@ -73,6 +79,9 @@ _PAGE_LIMIT = 100
 # некорректный cursor Bybit крутил бы цикл бесконечно.
 _MAX_PAGES = 50
 
+# Сколько 7-дневных чанков месяца /report выбирает одновременно.
+_REPORT_CHUNK_CONCURRENCY = 3
+
 
 class _BybitReportError(Exception):
     """Ошибка API Bybit при сборе отчёта."""
@@ -207,7 +216,6 @@ async def fetch_closed_pnl_rows(start_ms: int, end_ms: int) -> list:
             )
         seen_cursors.add(next_cursor)
         cursor = next_cursor
-        await asyncio.sleep(0.1)
 
     raise _BybitReportError(
         f"{chunk_info} retCode=0, retMsg=пагинация не завершилась за "
@@ -215,6 +223,66 @@ async def fetch_closed_pnl_rows(start_ms: int, end_ms: int) -> list:
     )
 
 
+async def load_closed_pnl_rows(start_ms: int, end_ms: int, now_ms: int) -> list:
+    """
+    Полные строки closed-PnL интервала (не более 7 суток): покрытые части —
+    из локальной истории, остальное — через :func:`fetch_closed_pnl_rows`.
+
+    Непокрытый промежуток делится границей ``now_ms - CLOSED_PNL_SETTLE_MS``:
+    завершённая часть после полной выборки записывается в историю, открытый
+    хвост только читается. Ошибка выборки пробрасывается как раньше; сбой
+    записи истории на результат не влияет (промежуток просто выберут снова).
+    Без включённой истории — ровно один вызов fetch_closed_pnl_rows.
+    """
+    store = get_closed_pnl_store()
+    if store is None:
+        return await fetch_closed_pnl_rows(start_ms, end_ms)
+
+    rows, gaps = await run_disk(store.plan, start_ms, end_ms)
+    settled_ms = now_ms - CLOSED_PNL_SETTLE_MS
+    for gap_start, gap_end in gaps:
+        if gap_start <= settled_ms:
+            done_end = min(gap_end, settled_ms)
+            done_rows = await fetch_closed_pnl_rows(gap_start, done_end)
+            rows.extend(done_rows)
+            await run_disk(store.record, gap_start, done_end, done_rows)
+            gap_start = done_end + 1
+        if gap_start <= gap_end:
+            rows.extend(await fetch_closed_pnl_rows(gap_start, gap_end))
+    return rows
+
+
+async def _load_report_chunks(chunks: list, now_ms: int, failed: list) -> list:
+    """
+    Строки всех чанков ``[(start, end), ...]`` в порядке чанков.
+
+    Чанки выбираются параллельно (не более ``_REPORT_CHUNK_CONCURRENCY``
+    одновременно), частоту страниц ограничивает ведро get_closed_pnl в
+    core.request_scheduler (фоновый класс приоритета). Каждый
+    чанк проходит ту же fail-closed выборку; первая ошибка отменяет
+    остальные и пробрасывается, а границы её чанка дописываются в ``failed``.
+    """
+    semaphore = asyncio.Semaphore(_REPORT_CHUNK_CONCURRENCY)
+
+    async def _one(start_ms: int, end_ms: int) -> list:
+        async with semaphore:
+            try:
+                return await load_closed_pnl_rows(start_ms, end_ms, now_ms)
+            except Exception:
+                failed.append((start_ms, end_ms))
+                raise
+
+    tasks = [asyncio.ensure_future(_one(start, end)) for start, end in chunks]
+    try:
+        results = await asyncio.gather(*tasks)
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        raise
+    return [row for rows in results for row in rows]
+
+
 def _historical_risk_usd(
     trade: dict,
     risk_evidence: dict | None,
@@ -283,7 +351,8 @@ async def send_report(update: Update, context: ContextTypes.DEFAULT_TYPE):
 
     Без аргументов: показывает текстовый список последних 15 сделок.
     С аргументом даты (например, /report 01.2026): отправляет CSV-файл с полной
-    выборкой. Данные получаются чанками по 7 дней для обхода лимитов API.
+    выборкой. Данные получаются чанками по 7 дней для обхода лимитов API;
+    чанки выбираются параллельно, а их строки склеиваются в порядке чанков.
     """
     if str(update.effective_user.id) != ALLOWED_ID: return
 
@@ -324,16 +393,17 @@ async def send_report(update: Update, context: ContextTypes.DEFAULT_TYPE):
     status_deleted = False
     current_start = start_ts
     current_end = start_ts   # инициализируем до цикла — доступно в except
+    failed_chunks: list = []
     try:
-        all_trades = []
-
+        chunks = []
         while current_start < end_ts:
             current_end = min(current_start + _CHUNK_MS, end_ts)
-            # Полная выборка чанка или ошибка: частичные страницы агрегатом
-            # отчёта не становятся.
-            all_trades.extend(await fetch_closed_pnl_rows(current_start, current_end))
+            chunks.append((current_start, current_end))
             current_start = current_end + 1          # шаг на 1 мс — без пробелов и перекрытий
-            await asyncio.sleep(0.1)
+
+        # Полная выборка каждого чанка или ошибка: частичные страницы
+        # агрегатом отчёта не становятся.
+        all_trades = await _load_report_chunks(chunks, now_ms, failed_chunks)
 
         if not all_trades:
             await status_msg.edit_text(
@@ -350,12 +420,12 @@ async def send_report(update: Update, context: ContextTypes.DEFAULT_TYPE):
         report_lines = []
         # Доказанный риск конкретных входов бота. Читается один раз за отчёт;
         # запись в журнал не производится — backfill историческим риском запрещён.
-        risk_evidence = await asyncio.to_thread(get_entry_risk_evidence)
+        risk_evidence = await run_disk(get_entry_risk_evidence)
         # Связи защитных ордеров выхода с риском их входа. Записаны наблюдателем
         # ДО закрытия позиции, пока ордер был виден в открытых: только так
         # дочерний SL/TP вообще сохраняет связь со своим входом. Никаких запросов
         # к бирже здесь нет — история ордеров для этого бесполезна.
-        exit_evidence = await asyncio.to_thread(get_exit_order_risk_evidence)
+        exit_evidence = await run_disk(get_exit_order_risk_evidence)
         # Аккумуляторы R считаются ТОЛЬКО по сделкам с доказанным риском.
         total_r = 0.0
         r_known = 0
@@ -455,6 +525,8 @@ async def send_report(update: Update, context: ContextTypes.DEFAULT_TYPE):
             )
 
     except Exception as e:
+        if failed_chunks:
+            current_start, current_end = failed_chunks[0]
         logging.exception(
             "Report error for %s (chunk %s–%s): %s",
             month_name, current_start, current_end, e,
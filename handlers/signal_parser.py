@@ -6,12 +6,14 @@ import asyncio
 import re
 import logging
 import secrets
+import time
 from decimal import Decimal
 
 from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
 from telegram.ext import ContextTypes
 
 from core.config import ALLOWED_ID, REQUIRE_MARKET_CONFIRM
+from core.executors import run_disk
 from core.sl_percent import (
     SL_ABSOLUTE, SL_PERCENT, SignalSLError, decimal_from_price,
     encode_percent_callback, fmt_decimal, normalize_entry_price, parse_sl_token,
@@ -19,8 +21,15 @@ from core.sl_percent import (
 )
 from core.trading_core import session, check_daily_limit
 from core.notifier import send_alert, FAIL_CLOSED
-from core.heat import enforce_heat
-from core.conflict import resolve_signal_conflict
+from core.signal_pipeline import record_signal_latency, signal_slot
+from core.exchange_snapshot import get_wallet_snapshot
+from core.heat import (
+    compute_current_heat, enforce_heat, heat_queue_enabled, read_heat_positions,
+    select_heat_admissions,
+)
+from core.instrument_cache import get_instrument_info
+from core.leverage_cache import leverage_is_set
+from core.conflict import read_existing_side, resolve_signal_conflict
 from core.write_verify import (
     READBACK_ATTEMPTS, READBACK_DELAY_SEC, SOURCE_OPEN_ORDER, UNVERIFIED,
     VERIFIED, MISMATCH, WRITE_AMBIGUOUS_UNVERIFIED, align_expected, fmt_level,
@@ -36,6 +45,7 @@ from core.database import (
     log_source, update_risk_for_symbol,
     get_risk_for_symbol, is_trading_enabled,
     get_global_risk, set_market_pending,
+    get_heat_queue, prune_heat_queue, remove_heat_queue_item,
 )
 
 from handlers.preflight import clip_qty, validate_qty, get_available_usd
@@ -281,13 +291,51 @@ async def _verify_limit_protection(sym, sl_for_order, tick_raw, order_ids):
     return result
 
 
+def _start_pretrade_reads(sym: str) -> dict:
+    """Запускает одновременно чтения, не зависящие друг от друга.
+
+    Тикер, фильтры инструмента, баланс, текущее направление по символу
+    (позиция + ордера на вход) и снимок позиций для heat нужны проверкам
+    ниже, но ни одно чтение не зависит от результата другого. Обработчик
+    ждёт их в прежнем порядке проверок, поэтому ответы оператору, ранние
+    выходы и fail-closed решения не меняются; ошибка чтения поднимается там
+    же, где раньше поднимался последовательный запрос.
+    """
+    loop = asyncio.get_running_loop()
+    return {
+        "ticker": loop.create_task(
+            bybit_call(session.get_tickers, category="linear", symbol=sym)
+        ),
+        "instrument": loop.create_task(get_instrument_info(bybit_call, session, sym)),
+        "existing_side": loop.create_task(read_existing_side(sym)),
+        "wallet": loop.create_task(_read_wallet()),
+        "heat_positions": loop.create_task(read_heat_positions()),
+    }
+
+
+async def _read_wallet(*, fresh: bool = False):
+    return (await get_wallet_snapshot(bybit_call, session, fresh=fresh)).resp
+
+
+def _retrieve_exception(task: asyncio.Task) -> None:
+    if not task.cancelled():
+        task.exception()
+
+
+def _drop_pretrade_reads(reads: dict) -> None:
+    """Отменяет невостребованные чтения (ранний выход) и гасит их ошибки."""
+    for task in reads.values():
+        if not task.done():
+            task.cancel()
+        task.add_done_callback(_retrieve_exception)
+
+
 async def parse_and_trade(update: Update, context: ContextTypes.DEFAULT_TYPE):
     if str(update.effective_user.id) != ALLOWED_ID:
         return
     if not is_trading_enabled():
         return
 
-    pos_value_usd = 0.0
     # Фильтр MessageHandler отбирает update.effective_message (обычное сообщение,
     # отредактированное, channel_post или edited_channel_post). Обращаемся к тому
     # же объекту, а не к update.message, который может быть None для этих типов.
@@ -298,9 +346,52 @@ async def parse_and_trade(update: Update, context: ContextTypes.DEFAULT_TYPE):
     if not raw:
         return
     txt = raw.replace(',', '.')
+    started = time.monotonic()
     logging.info(f"📩 Message received: {txt[:50]}...")
 
     try:
+        # --- Парсинг сигнала ---
+        # Обычный текст чата не сигнал: дневной лимит для него не проверяется
+        # и биржа не запрашивается.
+        sig = parse_signal(txt)
+        if sig is None:
+            return
+
+        # Сигналы по разным символам обрабатываются параллельно, по одному
+        # символу — строго по очереди (core.signal_pipeline).
+        async with signal_slot(f"{sig['coin']}USDT"):
+            await _trade_signal(msg_obj, context.bot, sig, started, signal_text=txt)
+    except Exception as e:
+        logging.error(f"Trade Error: {e}")
+        await msg_obj.reply_text(
+            format_error_message(
+                "Не удалось обработать торговый сигнал.",
+                action="проверьте сигнал и повторите попытку",
+            ),
+            parse_mode='HTML',
+        )
+
+
+async def _trade_signal(msg_obj, bot, sig: dict, started: float | None, *,
+                        signal_text: str, queued_at: float | None = None):
+    """Проверки, карточка и вход по распознанному сигналу.
+
+    Выполняется под замком символа; исключения уходят вызывающему.
+    ``started`` — время получения сигнала для замера «сигнал → карточка»
+    (None — не замерять); ``signal_text`` и ``queued_at`` уходят в очередь
+    heat, если сделка в неё попадёт.
+    """
+    pos_value_usd = 0.0
+    reads = {}
+    try:
+        # Локальные проверки (грамматика SL, карантин источника) известны до
+        # биржи: только для сигнала, который их проходит, остальные чтения
+        # запускаются одновременно с дневным лимитом. Ответы по-прежнему идут
+        # в порядке проверок ниже.
+        source_enabled = is_source_enabled(sig["source_tag"])
+        if source_enabled and not sig["sl_error"] and sig["sl_mode"] is not None:
+            reads = _start_pretrade_reads(f"{sig['coin']}USDT")
+
         can_trade, pnl_today = await bybit_call(check_daily_limit)
         if not can_trade:
             await msg_obj.reply_text(
@@ -313,7 +404,7 @@ async def parse_and_trade(update: Update, context: ContextTypes.DEFAULT_TYPE):
             )
             try:
                 await send_alert(
-                    context.bot, ALLOWED_ID, "WARNING", FAIL_CLOSED,
+                    bot, ALLOWED_ID, "WARNING", FAIL_CLOSED,
                     f"Daily loss limit hit: PnL={pnl_today:.2f}$. Trading blocked.",
                     dedup_key="fail_closed_daily_limit",
                 )
@@ -321,11 +412,6 @@ async def parse_and_trade(update: Update, context: ContextTypes.DEFAULT_TYPE):
                 pass
             return
 
-        # --- Парсинг сигнала ---
-        sig = parse_signal(txt)
-        if sig is None:
-            return
-
         coin = sig["coin"]
         entry_val = sig["entry_val"]
         stop_val = sig["stop_val"]
@@ -353,7 +439,7 @@ async def parse_and_trade(update: Update, context: ContextTypes.DEFAULT_TYPE):
             return
 
         # ── Source quarantine check ────────────────────────────────────────
-        if not is_source_enabled(source_tag):
+        if not source_enabled:
             await msg_obj.reply_text(
                 format_warning_message(
                     [f"Источник {source_tag} находится в карантине."],
@@ -366,7 +452,7 @@ async def parse_and_trade(update: Update, context: ContextTypes.DEFAULT_TYPE):
 
         # --- Проверка существования монеты ---
         try:
-            ticker_data = await bybit_call(session.get_tickers, category="linear", symbol=sym)
+            ticker_data = await reads["ticker"]
             ticker_list = ticker_data.get('result', {}).get('list', [])
 
             if not ticker_list:
@@ -405,7 +491,7 @@ async def parse_and_trade(update: Update, context: ContextTypes.DEFAULT_TYPE):
 
         # Метаданные инструмента получаем ДО расчёта SL: процентный SL
         # нормализуется по tickSize того же снимка, что и лот-фильтр.
-        info_resp = await bybit_call(session.get_instruments_info, category="linear", symbol=sym)
+        info_resp = await reads["instrument"]
         info = info_resp['result']['list'][0]
         tick_raw = read_tick_size(info)
         lot_filter = info['lotSizeFilter']
@@ -493,7 +579,9 @@ async def parse_and_trade(update: Update, context: ContextTypes.DEFAULT_TYPE):
         # ── Conflict resolver ──────────────────────────────────────────────
         # По умолчанию (CONFLICT_POLICY_SAME_DIR=ignore): поведение как раньше.
         # Противоположное направление: fail-closed + алерт владельцу.
-        conflict_action, conflict_reason = await resolve_signal_conflict(sym, side)
+        conflict_action, conflict_reason = await resolve_signal_conflict(
+            sym, side, existing_side_read=reads["existing_side"]
+        )
         if conflict_action == "block":
             await msg_obj.reply_text(
                 format_warning_message(
@@ -506,7 +594,7 @@ async def parse_and_trade(update: Update, context: ContextTypes.DEFAULT_TYPE):
             )
             try:
                 await send_alert(
-                    context.bot, ALLOWED_ID, "WARNING", FAIL_CLOSED,
+                    bot, ALLOWED_ID, "WARNING", FAIL_CLOSED,
                     f"Signal conflict for {sym}: {conflict_reason}",
                     dedup_key=f"conflict_block_{sym}",
                 )
@@ -544,13 +632,24 @@ async def parse_and_trade(update: Update, context: ContextTypes.DEFAULT_TYPE):
 
         pos_usd = current_risk / (diff_pct / 100)
 
-        # Плечо
-        effective_lev = await bybit_call(set_leverage_safe, sym, lev)
+        # Плечо: запись только если кеш не доказывает, что оно уже такое
+        lev_written = not leverage_is_set(sym, lev)
+        if lev_written:
+            effective_lev = await bybit_call(set_leverage_safe, sym, lev)
+        else:
+            effective_lev = lev
 
         # --- PREFLIGHT: баланс + clip qty ---
         pos_value_usd = 0.0
         try:
-            wallet = await bybit_call(session.get_wallet_balance, accountType="UNIFIED", coin="USDT")
+            if conflict_action == "add" and lev_written:
+                # Добор к открытой позиции: смена плеча выше меняет её маржу,
+                # поэтому баланс, прочитанный до записи, не годится.
+                wallet = await _read_wallet(fresh=True)
+            else:
+                # Позиции и ордера на вход по символу нет (или плечо не
+                # менялось): годится баланс, прочитанный вместе с тикером.
+                wallet = await reads["wallet"]
             account_data = wallet['result']['list'][0]
             available_usd, avail_src = get_available_usd(account_data)
 
@@ -615,9 +714,12 @@ async def parse_and_trade(update: Update, context: ContextTypes.DEFAULT_TYPE):
                 "sym": sym, "side": side,
                 "entry_val": entry_price, "stop_val": stop_val,
                 "risk_usd": current_risk, "source_tag": source_tag,
+                "signal_text": signal_text,
+                **({"queued_at": queued_at} if queued_at is not None else {}),
             },
-            bot=context.bot,
+            bot=bot,
             owner_id=ALLOWED_ID,
+            positions_read=reads["heat_positions"],
         )
         if not heat_allowed:
             action_word = "В очереди" if heat_reason.startswith("queued") else "Отклонено"
@@ -652,6 +754,8 @@ async def parse_and_trade(update: Update, context: ContextTypes.DEFAULT_TYPE):
             )
             kb = [[InlineKeyboardButton(btn_label, callback_data=cb_data)]]
             await msg_obj.reply_text(msg, parse_mode='HTML', reply_markup=InlineKeyboardMarkup(kb))
+            if started is not None:
+                record_signal_latency(sym, started)
         else:
             kb = [[InlineKeyboardButton("🎯 Настроить TP", callback_data=f"set_tps|{sym}")]]
             # Для процентного SL в ордер уходит нормализованный Decimal, а не процент.
@@ -726,8 +830,8 @@ async def parse_and_trade(update: Update, context: ContextTypes.DEFAULT_TYPE):
                     write_acknowledged=place_success,
                     write_rejected=False,
                 )
-                await asyncio.to_thread(update_risk_for_symbol, sym, current_risk)
-                await asyncio.to_thread(log_source, sym, source_tag)
+                await run_disk(update_risk_for_symbol, sym, current_risk)
+                await run_disk(log_source, sym, source_tag)
                 entry_event = {
                     "event": ENTRY_PLACED, "symbol": sym, "side": side,
                     "source_tag": source_tag, "planned_risk_usdt": current_risk,
@@ -755,7 +859,7 @@ async def parse_and_trade(update: Update, context: ContextTypes.DEFAULT_TYPE):
                 # write_outcome обязателен: по одному VERIFIED нельзя отличить
                 # обычное подтверждение от восстановления сверкой.
                 entry_event["write_outcome"] = wo
-                journal_ok = await asyncio.to_thread(append_event, entry_event)
+                journal_ok = await run_disk(append_event, entry_event)
                 if not journal_ok:
                     logging.error(
                         "Limit %s принят Bybit (ордер %s), но ENTRY_PLACED не записан — "
@@ -790,6 +894,8 @@ async def parse_and_trade(update: Update, context: ContextTypes.DEFAULT_TYPE):
                         sl_status=verify["status"], sl_actual=fmt_level(verify["actual"]),
                     )
                 await msg_obj.reply_text(msg, parse_mode='HTML', reply_markup=InlineKeyboardMarkup(kb))
+                if started is not None:
+                    record_signal_latency(sym, started)
             elif write_rejected:
                 # Случай B (explicit rejection): доказанный business-код отказа —
                 # запись НЕ принята биржей. Риск+источник не пишем, ENTRY_PLACED
@@ -828,7 +934,7 @@ async def parse_and_trade(update: Update, context: ContextTypes.DEFAULT_TYPE):
                     )
                 else:
                     evidence_event["write_outcome"] = WRITE_AMBIGUOUS_UNVERIFIED
-                await asyncio.to_thread(append_event, evidence_event)
+                await run_disk(append_event, evidence_event)
                 # Truthful UX: не утверждаем "ордер не найден" как факт. UNVERIFIED
                 # означает "не смог подтвердить", не "доказанно отсутствует". Ордер
                 # мог существовать с неправильной защитой или под другим identifier.
@@ -850,12 +956,107 @@ async def parse_and_trade(update: Update, context: ContextTypes.DEFAULT_TYPE):
                     parse_mode='HTML',
                 )
 
-    except Exception as e:
-        logging.error(f"Trade Error: {e}")
-        await msg_obj.reply_text(
-            format_error_message(
-                "Не удалось обработать торговый сигнал.",
-                action="проверьте сигнал и повторите попытку",
-            ),
-            parse_mode='HTML',
-        )
+    finally:
+        _drop_pretrade_reads(reads)
+
+
+# ---------------------------------------------------------------------------
+# Очередь heat (HEAT_ACTION=queue): повторная проверка, когда heat снизился
+# ---------------------------------------------------------------------------
+
+_HEAT_DRAIN_LOCK = asyncio.Lock()
+
+
+class _OwnerChat:
+    """Ответы повторной проверки из очереди heat — в чат владельца.
+
+    Подставляется в :func:`_trade_signal` вместо сообщения сигнала: исходное
+    сообщение могло быть давно, карточка и отказы приходят новым сообщением.
+    """
+
+    def __init__(self, bot):
+        self._bot = bot
+
+    async def reply_text(self, text, **kwargs):
+        return await self._bot.send_message(chat_id=ALLOWED_ID, text=text, **kwargs)
+
+    async def reply_html(self, text, **kwargs):
+        return await self.reply_text(text, parse_mode='HTML', **kwargs)
+
+
+async def drain_heat_queue(bot) -> int:
+    """Допускает сделки из очереди heat, которые влезают в бюджет.
+
+    Heat считается один раз на прогон по общему снимку позиций
+    (core.exchange_snapshot) через compute_heat_from_data; без доказанного
+    снимка (ошибка API) очередь не разбирается. Порядок и бюджет —
+    :func:`core.heat.select_heat_admissions`. Каждая допущенная сделка
+    снимается с очереди и проходит под замком символа все проверки сигнала
+    заново (дневной лимит, цена, конфликт, риск, heat), поэтому карточка или
+    вход появятся, только если сигнал годен и сейчас. Не прошедшая heat
+    сделка возвращается в очередь со своим ``queued_at``.
+
+    Одновременный второй прогон пропускается. Возвращает число сделок,
+    отправленных на повторную проверку.
+    """
+    if not heat_queue_enabled() or _HEAT_DRAIN_LOCK.locked():
+        return 0
+    async with _HEAT_DRAIN_LOCK:
+        # Очередь сохраняется на диск при каждом изменении — через дисковый пул.
+        for item in await run_disk(prune_heat_queue):
+            logging.info("Heat queue: %s истёк без входа", item.get("sym"))
+        queue = get_heat_queue()
+        if not queue or not is_trading_enabled():
+            return 0
+
+        current_heat, heat_source = await compute_current_heat()
+        if heat_source != "live":
+            logging.warning("Heat queue: heat не доказан (%s) — очередь ждёт", heat_source)
+            return 0
+        admitted = select_heat_admissions(queue, current_heat)
+
+        chat = _OwnerChat(bot)
+        for item in admitted:
+            await run_disk(remove_heat_queue_item, item)
+            sym = item.get("sym", "?")
+            sig = parse_signal(item.get("signal_text") or "")
+            if sig is None:
+                logging.warning("Heat queue: %s без текста сигнала — снят с очереди", sym)
+                continue
+            logging.info(
+                "Heat queue: %s допущен (heat %.1f, риск %s) — повторная проверка",
+                sym, current_heat, item.get("risk_usd"),
+            )
+            try:
+                await chat.reply_html(
+                    format_warning_message(
+                        [f"Heat снизился до {current_heat:.1f}$: сигнал из очереди "
+                         "проверяется заново."],
+                        context=f"{sym} · {item.get('side', '?')}",
+                        action="дождитесь карточки сделки",
+                    )
+                )
+                async with signal_slot(f"{sig['coin']}USDT"):
+                    await _trade_signal(
+                        chat, bot, sig, None,
+                        signal_text=item["signal_text"],
+                        queued_at=item.get("queued_at"),
+                    )
+            except Exception as e:
+                # Сделка уже снята с очереди: без ответа владелец не узнал бы,
+                # что сигнал потерян. Обратно в очередь не ставится — та же
+                # ошибка повторялась бы на каждом прогоне.
+                logging.error("Heat queue: повторная проверка %s: %s", sym, e)
+                try:
+                    await chat.reply_html(
+                        format_error_message(
+                            "Повторная проверка сигнала из очереди heat не выполнена, "
+                            "сигнал снят с очереди.",
+                            context=f"{sym} · {item.get('side', '?')}",
+                            detail=str(e),
+                            action="проверьте позицию и при необходимости отправьте сигнал заново",
+                        )
+                    )
+                except Exception as notify_err:
+                    logging.error("Heat queue: ответ об ошибке %s: %s", sym, notify_err)
+        return len(admitted)
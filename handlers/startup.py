@@ -2,7 +2,6 @@
 Восстановление при старте — on_startup_check.
 """
 
-import asyncio
 import os
 import time
 import logging
@@ -11,6 +10,8 @@ from telegram import InlineKeyboardButton, InlineKeyboardMarkup
 from telegram.ext import ContextTypes
 
 from core.config import ALLOWED_ID, DATA_DIR
+from core.exchange_snapshot import get_open_orders_snapshot
+from core.executors import run_disk
 from core.trading_core import session
 from core.bybit_call import bybit_call
 from core.utils import safe_float
@@ -36,7 +37,7 @@ async def on_startup_check(context: ContextTypes.DEFAULT_TYPE):
     now = time.time()
     if os.path.exists(STARTUP_MARKER_FILE):
         try:
-            text = await asyncio.to_thread(STARTUP_MARKER_FILE.read_text)
+            text = await run_disk(STARTUP_MARKER_FILE.read_text)
             last_run = float(text)
             if now - last_run < 300:
                 logging.info("🚑 Startup Scan skipped (Cooldown).")
@@ -44,7 +45,7 @@ async def on_startup_check(context: ContextTypes.DEFAULT_TYPE):
         except Exception:
             pass
 
-    await asyncio.to_thread(STARTUP_MARKER_FILE.write_text, str(now))
+    await run_disk(STARTUP_MARKER_FILE.write_text, str(now))
 
     logging.info("🚑 Startup Recovery: Scanning...")
 
@@ -66,13 +67,9 @@ async def on_startup_check(context: ContextTypes.DEFAULT_TYPE):
             )
             return
 
-        orders_resp = await bybit_call(session.get_open_orders, category="linear", settleCoin="USDT")
-        orders = orders_resp['result']['list']
-        orders_map = {}
-        for o in orders:
-            sym = o['symbol']
-            if sym not in orders_map: orders_map[sym] = []
-            orders_map[sym].append(o)
+        orders_map = (await get_open_orders_snapshot(bybit_call, session)).by_symbol
+        if orders_map is None:
+            raise RuntimeError("get_open_orders: недостоверный ответ Bybit")
 
         issues = []
         for p in active_positions:
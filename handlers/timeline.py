@@ -8,13 +8,13 @@
 успешный факт.
 """
 
-import asyncio
 import logging
 
 from telegram import Update
 from telegram.ext import ContextTypes
 
 from core.config import ALLOWED_ID
+from core.executors import run_disk
 from core.journal import (
     UNKNOWN,
     get_trade_timeline,
@@ -201,7 +201,7 @@ async def timeline_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
         return
 
     try:
-        timeline = await asyncio.to_thread(
+        timeline = await run_disk(
             get_trade_timeline, symbol, TIMELINE_LIMIT
         )
     except Exception as exc:
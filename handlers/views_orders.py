@@ -8,6 +8,7 @@ from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
 from telegram.ext import ContextTypes
 
 from core.config import ALLOWED_ID
+from core.exchange_snapshot import get_open_orders_snapshot
 from core.trading_core import session
 from core.utils import safe_float
 from handlers.orders import bybit_call
@@ -31,7 +32,7 @@ async def view_orders(update: Update, context: ContextTypes.DEFAULT_TYPE):
     msg_obj = update.message if update.message else update.callback_query.message
 
     try:
-        orders_resp = await bybit_call(session.get_open_orders, category="linear", settleCoin="USDT")
+        orders_resp = (await get_open_orders_snapshot(bybit_call, session)).resp
         orders = orders_resp['result']['list']
         # Единый контракт closing: одного truthy reduceOnly недостаточно —
         # закрывающий ордер может иметь reduceOnly=False и closeOnTrigger=True.
@@ -10,6 +10,7 @@ from telegram.ext import ContextTypes
 from core.config import ALLOWED_ID
 from core.trading_core import session
 from core.database import get_risk_for_symbol
+from core.exchange_snapshot import get_open_orders_snapshot
 from core.utils import safe_float
 from handlers.ui import format_error_message, format_header, format_position_card
 from handlers.orders import bybit_call
@@ -24,14 +25,8 @@ async def check_positions(update: Update, context: ContextTypes.DEFAULT_TYPE):
         positions = pos_resp['result']['list']
         active = [p for p in positions if safe_float(p.get('size')) > 0]
 
-        raw_orders = await bybit_call(session.get_open_orders, category="linear", settleCoin="USDT")
-        all_orders = raw_orders.get('result', {}).get('list', [])
-
-        orders_count = {}
-        if all_orders:
-            for o in all_orders:
-                s = o['symbol']
-                orders_count[s] = orders_count.get(s, 0) + 1
+        orders_by_symbol = (await get_open_orders_snapshot(bybit_call, session)).by_symbol or {}
+        orders_count = {s: len(rows) for s, rows in orders_by_symbol.items()}
 
         if not active:
             msg = (
@@ -13,7 +13,11 @@ from colorama import init, Fore, Style
 from telegram.request import HTTPXRequest
 
 # Импорты из наших модулей
-from core.config import TELEGRAM_TOKEN, IS_DEMO, ALLOWED_ID
+from core.config import (
+    TELEGRAM_TOKEN, IS_DEMO, ALLOWED_ID, CLOSED_PNL_HISTORY_FILE, BYBIT_TRANSPORT,
+)
+from core.bybit_async import configure_async_transport
+from core.closed_pnl_store import configure_closed_pnl_store
 from core.database import get_global_risk, init_db
 from core.trading_core import session
 from handlers import (
@@ -30,6 +34,10 @@ from app.jobs import (
     reconcile_journal_job, weekly_source_report_job,
     register_protection_watchdog,
     register_exit_binding,
+    register_journal_snapshot,
+    register_private_stream,
+    register_instrument_refresh,
+    register_heat_queue_drain,
     _next_monday_9utc_secs,
 )
 from core.notifier import configure_alerts
@@ -116,6 +124,12 @@ def print_startup_banner():
 if __name__ == '__main__':
     # Загружаем базу до чтения persistent settings в баннере
     init_db()
+    # Локальная история closed-PnL: /report и недельный отчёт не перекачивают
+    # уже завершённые интервалы.
+    configure_closed_pnl_store(CLOSED_PNL_HISTORY_FILE)
+    # Нативный async-транспорт Bybit (BYBIT_TRANSPORT=httpx) для bybit_call.
+    if BYBIT_TRANSPORT == "httpx" and session is not None:
+        configure_async_transport(session)
 
     # Затем показываем баннер
     print_startup_banner()
@@ -192,7 +206,11 @@ if __name__ == '__main__':
                        handle_protection_input),
         group=-1,
     )
-    app.add_handler(MessageHandler((filters.TEXT | filters.CAPTION) & (~filters.COMMAND), parse_and_trade))
+    # Неблокирующий: пока сигнал ждёт Bybit, PTB обрабатывает следующие
+    # обновления — команды управления не стоят в очереди за сигналами.
+    # Параллелизм и очередь по символу — core.signal_pipeline.
+    app.add_handler(MessageHandler((filters.TEXT | filters.CAPTION) & (~filters.COMMAND),
+                                   parse_and_trade, block=False))
 
     async def _ptb_error_handler(update, context):
         """Единственная точка классификации и учёта исключений PTB.
@@ -259,6 +277,24 @@ if __name__ == '__main__':
     #     /start /stop, потому что связь обязана появиться до срабатывания SL/TP.
     register_exit_binding(jq)
 
+    # 11. Приватный WebSocket-поток Bybit (position/order/execution).
+    #     Только при PRIVATE_STREAM_ENABLED; ускоряет реакцию auto-BE и exit
+    #     binding, решения по-прежнему принимаются по REST.
+    register_private_stream(jq)
+
+    # 12. Кеш метаданных инструментов: полная загрузка linear-фильтров сразу
+    #     после старта и далее на TTL (INSTRUMENT_CACHE_TTL_SEC).
+    register_instrument_refresh(jq)
+
+    # 13. Снимок lifecycle журнала (JOURNAL_SNAPSHOT_INTERVAL_SEC): после
+    #     перезапуска доказательства читаются из снимка плюс хвост журнала.
+    register_journal_snapshot(jq)
+
+    # 14. Очередь heat (только при HEAT_ACTION=queue): сделка из очереди
+    #     проверяется заново, когда heat снизился. Событие приватного потока
+    #     запускает разбор сразу.
+    register_heat_queue_drain(jq)
+
     print("✅ Background jobs started...")
 
     # ----------------------------------------
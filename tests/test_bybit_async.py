@@ -0,0 +1,182 @@
+"""
+Нативный async-транспорт Bybit V5 (core.bybit_async).
+
+Доказываемые свойства:
+- запрос подписан по контракту V5 (timestamp + key + recv_window + payload),
+  GET — отсортированная query-строка, POST — JSON с приведением типов pybit;
+- успешный ответ отдаётся тем же конвертом, ненулевой retCode — исключением
+  со status_code и resp_headers, как у pybit; 10006 повторяется после сброса;
+- bybit_call отдаёт нативному клиенту только методы привязанной сессии из
+  ENDPOINTS, остальные вызовы идут через синхронный SDK.
+
+Сети нет: httpx.MockTransport.
+"""
+import hashlib
+import hmac
+import json
+import os
+import sys
+from unittest.mock import MagicMock, patch
+
+for _mod in [
+    "telegram", "telegram.ext", "telegram.request",
+    "pybit", "pybit.unified_trading",
+    "dotenv", "colorama",
+]:
+    sys.modules.setdefault(_mod, MagicMock())
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import httpx  # noqa: E402
+import pytest  # noqa: E402
+
+import core.bybit_async as ba  # noqa: E402
+from core.bybit_call import bybit_call  # noqa: E402
+from core.write_verify import envelope_ok, read_status_code  # noqa: E402
+
+_KEY = "test-key"
+_SECRET = "test-secret"
+
+
+def _ok(result=None):
+    return {"retCode": 0, "retMsg": "OK", "result": result or {"list": []},
+            "retExtInfo": {}, "time": 1}
+
+
+class _Exchange:
+    def __init__(self, *responses):
+        self.responses = list(responses)
+        self.requests = []
+
+    def __call__(self, request: httpx.Request):
+        self.requests.append(request)
+        status, body, headers = self.responses.pop(0)
+        return httpx.Response(status, json=body, headers=headers)
+
+
+def _client(exchange):
+    return ba.AsyncBybitClient(
+        "https://api-testnet.bybit.com", _KEY, _SECRET,
+        transport=httpx.MockTransport(exchange),
+    )
+
+
+def _expected_sign(request, payload):
+    ts = request.headers["X-BAPI-TIMESTAMP"]
+    window = request.headers["X-BAPI-RECV-WINDOW"]
+    return hmac.new(_SECRET.encode(), f"{ts}{_KEY}{window}{payload}".encode(),
+                    hashlib.sha256).hexdigest()
+
+
+@pytest.mark.asyncio
+async def test_get_is_signed_over_sorted_query_and_returns_envelope():
+    body = _ok({"list": [{"symbol": "BTCUSDT", "size": "0.1"}]})
+    exchange = _Exchange((200, body, {}))
+
+    resp = await _client(exchange).request(
+        "get_positions", symbol="BTCUSDT", category="linear", cursor=None,
+    )
+
+    assert resp == body and envelope_ok(resp)
+    request = exchange.requests[0]
+    assert request.url.path == "/v5/position/list"
+    assert request.url.query == b"category=linear&symbol=BTCUSDT"
+    assert request.headers["X-BAPI-SIGN"] == _expected_sign(
+        request, "category=linear&symbol=BTCUSDT")
+
+
+@pytest.mark.asyncio
+async def test_post_body_is_cast_like_pybit_and_signed():
+    exchange = _Exchange((200, _ok({"orderId": "1"}), {}))
+
+    await _client(exchange).request(
+        "set_trading_stop", category="linear", symbol="BTCUSDT",
+        stopLoss=65000.5, positionIdx="0", tpslMode="Full",
+    )
+
+    request = exchange.requests[0]
+    payload = request.content.decode()
+    assert json.loads(payload) == {
+        "category": "linear", "symbol": "BTCUSDT", "stopLoss": "65000.5",
+        "positionIdx": 0, "tpslMode": "Full",
+    }
+    assert request.headers["X-BAPI-SIGN"] == _expected_sign(request, payload)
+
+
+@pytest.mark.asyncio
+async def test_public_endpoint_is_not_signed():
+    exchange = _Exchange((200, _ok(), {}))
+    await _client(exchange).request("get_tickers", category="linear", symbol="BTCUSDT")
+    assert "X-BAPI-SIGN" not in exchange.requests[0].headers
+
+
+@pytest.mark.asyncio
+async def test_error_code_raises_with_status_code_and_headers():
+    exchange = _Exchange((200, {"retCode": 110017, "retMsg": "qty invalid"},
+                          {"X-Bapi-Limit-Status": "9"}))
+
+    with pytest.raises(ba.InvalidRequestError) as err:
+        await _client(exchange).request("place_order", category="linear",
+                                        symbol="BTCUSDT", qty=0.001)
+
+    assert read_status_code(err.value) == 110017
+    assert err.value.resp_headers["X-Bapi-Limit-Status"] == "9"
+
+
+@pytest.mark.asyncio
+async def test_rate_limit_is_retried_after_reset_and_http_error_fails():
+    exchange = _Exchange(
+        (200, {"retCode": 10006, "retMsg": "Too many visits"},
+         {"X-Bapi-Limit-Reset-Timestamp": "0"}),
+        (200, _ok(), {}),
+        (503, {}, {}),
+    )
+    client = _client(exchange)
+    slept = []
+
+    async def _sleep(seconds):
+        slept.append(seconds)
+
+    with patch.object(ba.asyncio, "sleep", new=_sleep):
+        assert envelope_ok(await client.request("get_open_orders", category="linear"))
+    assert slept == [0.0]
+
+    with pytest.raises(ba.FailedRequestError) as err:
+        await client.request("get_open_orders", category="linear")
+    assert err.value.status_code == 503
+
+
+class _Session:
+    endpoint = "https://api-testnet.bybit.com"
+    api_key = _KEY
+    api_secret = _SECRET
+    recv_window = 5000
+
+    def __init__(self):
+        self.sync_calls = []
+
+    def get_positions(self, **kwargs):
+        self.sync_calls.append(("get_positions", kwargs))
+        return _ok()
+
+    def set_leverage(self, **kwargs):
+        self.sync_calls.append(("set_leverage", kwargs))
+        return _ok()
+
+
+@pytest.mark.asyncio
+async def test_bybit_call_routes_only_bound_session_endpoints_natively():
+    session = _Session()
+    exchange = _Exchange((200, _ok({"list": [{"symbol": "ETHUSDT"}]}), {}))
+    client = ba.configure_async_transport(session)
+    client._transport = httpx.MockTransport(exchange)
+    try:
+        native = await bybit_call(session.get_positions, category="linear")
+        await bybit_call(session.set_leverage, category="linear", symbol="ETHUSDT")
+        await bybit_call(_Session().get_positions, category="linear")
+    finally:
+        ba.configure_async_transport(None)
+
+    assert native["result"]["list"] == [{"symbol": "ETHUSDT"}]
+    assert len(exchange.requests) == 1
+    assert [name for name, _ in session.sync_calls] == ["set_leverage"]
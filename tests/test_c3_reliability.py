@@ -141,7 +141,7 @@ class TestAutoCleanupOrdersJob:
 
     @pytest.mark.asyncio
     async def test_stale_order_is_cancelled(self):
-        """Order older than ORDER_TIMEOUT_DAYS → cancel_order called."""
+        """Order older than ORDER_TIMEOUT_DAYS → cancel_batch_order, one summary."""
         from app.jobs import auto_cleanup_orders_job
 
         now_ms = int(time.time() * 1000)
@@ -157,9 +157,22 @@ class TestAutoCleanupOrdersJob:
 
         _orders_resp = {"result": {"list": [stale_order]}}
 
+        batch_calls = []
+        # Сессия, которую видит app.jobs: при полном прогоне модуль мог быть
+        # импортирован с заглушкой core.trading_core другого теста.
+        import app.jobs as jobs_mod
+        job_session = jobs_mod.session
+
         async def fake_bybit_call(fn, *args, **kwargs):
-            if fn == _tc_mock.session.get_open_orders:
+            if fn == job_session.get_open_orders:
                 return _orders_resp
+            if fn == job_session.cancel_batch_order:
+                batch_calls.append(kwargs)
+                return {
+                    "retCode": 0,
+                    "result": {"list": [dict(i) for i in kwargs["request"]]},
+                    "retExtInfo": {"list": [{"code": 0, "msg": "OK"}]},
+                }
             return {}
 
         ctx = MagicMock()
@@ -168,15 +181,22 @@ class TestAutoCleanupOrdersJob:
         db_mock = sys.modules["core.database"]
         db_mock.is_trading_enabled.return_value = True
 
-        with patch("app.jobs.bybit_call", fake_bybit_call):
+        with patch("app.jobs.bybit_call", fake_bybit_call), \
+                patch("app.jobs.is_trading_enabled", return_value=True), \
+                patch("app.jobs.ORDER_TIMEOUT_DAYS", 3), \
+                patch("app.jobs.ALLOWED_ID", "123"):
             await auto_cleanup_orders_job(ctx)
 
-        # cancel_order should have been called via bybit_call
-        # (we can't assert on fake_bybit_call easily, but no exception = success)
+        assert batch_calls == [{
+            "category": "linear",
+            "request": [{"symbol": "BTCUSDT", "orderId": "order-123"}],
+        }]
+        ctx.bot.send_message.assert_awaited_once()
+        assert "BTCUSDT" in ctx.bot.send_message.await_args.kwargs["text"]
 
     @pytest.mark.asyncio
     async def test_fresh_order_not_cancelled(self):
-        """Order newer than ORDER_TIMEOUT_DAYS → cancel_order NOT called."""
+        """Order newer than ORDER_TIMEOUT_DAYS → nothing is cancelled."""
         from app.jobs import auto_cleanup_orders_job
 
         now_ms = int(time.time() * 1000)
@@ -195,8 +215,8 @@ class TestAutoCleanupOrdersJob:
         async def fake_bybit_call(fn, *args, **kwargs):
             if fn == _tc_mock.session.get_open_orders:
                 return {"result": {"list": [fresh_order]}}
-            if fn == _tc_mock.session.cancel_order:
-                cancel_calls.append(kwargs.get("orderId"))
+            if fn == _tc_mock.session.cancel_batch_order:
+                cancel_calls.extend(item["orderId"] for item in kwargs["request"])
             return {}
 
         ctx = MagicMock()
@@ -233,8 +253,8 @@ class TestAutoCleanupOrdersJob:
         async def fake_bybit_call(fn, *args, **kwargs):
             if fn == _tc_mock.session.get_open_orders:
                 return {"result": {"list": [tp_order]}}
-            if fn == _tc_mock.session.cancel_order:
-                cancel_calls.append(kwargs.get("orderId"))
+            if fn == _tc_mock.session.cancel_batch_order:
+                cancel_calls.extend(item["orderId"] for item in kwargs["request"])
             return {}
 
         ctx = MagicMock()
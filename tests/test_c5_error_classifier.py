@@ -107,7 +107,7 @@ class TestBybitCallAlerting:
         def bad_fn():
             raise exc_raised
 
-        with patch("core.bybit_call.asyncio.to_thread", side_effect=exc_raised), \
+        with patch("core.executors.run_network", side_effect=exc_raised), \
              patch("core.notifier.alert_bybit_error", new=fake_alert):
             # Импортируем после патчинга
             sys.modules.pop("core.bybit_call", None)
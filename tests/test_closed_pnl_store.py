@@ -0,0 +1,163 @@
+"""
+Локальная история closed-PnL (core.closed_pnl_store) и её чтение отчётами.
+
+Доказываемые свойства:
+- покрытый интервал отдаётся с диска, биржа запрашивается только по
+  непокрытым промежуткам; история переживает перезапуск (новый объект);
+- завершённая часть промежутка записывается, открытый хвост — только читается;
+- выборка без полного ключа, с повтором ключа или со строкой вне интервала
+  покрытием не становится;
+- повреждённая строка файла делает недоказанными только последующие маркеры,
+  оборванная последняя запись усекается при следующей записи;
+- без включённой истории отчёт делает ровно прежний один вызов выборки.
+
+Сети нет: fetch_closed_pnl_rows заменена счётчиком интервалов.
+"""
+import os
+import sys
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+for _mod in [
+    "telegram", "telegram.ext", "telegram.request", "telegram.error",
+    "pybit", "pybit.unified_trading",
+    "dotenv", "colorama",
+]:
+    sys.modules.setdefault(_mod, MagicMock())
+
+_cfg = MagicMock()
+_cfg.ALLOWED_ID = "123"
+_cfg.DATA_DIR = Path(__file__).resolve().parent.parent / "data"
+sys.modules.setdefault("core.config", _cfg)
+
+for _mod in ["core.trading_core", "core.bybit_call", "core.database", "handlers.orders"]:
+    sys.modules.setdefault(_mod, MagicMock())
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import pytest  # noqa: E402
+
+import core.closed_pnl_store as store_mod  # noqa: E402
+import handlers.reporting as reporting  # noqa: E402
+from core.closed_pnl_store import CLOSED_PNL_SETTLE_MS, ClosedPnlStore  # noqa: E402
+
+_DAY = 24 * 60 * 60 * 1000
+_T0 = 1_770_000_000_000
+
+
+def _row(order_id, ts, pnl="1.0", symbol="BTCUSDT"):
+    return {"symbol": symbol, "orderId": order_id, "updatedTime": str(ts),
+            "closedPnl": pnl}
+
+
+class _Exchange:
+    """Подмена fetch_closed_pnl_rows: строки по updatedTime, учёт интервалов."""
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.calls = []
+
+    async def __call__(self, start_ms, end_ms):
+        self.calls.append((start_ms, end_ms))
+        return [dict(r) for r in self.rows
+                if start_ms <= int(r["updatedTime"]) <= end_ms]
+
+
+@pytest.fixture
+def history(tmp_path):
+    path = tmp_path / "closed_pnl_history.jsonl"
+    store_mod.configure_closed_pnl_store(path)
+    yield path
+    store_mod.configure_closed_pnl_store(None)
+
+
+async def _load(exchange, start, end, now):
+    with patch.object(reporting, "fetch_closed_pnl_rows", new=exchange):
+        return await reporting.load_closed_pnl_rows(start, end, now)
+
+
+@pytest.mark.asyncio
+async def test_finished_interval_is_served_from_disk_after_restart(history):
+    exchange = _Exchange([_row("a", _T0 + 10), _row("b", _T0 + _DAY)])
+    now = _T0 + 30 * _DAY
+
+    first = await _load(exchange, _T0, _T0 + 2 * _DAY, now)
+    store_mod.configure_closed_pnl_store(history)        # «перезапуск»
+    second = await _load(exchange, _T0, _T0 + 2 * _DAY, now)
+
+    assert exchange.calls == [(_T0, _T0 + 2 * _DAY)]
+    assert [r["orderId"] for r in first] == ["a", "b"]
+    assert [r["orderId"] for r in second] == ["a", "b"]
+
+
+@pytest.mark.asyncio
+async def test_only_uncovered_gaps_and_open_tail_are_fetched(history):
+    now = _T0 + 3 * _DAY
+    exchange = _Exchange([_row("a", _T0 + 10), _row("b", _T0 + 2 * _DAY),
+                          _row("c", now - 1000)])
+    await _load(exchange, _T0, _T0 + _DAY, now)
+    exchange.calls.clear()
+
+    rows = await _load(exchange, _T0, now, now)
+
+    settled = now - CLOSED_PNL_SETTLE_MS
+    assert exchange.calls == [(_T0 + _DAY + 1, settled), (settled + 1, now)]
+    assert sorted(r["orderId"] for r in rows) == ["a", "b", "c"]
+
+    exchange.calls.clear()
+    await _load(exchange, _T0, now, now)
+    assert exchange.calls == [(settled + 1, now)]
+
+
+@pytest.mark.parametrize("rows", [
+    [{"symbol": "BTCUSDT", "updatedTime": str(_T0 + 5)}],
+    [_row("a", _T0 + 5), _row("a", _T0 + 5)],
+    [_row("a", _T0 + 3 * _DAY)],
+])
+def test_unproven_selection_is_not_recorded(tmp_path, rows):
+    store = ClosedPnlStore(tmp_path / "h.jsonl")
+
+    assert store.record(_T0, _T0 + _DAY, rows) is False
+    assert store.plan(_T0, _T0 + _DAY) == ([], [(_T0, _T0 + _DAY)])
+    assert not (tmp_path / "h.jsonl").exists()
+
+
+def test_corrupt_line_invalidates_only_later_markers(tmp_path):
+    path = tmp_path / "h.jsonl"
+    store = ClosedPnlStore(path)
+    assert store.record(_T0, _T0 + _DAY, [_row("a", _T0 + 5)])
+    with open(path, "a", encoding="utf-8") as f:
+        f.write("{broken\n")
+    assert store.record(_T0 + _DAY + 1, _T0 + 2 * _DAY, [_row("b", _T0 + _DAY + 5)])
+
+    rows, gaps = ClosedPnlStore(path).plan(_T0, _T0 + 2 * _DAY)
+
+    assert [r["orderId"] for r in rows] == ["a"]
+    assert gaps == [(_T0 + _DAY + 1, _T0 + 2 * _DAY)]
+
+
+def test_torn_tail_is_truncated_before_next_record(tmp_path):
+    path = tmp_path / "h.jsonl"
+    store = ClosedPnlStore(path)
+    assert store.record(_T0, _T0 + _DAY, [_row("a", _T0 + 5)])
+    with open(path, "a", encoding="utf-8") as f:
+        f.write('{"t": "row", "row": {"symbol"')
+
+    reopened = ClosedPnlStore(path)
+    assert reopened.record(_T0 + _DAY + 1, _T0 + 2 * _DAY, [_row("b", _T0 + _DAY + 5)])
+    rows, gaps = ClosedPnlStore(path).plan(_T0, _T0 + 2 * _DAY)
+
+    assert [r["orderId"] for r in rows] == ["a", "b"]
+    assert gaps == []
+
+
+@pytest.mark.asyncio
+async def test_disabled_history_keeps_single_fetch():
+    store_mod.configure_closed_pnl_store(None)
+    exchange = _Exchange([_row("a", _T0 + 10)])
+
+    rows = await _load(exchange, _T0, _T0 + _DAY, _T0 + 30 * _DAY)
+    await _load(exchange, _T0, _T0 + _DAY, _T0 + 30 * _DAY)
+
+    assert exchange.calls == [(_T0, _T0 + _DAY)] * 2
+    assert [r["orderId"] for r in rows] == ["a"]
@@ -0,0 +1,304 @@
+"""
+Общий снимок позиций и открытых ордеров (core.exchange_snapshot).
+
+Доказываемые свойства:
+- одновременные читатели ждут один запрос, повторный читатель в пределах
+  max_age получает сохранённый ответ, а каждый — собственную копию;
+- fresh=True всегда выполняет новый запрос;
+- запись через bybit_call сбрасывает снимок, чтение — нет;
+- недоказанный конверт и ошибка запроса не кешируются;
+- снимок не переиспользуется для другой session/call-пары;
+- открытые ордера читаются всеми страницами по nextPageCursor и отдаются
+  одним конвертом с индексом by_symbol; пустая страница с продолжением,
+  повторный токен и повтор orderId поднимают IncompleteSnapshotError;
+- баланс кешируется тем же снимком, сбрасывается записью, а синхронный
+  peek отдаёт только свежий ответ той же сессии;
+- задачи, решающие о записи (auto-BE, exit binding, очистка ордеров),
+  читают снимки с fresh=True.
+
+Сети нет: session — заглушка, call — счётчик поверх синхронной функции.
+"""
+import asyncio
+import os
+import sys
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+
+for _mod in [
+    "telegram", "telegram.ext", "telegram.request",
+    "pybit", "pybit.unified_trading",
+    "dotenv", "colorama",
+]:
+    sys.modules.setdefault(_mod, MagicMock())
+
+os.environ.setdefault("TELEGRAM_TOKEN", "test-telegram-token")
+os.environ.setdefault("BYBIT_API_KEY", "test-bybit-key")
+os.environ.setdefault("BYBIT_API_SECRET", "test-bybit-secret")
+os.environ.setdefault("ALLOWED_TELEGRAM_ID", "123")
+os.environ.setdefault("IS_DEMO", "True")
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import pytest  # noqa: E402
+
+import core.exchange_snapshot as snap  # noqa: E402
+from core.bybit_call import bybit_call  # noqa: E402
+
+
+def _ok(rows):
+    return {"retCode": 0, "retMsg": "OK", "result": {"list": rows}}
+
+
+class _Session:
+    def __init__(self, *responses):
+        self.responses = list(responses)
+        self.calls = 0
+
+        self.cursors = []
+
+    def _next(self):
+        self.calls += 1
+        resp = self.responses.pop(0)
+        if isinstance(resp, Exception):
+            raise resp
+        return resp
+
+    def get_positions(self, **kwargs):
+        assert kwargs == {"category": "linear", "settleCoin": "USDT"}
+        return self._next()
+
+    def get_wallet_balance(self, **kwargs):
+        assert kwargs == {"accountType": "UNIFIED", "coin": "USDT"}
+        return self._next()
+
+    def get_open_orders(self, cursor=None, **kwargs):
+        assert kwargs == {"category": "linear", "settleCoin": "USDT", "limit": 50}
+        self.cursors.append(cursor)
+        return self._next()
+
+
+async def _slow_call(fn, *args, **kwargs):
+    await asyncio.sleep(0.01)
+    return fn(*args, **kwargs)
+
+
+@pytest.fixture(autouse=True)
+def _clean_cache():
+    snap.invalidate_exchange_snapshots()
+    yield
+    snap.invalidate_exchange_snapshots()
+
+
+@pytest.mark.asyncio
+async def test_concurrent_readers_share_one_request_and_own_copies():
+    session = _Session(_ok([{"symbol": "BTCUSDT", "size": "1"}]))
+
+    first, second = await asyncio.gather(
+        snap.get_positions_snapshot(_slow_call, session),
+        snap.get_positions_snapshot(_slow_call, session),
+    )
+    third = await snap.get_positions_snapshot(_slow_call, session)
+
+    assert session.calls == 1
+    assert first.resp == second.resp == third.resp
+    first.resp["result"]["list"].clear()
+    assert third.resp["result"]["list"] == [{"symbol": "BTCUSDT", "size": "1"}]
+    assert snap.snapshot_age(third) >= 0
+
+
+@pytest.mark.asyncio
+async def test_max_age_and_fresh_force_new_request():
+    session = _Session(_ok([]), _ok([{"symbol": "A"}]), _ok([{"symbol": "B"}]))
+
+    await snap.get_positions_snapshot(_slow_call, session)
+    fresh = await snap.get_positions_snapshot(_slow_call, session, fresh=True)
+    expired = await snap.get_positions_snapshot(_slow_call, session, max_age=0)
+
+    assert session.calls == 3
+    assert fresh.resp["result"]["list"] == [{"symbol": "A"}]
+    assert expired.resp["result"]["list"] == [{"symbol": "B"}]
+
+
+@pytest.mark.asyncio
+async def test_write_through_bybit_call_invalidates_snapshot():
+    session = _Session(_ok([]), _ok([{"symbol": "ETHUSDT"}]))
+
+    def get_tickers():
+        return _ok([])
+
+    def set_trading_stop():
+        return {"retCode": 0}
+
+    await snap.get_positions_snapshot(bybit_call, session)
+    await bybit_call(get_tickers)
+    await snap.get_positions_snapshot(bybit_call, session)
+    assert session.calls == 1
+
+    await bybit_call(set_trading_stop)
+    after = await snap.get_positions_snapshot(bybit_call, session)
+    assert session.calls == 2
+    assert after.resp["result"]["list"] == [{"symbol": "ETHUSDT"}]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("bad", [
+    {"retCode": "0", "result": {"list": []}},
+    {"retCode": 10006, "retMsg": "rate limit", "result": {"list": []}},
+    {"retCode": 0, "result": {}},
+    RuntimeError("timeout"),
+])
+async def test_unproven_response_is_not_cached(bad):
+    session = _Session(bad, _ok([]))
+
+    if isinstance(bad, Exception):
+        with pytest.raises(RuntimeError):
+            await snap.get_positions_snapshot(_slow_call, session)
+    else:
+        first = await snap.get_positions_snapshot(_slow_call, session)
+        # Ответ отдан как есть: решение о достоверности остаётся за
+        # строгим разбором вызывающего.
+        assert first.resp == bad
+    second = await snap.get_positions_snapshot(_slow_call, session)
+
+    assert session.calls == 2
+    assert second.resp == _ok([])
+
+
+@pytest.mark.asyncio
+async def test_snapshot_is_scoped_to_session_and_call():
+    one = _Session(_ok([{"symbol": "A"}]))
+    other = _Session(_ok([{"symbol": "B"}]))
+
+    await snap.get_positions_snapshot(_slow_call, one)
+    result = await snap.get_positions_snapshot(_slow_call, other)
+    orders = _Session(_ok([{"orderId": "1"}]))
+    order_snapshot = await snap.get_open_orders_snapshot(_slow_call, orders)
+
+    assert result.resp["result"]["list"] == [{"symbol": "B"}]
+    assert order_snapshot.kind == snap.SNAPSHOT_OPEN_ORDERS
+    assert (one.calls, other.calls, orders.calls) == (1, 1, 1)
+
+
+def _page(rows, cursor):
+    return {"retCode": 0, "retMsg": "OK",
+            "result": {"list": rows, "nextPageCursor": cursor, "category": "linear"}}
+
+
+def _order(order_id, symbol="BTCUSDT"):
+    return {"orderId": order_id, "symbol": symbol}
+
+
+@pytest.mark.asyncio
+async def test_open_orders_snapshot_merges_all_pages_and_indexes_symbols():
+    session = _Session(
+        _page([_order("a"), _order("b", "ETHUSDT")], "c1"),
+        _page([_order("c")], ""),
+    )
+
+    result = await snap.get_open_orders_snapshot(_slow_call, session)
+
+    assert session.cursors == [None, "c1"]
+    assert [o["orderId"] for o in result.resp["result"]["list"]] == ["a", "b", "c"]
+    assert result.resp["result"]["nextPageCursor"] == ""
+    assert {s: [o["orderId"] for o in rows] for s, rows in result.by_symbol.items()} == {
+        "BTCUSDT": ["a", "c"], "ETHUSDT": ["b"],
+    }
+    assert result.by_symbol["BTCUSDT"][0] is result.resp["result"]["list"][0]
+
+
+@pytest.mark.asyncio
+async def test_anomalous_later_page_is_handed_out_unproven():
+    bad = {"retCode": 10001, "retMsg": "error", "result": {}}
+    session = _Session(_page([_order("a")], "c1"), bad)
+
+    result = await snap.get_open_orders_snapshot(_slow_call, session)
+
+    assert result.resp == bad
+    assert result.by_symbol is None
+
+
+@pytest.mark.parametrize("pages", [
+    [_page([], "c1")],
+    [_page([_order("a")], "c1"), _page([_order("b")], "c1")],
+    [_page([_order("a")], "c1"), _page([_order("a")], "")],
+    [_page([_order("a")], 7)],
+])
+@pytest.mark.asyncio
+async def test_unproven_pagination_fails_closed_and_is_not_cached(pages):
+    session = _Session(*pages, _page([_order("z")], ""))
+
+    with pytest.raises(snap.IncompleteSnapshotError):
+        await snap.get_open_orders_snapshot(_slow_call, session)
+    result = await snap.get_open_orders_snapshot(_slow_call, session)
+
+    assert [o["orderId"] for o in result.resp["result"]["list"]] == ["z"]
+
+
+def _wallet(available):
+    return _ok([{"totalAvailableBalance": available, "totalPerpUPL": "0"}])
+
+
+@pytest.mark.asyncio
+async def test_wallet_snapshot_is_shared_and_dropped_by_write():
+    session = _Session(_wallet("100"), _wallet("90"))
+
+    def place_order():
+        return {"retCode": 0}
+
+    first = await snap.get_wallet_snapshot(bybit_call, session)
+    second = await snap.get_wallet_snapshot(bybit_call, session)
+    assert session.calls == 1
+    assert first.resp == second.resp
+
+    await bybit_call(place_order)
+    after = await snap.get_wallet_snapshot(bybit_call, session)
+    assert session.calls == 2
+    assert after.resp["result"]["list"][0]["totalAvailableBalance"] == "90"
+
+
+@pytest.mark.asyncio
+async def test_wallet_peek_returns_only_fresh_response_of_same_session():
+    session = _Session(_wallet("100"))
+    assert snap.peek_wallet_snapshot(session) is None
+
+    await snap.get_wallet_snapshot(_slow_call, session)
+    peeked = snap.peek_wallet_snapshot(session)
+
+    assert peeked["result"]["list"][0]["totalAvailableBalance"] == "100"
+    peeked["result"]["list"].clear()
+    assert snap.peek_wallet_snapshot(session)["result"]["list"]
+    assert snap.peek_wallet_snapshot(_Session()) is None
+    assert snap.peek_wallet_snapshot(session, max_age=-1) is None
+    snap.invalidate_exchange_snapshots()
+    assert snap.peek_wallet_snapshot(session) is None
+
+
+@pytest.mark.asyncio
+async def test_write_deciding_jobs_demand_fresh_snapshots():
+    import app.jobs as jobs
+
+    reads = []
+
+    def snapshot(kind):
+        async def read(call, session, *, fresh=False, max_age=None):
+            reads.append((kind, fresh))
+            return SimpleNamespace(resp=_ok([]), by_symbol={})
+        return read
+
+    plan = {"anchored": True, "pending_change": {"change_id": "c-1"}}
+    context = SimpleNamespace(bot=AsyncMock())
+    with patch.object(jobs, "get_positions_snapshot", snapshot("positions")), \
+         patch.object(jobs, "get_open_orders_snapshot", snapshot("orders")), \
+         patch.object(jobs, "is_trading_enabled", return_value=True), \
+         patch.object(jobs, "get_auto_protection_evidence",
+                      return_value={"BTCUSDT": plan}), \
+         patch.object(jobs, "get_exit_binding_candidates", return_value={}):
+        await jobs.auto_breakeven_job(context)
+        await jobs.exit_binding_job(context)
+        await jobs.auto_cleanup_orders_job(context)
+
+    assert reads == [
+        ("positions", True), ("orders", True),
+        ("positions", True),
+        ("orders", True),
+    ]
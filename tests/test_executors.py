@@ -0,0 +1,66 @@
+"""
+Пулы потоков для сети и диска (core.executors).
+
+Доказываемые свойства:
+- занятый дисковый пул не задерживает сетевой вызов;
+- сверх числа потоков работа ждёт в очереди, очередь и её пик видны в
+  снимке, после завершения счётчики возвращаются к нулю;
+- исключение пробрасывается без изменений, contextvars видны в потоке.
+"""
+import asyncio
+import contextvars
+import os
+import sys
+import threading
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import pytest  # noqa: E402
+
+import core.executors as ex  # noqa: E402
+
+_VAR = contextvars.ContextVar("_VAR", default=None)
+
+
+@pytest.fixture
+def pools(monkeypatch):
+    network = ex._Pool("test-network", 2)
+    disk = ex._Pool("test-disk", 1)
+    monkeypatch.setattr(ex, "_NETWORK", network)
+    monkeypatch.setattr(ex, "_DISK", disk)
+    yield network, disk
+    for pool in (network, disk):
+        if pool._executor is not None:
+            pool._executor.shutdown(wait=True)
+
+
+@pytest.mark.asyncio
+async def test_busy_disk_pool_does_not_delay_network(pools):
+    release = threading.Event()
+    blocked = asyncio.ensure_future(ex.run_disk(release.wait, 5))
+    queued = asyncio.ensure_future(ex.run_disk(lambda: "after"))
+    await asyncio.sleep(0.05)
+
+    assert await asyncio.wait_for(ex.run_network(lambda: "sl readback"), 1) == "sl readback"
+    disk = ex.get_executor_stats()["disk"]
+    assert (disk["active"], disk["queued"]) == (1, 1)
+    assert disk["peak_queued"] >= 1
+
+    release.set()
+    assert await blocked is True
+    assert await queued == "after"
+    disk = ex.get_executor_stats()["disk"]
+    assert (disk["active"], disk["queued"], disk["completed"]) == (0, 0, 2)
+
+
+@pytest.mark.asyncio
+async def test_exception_and_context_reach_the_caller(pools):
+    def boom():
+        raise ValueError("bad")
+
+    with pytest.raises(ValueError, match="bad"):
+        await ex.run_network(boom)
+
+    _VAR.set("ctx")
+    assert await ex.run_disk(_VAR.get) == "ctx"
+    assert ex.get_executor_stats()["network"]["active"] == 0
@@ -331,6 +331,11 @@ def _handler_env(bybit_mock, *, source_enabled=True, conflict=("allow", ""),
                        new=conflict_mock))
         p(patch.object(signal_parser, "enforce_heat",
                        new=AsyncMock(return_value=heat)))
+        # Ранние чтения конфликта и heat идут мимо bybit_call: инертны.
+        p(patch.object(signal_parser, "read_existing_side",
+                       new=AsyncMock(return_value=None)))
+        p(patch.object(signal_parser, "read_heat_positions",
+                       new=AsyncMock(return_value=None)))
         p(patch.object(signal_parser, "get_global_risk", return_value=risk))
         # Записи на диск/в журнал остаются инертными.
         p(patch.object(signal_parser, "update_risk_for_symbol"))
@@ -472,7 +477,8 @@ class TestEditedMessagePath:
         replies = env.replies()
         assert [target for target, _ in replies] == [msg]
         assert "Дневной PnL" in replies[0][1]
-        env.parse_signal.assert_not_called()
+        # Лимит проверяется только для распознанного сигнала.
+        env.parse_signal.assert_called_once()
         assert _live_write_calls(calls) == []
 
     def test_edited_message_heat_block_replies_html_via_effective(self):
@@ -526,7 +532,7 @@ class TestMalformedSignal:
     """Производственный parser вернул None → прежнее молчаливое поведение."""
 
     def test_malformed_text_returns_silently_without_live_write(self):
-        """Нет ответа пользователю, нет ордеров; дневной лимит уже проверен."""
+        """Нет ответа пользователю, нет ордеров и нет проверки дневного лимита."""
         msg = _make_message(text="просто болтовня без сигнала")
         upd = _edited_update(msg)
         bybit_mock, calls = _bybit_dispatcher()
@@ -538,8 +544,8 @@ class TestMalformedSignal:
         assert env.parse_results == [None]
         # Прежняя семантика: молчаливый return без ответа пользователю.
         assert env.replies() == []
-        # Ни одного запроса дальше проверки дневного лимита.
-        assert calls == [signal_parser.check_daily_limit]
+        # Обычный текст чата не сигнал: ни одного запроса, включая дневной лимит.
+        assert calls == []
         assert _live_write_calls(calls) == []
 
 
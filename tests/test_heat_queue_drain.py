@@ -0,0 +1,284 @@
+"""
+Разбор очереди heat (HEAT_ACTION=queue): handlers.signal_parser.drain_heat_queue.
+
+Доказываемые свойства:
+- допуск идёт по priority, затем FIFO, пока хватает бюджета; первый не
+  влезающий элемент останавливает допуск;
+- heat считается один раз на прогон, недоказанный heat очередь не открывает;
+- допущенная сделка снимается с очереди и проходит все проверки сигнала
+  заново, ответы уходят в чат владельца;
+- сделка, снова упёршаяся в heat, возвращается в очередь со своим queued_at;
+- изменения очереди (с записью на диск) идут через дисковый пул, не в цикле
+  событий;
+- задача разбора регистрируется только при HEAT_ACTION=queue.
+
+Без сети: Telegram и Bybit замокированы в стиле существующих тестов.
+"""
+
+import asyncio
+import os
+import sys
+import threading
+import time
+from unittest.mock import AsyncMock, MagicMock, patch
+
+# ── Mock heavy deps before any project import ─────────────────────────────────
+for _mod in [
+    "telegram", "telegram.ext", "telegram.request", "telegram.error",
+    "pybit", "pybit.unified_trading",
+    "dotenv", "colorama",
+]:
+    sys.modules.setdefault(_mod, MagicMock())
+
+os.environ.setdefault("TELEGRAM_TOKEN", "test-telegram-token")
+os.environ.setdefault("BYBIT_API_KEY", "test-bybit-key")
+os.environ.setdefault("BYBIT_API_SECRET", "test-bybit-secret")
+os.environ.setdefault("ALLOWED_TELEGRAM_ID", "123")
+os.environ.setdefault("IS_DEMO", "True")
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import pytest  # noqa: E402
+
+import handlers.signal_parser as sp  # noqa: E402
+from core.heat import select_heat_admissions  # noqa: E402
+
+
+def _item(sym, risk, queued_at, priority=None):
+    item = {
+        "sym": sym, "side": "LONG", "risk_usd": risk, "queued_at": queued_at,
+        "ttl_min": 30, "signal_text": f"{sym[:-4]} 100 95 long #Test",
+    }
+    if priority is not None:
+        item["priority"] = priority
+    return item
+
+
+# ── select_heat_admissions ────────────────────────────────────────────────────
+
+def test_admission_order_is_priority_then_fifo_within_budget():
+    first = _item("BTCUSDT", 20.0, 1.0)
+    second = _item("ETHUSDT", 20.0, 2.0)
+    urgent = _item("SOLUSDT", 20.0, 3.0, priority=1)
+
+    with patch("core.heat.MAX_TOTAL_HEAT_USDT", 100.0):
+        admitted = select_heat_admissions([second, urgent, first], 50.0)
+
+    assert admitted == [urgent, first]
+
+
+def test_first_item_that_does_not_fit_stops_admission():
+    big = _item("BTCUSDT", 60.0, 1.0)
+    small = _item("ETHUSDT", 5.0, 2.0)
+
+    with patch("core.heat.MAX_TOTAL_HEAT_USDT", 100.0):
+        assert select_heat_admissions([big, small], 50.0) == []
+        assert select_heat_admissions([big, small], 30.0) == [big, small]
+
+
+# ── drain_heat_queue ──────────────────────────────────────────────────────────
+
+class _Queue:
+    """Очередь heat в памяти вместо core.database (без записи на диск)."""
+
+    def __init__(self, *items):
+        self.items = list(items)
+        self.threads = []
+
+    def get(self):
+        return list(self.items)
+
+    def prune(self):
+        self.threads.append(threading.current_thread())
+        return []
+
+    def remove(self, item):
+        self.threads.append(threading.current_thread())
+        if item in self.items:
+            self.items.remove(item)
+            return True
+        return False
+
+    def patches(self):
+        return [
+            patch.object(sp, "get_heat_queue", self.get),
+            patch.object(sp, "prune_heat_queue", self.prune),
+            patch.object(sp, "remove_heat_queue_item", self.remove),
+            patch.object(sp, "heat_queue_enabled", return_value=True),
+            patch.object(sp, "is_trading_enabled", return_value=True),
+        ]
+
+
+async def _drain(queue, heat, trade=None):
+    bot = MagicMock()
+    bot.send_message = AsyncMock()
+    trade = trade or AsyncMock()
+    extra = queue.patches() + [
+        patch.object(sp, "compute_current_heat", AsyncMock(return_value=heat)),
+        patch.object(sp, "_trade_signal", trade),
+        patch("core.heat.MAX_TOTAL_HEAT_USDT", 100.0),
+    ]
+    for p in extra:
+        p.start()
+    try:
+        admitted = await sp.drain_heat_queue(bot)
+    finally:
+        for p in extra:
+            p.stop()
+    return admitted, bot, trade
+
+
+@pytest.mark.asyncio
+async def test_unproven_heat_keeps_queue_closed():
+    queue = _Queue(_item("BTCUSDT", 10.0, 1.0))
+
+    admitted, bot, trade = await _drain(queue, (0.0, "api_error"))
+
+    assert admitted == 0
+    trade.assert_not_called()
+    assert len(queue.items) == 1
+
+
+@pytest.mark.asyncio
+async def test_fitting_items_are_rechecked_in_order_through_owner_chat():
+    first = _item("BTCUSDT", 20.0, 1.0)
+    second = _item("ETHUSDT", 20.0, 2.0)
+    blocked = _item("SOLUSDT", 50.0, 3.0)
+    queue = _Queue(blocked, second, first)
+
+    admitted, bot, trade = await _drain(queue, (50.0, "live"))
+
+    assert admitted == 2
+    assert queue.items == [blocked]
+    rechecked = [call.args[2]["coin"] for call in trade.await_args_list]
+    assert rechecked == ["BTC", "ETH"]
+    chat, passed_bot, _sig, started = trade.await_args_list[0].args
+    assert passed_bot is bot and started is None
+    assert trade.await_args_list[0].kwargs == {
+        "signal_text": first["signal_text"], "queued_at": 1.0,
+    }
+
+    assert len(queue.threads) == 3
+    assert threading.current_thread() not in queue.threads
+
+    await chat.reply_text("карточка")
+    assert bot.send_message.await_args.kwargs == {"chat_id": sp.ALLOWED_ID, "text": "карточка"}
+    assert "проверяется заново" in bot.send_message.await_args_list[0].kwargs["text"]
+
+
+@pytest.mark.asyncio
+async def test_item_without_signal_text_is_dropped():
+    legacy = _item("BTCUSDT", 10.0, 1.0)
+    del legacy["signal_text"]
+    queue = _Queue(legacy)
+
+    admitted, _, trade = await _drain(queue, (0.0, "live"))
+
+    assert admitted == 1
+    trade.assert_not_called()
+    assert queue.items == []
+
+
+@pytest.mark.asyncio
+async def test_failed_recheck_is_reported_to_owner_and_next_item_still_runs():
+    first = _item("BTCUSDT", 20.0, 1.0)
+    second = _item("ETHUSDT", 20.0, 2.0)
+    queue = _Queue(first, second)
+    trade = AsyncMock(side_effect=[RuntimeError("boom"), None])
+
+    admitted, bot, trade = await _drain(queue, (0.0, "live"), trade)
+
+    assert admitted == 2
+    assert queue.items == []
+    assert trade.await_count == 2
+    texts = [call.kwargs["text"] for call in bot.send_message.await_args_list]
+    failures = [t for t in texts if "ERROR" in t]
+    assert len(failures) == 1
+    assert "BTCUSDT" in failures[0] and "boom" in failures[0]
+
+
+@pytest.mark.asyncio
+async def test_recheck_blocked_by_heat_requeues_with_original_queued_at():
+    session = sp.session
+
+    async def bybit(fn, *args, **kwargs):
+        await asyncio.sleep(0)
+        if fn is sp.check_daily_limit:
+            return (True, 0.0)
+        if fn is session.get_tickers:
+            return {"result": {"list": [{"lastPrice": "100"}]}}
+        if fn is session.get_instruments_info:
+            return {"result": {"list": [{
+                "lotSizeFilter": {"qtyStep": "0.001", "minOrderQty": "0.001",
+                                  "maxOrderQty": "0"},
+                "priceFilter": {"tickSize": "0.01"},
+            }]}}
+        if fn is session.get_wallet_balance:
+            return {"result": {"list": [{"totalAvailableBalance": "10000"}]}}
+        if fn is sp.set_leverage_safe:
+            return args[1]
+        raise AssertionError(f"Неожидаемая цель bybit_call: {fn!r}")
+
+    queued_at = time.time() - 60
+    queue = _Queue(_item("BTCUSDT", 10.0, queued_at))
+    heat = AsyncMock(return_value=(False, "queued:⛔ Лимит heat"))
+    bot = MagicMock()
+    bot.send_message = AsyncMock()
+    extra = queue.patches() + [
+        patch.object(sp, "compute_current_heat", AsyncMock(return_value=(0.0, "live"))),
+        patch("core.heat.MAX_TOTAL_HEAT_USDT", 100.0),
+        patch.object(sp, "bybit_call", bybit),
+        patch.object(sp, "is_source_enabled", return_value=True),
+        patch.object(sp, "get_global_risk", return_value=10.0),
+        patch.object(sp, "resolve_signal_conflict", AsyncMock(return_value=("allow", ""))),
+        patch.object(sp, "read_existing_side", AsyncMock(return_value=None)),
+        patch.object(sp, "read_heat_positions", AsyncMock(return_value=None)),
+        patch.object(sp, "enforce_heat", heat),
+        patch.object(sp, "clip_qty", return_value=(2.0, "OK", {"desired_qty": 2.0})),
+    ]
+    for p in extra:
+        p.start()
+    try:
+        assert await sp.drain_heat_queue(bot) == 1
+    finally:
+        for p in extra:
+            p.stop()
+
+    trade_info = heat.await_args.kwargs["trade_info"]
+    assert trade_info["queued_at"] == queued_at
+    assert trade_info["signal_text"] == "BTC 100 95 long #Test"
+    texts = [call.kwargs["text"] for call in bot.send_message.await_args_list]
+    assert "В очереди" in texts[-1]
+
+
+@pytest.mark.asyncio
+async def test_enforce_heat_keeps_queued_at_of_requeued_trade():
+    from core.heat import enforce_heat
+
+    added = []
+    with patch("core.heat.MAX_TOTAL_HEAT_USDT", 100.0), \
+         patch("core.heat.HEAT_ACTION", "queue"), \
+         patch("core.heat.compute_current_heat", AsyncMock(return_value=(95.0, "live"))), \
+         patch("core.heat.add_to_heat_queue", new=added.append), \
+         patch("core.notifier.send_alert", AsyncMock()):
+        await enforce_heat(10.0, {"sym": "BTCUSDT", "queued_at": 123.0}, MagicMock(), "0")
+        await enforce_heat(10.0, {"sym": "ETHUSDT"}, MagicMock(), "0")
+
+    assert added[0]["queued_at"] == 123.0
+    assert added[1]["queued_at"] > 123.0
+
+
+def test_drain_job_registered_only_in_queue_mode():
+    import app.jobs as jobs
+    from app.jobs import heat_queue_job, register_heat_queue_drain
+
+    jq = MagicMock()
+    with patch("core.heat.heat_queue_enabled", return_value=False):
+        assert register_heat_queue_drain(jq) is False
+    jq.run_repeating.assert_not_called()
+
+    with patch("core.heat.heat_queue_enabled", return_value=True), \
+         patch.object(jobs, "HEAT_QUEUE_DRAIN_INTERVAL_SEC", 60):
+        assert register_heat_queue_drain(jq) is True
+    assert jq.run_repeating.call_args.args == (heat_queue_job,)
+    assert jq.run_repeating.call_args.kwargs["interval"] == 60
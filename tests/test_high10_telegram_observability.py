@@ -507,3 +507,17 @@ async def test_health_reports_counters_and_status_truthfully(health_handler):
     assert "OK" in recovered_text and "DEGRADED" not in recovered_text
     assert "Команд с ошибкой / 60 мин: 5" in recovered_text
     assert "Сбоев подряд: 0" in recovered_text
+
+
+@pytest.mark.asyncio
+async def test_health_shows_bybit_queue_metrics(health_handler):
+    """Очереди запросов Bybit видны в карточке как числа из памяти процесса."""
+    update, message = _update()
+    await health_handler.health_command(update, SimpleNamespace())
+    text = _squeeze(message.texts[0])
+
+    assert "Очереди Bybit" in text
+    assert "Записи:" in text and "Фоновые:" in text
+    assert "Отказы 10006:" in text
+    assert "Пулы потоков" in text
+    assert "Сеть (SDK): занято 0/" in text
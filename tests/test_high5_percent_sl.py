@@ -142,7 +142,9 @@ async def _run_signal(text, responses, clip):
          patch.object(sp, "is_source_enabled", return_value=True), \
          patch.object(sp, "get_global_risk", return_value=10.0), \
          patch.object(sp, "resolve_signal_conflict", AsyncMock(return_value=("allow", ""))), \
+         patch.object(sp, "read_existing_side", AsyncMock(return_value=None)), \
          patch.object(sp, "enforce_heat", AsyncMock(return_value=(True, ""))), \
+         patch.object(sp, "read_heat_positions", AsyncMock(return_value=None)), \
          patch.object(sp, "clip_qty", clip), \
          patch.object(sp, "set_market_pending", MagicMock()), \
          patch.object(sp, "update_risk_for_symbol", MagicMock()), \
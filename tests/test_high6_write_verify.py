@@ -401,7 +401,9 @@ async def _run_limit_events(sp, fake):
          patch.object(sp, "is_source_enabled", return_value=True), \
          patch.object(sp, "get_global_risk", return_value=10.0), \
          patch.object(sp, "resolve_signal_conflict", AsyncMock(return_value=("allow", ""))), \
+         patch.object(sp, "read_existing_side", AsyncMock(return_value=None)), \
          patch.object(sp, "enforce_heat", AsyncMock(return_value=(True, ""))), \
+         patch.object(sp, "read_heat_positions", AsyncMock(return_value=None)), \
          patch.object(sp, "clip_qty", _Clip(2.0)), \
          patch.object(sp, "set_market_pending", MagicMock()), \
          patch.object(sp, "update_risk_for_symbol", MagicMock()), \
@@ -461,7 +463,9 @@ async def _run_limit_capturing_risk(sp, fake):
          patch.object(sp, "is_source_enabled", return_value=True), \
          patch.object(sp, "get_global_risk", return_value=10.0), \
          patch.object(sp, "resolve_signal_conflict", AsyncMock(return_value=("allow", ""))), \
+         patch.object(sp, "read_existing_side", AsyncMock(return_value=None)), \
          patch.object(sp, "enforce_heat", AsyncMock(return_value=(True, ""))), \
+         patch.object(sp, "read_heat_positions", AsyncMock(return_value=None)), \
          patch.object(sp, "clip_qty", _Clip(2.0)), \
          patch.object(sp, "set_market_pending", MagicMock()), \
          patch.object(sp, "update_risk_for_symbol", new=risk), \
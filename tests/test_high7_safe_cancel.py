@@ -3,7 +3,7 @@ HIGH-7 — Тесты безопасной пакетной отмены лим
 
 Проверяется, что операторский поток «Отменить лимитные входы» не может удалить
 защитные ордера: fail-closed классификация, preview → подтверждение,
-индивидуальная отмена по точному orderId, снимок защиты до и после, durable
+пакетная отмена по точным парам (symbol, orderId), снимок защиты до и после, durable
 аудит и правдивые формулировки в Telegram.
 
 Сетевых вызовов нет: Bybit и Telegram замокированы. Тесты вызывают
@@ -250,11 +250,12 @@ class _Bybit:
     """Маршрутизатор bybit_call по идентичности метода session.
 
     Очереди ответов выдаются по порядку, последний элемент повторяется — тест
-    не привязывается к точному числу чтений. Все обращения к cancel_order
-    записываются для проверки идемпотентности.
+    не привязывается к точному числу чтений. Каждый элемент cancel_batch_order
+    записывается в ``cancel_calls`` как одиночная отмена (category, symbol,
+    orderId) для проверки идемпотентности, сами пакеты — в ``batch_calls``.
 
-    ``cancel_responses`` задаёт ответ биржи на отмену конкретного orderId;
-    по умолчанию возвращается строго доказанный успех ``retCode`` int 0.
+    ``cancel_responses`` / ``cancel_errors`` задают исход элемента конкретного
+    orderId; по умолчанию элемент — строго доказанный успех ``code`` int 0.
     """
 
     def __init__(self, orders, positions=None, cancel_errors=None,
@@ -264,8 +265,25 @@ class _Bybit:
         self.cancel_errors = dict(cancel_errors or {})
         self.cancel_responses = dict(cancel_responses or {})
         self.cancel_calls = []
+        self.batch_calls = []
         self.bulk_calls = []
 
+    def _item_code(self, oid):
+        """Элемент retExtInfo пакета по сценарию отмены одного orderId.
+
+        Доказанный business-код исключения становится кодом элемента;
+        транспортный сбой и ответ без retCode — элементом без кода.
+        """
+        if oid in self.cancel_errors:
+            code = getattr(self.cancel_errors[oid], "status_code", None)
+            return {"code": code, "msg": "rejected"} if code is not None else {}
+        if oid in self.cancel_responses:
+            resp = self.cancel_responses[oid]
+            if isinstance(resp, dict) and "retCode" in resp:
+                return {"code": resp["retCode"], "msg": ""}
+            return {}
+        return {"code": 0, "msg": "OK"}
+
     @staticmethod
     def _next(queue):
         item = queue.pop(0) if len(queue) > 1 else queue[0]
@@ -278,17 +296,15 @@ class _Bybit:
             return self._next(self.orders)
         if fn is co.session.get_positions:
             return self._next(self.positions)
-        if fn is co.session.cancel_order:
-            self.cancel_calls.append(kwargs)
-            oid = kwargs.get("orderId")
-            if oid in self.cancel_errors:
-                raise self.cancel_errors[oid]
-            if oid in self.cancel_responses:
-                resp = self.cancel_responses[oid]
-                if isinstance(resp, BaseException):
-                    raise resp
-                return resp
-            return {"retCode": 0, "result": {"orderId": oid}}
+        if fn is co.session.cancel_batch_order:
+            self.batch_calls.append(kwargs)
+            rows, codes = [], []
+            for item in kwargs["request"]:
+                self.cancel_calls.append({"category": kwargs["category"], **item})
+                rows.append(dict(item))
+                codes.append(self._item_code(item["orderId"]))
+            return {"retCode": 0, "retMsg": "OK", "result": {"list": rows},
+                    "retExtInfo": {"list": codes}}
         if fn is co.session.cancel_all_orders:
             self.bulk_calls.append(kwargs)
             raise AssertionError("cancel_all_orders запрещён в HIGH-7")
@@ -514,7 +530,7 @@ class TestPreviewConfirmContract:
 
 
 class TestIndividualCancellation:
-    """Индивидуальная отмена: один orderId → максимум одна cancel_order."""
+    """Отмена по точной паре: один orderId → максимум один элемент пакета."""
 
     @pytest.mark.asyncio
     async def test_each_order_cancelled_at_most_once(self, monkeypatch):
@@ -548,6 +564,65 @@ class TestIndividualCancellation:
         assert fake.cancel_calls.count({"category": "linear", "symbol": "BTCUSDT", "orderId": "e-1"}) <= 1
 
 
+class TestBatchCancelEngine:
+    """cancel_batch_order: пачки до 10, исход каждого элемента отдельно."""
+
+    @pytest.mark.asyncio
+    async def test_orders_are_sent_in_chunks_of_ten(self, monkeypatch):
+        """12 входов → два пакета (10 + 2), каждая пара ровно один раз."""
+        ids = [f"e-{i:02d}" for i in range(12)]
+        fake = _Bybit([_orders(*(_entry(i) for i in ids))])
+        events = []
+        await _run_flow(fake, monkeypatch, journal_sink=lambda ev: events.append(ev))
+        assert [len(c["request"]) for c in fake.batch_calls] == [10, 2]
+        assert sorted(c["orderId"] for c in fake.cancel_calls) == ids
+        assert events[0]["cancelled_count"] == 12
+
+    @pytest.mark.asyncio
+    async def test_batch_exception_applies_to_its_chunk_only(self):
+        """Сбой одного пакета не останавливает следующий и не повторяется."""
+        pairs = [("BTCUSDT", f"e-{i:02d}") for i in range(11)]
+        calls = []
+
+        async def call(fn, **kwargs):
+            calls.append(kwargs["request"])
+            if len(calls) == 1:
+                raise RuntimeError("ReadTimeout")
+            return {"retCode": 0, "result": {"list": kwargs["request"]},
+                    "retExtInfo": {"list": [{"code": 0, "msg": "OK"}]}}
+
+        outcomes = await co.cancel_orders_batched(call, co.session, pairs)
+        assert len(calls) == 2
+        assert [outcomes[p] for p in pairs] == [co.UNVERIFIED] * 10 + [co.CANCELLED]
+
+    @pytest.mark.parametrize("resp,expected", [
+        # Элементы по своим кодам: успех, доказанный отказ, код без доказательства.
+        ({"retCode": 0, "result": {"list": [
+            {"symbol": "BTCUSDT", "orderId": "a"},
+            {"symbol": "", "orderId": ""},
+            {"symbol": "", "orderId": ""}]},
+          "retExtInfo": {"list": [{"code": 0}, {"code": 110007}, {"code": "0"}]}},
+         ["cancelled", "rejected", "unverified"]),
+        # Эхо другой пары — успех не доказан.
+        ({"retCode": 0, "result": {"list": [
+            {"symbol": "BTCUSDT", "orderId": "b"},
+            {"symbol": "BTCUSDT", "orderId": "a"},
+            {"symbol": "BTCUSDT", "orderId": "c"}]},
+          "retExtInfo": {"list": [{"code": 0}] * 3}},
+         ["unverified", "unverified", "cancelled"]),
+        # Списки не совпадают по длине с запросом.
+        ({"retCode": 0, "result": {"list": []},
+          "retExtInfo": {"list": [{"code": 0}] * 3}},
+         ["unverified"] * 3),
+        # Доказанный отказ всего пакета.
+        ({"retCode": 110007, "result": {}}, ["rejected"] * 3),
+        (None, ["unverified"] * 3),
+    ])
+    def test_item_outcomes_are_classified_strictly(self, resp, expected):
+        pairs = [("BTCUSDT", "a"), ("BTCUSDT", "b"), ("BTCUSDT", "c")]
+        assert co.classify_batch_cancel_response(resp, pairs) == expected
+
+
 class TestProtectionSnapshot:
     """Снимок защиты позиций до и после отмены: SL/TP preservation."""
 
@@ -0,0 +1,241 @@
+"""
+Кеш метаданных инструментов (core.instrument_cache).
+
+Доказываемые свойства:
+- строка символа после первого запроса отдаётся из памяти в форме прежнего
+  конверта, каждому читателю — собственная копия; fresh=True перечитывает;
+- недоказанный конверт и строка чужого символа не кешируются;
+- полная загрузка проходит все страницы nextPageCursor, после неё чтение
+  не ходит в сеть; аномальная страница оставляет прежний кеш;
+- отказ записи по фильтрам через bybit_call сбрасывает строку ровно этого
+  символа, прочие ошибки — нет; то же для лимитного входа (символ
+  позиционно) и маркет-входа, который гасит исключение сам;
+- строка не переиспользуется для другой session/call-пары.
+
+Сети нет: session — заглушка, call — счётчик поверх синхронной функции;
+place_order сессии handlers.orders подменён.
+"""
+import asyncio
+import os
+import sys
+from unittest.mock import MagicMock, patch
+
+for _mod in [
+    "telegram", "telegram.ext", "telegram.request",
+    "pybit", "pybit.unified_trading",
+    "dotenv", "colorama",
+]:
+    sys.modules.setdefault(_mod, MagicMock())
+
+os.environ.setdefault("TELEGRAM_TOKEN", "test-telegram-token")
+os.environ.setdefault("BYBIT_API_KEY", "test-bybit-key")
+os.environ.setdefault("BYBIT_API_SECRET", "test-bybit-secret")
+os.environ.setdefault("ALLOWED_TELEGRAM_ID", "123")
+os.environ.setdefault("IS_DEMO", "True")
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import pytest  # noqa: E402
+
+import core.instrument_cache as ic  # noqa: E402
+from core import request_scheduler  # noqa: E402
+from core.bybit_call import bybit_call  # noqa: E402
+
+
+def _row(symbol, tick="0.1"):
+    return {
+        "symbol": symbol,
+        "priceFilter": {"tickSize": tick, "minPrice": "0.1", "maxPrice": "1000000"},
+        "lotSizeFilter": {"qtyStep": "0.001", "minOrderQty": "0.001",
+                          "maxOrderQty": "100"},
+    }
+
+
+def _ok(rows, cursor=""):
+    return {"retCode": 0, "retMsg": "OK",
+            "result": {"category": "linear", "list": rows,
+                       "nextPageCursor": cursor}}
+
+
+class _Session:
+    def __init__(self, *responses):
+        self.responses = list(responses)
+        self.requests = []
+
+    def get_instruments_info(self, **kwargs):
+        self.requests.append(kwargs)
+        resp = self.responses.pop(0)
+        if isinstance(resp, Exception):
+            raise resp
+        return resp
+
+
+async def _call(fn, *args, **kwargs):
+    await asyncio.sleep(0)
+    return fn(*args, **kwargs)
+
+
+class _Rejected(Exception):
+    def __init__(self, status_code):
+        super().__init__(f"rejected {status_code}")
+        self.status_code = status_code
+
+
+@pytest.fixture(autouse=True)
+def _clean_cache():
+    ic.invalidate_instrument()
+    ic._INVALIDATED.clear()
+    yield
+    ic.invalidate_instrument()
+    ic._INVALIDATED.clear()
+    # Отказ 10006 в тесте ниже приостанавливает ведро place_order.
+    request_scheduler.reset_request_scheduler()
+
+
+@pytest.mark.asyncio
+async def test_symbol_row_is_served_from_memory_as_copy():
+    session = _Session(_ok([_row("BTCUSDT")]), _ok([_row("BTCUSDT", "0.5")]))
+
+    first = await ic.get_instrument_info(_call, session, "BTCUSDT")
+    second = await ic.get_instrument_info(_call, session, "BTCUSDT")
+
+    assert session.requests == [{"category": "linear", "symbol": "BTCUSDT"}]
+    assert second["result"]["list"] == first["result"]["list"]
+    second["result"]["list"][0]["priceFilter"]["tickSize"] = "9"
+    third = await ic.get_instrument_info(_call, session, "BTCUSDT")
+    assert third["result"]["list"][0]["priceFilter"]["tickSize"] == "0.1"
+
+    fresh = await ic.get_instrument_info(_call, session, "BTCUSDT", fresh=True)
+    assert fresh["result"]["list"][0]["priceFilter"]["tickSize"] == "0.5"
+    assert len(session.requests) == 2
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("bad", [
+    {"retCode": 10006, "retMsg": "rate limit", "result": {"list": []}},
+    {"retCode": "0", "result": {"list": [_row("BTCUSDT")]}},
+    _ok([_row("ETHUSDT")]),
+    _ok([{"priceFilter": {"tickSize": "0.1"}}]),
+])
+async def test_unproven_or_foreign_row_is_not_cached(bad):
+    session = _Session(bad, _ok([_row("BTCUSDT")]))
+
+    assert await ic.get_instrument_info(_call, session, "BTCUSDT") == bad
+    await ic.get_instrument_info(_call, session, "BTCUSDT")
+
+    assert len(session.requests) == 2
+
+
+@pytest.mark.asyncio
+async def test_bulk_refresh_walks_every_page_and_serves_reads():
+    session = _Session(
+        _ok([_row("BTCUSDT"), _row("ETHUSDT")], cursor="page-2"),
+        _ok([_row("SOLUSDT", "0.01")]),
+    )
+
+    assert await ic.refresh_instruments(_call, session) == 3
+    sol = await ic.get_instrument_info(_call, session, "SOLUSDT")
+
+    assert session.requests == [
+        {"category": "linear", "limit": ic.INSTRUMENTS_PAGE_LIMIT},
+        {"category": "linear", "limit": ic.INSTRUMENTS_PAGE_LIMIT,
+         "cursor": "page-2"},
+    ]
+    assert sol["result"]["list"][0]["priceFilter"]["tickSize"] == "0.01"
+
+
+@pytest.mark.asyncio
+async def test_failed_bulk_refresh_keeps_previous_rows():
+    session = _Session(
+        _ok([_row("BTCUSDT")]),
+        _ok([_row("BTCUSDT", "0.5")], cursor="again"),
+        _ok([_row("ETHUSDT")], cursor="again"),
+    )
+    await ic.refresh_instruments(_call, session)
+
+    with pytest.raises(ic.InstrumentCacheError):
+        await ic.refresh_instruments(_call, session)
+
+    btc = await ic.get_instrument_info(_call, session, "BTCUSDT")
+    assert btc["result"]["list"][0]["priceFilter"]["tickSize"] == "0.1"
+    assert len(session.requests) == 3
+
+
+@pytest.mark.asyncio
+async def test_filter_rejection_through_bybit_call_invalidates_symbol():
+    session = _Session(
+        _ok([_row("BTCUSDT"), _row("ETHUSDT")]),
+        _ok([_row("BTCUSDT", "0.5")]),
+    )
+    await ic.refresh_instruments(bybit_call, session)
+
+    def place_order(**kwargs):
+        raise kwargs.pop("error")
+
+    with pytest.raises(_Rejected):
+        await bybit_call(place_order, symbol="BTCUSDT", error=_Rejected(10006),
+                         _alert_errors=False)
+    await ic.get_instrument_info(bybit_call, session, "BTCUSDT")
+    assert len(session.requests) == 1
+
+    with pytest.raises(_Rejected):
+        await bybit_call(place_order, symbol="BTCUSDT", error=_Rejected(110017),
+                         _alert_errors=False)
+    btc = await ic.get_instrument_info(bybit_call, session, "BTCUSDT")
+    await ic.get_instrument_info(bybit_call, session, "ETHUSDT")
+
+    assert btc["result"]["list"][0]["priceFilter"]["tickSize"] == "0.5"
+    assert session.requests[-1] == {"category": "linear", "symbol": "BTCUSDT"}
+    assert len(session.requests) == 2
+
+
+@pytest.mark.asyncio
+async def test_row_is_scoped_to_session_and_call():
+    one = _Session(_ok([_row("BTCUSDT")]))
+    other = _Session(_ok([_row("BTCUSDT", "0.5")]))
+
+    await ic.get_instrument_info(_call, one, "BTCUSDT")
+    result = await ic.get_instrument_info(_call, other, "BTCUSDT")
+
+    assert result["result"]["list"][0]["priceFilter"]["tickSize"] == "0.5"
+    assert (len(one.requests), len(other.requests)) == (1, 1)
+
+
+async def _cached_btc():
+    session = _Session(_ok([_row("BTCUSDT"), _row("ETHUSDT")]),
+                       _ok([_row("BTCUSDT", "0.5")]))
+    await ic.refresh_instruments(bybit_call, session)
+    return session
+
+
+@pytest.mark.asyncio
+async def test_limit_entry_rejection_with_positional_symbol_invalidates():
+    from handlers import orders
+
+    session = await _cached_btc()
+    with patch.object(orders.session, "place_order",
+                      MagicMock(side_effect=_Rejected(110094))):
+        with pytest.raises(_Rejected):
+            await bybit_call(orders.place_limit_order, "BTCUSDT", "Buy", 1.0,
+                             "100", "95", _alert_errors=False)
+
+    await ic.get_instrument_info(bybit_call, session, "ETHUSDT")
+    assert len(session.requests) == 1
+    await ic.get_instrument_info(bybit_call, session, "BTCUSDT")
+    assert session.requests[-1] == {"category": "linear", "symbol": "BTCUSDT"}
+
+
+@pytest.mark.asyncio
+async def test_market_entry_rejection_invalidates_despite_swallowed_error():
+    from handlers import orders
+
+    session = await _cached_btc()
+    with patch.object(orders.session, "place_order",
+                      MagicMock(side_effect=_Rejected(110017))):
+        result = await bybit_call(orders.place_market_with_retry, "BTCUSDT",
+                                  "Buy", 1.0, "95", 0.001, 0.001)
+
+    assert result[0] is False
+    await ic.get_instrument_info(bybit_call, session, "BTCUSDT")
+    assert session.requests[-1] == {"category": "linear", "symbol": "BTCUSDT"}
+    assert len(session.requests) == 2
@@ -0,0 +1,222 @@
+"""
+Компактная кодировка журнала (core.journal_codec) и её использование для
+запечатанных сегментов (core.journal, JOURNAL_COMPACT_SEGMENTS).
+
+Доказываемые свойства:
+- JSONL → компактная форма → JSONL возвращает исходные байты, включая битые,
+  неканонические и оборванные строки;
+- сегмент, разобранный из компактной формы, даёт те же tolerant- и
+  strict-события и ту же аномалию, что и разбор JSONL;
+- повреждённый компактный файл (байт payload, выпавшая или переставленная
+  запись, нет END) — CompactFormatError по цепочке CRC, а не тихая потеря;
+- запечатанный сегмент с компактной копией разбирается из неё без чтения
+  JSONL, с тем же результатом; копия чужого mtime или с повреждённым телом
+  игнорируется.
+
+Изоляция: journal импортируется заново с tmp_path-конфигом; сети нет.
+"""
+
+import importlib
+import io
+import json
+import os
+import sys
+from pathlib import Path as _Path
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+for _mod in [
+    "telegram", "telegram.ext", "telegram.request",
+    "pybit", "pybit.unified_trading",
+    "dotenv", "colorama",
+]:
+    sys.modules.setdefault(_mod, MagicMock())
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from core import journal_codec  # noqa: E402
+
+
+def _fresh_journal(tmp_path: _Path, segment_bytes: int = 0, compact: bool = False):
+    """Свежий core.journal с журналом внутри tmp_path."""
+    cfg = MagicMock()
+    cfg.DATA_DIR = tmp_path
+    cfg.JOURNAL_FILE = tmp_path / "trade_journal.jsonl"
+    cfg.DISABLED_SOURCES_FILE = tmp_path / "disabled_sources.json"
+    cfg.QUARANTINE_LOSS_STREAK = 0
+    cfg.QUARANTINE_DAILY_PNL_USDT = 0
+    cfg.QUARANTINE_WEEKLY_PNL_USDT = 0
+
+    with patch.dict(sys.modules, {"core.config": cfg}):
+        sys.modules.pop("core.journal", None)
+        journal = importlib.import_module("core.journal")
+        journal._DISABLED_SOURCES.clear()
+    journal.JOURNAL_SEGMENT_MAX_BYTES = segment_bytes
+    journal.JOURNAL_COMPACT_SEGMENTS = compact
+    return journal
+
+
+def _line(event):
+    return json.dumps(event, ensure_ascii=False).encode("utf-8") + b"\n"
+
+
+_TRICKY = b"".join([
+    _line({"event": "ENTRY_PLACED", "symbol": "BTCUSDT", "order_id": "o-1", "ts": 1.5}),
+    _line({"event": "NOTE", "symbol": "ETHUSDT", "text": "кириллица", "n": [1, None, True]}),
+    b'{"event": "NOTE",  "spaced": 1}\n',
+    b'{"event": "A", "event": "B"}\n',
+    b"[1, 2]\n",
+    b"not json\n",
+    b"\xff\xfe\n",
+    b"\n",
+    b'{"event": "NOTE"}\r{"event": "CR"}\n',
+    _line({"event": "ENTRY_PLACED", "symbol": 5, "ts": -0.0}),
+    b'{"event": "TORN", "sym',
+])
+
+
+def test_round_trip_is_byte_identical(tmp_path):
+    src = tmp_path / "journal.jsonl"
+    src.write_bytes(_TRICKY)
+
+    journal_codec.jsonl_to_compact(str(src), str(tmp_path / "j.tjc"))
+    journal_codec.compact_to_jsonl(str(tmp_path / "j.tjc"), str(tmp_path / "back.jsonl"))
+
+    assert (tmp_path / "back.jsonl").read_bytes() == _TRICKY
+    assert journal_codec._main(
+        ["to-jsonl", str(tmp_path / "j.tjc"), str(tmp_path / "cli.jsonl")]
+    ) == 0
+    assert (tmp_path / "cli.jsonl").read_bytes() == _TRICKY
+
+
+def test_repeated_keys_and_strings_are_stored_once():
+    event = {"event": "ENTRY_PLACED", "symbol": "BTCUSDT", "order_id": "o-1"}
+    data = _line(event) * 200
+
+    compact = journal_codec.encode_jsonl(data)
+
+    assert len(compact) < len(data)
+    for text in (b"ENTRY_PLACED", b"BTCUSDT", b"order_id"):
+        assert compact.count(text) == 1
+    records = list(journal_codec.iter_records(io.BytesIO(compact)))
+    assert [value for _kind, _n, value in records] == [event] * 200
+    assert sum(n for _kind, n, _value in records) == len(data)
+
+
+def _records(compact: bytes) -> list:
+    """Записи компактного файла сырыми байтами (заголовок + payload)."""
+    out, pos = [], len(journal_codec.MAGIC)
+    while pos < len(compact):
+        _kind, length, _n, _crc = journal_codec._HEADER.unpack_from(compact, pos)
+        end = pos + journal_codec._HEADER.size + length
+        out.append(compact[pos:end])
+        pos = end
+    return out
+
+
+def test_damaged_compact_file_is_rejected():
+    compact = journal_codec.encode_jsonl(
+        _line({"event": "NOTE", "symbol": "BTCUSDT", "n": 1})
+        + _line({"event": "NOTE", "symbol": "BTCUSDT", "n": 2})
+    )
+    magic = journal_codec.MAGIC
+    records = _records(compact)
+    flipped = bytearray(compact)
+    flipped[-journal_codec._HEADER.size - 3] ^= 0x01
+    swapped = records[:]
+    swapped[-2], swapped[-3] = swapped[-3], swapped[-2]
+
+    for damaged in (
+        compact[:-3],
+        b"JSON" + compact[4:],
+        bytes(flipped),
+        magic + b"".join(records[:-2] + records[-1:]),
+        magic + b"".join(swapped),
+        magic + b"".join(records[:-1]),
+        compact + records[-1],
+    ):
+        with pytest.raises(journal_codec.CompactFormatError):
+            list(journal_codec.iter_records(io.BytesIO(damaged)))
+
+
+def test_compact_parse_matches_jsonl_parse(tmp_path):
+    journal = _fresh_journal(tmp_path)
+    clean = b"".join(line for line in _TRICKY.splitlines(keepends=True)[:2])
+
+    for data in (clean, clean + b"not json\n" + clean, clean + b'{"event": "TORN"'):
+        jsonl = journal._SegmentIndex("seg", None)
+        jsonl.consume(data)
+        compact = journal._SegmentIndex("seg", None)
+        compact.consume_records(
+            journal_codec.iter_records(io.BytesIO(journal_codec.encode_jsonl(data)))
+        )
+        assert (compact.events, compact.strict, compact.strict_error,
+                compact.pending_raw, compact.offset) == (
+            jsonl.events, jsonl.strict, jsonl.strict_error,
+            jsonl.pending_raw, jsonl.offset)
+
+
+def _write_history(journal):
+    for i in range(6):
+        assert journal.append_event({"event": journal.ENTRY_PLACED, "symbol": "BTCUSDT",
+                                     "side": "LONG", "order_id": f"o-{i}",
+                                     "order_link_id": f"l-{i}"})
+        assert journal.append_event({"event": journal.CLOSED, "symbol": "BTCUSDT",
+                                     "order_id": f"o-{i}", "pnl_usdt": 1.0})
+
+
+def _restart(journal):
+    journal._INDEX = None
+    journal._SEALED.clear()
+    journal._SEGMENT_META.clear()
+
+
+def test_sealed_segment_is_parsed_from_its_compact_copy(tmp_path):
+    journal = _fresh_journal(tmp_path, segment_bytes=400, compact=True)
+    _write_history(journal)
+    copies = sorted(p.name for p in tmp_path.iterdir() if p.name.endswith(".tjc"))
+    assert copies
+    expected = journal.read_events()
+    owned = journal.get_bot_entry_identities()
+    _restart(journal)
+
+    with patch.object(journal._SegmentIndex, "consume", side_effect=AssertionError):
+        segments = journal._journal_segments()
+        for segment in segments:
+            journal._sealed_index(segment)
+    assert journal.read_events() == expected
+    assert journal.get_bot_entry_identities() == owned
+
+
+def test_foreign_compact_copy_is_ignored(tmp_path):
+    journal = _fresh_journal(tmp_path, segment_bytes=400, compact=True)
+    _write_history(journal)
+    expected = journal.read_events()
+    segment = journal._journal_segments()[0]
+    st = os.stat(segment[0])
+    journal_codec.write_compact(
+        journal.compact_segment_path(segment[0]),
+        _line({"event": "NOTE"}),
+        meta={"size": segment[1], "mtime_ns": st.st_mtime_ns - 1},
+    )
+    _restart(journal)
+
+    assert journal.read_events() == expected
+
+
+def test_compact_copy_with_damaged_body_is_ignored(tmp_path):
+    journal = _fresh_journal(tmp_path, segment_bytes=400, compact=True)
+    _write_history(journal)
+    expected = journal.read_events()
+    owned = journal.get_bot_entry_identities()
+    copy = journal.compact_segment_path(journal._journal_segments()[0][0])
+    raw = bytearray(open(copy, "rb").read())
+    # META цела, повреждено тело: «BTCUSDT» в STRING-записи → «BTCUSDU».
+    at = raw.index(b"BTCUSDT") + 6
+    raw[at] ^= 0x01
+    open(copy, "wb").write(bytes(raw))
+    _restart(journal)
+
+    assert journal.read_events() == expected
+    assert journal.get_bot_entry_identities() == owned
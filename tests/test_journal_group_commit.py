@@ -0,0 +1,184 @@
+"""
+Group commit журнала (core.journal.submit_event / append_event).
+
+Доказываемые свойства:
+- события, поставленные в очередь до ожидания, пишутся одной записью с одним
+  fsync, в порядке отправки;
+- каждое событие получает свой результат: некодируемое событие — своё
+  исключение, остальные пачки — True;
+- сбой fsync делает недоказанной всю пачку: False получает каждое событие;
+- append_event под уже взятым _JOURNAL_LOCK пишет напрямую, без deadlock;
+- обслуживание после записи (индекс, ротация) идёт раз на пачку и уже после
+  уведомления ожидающих;
+- journal-only события exit_binding_job по разным инструментам ставятся в
+  очередь до ожидания и делят один fsync.
+
+Изоляция: journal импортируется заново с tmp_path-конфигом; сети нет.
+"""
+
+import asyncio
+import importlib
+import json
+import os
+import sys
+import threading
+from pathlib import Path as _Path
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+for _mod in [
+    "telegram", "telegram.ext", "telegram.request",
+    "pybit", "pybit.unified_trading",
+    "dotenv", "colorama",
+]:
+    sys.modules.setdefault(_mod, MagicMock())
+
+os.environ.setdefault("TELEGRAM_TOKEN", "test-telegram-token")
+os.environ.setdefault("BYBIT_API_KEY", "test-bybit-key")
+os.environ.setdefault("BYBIT_API_SECRET", "test-bybit-secret")
+os.environ.setdefault("ALLOWED_TELEGRAM_ID", "123")
+os.environ.setdefault("IS_DEMO", "True")
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+
+def _fresh_journal(tmp_path: _Path):
+    """Свежий core.journal с журналом внутри tmp_path."""
+    cfg = MagicMock()
+    cfg.DATA_DIR = tmp_path
+    cfg.JOURNAL_FILE = tmp_path / "trade_journal.jsonl"
+    cfg.DISABLED_SOURCES_FILE = tmp_path / "disabled_sources.json"
+    cfg.QUARANTINE_LOSS_STREAK = 0
+    cfg.QUARANTINE_DAILY_PNL_USDT = 0
+    cfg.QUARANTINE_WEEKLY_PNL_USDT = 0
+
+    with patch.dict(sys.modules, {"core.config": cfg}):
+        sys.modules.pop("core.journal", None)
+        journal = importlib.import_module("core.journal")
+        journal._DISABLED_SOURCES.clear()
+        return journal
+
+
+def _gathering(journal, batch):
+    """Писатель ждёт, пока в очереди не наберётся *batch* событий."""
+    journal.JOURNAL_GROUP_COMMIT_WINDOW_MS = 5000
+    journal.JOURNAL_GROUP_COMMIT_MAX_EVENTS = batch
+
+
+def _counting_fsync(journal):
+    real_fsync = os.fsync
+    calls = []
+
+    def fsync(fd):
+        calls.append(fd)
+        return real_fsync(fd)
+
+    return calls, patch.object(journal.os, "fsync", fsync)
+
+
+def _note(i):
+    return {"event": "NOTE", "symbol": "BTCUSDT", "n": i}
+
+
+def test_queued_events_share_one_fsync(tmp_path):
+    journal = _fresh_journal(tmp_path)
+    _gathering(journal, 5)
+    calls, counting = _counting_fsync(journal)
+
+    with counting:
+        futures = [journal.submit_event(_note(i)) for i in range(5)]
+        results = [future.result(timeout=10) for future in futures]
+
+    assert results == [True] * 5
+    assert len(calls) == 1
+    lines = journal.JOURNAL_FILE.read_text(encoding="utf-8").splitlines()
+    assert [json.loads(line)["n"] for line in lines] == [0, 1, 2, 3, 4]
+
+
+def test_unencodable_event_fails_alone(tmp_path):
+    journal = _fresh_journal(tmp_path)
+    _gathering(journal, 3)
+
+    futures = [
+        journal.submit_event(_note(0)),
+        journal.submit_event({"event": "NOTE", "bad": object()}),
+        journal.submit_event(_note(2)),
+    ]
+
+    assert futures[0].result(timeout=10) is True
+    with pytest.raises(TypeError):
+        futures[1].result(timeout=10)
+    assert futures[2].result(timeout=10) is True
+    assert [ev["n"] for ev in journal.read_events()] == [0, 2]
+
+
+def test_failed_fsync_fails_every_event_of_the_batch(tmp_path):
+    journal = _fresh_journal(tmp_path)
+    _gathering(journal, 2)
+
+    def broken_fsync(fd):
+        raise OSError("disk gone")
+
+    with patch.object(journal.os, "fsync", broken_fsync):
+        futures = [journal.submit_event(_note(i)) for i in range(2)]
+        results = [future.result(timeout=10) for future in futures]
+
+    assert results == [False, False]
+
+
+def test_append_event_under_journal_lock_writes_directly(tmp_path):
+    journal = _fresh_journal(tmp_path)
+    done = []
+
+    def held():
+        with journal._JOURNAL_LOCK:
+            done.append(journal.append_event(_note(1)))
+
+    worker = threading.Thread(target=held)
+    worker.start()
+    worker.join(timeout=10)
+
+    assert not worker.is_alive()
+    assert done == [True]
+    assert journal.append_event(_note(2)) is True
+    assert [ev["n"] for ev in journal.read_events()] == [1, 2]
+
+
+def test_batch_maintenance_runs_once_before_waiters_are_notified(tmp_path):
+    journal = _fresh_journal(tmp_path)
+    _gathering(journal, 3)
+    futures = []
+    seen = []
+
+    def after(end_pos):
+        seen.append((end_pos, [future.done() for future in futures]))
+
+    with patch.object(journal, "_after_append_unlocked", after):
+        futures.extend(journal.submit_event(_note(i)) for i in range(3))
+        assert [future.result(timeout=10) for future in futures] == [True] * 3
+
+    size = journal.JOURNAL_FILE.stat().st_size
+    assert seen == [(size, [False, False, False])]
+
+
+def test_journal_only_job_writes_share_one_fsync(tmp_path):
+    import app.jobs as jobs
+
+    journal = _fresh_journal(tmp_path)
+    _gathering(journal, 3)
+    calls, counting = _counting_fsync(journal)
+    reports = []
+    pending = {sym: {"n": i} for i, sym in enumerate(["BTCUSDT", "ETHUSDT", "SOLUSDT"])}
+
+    def build(sym, plan):
+        return _note(plan["n"])
+
+    def report(sym, plan, written):
+        reports.append((sym, written))
+
+    with counting, patch.object(jobs, "submit_event", journal.submit_event):
+        asyncio.run(jobs._journal_append_batch(pending, build, report))
+
+    assert reports == [("BTCUSDT", True), ("ETHUSDT", True), ("SOLUSDT", True)]
+    assert len(calls) == 1
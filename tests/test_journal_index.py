@@ -0,0 +1,145 @@
+"""
+Инкрементальный индекс журнала (core.journal._journal_index).
+
+Доказываемые свойства:
+- после первого разбора читается только дописанный хвост, а результат
+  read_events совпадает с построчным чтением файла;
+- аномалия в дописанном хвосте делает строгий результат недоказанным, а
+  оборванная последняя строка перестаёт быть аномалией, когда её дописали;
+- подменённый (перезаписанный, усечённый) журнал пересобирается с нуля;
+- вызывающий код не может изменить индекс через возвращённые события.
+
+Изоляция: journal импортируется заново с tmp_path-конфигом; сети нет.
+"""
+
+import importlib
+import json
+import os
+import sys
+from pathlib import Path as _Path
+from unittest.mock import MagicMock, patch
+
+for _mod in [
+    "telegram", "telegram.ext", "telegram.request",
+    "pybit", "pybit.unified_trading",
+    "dotenv", "colorama",
+]:
+    sys.modules.setdefault(_mod, MagicMock())
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+
+def _fresh_journal(tmp_path: _Path):
+    """Свежий core.journal с журналом внутри tmp_path."""
+    cfg = MagicMock()
+    cfg.DATA_DIR = tmp_path
+    cfg.JOURNAL_FILE = tmp_path / "trade_journal.jsonl"
+    cfg.DISABLED_SOURCES_FILE = tmp_path / "disabled_sources.json"
+    cfg.QUARANTINE_LOSS_STREAK = 0
+    cfg.QUARANTINE_DAILY_PNL_USDT = 0
+    cfg.QUARANTINE_WEEKLY_PNL_USDT = 0
+
+    with patch.dict(sys.modules, {"core.config": cfg}):
+        sys.modules.pop("core.journal", None)
+        journal = importlib.import_module("core.journal")
+        journal._DISABLED_SOURCES.clear()
+        return journal
+
+
+def _entry(journal, symbol, order_id):
+    return {"event": journal.ENTRY_PLACED, "symbol": symbol,
+            "order_id": order_id, "order_link_id": f"l-{order_id}"}
+
+
+def test_only_appended_tail_is_parsed(tmp_path):
+    journal = _fresh_journal(tmp_path)
+    for i in range(5):
+        assert journal.append_event(_entry(journal, "BTCUSDT", f"o-{i}"))
+    assert len(journal.read_events()) == 5
+
+    real_loads = json.loads
+    parsed = []
+
+    def counting_loads(text, *args, **kwargs):
+        parsed.append(text)
+        return real_loads(text, *args, **kwargs)
+
+    assert journal.append_event(_entry(journal, "ETHUSDT", "o-new"))
+    with patch.object(journal.json, "loads", counting_loads):
+        events = journal.read_events()
+        by_symbol = journal.read_events(symbol="ETHUSDT")
+        owned = journal.get_bot_entry_identities()
+
+    # Повторные чтения разобрали ровно одну новую строку.
+    assert len(parsed) == 1
+    assert [ev["order_id"] for ev in events] == [
+        "o-0", "o-1", "o-2", "o-3", "o-4", "o-new",
+    ]
+    assert [ev["order_id"] for ev in by_symbol] == ["o-new"]
+    assert ("ETHUSDT", "o-new") in owned
+    assert journal._INDEX.offset == journal.JOURNAL_FILE.stat().st_size
+
+
+def test_anomaly_in_tail_makes_strict_result_unproven(tmp_path):
+    journal = _fresh_journal(tmp_path)
+    assert journal.append_event(_entry(journal, "BTCUSDT", "o-1"))
+    assert journal.get_bot_entry_identities() == {
+        ("BTCUSDT", "o-1"): {"order_id": "o-1", "order_link_id": "l-o-1"},
+    }
+
+    # Оборванная последняя строка: строгий результат не доказан...
+    line = json.dumps(_entry(journal, "ETHUSDT", "o-2"))
+    with open(journal.JOURNAL_FILE, "a", encoding="utf-8") as handle:
+        handle.write(line[:10])
+    assert journal.get_bot_entry_identities() == {}
+    assert journal.get_exit_binding_events() is None
+    # ...но только пока писатель её не завершил.
+    with open(journal.JOURNAL_FILE, "a", encoding="utf-8") as handle:
+        handle.write(line[10:] + "\n")
+    assert set(journal.get_bot_entry_identities()) == {
+        ("BTCUSDT", "o-1"), ("ETHUSDT", "o-2"),
+    }
+
+    # Битая строка в хвосте недоказанным делает весь результат, а tolerant
+    # чтение по-прежнему её пропускает.
+    with open(journal.JOURNAL_FILE, "a", encoding="utf-8") as handle:
+        handle.write("{не json\n")
+    assert journal.append_event(_entry(journal, "SOLUSDT", "o-3"))
+    assert journal.get_bot_entry_identities() == {}
+    assert journal.get_exit_binding_candidates() == {}
+    assert [ev["order_id"] for ev in journal.read_events()] == [
+        "o-1", "o-2", "o-3",
+    ]
+
+
+def test_replaced_journal_is_rebuilt(tmp_path):
+    journal = _fresh_journal(tmp_path)
+    for i in range(3):
+        assert journal.append_event(_entry(journal, "BTCUSDT", f"o-{i}"))
+    assert len(journal.read_events()) == 3
+
+    # Перезапись тем же inode с другим содержимым.
+    journal.JOURNAL_FILE.write_text(
+        json.dumps(_entry(journal, "XRPUSDT", "x-1")) + "\n", encoding="utf-8",
+    )
+    assert [ev["symbol"] for ev in journal.read_events()] == ["XRPUSDT"]
+    assert set(journal.get_bot_entry_identities()) == {("XRPUSDT", "x-1")}
+
+    journal.JOURNAL_FILE.unlink()
+    assert journal.read_events() == []
+    assert journal.get_bot_entry_identities() == {}
+
+
+def test_returned_events_do_not_alias_the_index(tmp_path):
+    journal = _fresh_journal(tmp_path)
+    assert journal.append_event(_entry(journal, "BTCUSDT", "o-1"))
+    assert journal.append_event({
+        "event": journal.EXIT_ORDER_BOUND, "symbol": "BTCUSDT",
+        "exit_order_id": "sl-1",
+    })
+
+    journal.read_events()[0]["order_id"] = "tampered"
+    journal.get_exit_binding_events()[0]["exit_order_id"] = "tampered"
+
+    assert journal.read_events()[0]["order_id"] == "o-1"
+    assert journal.get_exit_binding_events()[0]["exit_order_id"] == "sl-1"
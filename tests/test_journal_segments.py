@@ -0,0 +1,283 @@
+"""
+Сегменты журнала (core.journal: ротация и индекс запечатанного сегмента).
+
+Доказываемые свойства:
+- доросший до JOURNAL_SEGMENT_MAX_BYTES активный файл запечатывается, рядом
+  появляется его индекс, а чтения видят все сегменты в физическом порядке;
+- lifecycle и владение сквозные: вход в старом сегменте, закрытие в новом;
+- после перезапуска запрос по времени или символу не разбирает сегменты,
+  которые по индексу не подходят; символ читается по смещениям строк;
+- строгий разбор видит аномалию внутри запечатанного сегмента;
+- потерянный или чужой индекс сегмента пересобирается по файлу;
+- снимок lifecycle поверх сегментов поднимается без их разбора, в том числе
+  после того как его активный файл запечатали;
+- строгие читатели (связывание, подтверждение, риск выхода) отвечают из
+  свёрток индекса и запечатанные сегменты заново не разбирают;
+- ротация включается только явно, а свёрнутые сегменты в памяти не
+  остаются: кеш разобранных сегментов ограничен.
+
+Изоляция: journal импортируется заново с tmp_path-конфигом; сети нет.
+"""
+
+import importlib
+import os
+import sys
+from pathlib import Path as _Path
+from unittest.mock import MagicMock, patch
+
+for _mod in [
+    "telegram", "telegram.ext", "telegram.request",
+    "pybit", "pybit.unified_trading",
+    "dotenv", "colorama",
+]:
+    sys.modules.setdefault(_mod, MagicMock())
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+
+def _fresh_journal(tmp_path: _Path, segment_bytes: int = 400):
+    """Свежий core.journal с журналом внутри tmp_path и маленьким сегментом.
+
+    ``segment_bytes=None`` оставляет размер сегмента, прочитанный из окружения.
+    """
+    cfg = MagicMock()
+    cfg.DATA_DIR = tmp_path
+    cfg.JOURNAL_FILE = tmp_path / "trade_journal.jsonl"
+    cfg.DISABLED_SOURCES_FILE = tmp_path / "disabled_sources.json"
+    cfg.QUARANTINE_LOSS_STREAK = 0
+    cfg.QUARANTINE_DAILY_PNL_USDT = 0
+    cfg.QUARANTINE_WEEKLY_PNL_USDT = 0
+
+    with patch.dict(sys.modules, {"core.config": cfg}):
+        sys.modules.pop("core.journal", None)
+        journal = importlib.import_module("core.journal")
+        journal._DISABLED_SOURCES.clear()
+    if segment_bytes is not None:
+        journal.JOURNAL_SEGMENT_MAX_BYTES = segment_bytes
+    return journal
+
+
+def _restart(journal):
+    """Имитирует перезапуск процесса: всё разобранное в памяти потеряно."""
+    journal._INDEX = None
+    journal._SEALED.clear()
+    journal._SEGMENT_META.clear()
+
+
+def _entry(journal, symbol, order_id, ts):
+    return {"event": journal.ENTRY_PLACED, "symbol": symbol, "side": "LONG",
+            "order_id": order_id, "order_link_id": f"l-{order_id}", "ts": ts}
+
+
+def _closed(journal, symbol, order_id, ts):
+    return {"event": journal.CLOSED, "symbol": symbol, "order_id": order_id,
+            "order_link_id": f"l-{order_id}", "ts": ts, "pnl_usdt": 1.0}
+
+
+def _segments(tmp_path):
+    return sorted(p.name for p in tmp_path.iterdir() if p.name[-6:].isdigit())
+
+
+def _write_history(journal):
+    """Старый ETH-lifecycle целиком в первом сегменте, BTC — через стык."""
+    assert journal.append_event(_entry(journal, "ETHUSDT", "e-1", 1000.0))
+    assert journal.append_event(_closed(journal, "ETHUSDT", "e-1", 1001.0))
+    assert journal.append_event(_entry(journal, "BTCUSDT", "b-1", 1002.0))
+    assert journal.append_event({"event": "NOTE", "symbol": "BTCUSDT",
+                                 "ts": 1003.0, "pad": "x" * 200})
+    assert journal.append_event(_closed(journal, "BTCUSDT", "b-1", 5000.0))
+    assert journal.append_event(_entry(journal, "SOLUSDT", "s-1", 5001.0))
+
+
+def test_rotation_keeps_order_and_lifecycles(tmp_path):
+    journal = _fresh_journal(tmp_path)
+    _write_history(journal)
+
+    segments = _segments(tmp_path)
+    assert segments
+    for name in segments:
+        assert (tmp_path / f"{name}.idx").exists()
+
+    order_ids = [ev.get("order_id") for ev in journal.read_events()]
+    assert order_ids == ["e-1", "e-1", "b-1", None, "b-1", "s-1"]
+    assert journal.get_position_lifecycles()["BTCUSDT"]["state"] == journal.TERMINAL
+    assert set(journal.get_bot_entry_identities()) == {("SOLUSDT", "s-1")}
+
+    _restart(journal)
+    assert [ev.get("order_id") for ev in journal.read_events()] == order_ids
+    assert set(journal.get_bot_entry_identities()) == {("SOLUSDT", "s-1")}
+
+
+def test_bounded_reads_skip_irrelevant_sealed_segments(tmp_path):
+    journal = _fresh_journal(tmp_path)
+    _write_history(journal)
+    _restart(journal)
+
+    recent = journal.read_events(event_type=journal.CLOSED, since_ts=4000.0)
+    assert [ev["order_id"] for ev in recent] == ["b-1"]
+    assert journal._SEALED == {}
+
+    eth = journal.read_events(symbol="ETHUSDT")
+    assert [ev["event"] for ev in eth] == [journal.ENTRY_PLACED, journal.CLOSED]
+    # Символ прочитан по смещениям строк из индекса, сегмент целиком не разобран.
+    assert journal._SEALED == {}
+
+    stats = journal.compute_source_stats(since_ts=4000.0)
+    assert stats["unknown"]["trade_count"] == 1
+
+
+def test_anomaly_in_sealed_segment_makes_strict_result_unproven(tmp_path):
+    journal = _fresh_journal(tmp_path)
+    _write_history(journal)
+    first = tmp_path / _segments(tmp_path)[0]
+    raw = first.read_bytes()
+    # Та же длина, но первая строка больше не JSON.
+    first.write_bytes(b"#" + raw[1:])
+    _restart(journal)
+
+    assert journal.get_bot_entry_identities() == {}
+    assert journal.get_auto_protection_evidence() == {}
+    # Tolerant-чтение битую строку просто пропускает.
+    assert len(journal.read_events()) == 5
+
+
+def test_missing_or_foreign_segment_index_is_rebuilt(tmp_path):
+    journal = _fresh_journal(tmp_path)
+    _write_history(journal)
+    names = _segments(tmp_path)
+    (tmp_path / f"{names[0]}.idx").unlink()
+    if len(names) > 1:
+        (tmp_path / f"{names[1]}.idx").write_text("{}", encoding="utf-8")
+    _restart(journal)
+
+    eth = journal.read_events(symbol="ETHUSDT")
+
+    assert [ev["order_id"] for ev in eth] == ["e-1", "e-1"]
+    for name in names:
+        assert (tmp_path / f"{name}.idx").exists()
+        assert journal._read_checked_json(str(tmp_path / f"{name}.idx"))["size"] == (
+            (tmp_path / name).stat().st_size
+        )
+
+
+def test_snapshot_over_segments_skips_sealed_parse(tmp_path):
+    journal = _fresh_journal(tmp_path)
+    _write_history(journal)
+    expected = journal.get_position_lifecycles()
+    assert journal.save_lifecycle_snapshot()
+    _restart(journal)
+
+    assert journal.get_position_lifecycles() == expected
+    assert set(journal.get_bot_entry_identities()) == {("SOLUSDT", "s-1")}
+    assert journal._INDEX.partial
+    assert journal._SEALED == {}
+
+
+def test_rotation_disabled_keeps_single_file(tmp_path):
+    journal = _fresh_journal(tmp_path, segment_bytes=0)
+    _write_history(journal)
+
+    assert _segments(tmp_path) == []
+    assert len(journal.read_events()) == 6
+
+
+def _counting_sealed(journal):
+    """Патч _sealed_index, записывающий пути разобранных сегментов."""
+    real = journal._sealed_index
+    parsed = []
+
+    def counting(segment, *args, **kwargs):
+        parsed.append(os.path.basename(segment[0]))
+        return real(segment, *args, **kwargs)
+
+    return parsed, patch.object(journal, "_sealed_index", counting)
+
+
+def _planned_entry(journal, symbol, order_id, ts):
+    ev = _entry(journal, symbol, order_id, ts)
+    ev.update(qty="1", planned_risk_usdt=2.0)
+    return ev
+
+
+def _bound(journal, symbol, exit_order_id, ts):
+    return {"event": journal.EXIT_ORDER_BOUND, "symbol": symbol,
+            "exit_order_id": exit_order_id, "planned_risk_usdt": 2.0, "ts": ts}
+
+
+def test_snapshot_survives_rotation_of_its_active_file(tmp_path):
+    journal = _fresh_journal(tmp_path)
+    _write_history(journal)
+    assert journal.save_lifecycle_snapshot()
+    before = _segments(tmp_path)
+
+    journal.JOURNAL_SEGMENT_MAX_BYTES = 1
+    assert journal.append_event(_planned_entry(journal, "XRPUSDT", "x-1", 6000.0))
+    journal.JOURNAL_SEGMENT_MAX_BYTES = 0
+    assert journal.append_event(_closed(journal, "SOLUSDT", "s-1", 6001.0))
+    assert len(_segments(tmp_path)) == len(before) + 1
+    expected = journal.get_position_lifecycles()
+    _restart(journal)
+
+    parsed, counting = _counting_sealed(journal)
+    with counting:
+        assert journal.get_position_lifecycles() == expected
+        assert set(journal.get_bot_entry_identities()) == {("XRPUSDT", "x-1")}
+    # Сегменты снимка не разбирались: свёрнут только хвост файла, который
+    # был активным при снимке.
+    assert parsed == []
+    assert not journal._INDEX.partial
+
+
+def test_strict_readers_answer_from_folds_after_restart(tmp_path):
+    journal = _fresh_journal(tmp_path)
+    assert journal.append_event(_planned_entry(journal, "ETHUSDT", "e-1", 1000.0))
+    assert journal.append_event(_bound(journal, "ETHUSDT", "sl-e", 1001.0))
+    assert journal.append_event({"event": "NOTE", "ts": 1002.0, "pad": "x" * 400})
+    assert journal.append_event(_planned_entry(journal, "BTCUSDT", "b-1", 1003.0))
+    assert journal.append_event(_bound(journal, "BTCUSDT", "sl-b", 1004.0))
+    assert _segments(tmp_path)
+    assert journal.save_lifecycle_snapshot()
+    _restart(journal)
+
+    parsed, counting = _counting_sealed(journal)
+    counting.start()
+    candidates = journal.get_exit_binding_candidates()
+    assert {sym: info["order_id"] for sym, info in candidates.items()} == {
+        "ETHUSDT": "e-1", "BTCUSDT": "b-1",
+    }
+    assert [ev["exit_order_id"] for ev in journal.get_exit_binding_events()] == [
+        "sl-e", "sl-b",
+    ]
+    assert journal.get_tp_ladder_fill_events() == []
+    assert journal.get_exit_order_risk_evidence() == {
+        ("ETHUSDT", "sl-e"): 2.0, ("BTCUSDT", "sl-b"): 2.0,
+    }
+    assert journal.is_current_pending_lifecycle("BTCUSDT", {
+        "order_id": "b-1", "order_link_id": "l-b-1", "entry_event_ts": 1003.0,
+    })
+    counting.stop()
+    assert parsed == []
+
+
+def test_rotation_is_opt_in(tmp_path, monkeypatch):
+    monkeypatch.delenv("JOURNAL_SEGMENT_MAX_BYTES", raising=False)
+    journal = _fresh_journal(tmp_path, segment_bytes=None)
+    assert journal.JOURNAL_SEGMENT_MAX_BYTES == 0
+
+    _write_history(journal)
+    assert _segments(tmp_path) == []
+
+
+def test_folded_segments_are_not_kept_in_memory(tmp_path):
+    journal = _fresh_journal(tmp_path, segment_bytes=150)
+    for i in range(12):
+        assert journal.append_event(_entry(journal, "ETHUSDT", f"e-{i}", 1000.0 + i))
+    segments = _segments(tmp_path)
+    assert len(segments) > journal._SEALED_CACHE_SEGMENTS
+    _restart(journal)
+
+    assert journal.get_position_lifecycles()["ETHUSDT"]["order_id"] == "e-11"
+    assert journal._SEALED == {}
+
+    assert len(journal.read_events()) == 12
+    assert len(journal._SEALED) == journal._SEALED_CACHE_SEGMENTS
@@ -0,0 +1,190 @@
+"""
+Снимок materialised-состояния журнала (core.journal.save_lifecycle_snapshot).
+
+Доказываемые свойства:
+- после перезапуска lifecycle и владение поднимаются из снимка, а разбирается
+  только хвост журнала; результат совпадает с разбором с нуля;
+- чтение событий после старта со снимка всё равно видит весь журнал;
+- снимок с неверной контрольной суммой или от подменённого журнала
+  отвергается — журнал разбирается с нуля;
+- недоказанный (повреждённый) журнал в снимок не попадает;
+- Decimal, кортежные ключи и dict с «метками» переживают кодирование.
+
+Изоляция: journal импортируется заново с tmp_path-конфигом; сети нет.
+"""
+
+import importlib
+import json
+import os
+import sys
+from decimal import Decimal
+from pathlib import Path as _Path
+from unittest.mock import MagicMock, patch
+
+for _mod in [
+    "telegram", "telegram.ext", "telegram.request",
+    "pybit", "pybit.unified_trading",
+    "dotenv", "colorama",
+]:
+    sys.modules.setdefault(_mod, MagicMock())
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+
+def _fresh_journal(tmp_path: _Path):
+    """Свежий core.journal с журналом внутри tmp_path."""
+    cfg = MagicMock()
+    cfg.DATA_DIR = tmp_path
+    cfg.JOURNAL_FILE = tmp_path / "trade_journal.jsonl"
+    cfg.DISABLED_SOURCES_FILE = tmp_path / "disabled_sources.json"
+    cfg.QUARANTINE_LOSS_STREAK = 0
+    cfg.QUARANTINE_DAILY_PNL_USDT = 0
+    cfg.QUARANTINE_WEEKLY_PNL_USDT = 0
+
+    with patch.dict(sys.modules, {"core.config": cfg}):
+        sys.modules.pop("core.journal", None)
+        journal = importlib.import_module("core.journal")
+        journal._DISABLED_SOURCES.clear()
+        return journal
+
+
+def _entry(journal, symbol, order_id):
+    return {"event": journal.ENTRY_PLACED, "symbol": symbol, "side": "LONG",
+            "order_id": order_id, "order_link_id": f"l-{order_id}"}
+
+
+def _restart(journal):
+    """Имитирует перезапуск процесса: индекс в памяти потерян."""
+    journal._INDEX = None
+
+
+def _write_history(journal):
+    assert journal.append_event(_entry(journal, "BTCUSDT", "o-1"))
+    assert journal.append_event({
+        "event": journal.POSITION_CONFIRMED, "symbol": "BTCUSDT",
+        "order_id": "o-1", "order_link_id": "l-o-1", "position_idx": 0,
+    })
+    assert journal.append_event(_entry(journal, "ETHUSDT", "o-2"))
+    assert journal.append_event({
+        "event": journal.CLOSED, "symbol": "ETHUSDT",
+        "order_id": "o-2", "order_link_id": "l-o-2",
+    })
+
+
+def test_restart_replays_only_the_tail(tmp_path):
+    journal = _fresh_journal(tmp_path)
+    _write_history(journal)
+    assert journal.save_lifecycle_snapshot()
+    covered = journal._INDEX.offset
+
+    assert journal.append_event(_entry(journal, "SOLUSDT", "o-3"))
+    _restart(journal)
+
+    lifecycles = journal.get_position_lifecycles()
+    owned = journal.get_bot_entry_identities()
+
+    index = journal._INDEX
+    assert index.partial
+    assert [ev["order_id"] for ev in index.events] == ["o-3"]
+    assert index.offset > covered
+
+    assert lifecycles["BTCUSDT"]["state"] == journal.CONFIRMED
+    assert lifecycles["BTCUSDT"]["position_idx"] == 0
+    assert lifecycles["ETHUSDT"]["state"] == journal.TERMINAL
+    assert lifecycles["SOLUSDT"]["state"] == journal.PENDING
+    assert set(owned) == {("BTCUSDT", "o-1"), ("SOLUSDT", "o-3")}
+
+    os.remove(journal.lifecycle_snapshot_path())
+    _restart(journal)
+    assert journal.get_position_lifecycles() == lifecycles
+    assert journal.get_bot_entry_identities() == owned
+    assert not journal._INDEX.partial
+
+
+def test_event_reads_after_snapshot_start_see_whole_journal(tmp_path):
+    journal = _fresh_journal(tmp_path)
+    _write_history(journal)
+    assert journal.save_lifecycle_snapshot()
+    _restart(journal)
+
+    journal.get_position_lifecycles()
+    assert journal._INDEX.partial
+
+    assert len(journal.read_events()) == 4
+    assert not journal._INDEX.partial
+
+
+def test_corrupt_snapshot_is_ignored(tmp_path):
+    journal = _fresh_journal(tmp_path)
+    _write_history(journal)
+    assert journal.save_lifecycle_snapshot()
+
+    path = journal.lifecycle_snapshot_path()
+    with open(path, encoding="utf-8") as f:
+        document = json.load(f)
+    document["payload"] = document["payload"].replace('"o-1"', '"o-9"')
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(document, f)
+    _restart(journal)
+
+    owned = journal.get_bot_entry_identities()
+
+    assert not journal._INDEX.partial
+    assert set(owned) == {("BTCUSDT", "o-1")}
+
+
+def test_snapshot_of_rewritten_journal_is_ignored(tmp_path):
+    journal = _fresh_journal(tmp_path)
+    _write_history(journal)
+    assert journal.save_lifecycle_snapshot()
+
+    # Та же длина и тот же inode, но другое содержимое префикса.
+    raw = journal.JOURNAL_FILE.read_bytes()
+    with open(journal.JOURNAL_FILE, "r+b") as f:
+        f.write(raw.replace(b'"o-1"', b'"o-7"'))
+    _restart(journal)
+
+    owned = journal.get_bot_entry_identities()
+
+    assert not journal._INDEX.partial
+    assert set(owned) == {("BTCUSDT", "o-7")}
+
+
+def test_unproven_journal_is_not_snapshotted(tmp_path):
+    journal = _fresh_journal(tmp_path)
+    _write_history(journal)
+    with open(journal.JOURNAL_FILE, "ab") as f:
+        f.write(b"not json\n")
+
+    assert journal.save_lifecycle_snapshot() is False
+    assert not os.path.exists(journal.lifecycle_snapshot_path())
+    assert journal.get_bot_entry_identities() == {}
+
+
+def test_unchanged_prefix_is_not_rewritten(tmp_path):
+    journal = _fresh_journal(tmp_path)
+    _write_history(journal)
+
+    assert journal.save_lifecycle_snapshot() is True
+    assert journal.save_lifecycle_snapshot() is False
+    assert journal.append_event(_entry(journal, "SOLUSDT", "o-3"))
+    assert journal.save_lifecycle_snapshot() is True
+
+
+def test_state_encoding_round_trips(tmp_path):
+    journal = _fresh_journal(tmp_path)
+    state = {
+        ("BTCUSDT", "o-1"): {"order_link_id": "l-1"},
+        "ETHUSDT": {
+            "trigger": Decimal("101.50"),
+            "pair": ("a", 1),
+            "raw": {"$decimal": "not a tag"},
+            "flags": [True, None, 1.25],
+        },
+    }
+
+    encoded = json.loads(json.dumps(journal._snapshot_encode(state)))
+    decoded = journal._snapshot_decode(encoded)
+
+    assert decoded == state
+    assert type(decoded["ETHUSDT"]["trigger"]) is Decimal
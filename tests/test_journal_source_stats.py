@@ -0,0 +1,164 @@
+"""
+Статистика источников по столбцам CLOSED (core.journal._ClosedColumns).
+
+Доказываемые свойства:
+- столбцовый путь (numpy и array-fallback) даёт ту же статистику, что и
+  построчный compute_source_stats(events) по read_events, для всех окон;
+- столбцы дописываются инкрементально: повторный вызов разбирает только
+  новые события CLOSED;
+- автокарантин считает все окна одним проходом, не перечитывая журнал;
+- событие, которое столбцами не выразить, переводит расчёт на построчный путь;
+- окно по времени не переводит в столбцы заведомо ранние сегменты.
+
+Изоляция: journal импортируется заново с tmp_path-конфигом; сети нет.
+"""
+
+import importlib
+import os
+import sys
+from pathlib import Path as _Path
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+for _mod in [
+    "telegram", "telegram.ext", "telegram.request",
+    "pybit", "pybit.unified_trading",
+    "dotenv", "colorama",
+]:
+    sys.modules.setdefault(_mod, MagicMock())
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+def _fresh_journal(tmp_path: _Path, segment_bytes: int = 0):
+    """Свежий core.journal с журналом внутри tmp_path."""
+    cfg = MagicMock()
+    cfg.DATA_DIR = tmp_path
+    cfg.JOURNAL_FILE = tmp_path / "trade_journal.jsonl"
+    cfg.DISABLED_SOURCES_FILE = tmp_path / "disabled_sources.json"
+    cfg.QUARANTINE_LOSS_STREAK = 0
+    cfg.QUARANTINE_DAILY_PNL_USDT = 0
+    cfg.QUARANTINE_WEEKLY_PNL_USDT = 0
+
+    with patch.dict(sys.modules, {"core.config": cfg}):
+        sys.modules.pop("core.journal", None)
+        journal = importlib.import_module("core.journal")
+        journal._DISABLED_SOURCES.clear()
+    journal.JOURNAL_SEGMENT_MAX_BYTES = segment_bytes
+    return journal
+
+
+_BACKENDS = [
+    pytest.param(None, id="array"),
+    pytest.param(
+        numpy, id="numpy",
+        marks=pytest.mark.skipif(numpy is None, reason="numpy не установлен"),
+    ),
+]
+
+
+def _closed(journal, tag, pnl, r, ts):
+    event = {"event": journal.CLOSED, "symbol": "BTCUSDT",
+             "pnl_usdt": pnl, "R": r, "ts": ts}
+    if tag is not None:
+        event["source_tag"] = tag
+    return event
+
+
+def _write_trades(journal, count=60):
+    tags = ["#A", "#B", None, "#C"]
+    for i in range(count):
+        pnl = ((i * 7) % 11 - 5) * 0.25
+        assert journal.append_event(
+            _closed(journal, tags[i % len(tags)], pnl, pnl / 2, 1000.0 + i)
+        )
+        if i % 9 == 0:
+            assert journal.append_event({"event": journal.ENTRY_PLACED,
+                                         "symbol": "ETHUSDT", "ts": 1000.0 + i})
+
+
+def _legacy(journal, since_ts=0.0):
+    events = journal.read_events(event_type=journal.CLOSED, since_ts=since_ts)
+    return journal.compute_source_stats(events)
+
+
+@pytest.mark.parametrize("backend", _BACKENDS)
+def test_columns_match_row_by_row_stats(tmp_path, backend):
+    journal = _fresh_journal(tmp_path)
+    journal._np = backend
+    _write_trades(journal)
+
+    windows = {"all": 0.0, "recent": 1030.0, "tail": 1059.0, "none": 5000.0}
+    computed = journal.compute_source_stats_windows(windows)
+
+    for name, since_ts in windows.items():
+        assert computed[name] == _legacy(journal, since_ts)
+        assert list(computed[name]) == list(_legacy(journal, since_ts))
+    assert journal.compute_source_stats() == computed["all"]
+    assert computed["none"] == {}
+
+
+@pytest.mark.parametrize("backend", _BACKENDS)
+def test_columns_grow_incrementally(tmp_path, backend):
+    journal = _fresh_journal(tmp_path)
+    journal._np = backend
+    _write_trades(journal, count=20)
+    journal.compute_source_stats()
+
+    added = []
+    real_add = journal._ClosedColumns.add
+
+    def counting_add(self, ev):
+        added.append(ev)
+        return real_add(self, ev)
+
+    assert journal.append_event(_closed(journal, "#A", -1.0, -0.5, 2000.0))
+    with patch.object(journal._ClosedColumns, "add", counting_add):
+        stats = journal.compute_source_stats()
+
+    assert len(added) == 1
+    assert stats == _legacy(journal)
+
+
+def test_quarantine_uses_one_pass_without_rereading(tmp_path):
+    journal = _fresh_journal(tmp_path)
+    now = journal.time.time()
+    for i in range(3):
+        assert journal.append_event(_closed(journal, "#Bad", -10.0, -1.0, now - 60 + i))
+
+    with patch.object(journal, "QUARANTINE_DAILY_PNL_USDT", -20.0), \
+         patch.object(journal, "QUARANTINE_WEEKLY_PNL_USDT", -100.0), \
+         patch.object(journal, "read_events", side_effect=AssertionError), \
+         patch.object(journal, "_save_disabled_sources"):
+        quarantined = journal.check_and_quarantine_sources()
+
+    assert [tag for tag, _reason in quarantined] == ["#Bad"]
+    assert "daily PnL -30.00$" in quarantined[0][1]
+
+
+def test_irregular_event_falls_back_to_row_by_row(tmp_path):
+    journal = _fresh_journal(tmp_path)
+    _write_trades(journal, count=8)
+    assert journal.append_event(_closed(journal, "#A", "1.5", 0.5, "late"))
+
+    with journal._JOURNAL_LOCK:
+        assert journal._closed_columns().irregular
+    assert journal.compute_source_stats() == _legacy(journal)
+
+
+def test_time_window_skips_earlier_sealed_segments(tmp_path):
+    journal = _fresh_journal(tmp_path, segment_bytes=600)
+    _write_trades(journal, count=40)
+    segments = journal._journal_segments()
+    assert len(segments) > 1
+
+    stats = journal.compute_source_stats(since_ts=1035.0)
+
+    assert stats == _legacy(journal, 1035.0)
+    assert segments[0] not in journal._CLOSED_SEALED
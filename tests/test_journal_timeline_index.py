@@ -0,0 +1,149 @@
+"""
+Индекс строк по символу для /timeline (core.journal._timeline_events).
+
+Доказываемые свойства:
+- /timeline разбирает только строки своего символа, а не весь журнал;
+- индекс дописывается вслед за append_event;
+- пакетная отмена попадает в индекс символа через symbols и точные пары;
+- несходящийся индекс (мусор, чужой файл, переписанный журнал)
+  пересобирается, и результат совпадает с полным просмотром;
+- хронология продолжается в запечатанные сегменты.
+
+Изоляция: journal импортируется заново с tmp_path-конфигом; сети нет.
+"""
+
+import importlib
+import json
+import os
+import sys
+from pathlib import Path as _Path
+from unittest.mock import MagicMock, patch
+
+for _mod in [
+    "telegram", "telegram.ext", "telegram.request",
+    "pybit", "pybit.unified_trading",
+    "dotenv", "colorama",
+]:
+    sys.modules.setdefault(_mod, MagicMock())
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+
+def _fresh_journal(tmp_path: _Path, segment_bytes: int = 0):
+    """Свежий core.journal с журналом внутри tmp_path."""
+    cfg = MagicMock()
+    cfg.DATA_DIR = tmp_path
+    cfg.JOURNAL_FILE = tmp_path / "trade_journal.jsonl"
+    cfg.DISABLED_SOURCES_FILE = tmp_path / "disabled_sources.json"
+    cfg.QUARANTINE_LOSS_STREAK = 0
+    cfg.QUARANTINE_DAILY_PNL_USDT = 0
+    cfg.QUARANTINE_WEEKLY_PNL_USDT = 0
+
+    with patch.dict(sys.modules, {"core.config": cfg}):
+        sys.modules.pop("core.journal", None)
+        journal = importlib.import_module("core.journal")
+        journal._DISABLED_SOURCES.clear()
+    journal.JOURNAL_SEGMENT_MAX_BYTES = segment_bytes
+    return journal
+
+
+def _entry(journal, symbol, order_id):
+    return {"event": journal.ENTRY_PLACED, "symbol": symbol,
+            "order_id": order_id, "order_link_id": f"l-{order_id}"}
+
+
+def _order_ids(timeline):
+    return [entry["details"].get("order_id") for entry in timeline]
+
+
+def _count_loads(journal):
+    real_loads = json.loads
+    parsed = []
+
+    def counting_loads(text, *args, **kwargs):
+        parsed.append(text)
+        return real_loads(text, *args, **kwargs)
+
+    return parsed, patch.object(journal.json, "loads", counting_loads)
+
+
+def test_timeline_parses_only_lines_of_its_symbol(tmp_path):
+    journal = _fresh_journal(tmp_path)
+    for i in range(40):
+        assert journal.append_event(_entry(journal, "ETHUSDT", f"e-{i}"))
+        if i % 10 == 0:
+            assert journal.append_event(_entry(journal, "BTCUSDT", f"b-{i}"))
+
+    assert _order_ids(journal.get_trade_timeline("btcusdt", limit=2)) == ["b-20", "b-30"]
+    assert os.path.exists(journal.timeline_index_path())
+
+    # Индекс дописывается вслед за append_event, без чтения timeline.
+    assert journal.append_event(_entry(journal, "BTCUSDT", "b-new"))
+    with open(journal.timeline_index_path(), encoding="utf-8") as f:
+        last = json.loads(f.read().splitlines()[-1])
+    assert last[2] == ["BTCUSDT"]
+
+    parsed, counting = _count_loads(journal)
+    with counting:
+        timeline = journal.get_trade_timeline("BTCUSDT", limit=2)
+    assert _order_ids(timeline) == ["b-30", "b-new"]
+    assert len(parsed) == 2
+
+
+def test_cancel_batch_is_indexed_by_symbols_and_exact_pairs(tmp_path):
+    journal = _fresh_journal(tmp_path)
+    assert journal.append_event(_entry(journal, "BTCUSDT", "b-1"))
+    assert journal.append_event({
+        "event": journal.ORDER_CANCEL_BATCH,
+        "symbols": ["ethusdt"],
+        "cancelled_ids": ["SOLUSDT:s-1", "XRPUSDT:"],
+    })
+
+    assert [e["event"] for e in journal.get_trade_timeline("SOLUSDT")] == [
+        journal.ORDER_CANCEL_BATCH,
+    ]
+    assert [e["event"] for e in journal.get_trade_timeline("ETHUSDT")] == [
+        journal.ORDER_CANCEL_BATCH,
+    ]
+    assert journal.get_trade_timeline("XRPUSDT") == []
+
+
+def test_inconsistent_index_is_rebuilt(tmp_path):
+    journal = _fresh_journal(tmp_path)
+    for i in range(5):
+        assert journal.append_event(_entry(journal, "BTCUSDT", f"b-{i}"))
+    expected = journal.get_trade_timeline("BTCUSDT")
+
+    for garbage in ("not json\n", '{"version": 1, "identity": [0, 0]}\n'):
+        with open(journal.timeline_index_path(), "w", encoding="utf-8") as f:
+            f.write(garbage)
+        journal._TIMELINE = None
+        assert journal.get_trade_timeline("BTCUSDT") == expected
+
+
+def test_rewritten_journal_is_reindexed(tmp_path):
+    journal = _fresh_journal(tmp_path)
+    for i in range(3):
+        assert journal.append_event(_entry(journal, "BTCUSDT", f"b-{i}"))
+    assert len(journal.get_trade_timeline("BTCUSDT")) == 3
+
+    lines = [json.dumps(_entry(journal, "ETHUSDT", f"e-{i}")) for i in range(3)]
+    journal.JOURNAL_FILE.write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+    assert journal.get_trade_timeline("BTCUSDT") == []
+    assert _order_ids(journal.get_trade_timeline("ETHUSDT")) == ["e-0", "e-1", "e-2"]
+
+
+def test_timeline_continues_into_sealed_segments(tmp_path):
+    journal = _fresh_journal(tmp_path, segment_bytes=300)
+    for i in range(12):
+        assert journal.append_event(_entry(journal, "BTCUSDT", f"b-{i}"))
+        assert journal.append_event(_entry(journal, "ETHUSDT", f"e-{i}"))
+    assert any(name.endswith(".000001") for name in os.listdir(tmp_path))
+
+    timeline = journal.get_trade_timeline("BTCUSDT", limit=100)
+
+    assert _order_ids(timeline) == [f"b-{i}" for i in range(12)]
+    assert _order_ids(journal.get_trade_timeline("BTCUSDT", limit=3)) == [
+        "b-9", "b-10", "b-11",
+    ]
@@ -0,0 +1,223 @@
+"""
+Кеш плеча (core.leverage_cache) и пропуск лишних set_leverage.
+
+Доказываемые свойства:
+- успешный get_positions через bybit_call засевает кеш полем leverage;
+- запись пропускается только при доказанном равном плече: другое, устаревшее
+  или неизвестное плечо пишется как раньше;
+- строки одного символа с разным плечом (hedge mode) сбрасывают символ;
+- чтение, отправленное до записи плеча, кеш не меняет;
+- неудачная запись сбрасывает символ, 110043 — доказывает значение;
+- parse_and_trade не вызывает set_leverage_safe при доказанном плече.
+
+Без сети: Telegram и Bybit замокированы в стиле существующих тестов.
+"""
+
+import asyncio
+import os
+import sys
+import time
+from unittest.mock import AsyncMock, MagicMock, patch
+
+# ── Mock heavy deps before any project import ─────────────────────────────────
+for _mod in [
+    "telegram", "telegram.ext", "telegram.request", "telegram.error",
+    "pybit", "pybit.unified_trading",
+    "dotenv", "colorama",
+]:
+    sys.modules.setdefault(_mod, MagicMock())
+
+os.environ.setdefault("TELEGRAM_TOKEN", "test-telegram-token")
+os.environ.setdefault("BYBIT_API_KEY", "test-bybit-key")
+os.environ.setdefault("BYBIT_API_SECRET", "test-bybit-secret")
+os.environ.setdefault("ALLOWED_TELEGRAM_ID", "123")
+os.environ.setdefault("IS_DEMO", "True")
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import pytest  # noqa: E402
+
+from core import leverage_cache as lc  # noqa: E402
+
+_UID = "123"
+
+
+@pytest.fixture(autouse=True)
+def _fresh_cache():
+    lc.reset_leverage_cache()
+    yield
+    lc.reset_leverage_cache()
+
+
+def _positions(*rows):
+    return {"retCode": 0, "result": {"list": list(rows)}}
+
+
+@pytest.mark.asyncio
+async def test_get_positions_through_bybit_call_seeds_cache():
+    import core.bybit_call as bc_mod
+
+    def get_positions(**kwargs):
+        return _positions({"symbol": "BTCUSDT", "size": "0", "leverage": "5"})
+
+    async def run_network(fn, *args, **kwargs):
+        return fn(*args, **kwargs)
+
+    with patch.object(bc_mod, "native_call", return_value=None), \
+         patch.object(bc_mod, "run_network", run_network):
+        await bc_mod.bybit_call(get_positions, category="linear", symbol="BTCUSDT")
+
+    assert lc.leverage_is_set("BTCUSDT", 5)
+    assert not lc.leverage_is_set("BTCUSDT", 10)
+    assert not lc.leverage_is_set("ETHUSDT", 5)
+
+
+def test_stale_or_disabled_cache_proves_nothing():
+    lc.note_positions_response(
+        _positions({"symbol": "BTCUSDT", "leverage": "5"}), time.monotonic(),
+    )
+    assert lc.leverage_is_set("BTCUSDT", "5")
+
+    with patch.object(lc, "LEVERAGE_CACHE_TTL_SEC", 0):
+        assert not lc.leverage_is_set("BTCUSDT", 5)
+
+    lc.reset_leverage_cache()
+    lc.note_positions_response(
+        _positions({"symbol": "BTCUSDT", "leverage": "5"}),
+        time.monotonic() - lc.LEVERAGE_CACHE_TTL_SEC - 1,
+    )
+    assert not lc.leverage_is_set("BTCUSDT", 5)
+
+
+def test_error_envelope_and_disagreeing_rows_do_not_prove():
+    lc.note_positions_response(
+        {"retCode": 10001, "result": {"list": [{"symbol": "BTCUSDT", "leverage": "5"}]}},
+        time.monotonic(),
+    )
+    assert not lc.leverage_is_set("BTCUSDT", 5)
+
+    lc.note_positions_response(
+        _positions({"symbol": "BTCUSDT", "leverage": "5"}), time.monotonic(),
+    )
+    lc.note_positions_response(
+        _positions(
+            {"symbol": "BTCUSDT", "positionIdx": 1, "leverage": "5"},
+            {"symbol": "BTCUSDT", "positionIdx": 2, "leverage": "10"},
+        ),
+        time.monotonic(),
+    )
+    assert not lc.leverage_is_set("BTCUSDT", 5)
+    assert not lc.leverage_is_set("BTCUSDT", 10)
+
+
+def test_read_sent_before_write_is_ignored():
+    read_sent = time.monotonic()
+    lc.note_leverage_write("BTCUSDT", 10, time.monotonic(), True)
+
+    lc.note_positions_response(
+        _positions({"symbol": "BTCUSDT", "leverage": "5"}), read_sent,
+    )
+
+    assert lc.leverage_is_set("BTCUSDT", 10)
+
+
+def test_write_outcomes_of_set_leverage_safe():
+    from handlers import orders
+
+    with patch.object(orders.session, "set_leverage", MagicMock()):
+        assert orders.set_leverage_safe("BTCUSDT", 5) == 5
+    assert lc.leverage_is_set("BTCUSDT", 5)
+
+    with patch.object(orders.session, "set_leverage",
+                      MagicMock(side_effect=RuntimeError("boom"))):
+        assert orders.set_leverage_safe("BTCUSDT", 7) == 1
+    assert not lc.leverage_is_set("BTCUSDT", 5)
+    assert not lc.leverage_is_set("BTCUSDT", 7)
+
+    with patch.object(orders.session, "set_leverage",
+                      MagicMock(side_effect=RuntimeError("110043 not modified"))):
+        assert orders.set_leverage_safe("BTCUSDT", 7) == 7
+    assert lc.leverage_is_set("BTCUSDT", 7)
+
+
+# ── parse_and_trade ───────────────────────────────────────────────────────────
+
+async def _run_signal():
+    import handlers.signal_parser as sp
+
+    calls = []
+
+    async def bybit(fn, *args, **kwargs):
+        session = sp.session
+        await asyncio.sleep(0)
+        if fn is sp.check_daily_limit:
+            return (True, 0.0)
+        if fn is session.get_tickers:
+            return {"result": {"list": [{"lastPrice": "100"}]}}
+        if fn is session.get_instruments_info:
+            return {"result": {"list": [{
+                "lotSizeFilter": {"qtyStep": "0.001", "minOrderQty": "0.001",
+                                  "maxOrderQty": "0"},
+                "priceFilter": {"tickSize": "0.01"},
+            }]}}
+        if fn is session.get_wallet_balance:
+            calls.append("wallet")
+            return {"result": {"list": [{"totalAvailableBalance": "10000"}]}}
+        if fn is sp.set_leverage_safe:
+            calls.append("leverage")
+            return args[1]
+        if fn is sp.place_limit_order:
+            calls.append("place")
+            return {"retCode": 0, "result": {"orderId": "L1"}}
+        if fn is session.get_open_orders:
+            return {"retCode": 0, "result": {"list": [{
+                "symbol": "BTCUSDT", "orderId": "L1", "stopLoss": "95",
+            }]}}
+        raise AssertionError(f"Неожидаемая цель bybit_call: {fn!r}")
+
+    msg = MagicMock()
+    msg.text = "BTC 100 95 long #Test"
+    msg.caption = None
+    msg.reply_text = AsyncMock()
+    msg.reply_html = AsyncMock()
+    update = MagicMock()
+    update.effective_user.id = _UID
+    update.effective_message = msg
+    with patch.object(sp, "ALLOWED_ID", _UID), \
+         patch.object(sp, "bybit_call", bybit), \
+         patch.object(sp, "is_trading_enabled", return_value=True), \
+         patch.object(sp, "is_source_enabled", return_value=True), \
+         patch.object(sp, "get_global_risk", return_value=10.0), \
+         patch.object(sp, "resolve_signal_conflict",
+                      AsyncMock(return_value=("add", "добор разрешён"))), \
+         patch.object(sp, "read_existing_side", AsyncMock(return_value="LONG")), \
+         patch.object(sp, "enforce_heat", AsyncMock(return_value=(True, "ok"))), \
+         patch.object(sp, "read_heat_positions", AsyncMock(return_value=None)), \
+         patch.object(sp, "clip_qty", return_value=(2.0, "OK", {"desired_qty": 2.0})), \
+         patch.object(sp, "update_risk_for_symbol", MagicMock()), \
+         patch.object(sp, "log_source", MagicMock()), \
+         patch.object(sp, "append_event", MagicMock(return_value=True)):
+        await sp.parse_and_trade(update, MagicMock())
+    return calls
+
+
+@pytest.mark.asyncio
+async def test_signal_skips_write_when_leverage_is_proven():
+    # SL 95 от входа 100 — 5 %, сигнал просит x5.
+    lc.note_positions_response(
+        _positions({"symbol": "BTCUSDT", "size": "1", "leverage": "5"}),
+        time.monotonic(),
+    )
+
+    calls = await _run_signal()
+
+    # Плечо не менялось: ни записи, ни повторного чтения баланса для добора.
+    assert calls == ["wallet", "place"]
+
+
+@pytest.mark.asyncio
+async def test_signal_writes_unproven_leverage():
+    calls = await _run_signal()
+
+    assert calls.count("leverage") == 1
+    assert calls.count("wallet") == 2 and calls.count("place") == 1
@@ -18,7 +18,10 @@ LIVE-FIX5 remediation — пагинация closed-PnL в check_daily_limit().
   ``retCode``, пустая страница с продолжением, повторный токен, упор в предел
   страниц) уходит в существующий fail-closed выход ``(False, 0.0)`` без
   частичного PnL;
-- сигнатура для вызывающих не меняется, write-эндпоинты не вызываются.
+- сигнатура для вызывающих не меняется, write-эндпоинты не вызываются;
+- накопитель дня догружает только окно после учтённых закрытий, повтор
+  ``(orderId, updatedTime)`` не учитывает, на смене дня и при строках без
+  ключа читает день заново, а сбой окна накопитель не меняет.
 
 Тесты с пометкой «падает на single-page baseline» — это регрессии на исходный
 дефект: baseline делал ровно один запрос и второй страницы не видел.
@@ -392,3 +395,111 @@ class TestCallerContract:
                 imported.add(node.module)
         assert not [m for m in imported if m.split(".")[0] == "handlers"], imported
         assert callable(_tc._daily_closed_pnl_rows)
+
+
+# ── Накопитель дня: догрузка только новых закрытий ────────────────────────────
+
+def _keyed(pnl, order_id, updated):
+    """Строка closed-PnL с ключом накопителя (orderId, updatedTime)."""
+    return {"symbol": "BTCUSDT", "closedPnl": str(pnl),
+            "orderId": order_id, "updatedTime": str(updated)}
+
+
+class _Exchange:
+    """Одна session на несколько проверок дня: очередь страниц и учёт запросов."""
+
+    def __init__(self):
+        self.queue: list = []
+        self.calls: list = []
+        self.session = MagicMock()
+        self.session.get_closed_pnl.side_effect = self._closed_pnl
+        self.session.get_wallet_balance.return_value = {
+            "retCode": 0, "result": {"list": [{"totalPerpUPL": "0.0"}]}
+        }
+
+    def _closed_pnl(self, **kw):
+        self.calls.append(dict(kw))
+        resp = self.queue.pop(0)
+        if isinstance(resp, Exception):
+            raise resp
+        return resp
+
+    def realized(self, ts_start, *pages):
+        self.queue.extend(pages)
+        with patch.object(_tc, "session", self.session):
+            return _tc._daily_realized_pnl(ts_start)
+
+
+@pytest.fixture
+def exchange():
+    saved = _tc._daily_pnl_state
+    _tc._daily_pnl_state = None
+    try:
+        yield _Exchange()
+    finally:
+        _tc._daily_pnl_state = saved
+
+
+class TestDailyPnlAccumulator:
+
+    _DAY = 1_700_000_000_000
+
+    def test_second_check_reads_only_window_after_high_water(self, exchange):
+        hw = self._DAY + 3_600_000
+        first = exchange.realized(
+            self._DAY,
+            _page([_keyed("10.0", "A", self._DAY + 1000)], next_cursor="C2"),
+            _page([_keyed("-4.0", "B", hw)]),
+        )
+        # Окно с перекрытием снова отдаёт B: повтор не учитывается.
+        second = exchange.realized(
+            self._DAY,
+            _page([_keyed("-4.0", "B", hw), _keyed("-1.5", "C", hw + 10)]),
+        )
+
+        assert first == pytest.approx(6.0)
+        assert second == pytest.approx(4.5)
+        assert [kw["startTime"] for kw in exchange.calls] == [
+            self._DAY, self._DAY, hw - _tc._DAILY_PNL_OVERLAP_MS,
+        ]
+        assert exchange.calls[2].get("cursor") is None
+
+    def test_new_day_starts_from_midnight_again(self, exchange):
+        exchange.realized(self._DAY, _page([_keyed("10.0", "A", self._DAY + 5)]))
+        next_day = self._DAY + 86_400_000
+        total = exchange.realized(next_day, _page([_keyed("2.0", "Z", next_day + 5)]))
+
+        assert total == pytest.approx(2.0)
+        assert exchange.calls[-1]["startTime"] == next_day
+
+    def test_failed_window_keeps_accumulator_and_propagates(self, exchange):
+        exchange.realized(self._DAY, _page([_keyed("10.0", "A", self._DAY + 5)]))
+
+        with pytest.raises(_tc._DailyLimitDataError):
+            exchange.realized(
+                self._DAY,
+                _page([_keyed("-70.0", "B", self._DAY + 9)], next_cursor="C2"),
+                _page([], next_cursor="C3"),
+            )
+        total = exchange.realized(
+            self._DAY, _page([_keyed("-70.0", "B", self._DAY + 9)]),
+        )
+
+        assert total == pytest.approx(-60.0)
+
+    def test_rows_without_key_force_full_recount(self, exchange):
+        exchange.realized(self._DAY, _page([_row("10.0")]))
+        total = exchange.realized(
+            self._DAY, _page([_row("10.0"), _keyed("1.0", "B", self._DAY + 9)]),
+        )
+        again = exchange.realized(
+            self._DAY,
+            _page([_row("10.0"), _keyed("1.0", "B", self._DAY + 9),
+                   _keyed("-1.0", "C", self._DAY + 20)]),
+        )
+
+        assert total == pytest.approx(11.0)
+        assert again == pytest.approx(10.0)
+        # Строку без ключа не отличить от повтора: окно не догружается, каждая
+        # проверка снова читает день с полуночи.
+        assert [kw["startTime"] for kw in exchange.calls] == [self._DAY] * 3
@@ -232,14 +232,18 @@ async def _run_tp_ladder(monkeypatch, tmp_path, position, events=None, *,
             "lotSizeFilter": {"qtyStep": qty_step, "minOrderQty": min_qty},
         }]}}
 
-    async def place_order(**kwargs):
-        orders.append(kwargs)
-        return {"retCode": 0, "result": {"orderId": f"tp-{len(orders)}"}}
+    async def place_batch_order(category, request):
+        rows = []
+        for item in request:
+            orders.append(dict(item, category=category))
+            rows.append({"orderId": f"tp-{len(orders)}"})
+        return {"retCode": 0, "result": {"list": rows},
+                "retExtInfo": {"list": [{"code": 0, "msg": "OK"}] * len(rows)}}
 
     fake_session = SimpleNamespace(
         get_positions=get_positions,
         get_instruments_info=get_instruments_info,
-        place_order=place_order,
+        place_batch_order=place_batch_order,
     )
 
     async def api_call(fn, **kwargs):
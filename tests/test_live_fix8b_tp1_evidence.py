@@ -202,11 +202,14 @@ def _classify(rows, *, symbol="ETHUSDT", side="Buy", idx=0, tp_order_id="tp-1",
 
 async def _run_tp_ladder(monkeypatch, tmp_path, position, events=None, *,
                          tick="0.01", qty_step="0.1", min_qty="1",
-                         responses=None, fail_after=None):
-    """Один прогон place_tp_ladder; возвращает (запросы place_order, текст).
+                         responses=None, fail_after=None, retries=None):
+    """Один прогон place_tp_ladder; возвращает (ноги пакета, текст).
 
     ``responses`` подменяет ответы биржи на размещение (по номеру ноги),
-    ``fail_after`` заставляет биржу отказать начиная с указанной ноги.
+    ``fail_after`` делает исход ног начиная с указанной недоказанным
+    (транспортный сбой). Ответ ноги попадает в её элемент ответа
+    ``place_batch_order``; повторы отдельным ``place_order`` пишутся в
+    ``retries``, если список передан.
     """
     orders = []
     if events is not None:
@@ -221,18 +224,38 @@ async def _run_tp_ladder(monkeypatch, tmp_path, position, events=None, *,
             "lotSizeFilter": {"qtyStep": qty_step, "minOrderQty": min_qty},
         }]}}
 
-    async def place_order(**kwargs):
-        orders.append(kwargs)
-        leg = len(orders)
+    def leg_response(leg):
         if fail_after is not None and leg >= fail_after:
-            raise RuntimeError("bybit rejected leg")
+            return None
         if responses is not None:
             return responses[leg - 1]
         return {"retCode": 0, "result": {"orderId": f"tp-{leg}"}}
 
+    async def place_batch_order(category, request):
+        rows, codes = [], []
+        for item in request:
+            orders.append(dict(item, category=category))
+            resp = leg_response(len(orders))
+            has_code = isinstance(resp, dict) and "retCode" in resp
+            result = resp.get("result") if isinstance(resp, dict) else None
+            rows.append(result if isinstance(result, dict) else {})
+            codes.append({"code": resp["retCode"], "msg": ""} if has_code else {})
+        return {"retCode": 0, "retMsg": "OK", "result": {"list": rows},
+                "retExtInfo": {"list": codes}}
+
+    async def place_order(**kwargs):
+        if retries is not None:
+            retries.append(kwargs)
+        leg = next(i for i, o in enumerate(orders, 1) if o["price"] == kwargs["price"])
+        resp = leg_response(leg)
+        if resp is None:
+            raise RuntimeError("bybit rejected leg")
+        return resp
+
     fake_session = SimpleNamespace(
         get_positions=get_positions,
         get_instruments_info=get_instruments_info,
+        place_batch_order=place_batch_order,
         place_order=place_order,
     )
 
@@ -1361,6 +1384,55 @@ async def test_tp2_tp3_placement_behavior_is_unchanged(monkeypatch, tmp_path):
     ] == ["tp-1"]
 
 
+@pytest.mark.asyncio
+async def test_ladder_is_one_batch_and_only_rejected_legs_are_retried(
+    monkeypatch, tmp_path
+):
+    """Пакет: доказанный отказ TP2 повторяется один раз, TP1/TP3 — нет."""
+    rejected = {"retCode": 110007, "result": {"orderId": ""}}
+    ok = {"retCode": 0, "result": {"orderId": "tp-1"}}
+    retries = []
+    orders, text = await _run_tp_ladder(
+        monkeypatch, tmp_path, _position(), [_entry(), _confirmed()],
+        responses=[ok, rejected, {"retCode": 0, "result": {"orderId": "tp-3"}}],
+        retries=retries,
+    )
+
+    assert [o["price"] for o in orders] == ["101.0", "102.0", "103.0"]
+    assert [r["price"] for r in retries] == ["102.0"]
+    assert _tp1()["order_id"] == "tp-1"
+    assert "Err" not in text
+
+
+@pytest.mark.asyncio
+async def test_unproven_batch_leg_is_never_retried(monkeypatch, tmp_path):
+    """Недоказанный исход ноги в пакете — без повтора (нога могла встать)."""
+    retries = []
+    orders, text = await _run_tp_ladder(
+        monkeypatch, tmp_path, _position(), [_entry(), _confirmed()],
+        fail_after=3, retries=retries,
+    )
+
+    assert len(orders) == 3
+    assert retries == []
+    assert "Err TP3" in text and "Err TP2" not in text
+    assert _tp1()["order_id"] == "tp-1"
+
+
+@pytest.mark.parametrize("resp,expected", [
+    ({"retCode": 0, "result": {"list": [{"orderId": "a"}, {"orderId": ""}]},
+      "retExtInfo": {"list": [{"code": 0, "msg": "OK"}, {"code": 110007, "msg": "x"}]}},
+     [{"result": {"orderId": "a"}, "retCode": 0, "retMsg": "OK"},
+      {"result": {"orderId": ""}, "retCode": 110007, "retMsg": "x"}]),
+    ({"retCode": 0, "result": {"list": [{"orderId": "a"}]},
+      "retExtInfo": {"list": [{}, {}]}},
+     [None, None]),
+    ({"retCode": 10001, "retMsg": "bad"}, [{"retCode": 10001, "retMsg": "bad"}] * 2),
+])
+def test_batch_response_is_split_into_leg_envelopes(resp, expected):
+    assert trading_core._batch_leg_responses(resp, 2) == expected
+
+
 # --- C. Минимальная доказанная форма строки истории ------------------------
 
 @pytest.mark.parametrize("row, reason", [
@@ -1444,3 +1516,19 @@ async def test_observer_read_bound_is_unchanged_after_remediation(
         "limit": 50,
     }]
     assert second == []
+
+
+@pytest.mark.asyncio
+async def test_dropped_zero_qty_tp1_leg_never_promotes_a_later_leg(
+    monkeypatch, tmp_path
+):
+    """36b. Нога TP1 нулевого объёма отброшена — TP3 идентичностью TP1 не становится."""
+    orders, _ = await _run_tp_ladder(
+        monkeypatch, tmp_path, _position(qty="0.2"),
+        [_entry(qty="0.2"), _confirmed(qty="0.2")],
+        min_qty="0",
+    )
+
+    assert [order["price"] for order in orders] == ["103.0"]
+    assert journal.read_events(event_type=journal.TP_LADDER_PLACED) == []
+    assert _tp1() is None
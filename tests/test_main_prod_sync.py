@@ -153,9 +153,10 @@ def runtime():
             requests.append(self)
 
     class Handler:
-        def __init__(self, kind, *args):
+        def __init__(self, kind, *args, **kwargs):
             self.kind = kind
             self.args = args
+            self.kwargs = kwargs
             self.group = None
 
     class JobQueue:
@@ -265,6 +266,10 @@ def runtime():
             "reconcile_journal_job",
             "weekly_source_report_job",
             "register_protection_watchdog",
+            "register_private_stream",
+            "register_instrument_refresh",
+            "register_journal_snapshot",
+            "register_heat_queue_drain",
         )
     }
     jobs["_next_monday_9utc_secs"] = lambda: 1234
@@ -293,7 +298,7 @@ def runtime():
             ApplicationBuilder=lambda: builder,
             CommandHandler=lambda *args: Handler("CommandHandler", *args),
             CallbackQueryHandler=lambda *args: Handler("CallbackQueryHandler", *args),
-            MessageHandler=lambda *args: Handler("MessageHandler", *args),
+            MessageHandler=lambda *args, **kwargs: Handler("MessageHandler", *args, **kwargs),
             filters=SimpleNamespace(TEXT=Filter(), CAPTION=Filter(), COMMAND=Filter()),
         ),
         "telegram.request": _module("telegram.request", HTTPXRequest=Request),
@@ -310,6 +315,16 @@ def runtime():
             USER_RISK_USD=50.0,
             IS_DEMO=True,
             ALLOWED_ID="123",
+            CLOSED_PNL_HISTORY_FILE="closed_pnl_history.jsonl",
+            BYBIT_TRANSPORT="pybit",
+        ),
+        "core.bybit_async": _module(
+            "core.bybit_async",
+            configure_async_transport=lambda session: None,
+        ),
+        "core.closed_pnl_store": _module(
+            "core.closed_pnl_store",
+            configure_closed_pnl_store=lambda path: None,
         ),
         "core.database": _module(
             "core.database",
@@ -596,6 +611,9 @@ def test_runtime_preserves_handlers_and_background_job_schedules(runtime):
     assert protection.group == -1
     assert signals.args[1].__name__ == "parse_and_trade"
     assert signals.group == 0
+    # Сигнал, ждущий Bybit, не задерживает следующие обновления и команды.
+    assert signals.kwargs == {"block": False}
+    assert protection.kwargs == {}
 
     calls = runtime.app.job_queue.calls
     assert len(calls) == 8
@@ -0,0 +1,486 @@
+"""
+Приватный WebSocket-поток Bybit V5 (core.private_stream) и его подключение к
+задачам (app.jobs).
+
+Доказываемые свойства:
+- поток проходит auth с подписью ``GET/realtime{expires}``, подписывается на
+  position/order/execution и ведёт зеркало позиций: закрытая позиция из него
+  уходит, топики order и execution только сообщают об изменении;
+- зеркало пригодно только после засева и пока поток жив; pong продлевает
+  свежесть, разрыв делает зеркало непригодным и ведёт к переподключению;
+  backoff переподключения начинается заново после сессии, дошедшей до подписки;
+- дельты, пришедшие во время засева, переигрываются поверх REST без отката к
+  более старой версии; засев из прошлого соединения не применяется;
+- сигнал потока сбрасывает общий снимок биржи и ставит один внеочередной
+  прогон на пачку событий; прогон засевает зеркало из REST и запускает exit
+  binding раньше auto-BE;
+- пульс берёт позиции из свежего зеркала, а из устаревшего — по REST;
+- выключенный флаг не запускает ничего.
+
+Сеть — только loopback: локальный WebSocket-сервер на stdlib в потоке.
+"""
+
+import base64
+import hashlib
+import hmac
+import importlib
+import json
+import os
+import queue
+import socket
+import struct
+import sys
+import threading
+import time
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import pytest
+
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if _ROOT not in sys.path:
+    sys.path.insert(0, _ROOT)
+
+from core import private_stream as ps  # noqa: E402
+
+_HEAVY_MODULES = (
+    "telegram", "telegram.ext", "telegram.request", "telegram.error",
+    "pybit", "pybit.unified_trading",
+    "dotenv", "colorama",
+)
+
+_ENV = {
+    "TELEGRAM_TOKEN": "t", "BYBIT_API_KEY": "k", "BYBIT_API_SECRET": "s",
+    "ALLOWED_TELEGRAM_ID": "123", "IS_DEMO": "True",
+}
+
+_PROJECT_ROOTS = ("core", "handlers", "app")
+
+_WS_GUID = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+
+
+# ── Локальный WebSocket-сервер ────────────────────────────────────────────────
+
+class _FakeBybitServer:
+    """Минимальный сервер RFC 6455: handshake, текстовые кадры, close.
+
+    Каждое соединение обслуживается в своём потоке: входящие сообщения
+    клиента кладутся в ``received``, ответы на auth/subscribe/ping — как у
+    Bybit, а ``push`` отправляет данные в текущее соединение.
+    """
+
+    def __init__(self, secret: str):
+        self.secret = secret
+        self.sock = socket.socket()
+        self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.sock.bind(("127.0.0.1", 0))
+        self.sock.listen()
+        self.url = f"ws://127.0.0.1:{self.sock.getsockname()[1]}"
+        self.received = queue.Queue()
+        self.connections = []
+        self._conn = None
+        self._write_lock = threading.Lock()
+        self._closed = False
+        threading.Thread(target=self._accept, daemon=True).start()
+
+    def _accept(self):
+        while not self._closed:
+            try:
+                conn, _ = self.sock.accept()
+            except OSError:
+                return
+            threading.Thread(target=self._serve, args=(conn,), daemon=True).start()
+
+    def _serve(self, conn):
+        request = b""
+        while b"\r\n\r\n" not in request:
+            request += conn.recv(1024)
+        key = next(
+            line.split(":", 1)[1].strip()
+            for line in request.decode().split("\r\n")
+            if line.lower().startswith("sec-websocket-key:")
+        )
+        accept = base64.b64encode(
+            hashlib.sha1((key + _WS_GUID).encode()).digest()
+        ).decode()
+        conn.sendall(
+            b"HTTP/1.1 101 Switching Protocols\r\nUpgrade: websocket\r\n"
+            b"Connection: Upgrade\r\nSec-WebSocket-Accept: "
+            + accept.encode() + b"\r\n\r\n"
+        )
+        self._conn = conn
+        self.connections.append(conn)
+        try:
+            while True:
+                opcode, payload = self._read_frame(conn)
+                if opcode == 0x8:
+                    with self._write_lock:
+                        conn.sendall(bytes([0x88, 0]))
+                    conn.close()
+                    return
+                message = json.loads(payload)
+                self.received.put(message)
+                self._reply(conn, message)
+        except (OSError, ConnectionError):
+            return
+
+    def _reply(self, conn, message):
+        op = message.get("op")
+        if op == "auth":
+            api_key, expires, signature = message["args"]
+            expected = hmac.new(
+                self.secret.encode(), f"GET/realtime{expires}".encode(),
+                hashlib.sha256,
+            ).hexdigest()
+            ok = signature == expected and expires > time.time() * 1000
+            self._send(conn, {"op": "auth", "success": ok, "ret_msg": ""})
+        elif op == "subscribe":
+            self._send(conn, {"op": "subscribe", "success": True, "ret_msg": ""})
+        elif op == "ping":
+            self._send(conn, {"op": "pong", "args": [str(int(time.time() * 1000))]})
+
+    @staticmethod
+    def _recv_exact(conn, size):
+        data = b""
+        while len(data) < size:
+            chunk = conn.recv(size - len(data))
+            if not chunk:
+                raise ConnectionError("client closed")
+            data += chunk
+        return data
+
+    def _read_frame(self, conn):
+        first, second = self._recv_exact(conn, 2)
+        length = second & 0x7F
+        if length == 126:
+            length = struct.unpack(">H", self._recv_exact(conn, 2))[0]
+        elif length == 127:
+            length = struct.unpack(">Q", self._recv_exact(conn, 8))[0]
+        mask = self._recv_exact(conn, 4)
+        data = self._recv_exact(conn, length)
+        return first & 0x0F, bytes(b ^ mask[i % 4] for i, b in enumerate(data))
+
+    def _send(self, conn, message):
+        payload = json.dumps(message).encode()
+        if len(payload) < 126:
+            header = bytes([0x81, len(payload)])
+        else:
+            header = bytes([0x81, 126]) + struct.pack(">H", len(payload))
+        with self._write_lock:
+            conn.sendall(header + payload)
+
+    def push(self, topic, rows):
+        self._send(self._conn, {"topic": topic, "creationTime": 1, "data": rows})
+
+    def drop(self):
+        """Обрывает текущее соединение без close-кадра."""
+        self._conn.shutdown(socket.SHUT_RDWR)
+        self._conn.close()
+
+    def close(self):
+        self._closed = True
+        self.sock.close()
+        for conn in self.connections:
+            try:
+                conn.close()
+            except OSError:
+                pass
+
+
+def _wait(predicate, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+@pytest.fixture
+def server():
+    srv = _FakeBybitServer("secret")
+    yield srv
+    srv.close()
+
+
+@pytest.fixture
+def stream(server):
+    changes = queue.Queue()
+    stream = ps.PrivateStream(
+        server.url, "key", "secret",
+        on_change=changes.put,
+        ping_interval=0.2,
+        reconnect_delay=0.05,
+    )
+    stream.changes = changes
+    stream.start()
+    yield stream
+    stream.stop()
+
+
+def _position(symbol, size, updated, idx=0):
+    return {"category": "linear", "symbol": symbol, "positionIdx": idx,
+            "size": size, "side": "Buy", "updatedTime": str(updated)}
+
+
+def _order(order_id, status, updated, symbol="BTCUSDT"):
+    return {"category": "linear", "symbol": symbol, "orderId": order_id,
+            "orderStatus": status, "updatedTime": str(updated)}
+
+
+# ── 1. Поток: auth, подписка, зеркало ────────────────────────────────────────
+
+def test_stream_authenticates_subscribes_and_mirrors_changes(server, stream):
+    assert stream.changes.get(timeout=5) == {ps.STREAM_SUBSCRIBED}
+    auth = server.received.get(timeout=1)
+    subscribe = server.received.get(timeout=1)
+    assert auth["op"] == "auth" and auth["args"][0] == "key"
+    assert subscribe == {"op": "subscribe", "args": ["position", "order", "execution"]}
+
+    mirror = stream.mirror
+    assert mirror.needs_seed and mirror.positions(60) is None
+    epoch = mirror.begin_seed()
+    assert mirror.seed(epoch, [_position("BTCUSDT", "1", 100)])
+    assert mirror.is_fresh(60)
+
+    server.push("order", [_order("o-1", "New", 200)])
+    server.push("position", [_position("BTCUSDT", "0", 300),
+                             _position("ETHUSDT", "2", 300)])
+    execution = {"category": "linear", "symbol": "ETHUSDT", "execId": "e-1",
+                 "orderId": "o-1", "execQty": "2"}
+    server.push("execution", [execution])
+    server.push("execution", [execution, {"category": "spot", "execId": "e-2"}])
+    server.push("order", [_order("o-1", "Filled", 400)])
+
+    topics = [stream.changes.get(timeout=5) for _ in range(5)]
+    assert topics == [{"order"}, {"position"}, {"execution"}, {"execution"}, {"order"}]
+    assert [p["symbol"] for p in mirror.positions(60)] == ["ETHUSDT"]
+
+
+def test_pong_keeps_mirror_fresh_and_drop_reconnects(server, stream):
+    assert stream.changes.get(timeout=5) == {ps.STREAM_SUBSCRIBED}
+    mirror = stream.mirror
+    assert mirror.seed(mirror.begin_seed(), [])
+
+    # Тишина дольше ping_interval: клиент пингует, pong продлевает свежесть.
+    assert _wait(lambda: any(
+        m.get("op") == "ping" for m in list(server.received.queue)
+    ))
+    time.sleep(0.3)
+    assert mirror.is_fresh(0.25)
+
+    server.drop()
+    assert stream.changes.get(timeout=5) == {ps.STREAM_SUBSCRIBED}
+    assert stream.reconnects >= 1
+    assert len(server.connections) == 2
+    # Переподключение: засев прошлого соединения не доказывает новое.
+    assert mirror.needs_seed and not mirror.is_fresh(60)
+
+
+def test_rejected_auth_never_marks_stream_connected(server):
+    stream = ps.PrivateStream(
+        server.url, "key", "wrong-secret",
+        on_change=MagicMock(), ping_interval=0.2,
+        reconnect_delay=0.05, max_reconnect_delay=0.05,
+    )
+    stream.start()
+    try:
+        assert _wait(lambda: stream.reconnects >= 2)
+        stream._on_change.assert_not_called()
+        assert not stream.mirror.needs_seed
+    finally:
+        stream.stop()
+
+
+def test_backoff_restarts_after_a_subscribed_session():
+    stream = ps.PrivateStream(
+        "ws://unused", "key", "secret",
+        reconnect_delay=1, max_reconnect_delay=8,
+    )
+    # Дошла ли очередная сессия до подписки перед разрывом.
+    subscribed = [False, False, False, True, False]
+    delays = []
+
+    def session():
+        stream._subscribed = subscribed.pop(0)
+        raise ConnectionError("drop")
+
+    class _Stop:
+        def is_set(self):
+            return False
+
+        def wait(self, delay):
+            delays.append(delay)
+            return not subscribed
+
+    stream._session = session
+    stream._stop = _Stop()
+    stream._run()
+
+    assert delays == [1, 2, 4, 1, 2]
+
+
+# ── 2. Засев зеркала ─────────────────────────────────────────────────────────
+
+def test_seed_replays_deltas_without_regressing_versions():
+    mirror = ps.PrivateStreamMirror()
+    mirror.connected()
+    epoch = mirror.begin_seed()
+    # Пока идёт REST-запрос: старая дельта BTC и закрытие ETH.
+    mirror.apply({"topic": "position", "data": [_position("BTCUSDT", "1", 100)]})
+    mirror.apply({"topic": "position", "data": [_position("ETHUSDT", "0", 500)]})
+    mirror.apply({"topic": "order", "data": [_order("o-9", "New", 600)]})
+
+    assert mirror.seed(
+        epoch,
+        [_position("BTCUSDT", "3", 200), _position("ETHUSDT", "1", 400)],
+    )
+
+    positions = {p["symbol"]: p["size"] for p in mirror.positions(60)}
+    assert positions == {"BTCUSDT": "3"}
+
+
+def test_seed_from_previous_connection_is_discarded():
+    mirror = ps.PrivateStreamMirror()
+    mirror.connected()
+    epoch = mirror.begin_seed()
+    mirror.disconnected()
+    mirror.connected()
+
+    assert mirror.seed(epoch, [_position("BTCUSDT", "1", 1)]) is False
+    assert mirror.needs_seed and mirror.positions(60) is None
+
+
+# ── 3. Подключение к задачам ─────────────────────────────────────────────────
+
+@pytest.fixture(scope="module")
+def jobs():
+    """Настоящий app.jobs в офлайн-окружении, с полным откатом после."""
+    original = set(sys.modules)
+    displaced = {}
+    for name in list(sys.modules):
+        if name.split(".")[0] in _PROJECT_ROOTS:
+            displaced[name] = sys.modules.pop(name)
+    for name in _HEAVY_MODULES:
+        sys.modules.setdefault(name, MagicMock())
+    saved_env = {key: os.environ.get(key) for key in _ENV}
+    os.environ.update(_ENV)
+    sys.modules["core.trading_core"] = MagicMock()
+    try:
+        yield importlib.import_module("app.jobs")
+    finally:
+        for key, value in saved_env.items():
+            if value is None:
+                os.environ.pop(key, None)
+            else:
+                os.environ[key] = value
+        for name in set(sys.modules) - original:
+            sys.modules.pop(name, None)
+        sys.modules.update(displaced)
+
+
+class _JobQueue:
+    def __init__(self):
+        self.once = []
+
+    def run_once(self, callback, when, **kwargs):
+        self.once.append((callback, when))
+
+
+def test_registration_follows_private_stream_enabled(jobs, monkeypatch):
+    queue_ = _JobQueue()
+    monkeypatch.setattr(jobs, "PRIVATE_STREAM_ENABLED", False)
+    assert jobs.register_private_stream(queue_) is False
+    assert queue_.once == []
+
+    monkeypatch.setattr(jobs, "PRIVATE_STREAM_ENABLED", True)
+    assert jobs.register_private_stream(queue_) is True
+    assert queue_.once == [
+        (jobs._start_private_stream_job, jobs.PRIVATE_STREAM_FIRST_RUN_SEC),
+    ]
+
+
+def test_change_invalidates_snapshot_and_coalesces_wake(jobs, monkeypatch):
+    invalidations = []
+    monkeypatch.setattr(jobs, "invalidate_exchange_snapshots",
+                        lambda: invalidations.append(1))
+    monkeypatch.setattr(jobs, "_stream_wake_pending", False)
+    queue_ = _JobQueue()
+
+    jobs._on_private_stream_change(queue_, {"order"})
+    jobs._on_private_stream_change(queue_, {"execution"})
+    jobs._on_private_stream_change(queue_, {"position"})
+
+    assert len(invalidations) == 3
+    assert queue_.once == [
+        (jobs.private_stream_wake_job, jobs.PRIVATE_STREAM_WAKE_DELAY_SEC),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_wake_seeds_mirror_then_runs_binding_before_auto_be(jobs, monkeypatch):
+    order = []
+
+    async def binding(context):
+        order.append("exit_binding")
+
+    async def auto_be(context):
+        order.append("auto_be")
+
+    def rows(*items):
+        return {"retCode": 0, "result": {"list": list(items)}}
+
+    snapshots = {"positions": rows(_position("BTCUSDT", "1", 1))}
+
+    async def positions_snapshot(call, session, *, fresh=False, max_age=None):
+        assert fresh is True
+        return SimpleNamespace(resp=snapshots["positions"])
+
+    mirror = ps.PrivateStreamMirror()
+    mirror.connected()
+    monkeypatch.setattr(jobs, "_private_stream", SimpleNamespace(mirror=mirror))
+    monkeypatch.setattr(jobs, "_stream_wake_pending", True)
+    monkeypatch.setattr(jobs, "exit_binding_job", binding)
+    monkeypatch.setattr(jobs, "auto_breakeven_job", auto_be)
+    monkeypatch.setattr(jobs, "get_positions_snapshot", positions_snapshot)
+
+    await jobs.private_stream_wake_job(SimpleNamespace())
+
+    assert order == ["exit_binding", "auto_be"]
+    assert jobs._stream_wake_pending is False
+    assert [p["symbol"] for p in mirror.positions(60)] == ["BTCUSDT"]
+
+    # Засеянное зеркало повторно не засевается; недоказанный REST не засевает.
+    fresh_mirror = ps.PrivateStreamMirror()
+    fresh_mirror.connected()
+    monkeypatch.setattr(jobs, "_private_stream", SimpleNamespace(mirror=fresh_mirror))
+    snapshots["positions"] = {"retCode": 10006, "result": {"list": []}}
+    await jobs.private_stream_wake_job(SimpleNamespace())
+    assert fresh_mirror.needs_seed and fresh_mirror.positions(60) is None
+
+
+@pytest.mark.asyncio
+async def test_heartbeat_reads_fresh_mirror_and_falls_back_to_rest(jobs, monkeypatch):
+    rest_calls = []
+
+    async def positions_snapshot(call, session, *, fresh=False, max_age=None):
+        rest_calls.append(fresh)
+        return SimpleNamespace(resp={"retCode": 0, "result": {"list": []}})
+
+    mirror = ps.PrivateStreamMirror()
+    mirror.connected()
+    row = dict(_position("BTCUSDT", "1", 1), unrealisedPnl="12.5")
+    assert mirror.seed(mirror.begin_seed(), [row])
+    monkeypatch.setattr(jobs, "_private_stream", SimpleNamespace(mirror=mirror))
+    monkeypatch.setattr(jobs, "get_positions_snapshot", positions_snapshot)
+    logged = []
+    monkeypatch.setattr(jobs.logging, "info", lambda msg, *a: logged.append(msg))
+
+    await jobs.heartbeat_job(SimpleNamespace())
+    assert rest_calls == []
+    assert "+12.50$ (1 deals)" in logged[-1] and "Stream: live" in logged[-1]
+
+    mirror.disconnected()
+    await jobs.heartbeat_job(SimpleNamespace())
+    assert rest_calls == [False]
+    assert "(0 deals)" in logged[-1] and "Stream: stale" in logged[-1]
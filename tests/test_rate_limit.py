@@ -0,0 +1,75 @@
+"""
+Token bucket запросов к Bybit (core.rate_limit).
+
+Доказываемые свойства:
+- запас ведра уходит без ожидания, дальше каждый запрос ждёт 1/rate;
+- за время простоя ведро пополняется, но не сверх capacity;
+- параллельные резервирования выстраиваются в очередь без цикла ожидания.
+"""
+import asyncio
+import os
+import sys
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import pytest  # noqa: E402
+
+import core.rate_limit as rl  # noqa: E402
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def _bucket(rate, capacity):
+    clock = _Clock()
+    with patch.object(rl.time, "monotonic", clock):
+        bucket = rl.TokenBucket(rate, capacity)
+    return bucket, clock
+
+
+def test_burst_then_paced_waits():
+    bucket, clock = _bucket(rate=10, capacity=2)
+    with patch.object(rl.time, "monotonic", clock):
+        waits = [bucket.reserve() for _ in range(4)]
+
+    assert waits == pytest.approx([0.0, 0.0, 0.1, 0.2])
+
+
+def test_idle_refill_is_capped_by_capacity():
+    bucket, clock = _bucket(rate=10, capacity=2)
+    with patch.object(rl.time, "monotonic", clock):
+        bucket.reserve()
+        bucket.reserve()
+        clock.now += 60
+        waits = [bucket.reserve() for _ in range(3)]
+
+    assert waits == pytest.approx([0.0, 0.0, 0.1])
+
+
+def test_invalid_parameters_are_rejected():
+    with pytest.raises(ValueError):
+        rl.TokenBucket(0, 1)
+    with pytest.raises(ValueError):
+        rl.TokenBucket(1, 0)
+
+
+@pytest.mark.asyncio
+async def test_concurrent_acquire_sleeps_in_reservation_order():
+    bucket, clock = _bucket(rate=5, capacity=1)
+    slept = []
+
+    async def _sleep(seconds):
+        slept.append(seconds)
+
+    with patch.object(rl.time, "monotonic", clock), \
+            patch.object(rl.asyncio, "sleep", new=_sleep):
+        waits = await asyncio.gather(*(bucket.acquire() for _ in range(3)))
+
+    assert list(waits) == pytest.approx([0.0, 0.2, 0.4])
+    assert slept == pytest.approx([0.2, 0.4])
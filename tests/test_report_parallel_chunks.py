@@ -0,0 +1,88 @@
+"""
+Параллельная выборка чанков месяца в /report (handlers.reporting).
+
+Доказываемые свойства:
+- чанки выбираются одновременно, но не больше _REPORT_CHUNK_CONCURRENCY;
+- строки склеиваются в порядке чанков, а не в порядке завершения;
+- ошибка одного чанка отменяет остальные и сообщает границы своего чанка.
+
+Сети нет: load_closed_pnl_rows заменена задержкой, обратной номеру чанка.
+"""
+import asyncio
+import os
+import sys
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+for _mod in [
+    "telegram", "telegram.ext", "telegram.request", "telegram.error",
+    "pybit", "pybit.unified_trading",
+    "dotenv", "colorama",
+]:
+    sys.modules.setdefault(_mod, MagicMock())
+
+_cfg = MagicMock()
+_cfg.ALLOWED_ID = "123"
+_cfg.DATA_DIR = Path(__file__).resolve().parent.parent / "data"
+sys.modules.setdefault("core.config", _cfg)
+
+for _mod in ["core.trading_core", "core.bybit_call", "core.database", "handlers.orders"]:
+    sys.modules.setdefault(_mod, MagicMock())
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import pytest  # noqa: E402
+
+import handlers.reporting as reporting  # noqa: E402
+
+_CHUNKS = [(i * 100, i * 100 + 99) for i in range(5)]
+
+
+class _Loader:
+    def __init__(self, fail_start=None):
+        self.fail_start = fail_start
+        self.active = 0
+        self.peak = 0
+        self.started = []
+        self.cancelled = []
+
+    async def __call__(self, start_ms, end_ms, now_ms):
+        self.started.append(start_ms)
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        try:
+            # Первые чанки отвечают последними.
+            await asyncio.sleep(0.001 * (len(_CHUNKS) - start_ms // 100))
+            if start_ms == self.fail_start:
+                raise RuntimeError("страница не доказана")
+            return [{"orderId": f"{start_ms}-a"}, {"orderId": f"{start_ms}-b"}]
+        except asyncio.CancelledError:
+            self.cancelled.append(start_ms)
+            raise
+        finally:
+            self.active -= 1
+
+
+@pytest.mark.asyncio
+async def test_chunks_run_bounded_in_parallel_and_keep_chunk_order():
+    loader = _Loader()
+    with patch.object(reporting, "load_closed_pnl_rows", new=loader):
+        rows = await reporting._load_report_chunks(_CHUNKS, 10_000, [])
+
+    assert [r["orderId"] for r in rows] == [
+        f"{start}-{suffix}" for start, _ in _CHUNKS for suffix in "ab"
+    ]
+    assert loader.peak == reporting._REPORT_CHUNK_CONCURRENCY
+
+
+@pytest.mark.asyncio
+async def test_failed_chunk_cancels_the_rest_and_reports_its_bounds():
+    loader = _Loader(fail_start=200)
+    failed = []
+    with patch.object(reporting, "load_closed_pnl_rows", new=loader):
+        with pytest.raises(RuntimeError):
+            await reporting._load_report_chunks(_CHUNKS, 10_000, failed)
+
+    assert failed == [(200, 299)]
+    assert loader.cancelled
+    assert loader.active == 0
@@ -0,0 +1,165 @@
+"""
+Планировщик запросов Bybit (core.request_scheduler) за bybit_call.
+
+Доказываемые свойства:
+- при занятых слотах первыми проходят записи, затем чтения, затем фоновые
+  чтения; внутри класса — порядок поступления;
+- запрос к эндпоинту с исчерпанным ведром ждёт пополнения, другой эндпоинт
+  при этом не ждёт;
+- заголовки X-Bapi-Limit* и отказ 10006 из исключения SDK подстраивают ведро
+  и учитываются в метриках; исключение пробрасывается без изменений;
+- очередь и ожидание видны в метриках.
+"""
+import asyncio
+import os
+import sys
+from unittest.mock import MagicMock, patch
+
+for _mod in [
+    "telegram", "telegram.ext", "telegram.request",
+    "pybit", "pybit.unified_trading",
+    "dotenv", "colorama",
+]:
+    sys.modules.setdefault(_mod, MagicMock())
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import pytest  # noqa: E402
+
+import core.request_scheduler as rs  # noqa: E402
+from core.bybit_call import bybit_call  # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def _clean_scheduler():
+    rs.reset_request_scheduler()
+    yield
+    rs.reset_request_scheduler()
+
+
+class _RateLimited(Exception):
+    def __init__(self, headers=None):
+        super().__init__("rate limit")
+        self.status_code = 10006
+        self.resp_headers = headers
+
+
+def test_priority_classes():
+    assert rs.request_priority("place_order") == rs.PRIORITY_WRITE
+    assert rs.request_priority("set_trading_stop") == rs.PRIORITY_WRITE
+    assert rs.request_priority("get_positions") == rs.PRIORITY_READ
+    assert rs.request_priority("get_kline") == rs.PRIORITY_BACKGROUND
+
+
+@pytest.mark.asyncio
+async def test_writes_overtake_queued_reads_when_slots_are_full():
+    order = []
+
+    async def _request(name):
+        async with rs.request_slot(name):
+            order.append(name)
+            await asyncio.sleep(0)
+
+    with patch.object(rs, "MAX_IN_FLIGHT", 1):
+        async with rs.request_slot("get_wallet_balance"):
+            tasks = [asyncio.ensure_future(_request(name)) for name in (
+                "get_kline", "get_positions", "place_order",
+                "get_open_orders", "set_trading_stop",
+            )]
+            await asyncio.sleep(0)
+        await asyncio.gather(*tasks)
+
+    assert order == [
+        "place_order", "set_trading_stop",
+        "get_positions", "get_open_orders",
+        "get_kline",
+    ]
+    stats = rs.get_scheduler_stats()["priority"]
+    assert stats["write"]["waited"] == 2
+    assert stats["background"]["waited"] == 1
+
+
+@pytest.mark.asyncio
+async def test_exhausted_endpoint_waits_other_endpoint_does_not():
+    slept = []
+
+    async def _sleep(seconds):
+        slept.append(seconds)
+
+    limit = rs.ENDPOINT_LIMITS["place_order"] * rs.LIMIT_SAFETY
+    with patch.object(rs.asyncio, "sleep", new=_sleep):
+        for _ in range(int(limit)):
+            async with rs.request_slot("place_order"):
+                pass
+        assert slept == []
+        async with rs.request_slot("get_positions"):
+            pass
+        assert slept == []
+        async with rs.request_slot("place_order"):
+            pass
+
+    assert len(slept) == 1 and 0 < slept[0] <= 1 / limit + 0.01
+
+
+@pytest.mark.asyncio
+async def test_rate_limit_error_is_counted_and_pauses_endpoint():
+    def place_order(**kwargs):
+        raise _RateLimited({"X-Bapi-Limit": "5", "X-Bapi-Limit-Status": "0"})
+
+    with pytest.raises(_RateLimited):
+        await bybit_call(place_order, symbol="BTCUSDT", _alert_errors=False)
+
+    bucket = rs._BUCKETS["place_order"]
+    assert bucket.rate == pytest.approx(5 * rs.LIMIT_SAFETY)
+    assert bucket.reserve() > 0.5
+    assert rs.get_scheduler_stats()["rate_limited"] == 1
+
+
+@pytest.mark.asyncio
+async def test_unknown_endpoint_has_no_bucket_and_disabled_mode_passes_through():
+    def custom_call():
+        return {"retCode": 0}
+
+    assert await bybit_call(custom_call) == {"retCode": 0}
+    assert "custom_call" not in rs._BUCKETS
+
+    with patch.object(rs, "RATE_LIMIT_ENABLED", False):
+        async with rs.request_slot("place_order"):
+            pass
+    assert "place_order" not in rs._BUCKETS
+
+
+def test_wrappers_resolve_to_the_endpoint_they_call():
+    assert rs.request_endpoint("place_limit_order") == "place_order"
+    assert rs.request_endpoint("place_market_with_retry") == "place_order"
+    assert rs.request_endpoint("set_leverage_safe") == "set_leverage"
+    assert rs.request_endpoint("check_daily_limit") == "get_wallet_balance"
+    assert rs.request_endpoint("get_positions") == "get_positions"
+
+
+@pytest.mark.asyncio
+async def test_wrapper_call_draws_from_the_endpoint_bucket():
+    def place_limit_order(sym, side):
+        return {"retCode": 0}
+
+    def set_leverage_safe(sym, lev):
+        return lev
+
+    await bybit_call(place_limit_order, "BTCUSDT", "LONG")
+    await bybit_call(set_leverage_safe, "BTCUSDT", 5)
+
+    assert "place_order" in rs._BUCKETS
+    assert "set_leverage" in rs._BUCKETS
+    assert "place_limit_order" not in rs._BUCKETS
+    place = rs._BUCKETS["place_order"]
+    assert place._tokens < place.capacity
+
+
+@pytest.mark.asyncio
+async def test_explicit_endpoint_overrides_the_function_name():
+    def _helper():
+        return None
+
+    await bybit_call(_helper, _endpoint="get_closed_pnl")
+
+    assert "get_closed_pnl" in rs._BUCKETS
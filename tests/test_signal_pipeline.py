@@ -0,0 +1,212 @@
+"""
+Конвейер сигналов (core.signal_pipeline) и его использование в parse_and_trade.
+
+Доказываемые свойства:
+- сигналы по разным символам обрабатываются одновременно, по одному
+  символу — строго по очереди поступления;
+- одновременно обрабатывается не больше SIGNAL_PIPELINE_WORKERS сигналов, а
+  ждущие своего символа слот не занимают;
+- исключение внутри обработки освобождает замок и счётчики;
+- два одновременных сигнала по одному символу не дают двойного входа:
+  второй проверяет конфликт уже после размещения первого;
+- глубина очереди и ожидание видны в /health.
+
+Без сети: Telegram и Bybit замокированы в стиле существующих тестов.
+"""
+
+import asyncio
+import os
+import sys
+from unittest.mock import AsyncMock, MagicMock, patch
+
+# ── Mock heavy deps before any project import ─────────────────────────────────
+for _mod in [
+    "telegram", "telegram.ext", "telegram.request", "telegram.error",
+    "pybit", "pybit.unified_trading",
+    "dotenv", "colorama",
+]:
+    sys.modules.setdefault(_mod, MagicMock())
+
+os.environ.setdefault("TELEGRAM_TOKEN", "test-telegram-token")
+os.environ.setdefault("BYBIT_API_KEY", "test-bybit-key")
+os.environ.setdefault("BYBIT_API_SECRET", "test-bybit-secret")
+os.environ.setdefault("ALLOWED_TELEGRAM_ID", "123")
+os.environ.setdefault("IS_DEMO", "True")
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import pytest  # noqa: E402
+
+from core import signal_pipeline  # noqa: E402
+
+_UID = "123"
+
+
+@pytest.fixture(autouse=True)
+def _fresh_pipeline():
+    signal_pipeline.reset_signal_pipeline()
+    yield
+    signal_pipeline.reset_signal_pipeline()
+
+
+async def _job(symbol, log, hold):
+    async with signal_pipeline.signal_slot(symbol):
+        log.append(("start", symbol))
+        await hold.wait()
+        log.append(("end", symbol))
+
+
+@pytest.mark.asyncio
+async def test_symbols_run_concurrently_and_serialize_per_symbol():
+    log = []
+    hold = asyncio.Event()
+    tasks = [
+        asyncio.create_task(_job(symbol, log, hold))
+        for symbol in ("BTCUSDT", "ETHUSDT", "BTCUSDT")
+    ]
+    await asyncio.sleep(0.01)
+
+    assert log == [("start", "BTCUSDT"), ("start", "ETHUSDT")]
+    stats = signal_pipeline.get_signal_pipeline_stats()
+    assert stats["running"] == 2 and stats["queued"] == 1
+    assert stats["symbol_waits"] == 1
+
+    hold.set()
+    await asyncio.gather(*tasks)
+    assert log.index(("start", "BTCUSDT"), 1) > log.index(("end", "BTCUSDT"))
+    stats = signal_pipeline.get_signal_pipeline_stats()
+    assert stats["processed"] == 3 and stats["queued"] == 0
+    assert stats["peak_queued"] >= 1 and stats["waited"] >= 1
+    assert signal_pipeline._SYMBOL_LOCKS == {}
+
+
+@pytest.mark.asyncio
+async def test_worker_limit_and_same_symbol_waiters_hold_no_slot():
+    log = []
+    hold = asyncio.Event()
+    with patch.object(signal_pipeline, "SIGNAL_PIPELINE_WORKERS", 2):
+        tasks = [
+            asyncio.create_task(_job(symbol, log, hold))
+            for symbol in ("BTCUSDT", "BTCUSDT", "BTCUSDT", "ETHUSDT", "SOLUSDT")
+        ]
+        await asyncio.sleep(0.01)
+
+        # Два BTC ждут своего символа и слоты не заняли: ETH получил второй.
+        assert log == [("start", "BTCUSDT"), ("start", "ETHUSDT")]
+        assert signal_pipeline.get_signal_pipeline_stats()["running"] == 2
+
+        hold.set()
+        await asyncio.gather(*tasks)
+    assert [symbol for kind, symbol in log if kind == "start"].count("BTCUSDT") == 3
+
+
+@pytest.mark.asyncio
+async def test_exception_releases_lock_and_counters():
+    with pytest.raises(RuntimeError):
+        async with signal_pipeline.signal_slot("BTCUSDT"):
+            raise RuntimeError("boom")
+
+    stats = signal_pipeline.get_signal_pipeline_stats()
+    assert stats["running"] == 0 and stats["queued"] == 0
+    assert signal_pipeline._SYMBOL_LOCKS == {}
+    async with signal_pipeline.signal_slot("BTCUSDT"):
+        pass
+
+
+def test_health_shows_signal_queue():
+    from handlers.health import build_health_message
+
+    signal_pipeline.record_signal_latency("BTCUSDT", 0.0)
+    text = build_health_message(
+        {}, signal_stats=signal_pipeline.get_signal_pipeline_stats(),
+    )
+
+    assert "Сигналы" in text
+    assert "В очереди" in text and "Сигнал → карточка" in text
+
+
+# ── parse_and_trade под замком символа ────────────────────────────────────────
+
+class _Bybit:
+    """bybit_call лимит-входа; размещение ордера отмечается в ``placed``."""
+
+    def __init__(self, sp):
+        self.sp = sp
+        self.placed = 0
+
+    async def __call__(self, fn, *args, **kwargs):
+        sp = self.sp
+        session = sp.session
+        await asyncio.sleep(0)
+        if fn is sp.check_daily_limit:
+            return (True, 0.0)
+        if fn is session.get_tickers:
+            return {"result": {"list": [{"lastPrice": "100"}]}}
+        if fn is session.get_instruments_info:
+            return {"result": {"list": [{
+                "lotSizeFilter": {"qtyStep": "0.001", "minOrderQty": "0.001",
+                                  "maxOrderQty": "0"},
+                "priceFilter": {"tickSize": "0.01"},
+            }]}}
+        if fn is session.get_wallet_balance:
+            return {"result": {"list": [{"totalAvailableBalance": "10000"}]}}
+        if fn is sp.set_leverage_safe:
+            return 5
+        if fn is sp.place_limit_order:
+            self.placed += 1
+            return {"retCode": 0, "result": {"orderId": f"L{self.placed}"}}
+        if fn is session.get_open_orders:
+            return {"retCode": 0, "result": {"list": [{
+                "symbol": "BTCUSDT", "orderId": f"L{self.placed}", "stopLoss": "95",
+            }]}}
+        raise AssertionError(f"Неожидаемая цель bybit_call: {fn!r}")
+
+
+def _update(text):
+    msg = MagicMock()
+    msg.text = text
+    msg.caption = None
+    msg.reply_text = AsyncMock()
+    msg.reply_html = AsyncMock()
+    update = MagicMock()
+    update.effective_user.id = _UID
+    update.effective_message = msg
+    return update, msg
+
+
+@pytest.mark.asyncio
+async def test_concurrent_same_symbol_signals_enter_once():
+    import handlers.signal_parser as sp
+
+    bybit = _Bybit(sp)
+
+    async def conflict(symbol, side, *, existing_side_read=None):
+        # Биржа «видит» ордер первого сигнала, как только он размещён.
+        await asyncio.sleep(0)
+        if bybit.placed:
+            return "ignore", f"Уже {side} по {symbol} — сигнал проигнорирован"
+        return "allow", ""
+
+    first, first_msg = _update("BTC 100 95 long #Test")
+    second, second_msg = _update("BTC 100 95 long #Test")
+    with patch.object(sp, "ALLOWED_ID", _UID), \
+         patch.object(sp, "bybit_call", bybit), \
+         patch.object(sp, "is_trading_enabled", return_value=True), \
+         patch.object(sp, "is_source_enabled", return_value=True), \
+         patch.object(sp, "get_global_risk", return_value=10.0), \
+         patch.object(sp, "resolve_signal_conflict", conflict), \
+         patch.object(sp, "read_existing_side", AsyncMock(return_value=None)), \
+         patch.object(sp, "enforce_heat", AsyncMock(return_value=(True, "ok"))), \
+         patch.object(sp, "read_heat_positions", AsyncMock(return_value=None)), \
+         patch.object(sp, "clip_qty", return_value=(2.0, "OK", {"desired_qty": 2.0})), \
+         patch.object(sp, "update_risk_for_symbol", MagicMock()), \
+         patch.object(sp, "log_source", MagicMock()), \
+         patch.object(sp, "append_event", MagicMock(return_value=True)):
+        await asyncio.gather(
+            sp.parse_and_trade(first, MagicMock()),
+            sp.parse_and_trade(second, MagicMock()),
+        )
+
+    assert bybit.placed == 1
+    assert "проигнорирован" in second_msg.reply_text.call_args[0][0]
+    assert signal_pipeline.get_signal_pipeline_stats()["symbol_waits"] == 1
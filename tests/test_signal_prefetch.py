@@ -0,0 +1,324 @@
+"""
+Одновременные чтения перед сделкой в parse_and_trade.
+
+Доказываемые свойства:
+- дневной лимит, тикер, фильтры инструмента и баланс запрашиваются
+  одновременно, а не друг за другом;
+- сигнал, не прошедший локальные проверки, запрашивает только дневной лимит;
+- ранний выход (дневной лимит) отменяет невостребованные чтения и не пишет
+  плечо;
+- ошибка раннего чтения направления по символу — по-прежнему "block";
+- _get_existing_side читает позицию и ордера одновременно, но решает в
+  прежнем порядке: найденная позиция важнее ошибки чтения ордеров;
+- добор ("add") перечитывает баланс после смены плеча;
+- heat считается по заранее прочитанному снимку позиций;
+- время «сигнал → карточка» записывается для каждого сигнала.
+
+Без сети: Telegram и Bybit замокированы в стиле существующих тестов.
+"""
+
+import asyncio
+import os
+import sys
+from unittest.mock import AsyncMock, MagicMock, patch
+
+# ── Mock heavy deps before any project import ─────────────────────────────────
+for _mod in [
+    "telegram", "telegram.ext", "telegram.request", "telegram.error",
+    "pybit", "pybit.unified_trading",
+    "dotenv", "colorama",
+]:
+    sys.modules.setdefault(_mod, MagicMock())
+
+os.environ.setdefault("TELEGRAM_TOKEN", "test-telegram-token")
+os.environ.setdefault("BYBIT_API_KEY", "test-bybit-key")
+os.environ.setdefault("BYBIT_API_SECRET", "test-bybit-secret")
+os.environ.setdefault("ALLOWED_TELEGRAM_ID", "123")
+os.environ.setdefault("IS_DEMO", "True")
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import pytest  # noqa: E402
+
+import handlers.signal_parser as sp  # noqa: E402
+
+_UID = "123"
+
+_INSTRUMENTS = {"result": {"list": [{
+    "lotSizeFilter": {"qtyStep": "0.001", "minOrderQty": "0.001", "maxOrderQty": "0"},
+    "priceFilter": {"tickSize": "0.01"},
+}]}}
+
+
+class _Bybit:
+    """bybit_call по идентичности цели; чтения ждут, пока не стартуют все."""
+
+    def __init__(self, *, can_trade=(True, 0.0), together=()):
+        self.can_trade = can_trade
+        self.calls = []
+        self.in_flight = 0
+        self.peak = 0
+        self._together = set(together)
+        self._started = set()
+        self._all_started = asyncio.Event()
+
+    def _route(self, fn):
+        session = sp.session
+        if fn is sp.check_daily_limit:
+            return "daily", self.can_trade
+        if fn is session.get_tickers:
+            return "ticker", {"result": {"list": [{"lastPrice": "100"}]}}
+        if fn is session.get_instruments_info:
+            return "instrument", _INSTRUMENTS
+        if fn is session.get_wallet_balance:
+            return "wallet", {"result": {"list": [{"totalAvailableBalance": "10000"}]}}
+        if fn is sp.set_leverage_safe:
+            return "leverage", 5
+        if fn is sp.place_limit_order:
+            return "place", {"retCode": 0, "result": {"orderId": "L1"}}
+        if fn is session.get_open_orders:
+            return "readback", {"retCode": 0, "result": {"list": [{
+                "symbol": "BTCUSDT", "orderId": "L1", "stopLoss": "95",
+            }]}}
+        raise AssertionError(f"Неожидаемая цель bybit_call: {fn!r}")
+
+    async def __call__(self, fn, *args, **kwargs):
+        name, resp = self._route(fn)
+        self.calls.append(name)
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+        try:
+            if name in self._together:
+                self._started.add(name)
+                if self._started >= self._together:
+                    self._all_started.set()
+                # Последовательный обработчик здесь не дождался бы остальных.
+                await asyncio.wait_for(self._all_started.wait(), timeout=2)
+            else:
+                await asyncio.sleep(0)
+            return resp
+        finally:
+            self.in_flight -= 1
+
+
+def _make_signal_update(text):
+    msg = MagicMock()
+    msg.text = text
+    msg.caption = None
+    msg.reply_text = AsyncMock()
+    msg.reply_html = AsyncMock()
+    update = MagicMock()
+    update.effective_user.id = _UID
+    update.effective_message = msg
+    return update, msg
+
+
+async def _run_signal(bybit, text="BTC 100 95 long #Test", *,
+                      conflict=None, existing=None, heat=None,
+                      heat_positions=None, source_enabled=True):
+    """Прогоняет parse_and_trade; возвращает (msg, моки ранних чтений)."""
+    update, msg = _make_signal_update(text)
+    existing = existing or AsyncMock(return_value=None)
+    heat_positions = heat_positions or AsyncMock(return_value=None)
+    extra = []
+    if conflict is not None:
+        extra.append(patch.object(sp, "resolve_signal_conflict", conflict))
+    if heat is not None:
+        extra.append(patch.object(sp, "enforce_heat", heat))
+    with patch.object(sp, "ALLOWED_ID", _UID), \
+         patch.object(sp, "bybit_call", bybit), \
+         patch.object(sp, "is_trading_enabled", return_value=True), \
+         patch.object(sp, "is_source_enabled", return_value=source_enabled), \
+         patch.object(sp, "get_global_risk", return_value=10.0), \
+         patch.object(sp, "read_existing_side", existing), \
+         patch.object(sp, "read_heat_positions", heat_positions), \
+         patch.object(sp, "send_alert", AsyncMock()), \
+         patch.object(sp, "clip_qty", return_value=(2.0, "OK", {"desired_qty": 2.0})), \
+         patch.object(sp, "set_market_pending", MagicMock()), \
+         patch.object(sp, "update_risk_for_symbol", MagicMock()), \
+         patch.object(sp, "log_source", MagicMock()), \
+         patch.object(sp, "append_event", MagicMock(return_value=True)):
+        for p in extra:
+            p.start()
+        try:
+            await sp.parse_and_trade(update, MagicMock())
+        finally:
+            for p in extra:
+                p.stop()
+    return msg, existing, heat_positions
+
+
+def _allow():
+    return AsyncMock(return_value=("allow", ""))
+
+
+def _heat_ok():
+    return AsyncMock(return_value=(True, "ok"))
+
+
+@pytest.mark.asyncio
+async def test_independent_reads_are_in_flight_together():
+    bybit = _Bybit(together={"daily", "ticker", "instrument", "wallet"})
+
+    msg, existing, heat_positions = await _run_signal(
+        bybit, conflict=_allow(), heat=_heat_ok(),
+    )
+
+    assert bybit.peak >= 4
+    assert bybit.calls.count("place") == 1
+    assert bybit.calls.count("wallet") == 1
+    existing.assert_awaited_once_with("BTCUSDT")
+    heat_positions.assert_awaited_once()
+    assert "Не удалось" not in str(msg.reply_text.call_args)
+
+
+@pytest.mark.asyncio
+async def test_locally_rejected_signal_reads_only_daily_limit():
+    bybit = _Bybit()
+
+    msg, existing, _ = await _run_signal(bybit, source_enabled=False)
+
+    assert bybit.calls == ["daily"]
+    existing.assert_not_called()
+    assert "карантине" in msg.reply_text.call_args[0][0]
+
+
+@pytest.mark.asyncio
+async def test_daily_limit_block_cancels_pending_reads():
+    bybit = _Bybit(can_trade=(False, -50.0))
+    started = asyncio.Event()
+
+    async def slow_side(symbol):
+        started.set()
+        await asyncio.sleep(30)
+
+    existing = AsyncMock(side_effect=slow_side)
+    msg, _, _ = await _run_signal(bybit, existing=existing)
+    await asyncio.sleep(0)
+
+    assert "leverage" not in bybit.calls and "place" not in bybit.calls
+    assert "Дневной PnL" in msg.reply_text.call_args[0][0]
+    assert started.is_set()
+    pending = [t for t in asyncio.all_tasks() if t is not asyncio.current_task()]
+    assert not any("slow_side" in repr(t.get_coro()) for t in pending)
+
+
+@pytest.mark.asyncio
+async def test_existing_side_read_error_still_blocks():
+    bybit = _Bybit()
+    existing = AsyncMock(side_effect=RuntimeError("positions down"))
+
+    msg, _, _ = await _run_signal(bybit, existing=existing, heat=_heat_ok())
+
+    assert "leverage" not in bybit.calls and "place" not in bybit.calls
+    assert "fail-closed" in msg.reply_text.call_args[0][0]
+
+
+@pytest.mark.asyncio
+async def test_add_rereads_wallet_after_leverage_write():
+    bybit = _Bybit()
+    add = AsyncMock(return_value=("add", "добор разрешён"))
+
+    await _run_signal(bybit, conflict=add, heat=_heat_ok())
+
+    assert bybit.calls.count("wallet") == 2
+    last_wallet = max(i for i, name in enumerate(bybit.calls) if name == "wallet")
+    assert bybit.calls.index("leverage") < last_wallet
+    assert bybit.calls.count("place") == 1
+
+
+@pytest.mark.asyncio
+async def test_heat_uses_prefetched_positions():
+    import core.heat as heat
+
+    bybit = _Bybit()
+    positions = {"result": {"list": [
+        {"symbol": "ETHUSDT", "size": "1", "avgPrice": "180", "stopLoss": "90"},
+    ]}}
+    heat_positions = AsyncMock(return_value=positions)
+
+    with patch.object(heat, "MAX_TOTAL_HEAT_USDT", 95.0), \
+         patch.object(heat, "HEAT_ACTION", "reject"), \
+         patch("core.exchange_snapshot.get_positions_snapshot",
+               AsyncMock(side_effect=AssertionError("повторное чтение"))), \
+         patch("core.notifier.send_alert", AsyncMock()):
+        msg, _, _ = await _run_signal(
+            bybit, conflict=_allow(), heat_positions=heat_positions,
+        )
+
+    heat_positions.assert_awaited_once()
+    assert "place" not in bybit.calls
+    assert "Heat" in msg.reply_html.call_args[0][0]
+
+
+@pytest.mark.asyncio
+async def test_signal_to_card_latency_is_recorded():
+    from core import signal_pipeline
+
+    signal_pipeline.reset_signal_pipeline()
+    bybit = _Bybit()
+
+    await _run_signal(bybit, conflict=_allow(), heat=_heat_ok())
+    await _run_signal(_Bybit(can_trade=(False, -50.0)))
+
+    latency = signal_pipeline.get_signal_pipeline_stats()["latency"]
+    assert latency["count"] == 1
+    assert signal_pipeline._LATENCY[0][0] == "BTCUSDT"
+    assert 0 <= latency["last_ms"] <= latency["max_ms"]
+
+
+# ── core.conflict._get_existing_side ──────────────────────────────────────────
+
+def _conflict_reads(positions, orders):
+    from core.trading_core import session
+
+    calls = []
+
+    async def call(fn, *args, **kwargs):
+        resp = positions if fn is session.get_positions else orders
+        calls.append("positions" if fn is session.get_positions else "orders")
+        await asyncio.sleep(0)
+        if isinstance(resp, BaseException):
+            raise resp
+        return resp
+
+    return calls, patch("core.bybit_call.bybit_call", call)
+
+
+def _rows(*rows):
+    return {"result": {"list": list(rows)}}
+
+
+@pytest.mark.asyncio
+async def test_position_wins_over_orders_read_error():
+    from core.conflict import _get_existing_side
+
+    calls, patched = _conflict_reads(
+        _rows({"size": "1", "side": "Sell"}), RuntimeError("orders down"),
+    )
+    with patched:
+        assert await _get_existing_side("BTCUSDT") == "SHORT"
+    assert sorted(calls) == ["orders", "positions"]
+
+
+@pytest.mark.asyncio
+async def test_orders_read_error_without_position_raises():
+    from core.conflict import _get_existing_side, resolve_signal_conflict
+
+    _, patched = _conflict_reads(_rows(), RuntimeError("orders down"))
+    with patched:
+        with pytest.raises(RuntimeError):
+            await _get_existing_side("BTCUSDT")
+        action, reason = await resolve_signal_conflict("BTCUSDT", "LONG")
+    assert action == "block"
+    assert "fail-closed" in reason
+
+
+@pytest.mark.asyncio
+async def test_positions_read_error_raises_even_if_orders_are_clean():
+    from core.conflict import _get_existing_side
+
+    _, patched = _conflict_reads(RuntimeError("positions down"), _rows())
+    with patched:
+        with pytest.raises(RuntimeError):
+            await _get_existing_side("BTCUSDT")
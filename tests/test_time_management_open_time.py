@@ -0,0 +1,178 @@
+"""
+Время открытия позиций для time_management_job (app.jobs._position_open_times).
+
+Доказываемые свойства:
+- время позиции кешируется по её lifecycle: повторный прогон биржу не
+  запрашивает, закрытая позиция из кеша уходит;
+- новый вход бота с тем же createdTime на бирже берёт новое время из
+  журнала, а не кешированное время прошлого lifecycle;
+- позиция бота берёт время из журнала (якорь исполнения входа либо
+  POSITION_CONFIRMED) без get_executions; сторона журнала обязана совпасть;
+- остальные символы запрашиваются параллельно, а не по одному;
+- сбой запроса символа не кешируется и не мешает остальным;
+- журнал отдаёт время только CONFIRMED lifecycle.
+
+Сети нет: bybit_call заменён фейком, журнал уводится в tmp_path.
+"""
+import asyncio
+import os
+import sys
+from pathlib import Path
+from unittest.mock import MagicMock
+
+for _mod in [
+    "telegram", "telegram.ext", "telegram.request", "telegram.error",
+    "pybit", "pybit.unified_trading",
+    "dotenv", "colorama",
+]:
+    sys.modules.setdefault(_mod, MagicMock())
+
+_cfg = MagicMock()
+_cfg.ALLOWED_ID = "0"
+_cfg.DATA_DIR = Path(__file__).resolve().parent.parent / "data"
+sys.modules.setdefault("core.config", _cfg)
+
+for _mod in ["core.trading_core", "core.database"]:
+    sys.modules.setdefault(_mod, MagicMock())
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import pytest  # noqa: E402
+
+import app.jobs as jobs  # noqa: E402
+import core.journal as journal  # noqa: E402
+
+_T0 = 1_770_000_000_000
+
+
+def _pos(symbol, side="Buy", created=_T0):
+    return {"symbol": symbol, "side": side, "positionIdx": 0,
+            "createdTime": str(created), "size": "1"}
+
+
+class _Exchange:
+    """get_executions по символу; учитывает вызовы и одновременность."""
+
+    def __init__(self, exec_ms=None, fail=()):
+        self.exec_ms = exec_ms or {}
+        self.fail = set(fail)
+        self.calls = []
+        self.in_flight = 0
+        self.peak = 0
+
+    async def __call__(self, fn, **kwargs):
+        assert fn is jobs.session.get_executions
+        sym = kwargs["symbol"]
+        self.calls.append(sym)
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+        try:
+            for _ in range(3):
+                await asyncio.sleep(0)
+            if sym in self.fail:
+                raise RuntimeError("timeout")
+            ms = self.exec_ms.get(sym)
+            rows = [{"execTime": str(ms)}] if ms is not None else []
+            return {"retCode": 0, "result": {"list": rows}}
+        finally:
+            self.in_flight -= 1
+
+
+@pytest.fixture
+def exchange(monkeypatch):
+    jobs._POSITION_OPEN_MS.clear()
+    fake = _Exchange()
+    monkeypatch.setattr(jobs, "bybit_call", fake)
+    monkeypatch.setattr(jobs, "get_position_open_times", lambda: {})
+    yield fake
+    jobs._POSITION_OPEN_MS.clear()
+
+
+def _key(p):
+    return jobs._position_lifecycle_key(p)
+
+
+@pytest.mark.asyncio
+async def test_open_time_is_fetched_once_per_lifecycle(exchange):
+    exchange.exec_ms = {"BTCUSDT": _T0 + 5}
+    btc = _pos("BTCUSDT")
+
+    first = await jobs._position_open_times([btc])
+    second = await jobs._position_open_times([btc])
+
+    assert exchange.calls == ["BTCUSDT"]
+    assert first == second == {_key(btc): _T0 + 5}
+
+    await jobs._position_open_times([])
+    assert jobs._POSITION_OPEN_MS == {}
+
+
+@pytest.mark.asyncio
+async def test_reentry_with_same_created_time_is_not_served_from_cache(exchange, monkeypatch):
+    seeds = {"BTCUSDT": {"side": "LONG", "order_id": "e-1", "open_ms": _T0 + 7,
+                         "source": journal.ENTRY_EXECUTION_ANCHOR_PROVEN}}
+    monkeypatch.setattr(jobs, "get_position_open_times", lambda: dict(seeds))
+    btc = _pos("BTCUSDT")
+
+    assert await jobs._position_open_times([btc]) == {_key(btc): _T0 + 7}
+
+    # Позиция закрылась и открылась снова между прогонами; createdTime тот же.
+    seeds["BTCUSDT"] = {"side": "LONG", "order_id": "e-2", "open_ms": _T0 + 900,
+                        "source": journal.ENTRY_EXECUTION_ANCHOR_PROVEN}
+
+    assert await jobs._position_open_times([btc]) == {_key(btc): _T0 + 900}
+    assert exchange.calls == []
+    assert len(jobs._POSITION_OPEN_MS) == 1
+
+
+@pytest.mark.asyncio
+async def test_journal_seed_skips_exchange_lookup(exchange, monkeypatch):
+    monkeypatch.setattr(jobs, "get_position_open_times", lambda: {
+        "BTCUSDT": {"side": "LONG", "order_id": "e-1", "open_ms": _T0 + 7,
+                    "source": journal.ENTRY_EXECUTION_ANCHOR_PROVEN},
+        "ETHUSDT": {"side": "LONG", "order_id": "e-2", "open_ms": _T0 + 9,
+                    "source": journal.POSITION_CONFIRMED},
+    })
+    btc, eth = _pos("BTCUSDT"), _pos("ETHUSDT", side="Sell")
+
+    times = await jobs._position_open_times([btc, eth])
+
+    # ETH в журнале — LONG, а на бирже Short: это не позиция бота.
+    assert exchange.calls == ["ETHUSDT"]
+    assert times == {_key(btc): _T0 + 7, _key(eth): _T0}
+
+
+@pytest.mark.asyncio
+async def test_lookups_run_concurrently_and_failures_are_not_cached(exchange):
+    exchange.fail = {"XRPUSDT"}
+    positions = [_pos(s) for s in ("BTCUSDT", "ETHUSDT", "SOLUSDT", "XRPUSDT")]
+
+    times = await jobs._position_open_times(positions)
+
+    assert exchange.peak > 1
+    assert set(times) == {_key(p) for p in positions[:3]}
+
+    exchange.calls.clear()
+    await jobs._position_open_times(positions)
+    assert exchange.calls == ["XRPUSDT"]
+
+
+def test_journal_open_times_come_only_from_confirmed_lifecycles(monkeypatch, tmp_path):
+    monkeypatch.setattr(journal, "DATA_DIR", tmp_path)
+    monkeypatch.setattr(journal, "JOURNAL_FILE", tmp_path / "trade_journal.jsonl")
+    for symbol in ("BTCUSDT", "ETHUSDT"):
+        assert journal.append_event({
+            "event": journal.ENTRY_PLACED, "symbol": symbol, "side": "LONG",
+            "order_id": f"{symbol}-1", "qty": "1", "planned_risk_usdt": 1.0,
+        })
+    assert journal.append_event({
+        "event": journal.POSITION_CONFIRMED, "symbol": "BTCUSDT", "side": "LONG",
+        "order_id": "BTCUSDT-1",
+    })
+    confirmed_ts = journal.get_position_lifecycles()["BTCUSDT"]["confirmed_ts"]
+
+    assert journal.get_position_open_times() == {
+        "BTCUSDT": {"side": "LONG", "order_id": "BTCUSDT-1",
+                    "open_ms": int(confirmed_ts * 1000),
+                    "source": journal.POSITION_CONFIRMED},
+    }